@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+File: import_time.py
+Measure how long importing the package takes, each run in a fresh interpreter.
+Run from the repository root: python benchmarks/import_time.py [num_runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+"""The directory containing the package."""
+STATEMENTS: tuple[str, ...] = (
+    'import SignalCliApi',
+    'from SignalCliApi import SignalCli',
+    'from SignalCliApi import SignalAccounts',
+)
+"""The imports to time."""
+TIMER_CODE: str = """
+import sys, time
+start = time.perf_counter()
+%s
+print((time.perf_counter() - start) * 1000, len(sys.modules))
+"""
+"""The code run in each interpreter, printing the milliseconds taken and the number of modules loaded."""
+
+
+def __time_statement__(statement: str) -> tuple[float, int]:
+    """
+    Time a statement in a fresh interpreter.
+    :param statement: str: The import statement.
+    :return: tuple[float, int]: The milliseconds taken, and the number of modules loaded.
+    """
+    environment: dict[str, str] = dict(os.environ)
+    environment['PYTHONPATH'] = SRC_PATH
+    output: str = subprocess.check_output([sys.executable, '-c', TIMER_CODE % statement], env=environment, text=True)
+    milliseconds, num_modules = output.split()
+    return float(milliseconds), int(num_modules)
+
+
+def main() -> None:
+    """
+    Time each statement, and print the median.
+    :return: None
+    """
+    num_runs: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for statement in STATEMENTS:
+        results: list[tuple[float, int]] = [__time_statement__(statement) for _ in range(num_runs)]
+        median: float = statistics.median(milliseconds for milliseconds, _ in results)
+        print("%-42s %7.1f ms median of %i, %i modules loaded." % (statement, median, num_runs, results[0][1]))
+    return
+
+
+if __name__ == '__main__':
+    main()
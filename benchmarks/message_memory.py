@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+File: message_memory.py
+Measure the memory used per message, with tracemalloc.
+Run from the repository root: python benchmarks/message_memory.py [num_messages]
+"""
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from SignalCliApi.signalAccountContext import SignalAccountContext
+from SignalCliApi.signalCommon import MessageTypes, RecipientTypes
+from SignalCliApi.signalContacts import SignalContacts
+from SignalCliApi.signalDevices import SignalDevices
+from SignalCliApi.signalGroups import SignalGroups
+from SignalCliApi.signalReceivedMessage import SignalReceivedMessage
+from SignalCliApi.signalSticker import SignalStickerPacks
+
+ACCOUNT_ID: str = '+15555550100'
+"""The account the messages belong to."""
+SENDERS: tuple[str, ...] = ('+15555550101', '+15555550102', '+15555550103')
+"""The contacts the messages come from."""
+
+
+def __fake_signal_cli__(server_socket: socket.socket) -> None:
+    """
+    Answer every request with an empty result, standing in for signal-cli.
+    :param server_socket: socket.socket: Our end of the socket pair.
+    :return: None
+    """
+    buffer: bytes = b''
+    while True:
+        data: bytes = server_socket.recv(65536)
+        if len(data) == 0:
+            return
+        buffer += data
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            request: dict = json.loads(line)
+            response: dict = {'jsonrpc': '2.0', 'id': request.get('id'), 'result': {}}
+            server_socket.sendall(json.dumps(response).encode() + b'\n')
+
+
+def __make_message_dict__(number: int) -> dict:
+    """
+    Make the __to_dict__() of a received message.
+    :param number: int: The message number, used to vary the sender, timestamp and body.
+    :return: dict: The message dict.
+    """
+    timestamp: int = 1700000000000 + number
+    return {
+        'sender': SENDERS[number % len(SENDERS)], 'recipient': ACCOUNT_ID, 'recipientType': RecipientTypes.CONTACT.value,
+        'device': 1, 'timestamp': {'timestamp': timestamp}, 'messageType': MessageTypes.RECEIVED.value,
+        'isDelivered': True, 'timeDelivered': {'timestamp': timestamp + 500},
+        'isRead': False, 'timeRead': None, 'isViewed': False, 'timeViewed': None,
+        'body': 'Message number %i.' % number, 'attachments': None, 'mentions': {'mentions': []},
+        'reactions': {'reactions': []}, 'sticker': None, 'quote': None, 'expiration': None,
+        'expirationTimestamp': None, 'viewOnce': False, 'previews': [],
+    }
+
+
+def main() -> None:
+    """
+    Build the messages, and report the memory they take.
+    :return: None
+    """
+    num_messages: int = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    client_socket, server_socket = socket.socketpair()
+    threading.Thread(target=__fake_signal_cli__, args=(server_socket,), daemon=True).start()
+    with tempfile.TemporaryDirectory() as config_path:
+        account_path: str = os.path.join(config_path, 'data', ACCOUNT_ID + '.d')
+        os.makedirs(account_path)
+        os.makedirs(os.path.join(config_path, 'stickers'))
+        contacts = SignalContacts(command_socket=client_socket, sync_socket=client_socket, config_path=config_path,
+                                  account_id=ACCOUNT_ID, account_path=account_path)
+        for sender in SENDERS:
+            contacts.__get_or_add__(contact_id=sender)
+        groups = SignalGroups(sync_socket=client_socket, command_socket=client_socket, config_path=config_path,
+                              account_id=ACCOUNT_ID, account_contacts=contacts)
+        devices = SignalDevices(sync_socket=client_socket, account_id=ACCOUNT_ID, this_device=1)
+        _, this_device = devices.__get_or_add__(device_id=1)
+        sticker_packs = SignalStickerPacks(config_path=config_path)
+        context = SignalAccountContext(command_socket=client_socket, sync_socket=client_socket, account_id=ACCOUNT_ID,
+                                       config_path=config_path, account_path=account_path,
+                                       sticker_packs=sticker_packs, contacts=contacts, groups=groups, devices=devices,
+                                       this_device=this_device)
+        message_dicts: list[dict] = [__make_message_dict__(number) for number in range(num_messages)]
+
+        with contacts.bulk_load():
+            tracemalloc.start()
+            before: int = tracemalloc.get_traced_memory()[0]
+            messages: list[SignalReceivedMessage] = [
+                SignalReceivedMessage(context=context, from_dict=message_dict) for message_dict in message_dicts
+            ]
+            after: int = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+    client_socket.close()
+    server_socket.close()
+    used: int = after - before
+    print("%i messages: %i bytes, %.1f bytes per message." % (len(messages), used, used / len(messages)))
+    return
+
+
+if __name__ == '__main__':
+    main()
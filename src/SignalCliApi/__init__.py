@@ -1,31 +1,106 @@
 """File: __init__.py"""
-from .signalAccount import SignalAccount
-from .signalAccounts import SignalAccounts
-from .signalAttachment import SignalAttachment
-from .signalCli import SignalCli
-from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
-from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
-from .signalGroupUpdate import SignalGroupUpdate
-from .signalMention import SignalMention
-from .signalMentions import SignalMentions
-from .signalPreview import SignalPreview
-from .signalProfile import SignalProfile
-from .signalQuote import SignalQuote
-from .signalReaction import SignalReaction
-from .signalReactions import SignalReactions
-from .signalReceipt import SignalReceipt
-from .signalReceivedMessage import SignalReceivedMessage
-from .signalReceiveThread import SignalReceiveThread
-from .signalSentMessage import SignalSentMessage
-from .signalSticker import SignalStickerPacks, SignalStickerPack, SignalSticker
-from .signalStoryMessage import SignalStoryMessage
-from .signalSyncMessage import SignalSyncMessage
-from .signalTextAttachment import SignalTextAttachment
-from .signalThumbnail import SignalThumbnail
-from .signalTimestamp import SignalTimestamp
-from .signalTypingMessage import SignalTypingMessage
+import importlib
+from typing import Any, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from .signalAccount import SignalAccount
+    from .signalAccountContext import SignalAccountContext
+    from .signalAccounts import SignalAccounts
+    from .signalAsyncCli import AsyncSignalCli
+    from .signalAttachment import SignalAttachment
+    from .signalCallbackDispatcher import SignalCallbackDispatcher
+    from .signalCli import SignalCli
+    from .signalContact import SignalContact
+    from .signalContacts import SignalContacts
+    from .signalDevice import SignalDevice
+    from .signalDevices import SignalDevices
+    from .signalGroup import SignalGroup
+    from .signalGroups import SignalGroups
+    from .signalGroupUpdate import SignalGroupUpdate
+    from .signalMention import SignalMention
+    from .signalMentions import SignalMentions
+    from .signalPreview import SignalPreview
+    from .signalProfile import SignalProfile
+    from .signalQuote import SignalQuote
+    from .signalReaction import SignalReaction
+    from .signalReactions import SignalReactions
+    from .signalReceipt import SignalReceipt
+    from .signalReceivedMessage import SignalReceivedMessage
+    from .signalReceiveThread import SignalReceiveThread
+    from .signalReceiver import SignalReceiver
+    from .signalReceiveReactor import SignalReceiveReactor
+    from .signalSentMessage import SignalSentMessage
+    from .signalSticker import SignalStickerPacks, SignalStickerPack, SignalSticker
+    from .signalStoryMessage import SignalStoryMessage
+    from .signalSubscription import SignalSubscription
+    from .signalSyncMessage import SignalSyncMessage
+    from .signalTextAttachment import SignalTextAttachment
+    from .signalThumbnail import SignalThumbnail
+    from .signalTimestamp import SignalTimestamp
+    from .signalTypingMessage import SignalTypingMessage
+
+_LAZY_NAMES: dict[str, str] = {
+    'SignalAccount': '.signalAccount',
+    'SignalAccountContext': '.signalAccountContext',
+    'SignalAccounts': '.signalAccounts',
+    'AsyncSignalCli': '.signalAsyncCli',
+    'SignalAttachment': '.signalAttachment',
+    'SignalCallbackDispatcher': '.signalCallbackDispatcher',
+    'SignalCli': '.signalCli',
+    'SignalContact': '.signalContact',
+    'SignalContacts': '.signalContacts',
+    'SignalDevice': '.signalDevice',
+    'SignalDevices': '.signalDevices',
+    'SignalGroup': '.signalGroup',
+    'SignalGroups': '.signalGroups',
+    'SignalGroupUpdate': '.signalGroupUpdate',
+    'SignalMention': '.signalMention',
+    'SignalMentions': '.signalMentions',
+    'SignalPreview': '.signalPreview',
+    'SignalProfile': '.signalProfile',
+    'SignalQuote': '.signalQuote',
+    'SignalReaction': '.signalReaction',
+    'SignalReactions': '.signalReactions',
+    'SignalReceipt': '.signalReceipt',
+    'SignalReceivedMessage': '.signalReceivedMessage',
+    'SignalReceiveThread': '.signalReceiveThread',
+    'SignalReceiver': '.signalReceiver',
+    'SignalReceiveReactor': '.signalReceiveReactor',
+    'SignalSentMessage': '.signalSentMessage',
+    'SignalStickerPacks': '.signalSticker',
+    'SignalStickerPack': '.signalSticker',
+    'SignalSticker': '.signalSticker',
+    'SignalStoryMessage': '.signalStoryMessage',
+    'SignalSubscription': '.signalSubscription',
+    'SignalSyncMessage': '.signalSyncMessage',
+    'SignalTextAttachment': '.signalTextAttachment',
+    'SignalThumbnail': '.signalThumbnail',
+    'SignalTimestamp': '.signalTimestamp',
+    'SignalTypingMessage': '.signalTypingMessage',
+}
+"""The public names of the package, and the module each is defined in."""
+
+__all__: list[str] = list(_LAZY_NAMES.keys())
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Import the module defining a public name on first access, so importing the package doesn't import every module.
+    :param name: str: The name being looked up.
+    :return: Any: The class.
+    :raises AttributeError: If the name isn't one of the package's public names.
+    """
+    if name not in _LAZY_NAMES:
+        raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
+    value: Any = getattr(importlib.import_module(_LAZY_NAMES[name], __name__), name)
+    # Cache it, so later lookups don't come back here:
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """
+    List the package's names, including the ones not imported yet.
+    :return: list[str]: The names.
+    """
+    return sorted(set(globals().keys()) | set(__all__))
@@ -8,9 +8,14 @@ import os
 import json
 import socket
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
 
-from .signalCommon import __socket_receive_blocking__, __socket_send__, __type_error__, __type_err_msg__, \
-    __parse_signal_response__, __check_response_for_error__
+from . import signalCommon
+from .signalAccountContext import SignalAccountContext
+from .signalCommon import __socket_request__, __socket_submit__, __pooled_request__, __type_error__, \
+    __type_err_msg__, __check_response_for_error__
 from .signalDevice import SignalDevice
 from .signalDevices import SignalDevices
 from .signalContacts import SignalContacts
@@ -19,7 +24,7 @@ from .signalMessages import SignalMessages
 from .signalProfile import SignalProfile
 from .signalSticker import SignalStickerPacks
 from .signalTimestamp import SignalTimestamp
-from .signalExceptions import InvalidDataFile, UnsupportedVersion
+from .signalExceptions import InvalidDataFile, UnsupportedVersion, CommunicationsError
 
 
 class SignalAccount(object):
@@ -43,6 +48,7 @@ class SignalAccount(object):
                  groups: Optional[SignalGroups] = None,
                  profile: Optional[SignalProfile] = None,
                  messages: Optional[SignalMessages] = None,
+                 lazy: bool = False,
                  ) -> None:
         """
         Initialize the SignalAccount.
@@ -61,6 +67,8 @@ class SignalAccount(object):
         :param groups: Optional: The SignalGroups object for this account.
         :param profile: Optional: The SignalProfile object for this account.
         :param messages: Optional: The SignalMessages object for this account.
+        :param lazy: True, load the devices, contacts, groups, messages and profile of a registered account on first
+            use, or on preload(); False, load them now.
         :raises TypeError: If a parameter is of invalid type.
         :raises InvalidDataFile: If a file contains invalid JSON or a KeyError occurs during loading.
         """
@@ -128,6 +136,10 @@ class SignalAccount(object):
             logger.critical("Raising TypeError:")
             logger.critical(__type_err_msg__('profile', 'Optional[SignalProfile]', profile))
             __type_error__("profile", "Optional[SignalProfile]", profile)
+        if not isinstance(lazy, bool):
+            logger.critical("Raising TypeError:")
+            logger.critical(__type_err_msg__('lazy', 'bool', lazy))
+            __type_error__("lazy", "bool", lazy)
 
         # Set internal Vars:
         self._sync_socket: socket.socket = sync_socket
@@ -151,19 +163,27 @@ class SignalAccount(object):
         self.uuid: str = uuid
         """The account uuid."""
 
-        # Set external object refs:
-        self.device: Optional[SignalDevice] = device
+        # Set object refs, loaded on first use through the properties:
+        self._device: Optional[SignalDevice] = device
         """The SignalDevice object."""
-        self.devices: Optional[SignalDevices] = devices
+        self._devices: Optional[SignalDevices] = devices
         """The account SignalDevices object."""
-        self.contacts: Optional[SignalContacts] = contacts
+        self._contacts: Optional[SignalContacts] = contacts
         """The account SignalContacts object."""
-        self.groups: Optional[SignalGroups] = groups
+        self._groups: Optional[SignalGroups] = groups
         """The account SignalGroups object."""
-        self.profile: Optional[SignalProfile] = profile
+        self._profile: Optional[SignalProfile] = profile
         """The account SignalProfile object."""
-        self.messages: Optional[SignalMessages] = messages
+        self._messages: Optional[SignalMessages] = messages
         """The account SignalMessages object."""
+        self._context: Optional[SignalAccountContext] = None
+        """The context shared by the account's messages, reactions, receipts and quotes."""
+        self._objects_loaded: bool = False
+        """Have the devices, contacts, groups, messages and profile been loaded?"""
+        self._objects_lock: threading.Lock = threading.Lock()
+        """Lock making sure the objects are loaded once, when first used from several threads."""
+        self._load_timings: dict[str, float] = {}
+        """Seconds taken by each phase of loading the objects, keyed by phase."""
 
         # Version:
         self.version: Optional[int] = None
@@ -233,67 +253,27 @@ class SignalAccount(object):
         # Do load:
         if do_load:
             self.__do_load__()
-        # If the account is registered, load account data from signal:
+        # If the account is registered, load account data from signal, now or on first use:
         if self.registered:
-            logger.info("Account is registered. Loading account data from signal.")
-
-            # Load devices from signal:
-            logger.debug("Loading Devices...")
-            self.devices = SignalDevices(sync_socket=self._sync_socket, account_id=self.number,
-                                         this_device=self.device_id, do_sync=True)
-            # Set this device:
-            self.device = self.devices.get_this_device()
-
-            # Load contacts from signal:
-            logger.debug("Loading Contacts...")
-            self.contacts = SignalContacts(command_socket=command_socket,
-                                           sync_socket=self._sync_socket,
-                                           config_path=self.config_path, account_id=self.number,
-                                           account_path=self._account_path, do_load=True,
-                                           do_sync=True)
-
-            # Load groups from signal:
-            logger.debug("Loading SignalGroups...")
-            self.groups = SignalGroups(sync_socket=self._sync_socket,
-                                       command_socket=self._command_socket,
-                                       config_path=self.config_path, account_id=self.number,
-                                       account_contacts=self.contacts, do_sync=True)
-
-            # Load messages from file:
-            logger.debug("Loading messages from disk....")
-            self.messages = SignalMessages(command_socket=self._command_socket,
-                                           config_path=self.config_path, account_id=self.number,
-                                           account_path=self._account_path, contacts=self.contacts,
-                                           groups=self.groups, devices=self.devices,
-                                           this_device=self.devices.get_this_device(),
-                                           sticker_packs=self._sticker_packs, do_load=True)
-
-            # Load profile from file and merge self-contact.
-            logger.debug("Loading SignalProfile from disk...")
-            self.profile = SignalProfile(sync_socket=self._sync_socket,
-                                         config_path=self.config_path, account_id=self.number,
-                                         contact_id=self.number, account_path=self._account_path,
-                                         do_load=True, is_account_profile=True)
-
-            # Merge disk profile and self-contact profile.
-            logger.debug("Merging account profiles...")
-            self_contact = self.contacts.get_self()
-            if self_contact is not None and self_contact.profile is not None:
-                self.profile.__update__(self_contact.profile)
+            if lazy:
+                logger.info("Account is registered. Account data will be loaded on first use.")
+            else:
+                logger.info("Account is registered. Loading account data from signal.")
+                self.preload()
         else:
             logger.info("Account not registered.")
             # Set devices to None:
-            self.devices = None
+            self._devices = None
             # Set this device to None:
-            self.device = None
+            self._device = None
             # Set contacts to None:
-            self.contacts = None
+            self._contacts = None
             # Set groups to None
-            self.groups = None
+            self._groups = None
             # Set messages to None
-            self.messages = None
+            self._messages = None
             # Set profile to None
-            self.profile = None
+            self._profile = None
         logger.info("Initialization complete.")
         return
 
@@ -468,6 +448,142 @@ class SignalAccount(object):
     ##########################
     # Methods:
     ##########################
+    def preload(self) -> None:
+        """
+        Load the devices, contacts and groups from signal, and the messages and profile from disk, if they haven't
+        been loaded yet. The properties call this on first access, and SignalCli.start_receive() calls it before
+        receiving; Call it directly to warm up a lazy account. Does nothing for an unregistered account.
+        :return: None
+        :raises CommunicationsError: On error communicating with signal.
+        :raises RuntimeError: On error loading a file.
+        """
+        if self._objects_loaded or not self.registered:
+            return
+        with self._objects_lock:
+            if self._objects_loaded:
+                return
+            logger: logging.Logger = logging.getLogger(__name__ + '.' + self.preload.__name__)
+            context = SignalAccountContext(command_socket=self._command_socket, sync_socket=self._sync_socket,
+                                           account_id=self.number, config_path=self.config_path,
+                                           account_path=self._account_path, sticker_packs=self._sticker_packs)
+
+            timings: dict[str, float] = {}
+            started_at: float = time.perf_counter()
+
+            # Fetch the devices, contacts and groups from signal, all at once:
+            logger.debug("Listing devices, contacts and groups...")
+            lists: dict[str, list[dict[str, Any]]] = self.__fetch_lists__()
+            timings['list'] = time.perf_counter() - started_at
+
+            # Load devices:
+            logger.debug("Loading Devices...")
+            phase_started_at: float = time.perf_counter()
+            devices = SignalDevices(sync_socket=self._sync_socket, account_id=self.number,
+                                    this_device=self.device_id, raw_devices=lists['listDevices'])
+            # Set this device:
+            device = devices.get_this_device()
+            context.devices = devices
+            context.this_device = device
+            timings['devices'] = time.perf_counter() - phase_started_at
+
+            # Load contacts:
+            logger.debug("Loading Contacts...")
+            phase_started_at = time.perf_counter()
+            contacts = SignalContacts(command_socket=self._command_socket,
+                                      sync_socket=self._sync_socket,
+                                      config_path=self.config_path, account_id=self.number,
+                                      account_path=self._account_path, do_load=True,
+                                      raw_contacts=lists['listContacts'])
+            context.contacts = contacts
+            timings['contacts'] = time.perf_counter() - phase_started_at
+
+            # Load groups:
+            logger.debug("Loading SignalGroups...")
+            phase_started_at = time.perf_counter()
+            groups = SignalGroups(sync_socket=self._sync_socket,
+                                  command_socket=self._command_socket,
+                                  config_path=self.config_path, account_id=self.number,
+                                  account_contacts=contacts, raw_groups=lists['listGroups'])
+            context.groups = groups
+            timings['groups'] = time.perf_counter() - phase_started_at
+
+            # Load messages from file:
+            logger.debug("Loading messages from disk....")
+            phase_started_at = time.perf_counter()
+            messages = SignalMessages(context=context, do_load=True)
+            timings['messages'] = time.perf_counter() - phase_started_at
+
+            # Load profile from file and merge self-contact.
+            logger.debug("Loading SignalProfile from disk...")
+            phase_started_at = time.perf_counter()
+            profile = SignalProfile(sync_socket=self._sync_socket,
+                                    config_path=self.config_path, account_id=self.number,
+                                    contact_id=self.number, account_path=self._account_path,
+                                    do_load=True, is_account_profile=True)
+
+            # Merge disk profile and self-contact profile.
+            logger.debug("Merging account profiles...")
+            self_contact = contacts.get_self()
+            if self_contact is not None and self_contact.profile is not None:
+                profile.__update__(self_contact.profile)
+            timings['profile'] = time.perf_counter() - phase_started_at
+            timings['total'] = time.perf_counter() - started_at
+
+            # Only set the objects once everything has loaded, so a failure leaves them to be loaded again:
+            self._context = context
+            self._devices = devices
+            self._device = device
+            self._contacts = contacts
+            self._groups = groups
+            self._messages = messages
+            self._profile = profile
+            self._load_timings = timings
+            self._objects_loaded = True
+            logger.info("Account data loaded in %.3fs: %s." % (timings['total'], ', '.join(
+                "%s %.3fs" % (phase, seconds) for phase, seconds in timings.items() if phase != 'total')))
+        return
+
+    def __fetch_lists__(self) -> dict[str, list[dict[str, Any]]]:
+        """
+        Run listDevices, listContacts and listGroups at the same time, each on its own pooled connection; If there's
+        no server address to pool connections to, they're all sent on the sync socket at once instead.
+        :return: dict[str, list[dict[str, Any]]]: The result of each, keyed by method.
+        :raises CommunicationsError: On error communicating with signal.
+        :raises SignalError: If signal returns an error.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__fetch_lists__.__name__)
+        methods: tuple[str, ...] = ('listDevices', 'listContacts', 'listGroups')
+        command_objs: dict[str, dict[str, Any]] = {
+            method: {"jsonrpc": "2.0", "method": method, "params": {"account": self.number}} for method in methods
+        }
+        futures: dict[str, Future]
+        executor: Optional[ThreadPoolExecutor] = None
+        if signalCommon.SERVER_ADDRESS is not None:
+            executor = ThreadPoolExecutor(max_workers=len(methods), thread_name_prefix="SignalAccount-list")
+            futures = {method: executor.submit(__pooled_request__, command_obj)
+                       for method, command_obj in command_objs.items()}
+        else:
+            futures = {method: __socket_submit__(self._sync_socket, command_obj)
+                       for method, command_obj in command_objs.items()}
+        # Wait for them all together, the pooled requests give up at the same deadline:
+        deadline: float = time.monotonic() + signalCommon.RPC_REQUEST_TIMEOUT
+        lists: dict[str, list[dict[str, Any]]] = {}
+        try:
+            for method, future in futures.items():
+                try:
+                    response_obj: dict[str, Any] = future.result(max(0.0, deadline - time.monotonic()))
+                except FutureTimeoutError:
+                    error_message: str = "Timed out waiting for the response to '%s'." % method
+                    logger.critical("Raising CommunicationsError(%s)." % error_message)
+                    raise CommunicationsError(error_message, None)
+                __check_response_for_error__(response_obj)  # Raises SignalError on any error.
+                lists[method] = response_obj['result']
+        finally:
+            # Don't wait on requests still running after a failure, they end at their own deadline:
+            if executor is not None:
+                executor.shutdown(wait=False)
+        return lists
+
     def verify(self, code: str, pin: Optional[str] = None) -> tuple[bool, str]:
         """
         Verify an account.
@@ -483,7 +599,6 @@ class SignalAccount(object):
         # Create a verify command object:
         verify_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "verify",
             "params": {
                 "account": self.number,
@@ -492,11 +607,8 @@ class SignalAccount(object):
         }
         if pin is not None:
             verify_command_obj['params']['pin'] = pin
-        json_command_str = json.dumps(verify_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)  # Raises CommunicationsError.
-        response_str = __socket_receive_blocking__(self._sync_socket)  # Raises CommunicationsError.
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, verify_command_obj)
         error_occurred, error_code, error_message = __check_response_for_error__(response_obj, [-1])
         # TODO: Check for response error codes, usually -1 is a good assumption.
         if error_occurred:
@@ -530,6 +642,90 @@ class SignalAccount(object):
         """
         return self.get_id()
 
+################################
+# Properties:
+################################
+    @property
+    def device(self) -> Optional[SignalDevice]:
+        """
+        The SignalDevice of the device we're using, loading the account data if required.
+        :return: Optional[SignalDevice]: The device, None if the account isn't registered.
+        """
+        self.preload()
+        return self._device
+
+    @property
+    def devices(self) -> Optional[SignalDevices]:
+        """
+        The account's SignalDevices object, loading the account data if required.
+        :return: Optional[SignalDevices]: The devices, None if the account isn't registered.
+        """
+        self.preload()
+        return self._devices
+
+    @property
+    def contacts(self) -> Optional[SignalContacts]:
+        """
+        The account's SignalContacts object, loading the account data if required.
+        :return: Optional[SignalContacts]: The contacts, None if the account isn't registered.
+        """
+        self.preload()
+        return self._contacts
+
+    @property
+    def groups(self) -> Optional[SignalGroups]:
+        """
+        The account's SignalGroups object, loading the account data if required.
+        :return: Optional[SignalGroups]: The groups, None if the account isn't registered.
+        """
+        self.preload()
+        return self._groups
+
+    @property
+    def messages(self) -> Optional[SignalMessages]:
+        """
+        The account's SignalMessages object, loading the account data if required.
+        :return: Optional[SignalMessages]: The messages, None if the account isn't registered.
+        """
+        self.preload()
+        return self._messages
+
+    @property
+    def profile(self) -> Optional[SignalProfile]:
+        """
+        The account's SignalProfile object, loading the account data if required.
+        :return: Optional[SignalProfile]: The profile, None if the account isn't registered.
+        """
+        self.preload()
+        return self._profile
+
+    @property
+    def context(self) -> Optional[SignalAccountContext]:
+        """
+        The context shared by the account's messages, reactions, receipts and quotes, loading the account data if
+        required.
+        :return: Optional[SignalAccountContext]: The context, None if the account isn't registered.
+        """
+        self.preload()
+        return self._context
+
+    @property
+    def load_timings(self) -> dict[str, float]:
+        """
+        Seconds taken by each phase of loading the devices, contacts, groups, messages and profile: 'list' for the
+        requests to signal, then 'devices', 'contacts', 'groups', 'messages', 'profile', and the 'total'.
+        :return: dict[str, float]: The timings, empty if not loaded yet.
+        """
+        return dict(self._load_timings)
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        Have the devices, contacts, groups, messages and profile been loaded?
+        :return: bool: True if loaded, or if there's nothing to load.
+        """
+        return self._objects_loaded or not self.registered
+
     @property
     def is_receiving(self) -> bool:
         return self._is_receiving
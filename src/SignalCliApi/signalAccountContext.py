@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+File: signalAccountContext.py
+The references shared by all the objects of an account.
+"""
+import logging
+import socket
+from typing import Optional
+
+from .signalCommon import __type_error__
+from .signalContacts import SignalContacts
+from .signalDevice import SignalDevice
+from .signalDevices import SignalDevices
+from .signalGroups import SignalGroups
+from .signalSticker import SignalStickerPacks
+
+
+class SignalAccountContext(object):
+    """
+    Holds the sockets, paths and collections of an account. SignalAccount creates one, and every message, reaction,
+    receipt and quote of the account keeps a reference to it, rather than its own copy of each.
+    """
+    __slots__ = ('command_socket', 'sync_socket', 'account_id', 'config_path', 'account_path', 'sticker_packs',
+                 'contacts', 'groups', 'devices', 'this_device')
+
+    def __init__(self,
+                 command_socket: socket.socket,
+                 sync_socket: socket.socket,
+                 account_id: str,
+                 config_path: str,
+                 account_path: str,
+                 sticker_packs: SignalStickerPacks,
+                 contacts: Optional[SignalContacts] = None,
+                 groups: Optional[SignalGroups] = None,
+                 devices: Optional[SignalDevices] = None,
+                 this_device: Optional[SignalDevice] = None,
+                 ) -> None:
+        """
+        Initialize the context.
+        :param command_socket: socket.socket: The socket to run commands on.
+        :param sync_socket: socket.socket: The socket to run sync operations on.
+        :param account_id: str: The account ID.
+        :param config_path: str: The full path to the signal-cli config directory.
+        :param account_path: str: The full path to the account data directory.
+        :param sticker_packs: SignalStickerPacks: The loaded sticker packs.
+        :param contacts: Optional[SignalContacts]: The account's contacts, if loaded yet.
+        :param groups: Optional[SignalGroups]: The account's groups, if loaded yet.
+        :param devices: Optional[SignalDevices]: The account's devices, if loaded yet.
+        :param this_device: Optional[SignalDevice]: The device we're using, if loaded yet.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(command_socket, socket.socket):
+            logger.critical("Raising TypeError:")
+            __type_error__("command_socket", "socket.socket", command_socket)
+        if not isinstance(sync_socket, socket.socket):
+            logger.critical("Raising TypeError:")
+            __type_error__("sync_socket", "socket.socket", sync_socket)
+        if not isinstance(account_id, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("account_id", "str", account_id)
+        if not isinstance(config_path, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("config_path", "str", config_path)
+        if not isinstance(account_path, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("account_path", "str", account_path)
+        if not isinstance(sticker_packs, SignalStickerPacks):
+            logger.critical("Raising TypeError:")
+            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
+        if contacts is not None and not isinstance(contacts, SignalContacts):
+            logger.critical("Raising TypeError:")
+            __type_error__("contacts", "Optional[SignalContacts]", contacts)
+        if groups is not None and not isinstance(groups, SignalGroups):
+            logger.critical("Raising TypeError:")
+            __type_error__("groups", "Optional[SignalGroups]", groups)
+        if devices is not None and not isinstance(devices, SignalDevices):
+            logger.critical("Raising TypeError:")
+            __type_error__("devices", "Optional[SignalDevices]", devices)
+        if this_device is not None and not isinstance(this_device, SignalDevice):
+            logger.critical("Raising TypeError:")
+            __type_error__("this_device", "Optional[SignalDevice]", this_device)
+
+        # Set external properties:
+        self.command_socket: socket.socket = command_socket
+        """The socket to run commands on."""
+        self.sync_socket: socket.socket = sync_socket
+        """The socket to run sync operations on."""
+        self.account_id: str = account_id
+        """The account ID."""
+        self.config_path: str = config_path
+        """The full path to the signal-cli config directory."""
+        self.account_path: str = account_path
+        """The full path to the account data directory."""
+        self.sticker_packs: SignalStickerPacks = sticker_packs
+        """The loaded sticker packs."""
+        self.contacts: Optional[SignalContacts] = contacts
+        """The account's SignalContacts object."""
+        self.groups: Optional[SignalGroups] = groups
+        """The account's SignalGroups object."""
+        self.devices: Optional[SignalDevices] = devices
+        """The account's SignalDevices object."""
+        self.this_device: Optional[SignalDevice] = this_device
+        """The SignalDevice for the device we're using."""
+        return
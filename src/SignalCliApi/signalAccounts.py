@@ -3,14 +3,17 @@
 File: signalAccounts.py
 Maintain and manage a list of accounts.
 """
-from typing import Optional, Iterator, TextIO
+from typing import Optional, Iterator, TextIO, Callable, Any
+from concurrent.futures import ThreadPoolExecutor, Future
 import os
 import json
 import socket
 import logging
+import threading
 
 from .signalCommon import phone_number_regex, uuid_regex, __type_error__, UUID_FORMAT_STR, __type_err_msg__, \
-    NUMBER_FORMAT_STR
+    NUMBER_FORMAT_STR, ACCOUNT_LOAD_WORKERS
+from .run_callback import __run_callback__
 from .signalAccount import SignalAccount
 from .signalSticker import SignalStickerPacks
 
@@ -33,6 +36,9 @@ class SignalAccounts(object):
                  config_path: str,
                  sticker_packs: SignalStickerPacks,
                  do_load: bool = False,
+                 callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 load_workers: int = ACCOUNT_LOAD_WORKERS,
+                 lazy: bool = False,
                  ) -> None:
         """
         Initialize the accounts:
@@ -41,6 +47,11 @@ class SignalAccounts(object):
         :param config_path: str: The path to the signal-cli direcotry.
         :param sticker_packs: SignalStickerPacks: The loaded SignalStickerPacks object.
         :param do_load: bool: Load from disk right away; Defaults to False.
+        :param callback: Optional[tuple[Callable, Optional[list[Any]]]]: The SignalCli callback, called with the
+            progress of each account as it's loaded.
+        :param load_workers: int: The number of accounts to load at once.
+        :param lazy: bool: True, only read accounts.json and each account detail file, leaving each account's
+            devices, contacts, groups, messages and profile to be loaded on first use; False, load them all now.
         """
         # Super:
         object.__init__(self)
@@ -66,6 +77,18 @@ class SignalAccounts(object):
             self.logger.critical("TypeError:")
             self.logger.critical(__type_err_msg__('do_load', 'bool', do_load))
             __type_error__("do_load", "bool", do_load)
+        if not isinstance(load_workers, int):
+            self.logger.critical("TypeError:")
+            self.logger.critical(__type_err_msg__('load_workers', 'int', load_workers))
+            __type_error__("load_workers", "int", load_workers)
+        elif load_workers < 1:
+            error_message: str = "load_workers must be at least 1."
+            self.logger.critical("ValueError: %s" % error_message)
+            raise ValueError(error_message)
+        if not isinstance(lazy, bool):
+            self.logger.critical("TypeError:")
+            self.logger.critical(__type_err_msg__('lazy', 'bool', lazy))
+            __type_error__("lazy", "bool", lazy)
         # Set internal vars:
         self._sync_socket: socket.socket = sync_socket
         """The sync socket to use."""
@@ -77,6 +100,16 @@ class SignalAccounts(object):
         """The known sticker packs."""
         self._accounts_file_path: str = os.path.join(config_path, 'data', 'accounts.json')
         """The full path to the accounts.json file."""
+        self._callback: Optional[tuple[Callable, Optional[list[Any]]]] = callback
+        """The callback to report loading progress to."""
+        self._load_workers: int = load_workers
+        """The number of accounts to load at once."""
+        self._lazy: bool = lazy
+        """Should the accounts' data be loaded on first use?"""
+        self._load_errors: dict[str, Exception] = {}
+        """The errors raised loading accounts, keyed by account number."""
+        self._progress_lock: threading.Lock = threading.Lock()
+        """Lock serializing progress reports from the load workers."""
         if do_load:
             self.__do_load__()
         return
@@ -113,6 +146,69 @@ class SignalAccounts(object):
             raise RuntimeError(error_message)
         return response_obj
 
+    def __load_account__(self, raw_account: dict[str, str]) -> SignalAccount:
+        """
+        Create and load an account from its entry in accounts.json.
+        :param raw_account: dict[str, str]: The account's entry.
+        :return: SignalAccount: The loaded account.
+        """
+        return SignalAccount(sync_socket=self._sync_socket, command_socket=self._command_socket,
+                             config_path=self._config_path, sticker_packs=self._sticker_packs,
+                             signal_account_path=raw_account['path'], environment=raw_account['environment'],
+                             number=raw_account['number'], uuid=raw_account['uuid'], do_load=True,
+                             lazy=self._lazy)
+
+    def __load_accounts__(self, raw_accounts: list[dict[str, str]]) -> list[SignalAccount]:
+        """
+        Load accounts on a pool of load_workers threads.
+        An account that fails to load is logged, reported to the callback, and kept in load_errors; The others are
+        still loaded.
+        :param raw_accounts: list[dict[str, str]]: The accounts.json entries of the accounts to load.
+        :return: list[SignalAccount]: The accounts loaded, in the order given.
+        """
+        num_accounts: int = len(raw_accounts)
+        if num_accounts == 0:
+            return []
+        num_done: int = 0
+
+        def report(status: str) -> None:
+            """
+            Report an account's progress to the callback.
+            :param status: str: The status.
+            :return: None
+            """
+            nonlocal num_done
+            with self._progress_lock:
+                num_done += 1
+                __run_callback__(self._callback, "%s (%i of %i)" % (status, num_done, num_accounts))
+            return
+
+        def load(raw_account: dict[str, str]) -> Optional[SignalAccount]:
+            """
+            Load one account, catching its errors.
+            :param raw_account: dict[str, str]: The account's entry.
+            :return: Optional[SignalAccount]: The account, or None if it failed to load.
+            """
+            number: str = raw_account['number']
+            try:
+                account: SignalAccount = self.__load_account__(raw_account)
+            except Exception as e:
+                self.logger.error("Failed to load account '%s': %s: %s" % (number, type(e).__name__, str(e.args)))
+                self._load_errors[number] = e
+                report("failed to load account '%s'" % number)
+                return None
+            self._load_errors.pop(number, None)
+            self.logger.info("Loaded account: '%s'" % number)
+            report("loaded account '%s'" % number)
+            return account
+
+        num_workers: int = min(self._load_workers, num_accounts)
+        self.logger.debug("Loading %i accounts on %i workers." % (num_accounts, num_workers))
+        with ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="SignalAccounts-load") as executor:
+            futures: list[Future] = [executor.submit(load, raw_account) for raw_account in raw_accounts]
+            accounts: list[Optional[SignalAccount]] = [future.result() for future in futures]
+        return [account for account in accounts if account is not None]
+
     def __do_load__(self) -> None:
         """
         Load the accounts from the accounts.json file.
@@ -123,18 +219,8 @@ class SignalAccounts(object):
         accounts_dict = self.__load_accounts_file__()
         # Parse the file and create the accounts:
         global ACCOUNTS
-        ACCOUNTS = []
-        count: int = 0
-        for raw_account in accounts_dict['accounts']:
-            count += 1
-            account = SignalAccount(sync_socket=self._sync_socket, command_socket=self._command_socket,
-                                    config_path=self._config_path, sticker_packs=self._sticker_packs,
-                                    signal_account_path=raw_account['path'], environment=raw_account['environment'],
-                                    number=raw_account['number'], uuid=raw_account['uuid'], do_load=True
-                                    )
-            self.logger.info("Loaded account: '%s'" % account.number)
-            ACCOUNTS.append(account)
-        self.logger.info("Loaded %i accounts." % count)
+        ACCOUNTS = self.__load_accounts__(accounts_dict['accounts'])
+        self.logger.info("Loaded %i accounts, %i failed." % (len(ACCOUNTS), len(self._load_errors)))
         return
 
     def __sync__(self) -> list[SignalAccount]:
@@ -144,25 +230,16 @@ class SignalAccounts(object):
         """
         global ACCOUNTS
         self.logger.info("Accounts sync started...")
-        new_accounts: list[SignalAccount] = []
         # Load accounts file:
         accounts_dict: dict = self.__load_accounts_file__()
-        # Parse the accounts file looking for a new account.
-        for raw_account in accounts_dict['accounts']:
-            account_found = False
-            for account in ACCOUNTS:
-                if account.number == raw_account['number']:
-                    account_found = True
-            if not account_found:
-                new_account: SignalAccount = SignalAccount(sync_socket=self._sync_socket, command_socket=self._command_socket,
-                                                           config_path=self._config_path, sticker_packs=self._sticker_packs,
-                                                           signal_account_path=raw_account['path'],
-                                                           environment=raw_account['environment'], number=raw_account['number'],
-                                                           uuid=raw_account['uuid'], do_load=True
-                                                           )
-                self.logger.info("New account found: '%s'" % new_account.number)
-                ACCOUNTS.append(new_account)
-                new_accounts.append(new_account)
+        # Parse the accounts file looking for new accounts, including any that failed to load before:
+        known_numbers: set[str] = {account.number for account in ACCOUNTS}
+        raw_new_accounts: list[dict[str, str]] = [raw_account for raw_account in accounts_dict['accounts']
+                                                  if raw_account['number'] not in known_numbers]
+        new_accounts: list[SignalAccount] = self.__load_accounts__(raw_new_accounts)
+        for new_account in new_accounts:
+            self.logger.info("New account found: '%s'" % new_account.number)
+        ACCOUNTS.extend(new_accounts)
         self.logger.info("Found %i new accounts." % len(new_accounts))
         return new_accounts
 
@@ -322,6 +399,14 @@ class SignalAccounts(object):
     ##########################
     # Properties:
     ##########################
+    @property
+    def load_errors(self) -> dict[str, Exception]:
+        """
+        The errors raised by the accounts that failed to load, keyed by account number.
+        :return: dict[str, Exception]: The errors.
+        """
+        return dict(self._load_errors)
+
     @property
     def num_accounts(self) -> int:
         """
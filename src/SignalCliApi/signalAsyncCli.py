@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+File: signalAsyncCli.py
+asyncio front-end to a running signal-cli daemon.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from typing import Optional, Any, Iterable, Iterator, AsyncIterator
+
+from . import signalCommon
+from .signalAccount import SignalAccount
+from .signalAttachment import SignalAttachment
+from .signalCli import SignalCli
+from .signalCommon import __type_error__, __parse_signal_response__, __check_response_for_error__, ReceiptTypes, \
+    ASYNC_READ_LIMIT
+from .signalContact import SignalContact
+from .signalEnvelopeParser import SignalEnvelopeParser
+from .signalExceptions import CommunicationsError, InvalidServerResponse
+from .signalGroup import SignalGroup
+from .signalMention import SignalMention
+from .signalMentions import SignalMentions
+from .signalMessage import SignalMessage
+from .signalPreview import SignalPreview
+from .signalQuote import SignalQuote
+from .signalReaction import SignalReaction
+from .signalReceivedMessage import SignalReceivedMessage
+from .signalSentMessage import SignalSentMessage
+from .signalSticker import SignalSticker
+from .signalTimestamp import SignalTimestamp
+
+
+class AsyncSignalCli(object):
+    """
+    asyncio front-end to a running signal-cli daemon.
+    Every request, and the 'receive' notifications for every account, share a single asyncio stream; Responses are
+    matched to requests by id, and notifications are routed to the receive stream of their subscription. Message
+    objects are the same ones SignalCli builds, the SignalCli object supplies the loaded accounts.
+    """
+
+    def __init__(self,
+                 signal_cli: SignalCli,
+                 server_address: Optional[tuple[str, int] | str] = None,
+                 ) -> None:
+        """
+        Initialize the front-end, call connect() or use 'async with' before making requests.
+        :param signal_cli: SignalCli: The SignalCli object with the loaded accounts.
+        :param server_address: Optional[tuple[str, int] | str]: The daemon address, defaults to the address
+            signal_cli uses.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(signal_cli, SignalCli):
+            logger.critical("Raising TypeError:")
+            __type_error__("signal_cli", "SignalCli", signal_cli)
+        if server_address is not None and not isinstance(server_address, (tuple, str)):
+            logger.critical("Raising TypeError:")
+            __type_error__("server_address", "Optional[tuple[str, int] | str]", server_address)
+
+        # Set internal vars:
+        self._signal_cli: SignalCli = signal_cli
+        """The SignalCli object supplying accounts and sticker packs."""
+        self._server_address: tuple[str, int] | str = server_address or signal_cli.server_address
+        """The address of the signal-cli daemon."""
+        self._reader: Optional[asyncio.StreamReader] = None
+        """The stream we read responses and notifications from."""
+        self._writer: Optional[asyncio.StreamWriter] = None
+        """The stream we write requests to."""
+        self._reader_task: Optional[asyncio.Task] = None
+        """The task routing incoming lines."""
+        self._ids: Iterator[int] = itertools.count(1)
+        """Request id generator."""
+        self._pending: dict[int, asyncio.Future] = {}
+        """Futures waiting for a response, keyed by request id."""
+        self._subscriptions: dict[int, asyncio.Queue] = {}
+        """Queues of incoming envelopes, keyed by subscription id."""
+        self._ended_subscriptions: set[int] = set()
+        """Subscriptions we've stopped reading, late notifications for these are dropped."""
+        self._account_locks: dict[str, asyncio.Lock] = {}
+        """Locks serializing changes to each account's objects, keyed by account number."""
+        return
+
+    ##########################
+    # Overrides:
+    ##########################
+    async def __aenter__(self) -> 'AsyncSignalCli':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+        return
+
+    ##########################
+    # Helpers:
+    ##########################
+    async def __read_loop__(self) -> None:
+        """
+        Read lines from the stream, resolving requests and routing notifications.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__read_loop__.__name__)
+        error: Exception = CommunicationsError("Connection closed.", None)
+        try:
+            while True:
+                line: bytes = await self._reader.readline()
+                if len(line) == 0:
+                    break
+                try:
+                    message_obj: dict[str, Any] = __parse_signal_response__(line.decode())
+                except InvalidServerResponse as e:
+                    logger.warning("Dropping invalid line from signal: %s" % str(e.args))
+                    continue
+                if 'id' in message_obj.keys():
+                    future: Optional[asyncio.Future] = self._pending.pop(message_obj['id'], None)
+                    if future is not None and not future.done():
+                        future.set_result(message_obj)
+                    else:
+                        logger.warning("Dropping response not matching a pending request.")
+                    continue
+                self.__route_notification__(message_obj)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            error_message: str = "Failed to read from stream: %s" % str(e.args)
+            logger.critical(error_message)
+            error = CommunicationsError(error_message, e)
+        # Fail anyone still waiting, and end the receive streams:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        for queue in self._subscriptions.values():
+            queue.put_nowait(None)
+        return
+
+    def __route_notification__(self, message_obj: dict[str, Any]) -> None:
+        """
+        Put a notification on the queue of its subscription.
+        :param message_obj: dict[str, Any]: The parsed notification.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__route_notification__.__name__)
+        try:
+            subscription_id: int = message_obj['params']['subscription']
+        except (KeyError, TypeError):
+            logger.warning("Dropping notification without a subscription.")
+            logger.debug("message_obj = %s" % str(message_obj))
+            return
+        if subscription_id in self._ended_subscriptions:
+            logger.debug("Dropping notification for ended subscription: %s" % str(subscription_id))
+            return
+        # Messages can arrive before receive() has seen the subscribeReceive response, so create the queue here:
+        queue: asyncio.Queue = self._subscriptions.setdefault(subscription_id, asyncio.Queue())
+        queue.put_nowait(message_obj)
+        return
+
+    def __get_account_lock__(self, account: SignalAccount) -> asyncio.Lock:
+        """
+        Get the lock serializing changes to an account's objects.
+        :param account: SignalAccount: The account.
+        :return: asyncio.Lock: The lock.
+        """
+        lock: Optional[asyncio.Lock] = self._account_locks.get(account.number)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._account_locks[account.number] = lock
+        return lock
+
+    async def __run_locked__(self, account: SignalAccount, function, *args) -> Any:
+        """
+        Run a blocking function that changes an account's objects in the default executor, one at a time per account,
+        holding the account's messages lock so it is also serialised with threaded receivers and senders.
+        :param account: SignalAccount: The account the function changes.
+        :param function: Callable: The function to run.
+        :param args: Any: The arguments to pass.
+        :return: Any: The return value of the function.
+        """
+        def __locked__() -> Any:
+            with account.messages.lock:
+                return function(*args)
+        async with self.__get_account_lock__(account):
+            return await asyncio.get_running_loop().run_in_executor(None, __locked__)
+
+    ##########################
+    # Methods:
+    ##########################
+    async def connect(self) -> None:
+        """
+        Connect to the signal-cli daemon.
+        :return: None
+        :raises CommunicationsError: On failure to connect.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.connect.__name__)
+        try:
+            if isinstance(self._server_address, str):
+                self._reader, self._writer = await asyncio.open_unix_connection(self._server_address,
+                                                                                limit=ASYNC_READ_LIMIT)
+            else:
+                host, port = self._server_address
+                self._reader, self._writer = await asyncio.open_connection(host, port, limit=ASYNC_READ_LIMIT)
+        except OSError as e:
+            error_message: str = "Couldn't connect to: %s: %s" % (str(self._server_address), str(e.args))
+            logger.critical("Raising CommunicationsError(%s)." % error_message)
+            raise CommunicationsError(error_message, e)
+        self._reader_task = asyncio.get_running_loop().create_task(self.__read_loop__())
+        logger.debug("Connected to: %s" % str(self._server_address))
+        return
+
+    async def close(self) -> None:
+        """
+        Close the connection, ending any receive streams.
+        :return: None
+        """
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+            self._writer = None
+        if self._reader_task is not None:
+            await self._reader_task
+            self._reader_task = None
+        return
+
+    async def request(self, method: str, params: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """
+        Run a JSON-RPC request.
+        :param method: str: The method to call.
+        :param params: Optional[dict[str, Any]]: The parameters of the call.
+        :return: dict[str, Any]: The response object; Check it with __check_response_for_error__().
+        :raises CommunicationsError: If not connected, or on failure to communicate.
+        """
+        command_obj: dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            command_obj['params'] = params
+        return await self.__request__(command_obj)
+
+    async def __request__(self, command_obj: dict[str, Any]) -> dict[str, Any]:
+        """
+        Run a JSON-RPC request from a command object; The 'id' is assigned automatically.
+        :param command_obj: dict[str, Any]: The command object.
+        :return: dict[str, Any]: The response object.
+        :raises CommunicationsError: If not connected, on failure to communicate, or if the response doesn't arrive
+            within RPC_REQUEST_TIMEOUT seconds.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__request__.__name__)
+        if self._writer is None or self._reader_task is None or self._reader_task.done():
+            raise CommunicationsError("Not connected.", None)
+        request_id: int = next(self._ids)
+        command_obj['id'] = request_id
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._writer.write((json.dumps(command_obj) + '\n').encode())
+            await self._writer.drain()
+        except (ConnectionError, OSError) as e:
+            self._pending.pop(request_id, None)
+            raise CommunicationsError("Failed to write to stream: %s" % str(e.args), e)
+        timeout: float = signalCommon.RPC_REQUEST_TIMEOUT
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(request_id, None)
+            error_message: str = "Timed out after %.1f seconds waiting for the response to '%s'." \
+                                 % (timeout, command_obj.get('method'))
+            logger.critical("Raising CommunicationsError(%s)." % error_message)
+            raise CommunicationsError(error_message, None)
+
+    async def send_message(self,
+                           account: SignalAccount,
+                           recipients: Iterable[SignalContact | SignalGroup] | SignalContact | SignalGroup,
+                           body: Optional[str] = None,
+                           attachments: Optional[Iterable[SignalAttachment | str] | SignalAttachment | str] = None,
+                           mentions: Optional[Iterable[SignalMention] | SignalMentions | SignalMention] = None,
+                           quote: Optional[SignalQuote] = None,
+                           sticker: Optional[SignalSticker] = None,
+                           previews: Optional[Iterable[SignalPreview]] = None,
+                           ) -> tuple[tuple[bool, SignalContact | SignalGroup, str | SignalSentMessage], ...]:
+        """
+        Send a message; See SignalMessages.send_message() for the parameters, return value and exceptions.
+        :param account: SignalAccount: The account to send from.
+        """
+        # Load the account's data off the event loop, if it's lazy and not loaded yet:
+        await asyncio.get_running_loop().run_in_executor(None, account.preload)
+        send_command_obj, send_context = account.messages.__prepare_send__(recipients, body, attachments, mentions,
+                                                                           quote, sticker, previews)
+        response_obj: dict[str, Any] = await self.__request__(send_command_obj)
+        return await self.__run_locked__(account, account.messages.__parse_send_response__, response_obj,
+                                         send_context)
+
+    async def send_receipt(self,
+                           account: SignalAccount,
+                           message: SignalReceivedMessage,
+                           receipt_type: ReceiptTypes = ReceiptTypes.READ,
+                           ) -> tuple[bool, SignalTimestamp | str]:
+        """
+        Send a read or viewed receipt for a received message, and mark the message read or viewed.
+        :param account: SignalAccount: The account the message was received by.
+        :param message: SignalReceivedMessage: The message to send the receipt for.
+        :param receipt_type: ReceiptTypes: Either ReceiptTypes.READ or ReceiptTypes.VIEWED.
+        :return: tuple[bool, SignalTimestamp | str]: The first element is True or False for success or failure.
+            The second element is either the SignalTimestamp of the receipt on success, or an error message.
+        :raises RuntimeError: On invalid receipt type.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.send_receipt.__name__)
+        if not isinstance(message, SignalReceivedMessage):
+            logger.critical("Raising TypeError:")
+            __type_error__("message", "SignalReceivedMessage", message)
+        response_obj: dict[str, Any] = await self.__request__(message.__build_receipt_command__(receipt_type))
+        is_success, result = await self.__run_locked__(account, message.__parse_receipt_response__, response_obj)
+        if is_success:
+            if receipt_type == ReceiptTypes.READ:
+                await self.__run_locked__(account, message.mark_read, result, False)
+            else:
+                await self.__run_locked__(account, message.mark_viewed, result, False)
+        return is_success, result
+
+    async def send_reaction(self, account: SignalAccount, reaction: SignalReaction) -> tuple[bool, str]:
+        """
+        Send a reaction.
+        :param account: SignalAccount: The account to send from.
+        :param reaction: SignalReaction: The reaction to send.
+        :return: tuple[bool, str]: True/False for sent status, and "SUCCESS" or an error message.
+        :raises RuntimeError: If the reaction was already sent.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.send_reaction.__name__)
+        if not isinstance(account, SignalAccount):
+            logger.critical("Raising TypeError:")
+            __type_error__("account", "SignalAccount", account)
+        if not isinstance(reaction, SignalReaction):
+            logger.critical("Raising TypeError:")
+            __type_error__("reaction", "SignalReaction", reaction)
+        if reaction.is_sent:
+            error_message: str = "reaction already sent."
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        response_obj: dict[str, Any] = await self.__request__(reaction.__build_send_command__())
+        return await self.__run_locked__(account, reaction.__parse_send_response__, response_obj)
+
+    async def sync_contacts(self, account: SignalAccount) -> list[SignalContact]:
+        """
+        Sync an account's contacts with signal.
+        :param account: SignalAccount: The account to sync.
+        :return: list[SignalContact]: The new contacts found.
+        :raises SignalError: On signal error.
+        """
+        response_obj: dict[str, Any] = await self.request("listContacts", {"account": account.number})
+        __check_response_for_error__(response_obj)
+        added, _, _ = await self.__run_locked__(account, account.contacts.__merge__, response_obj['result'])
+        return added
+
+    async def sync_groups(self, account: SignalAccount) -> None:
+        """
+        Sync an account's groups with signal.
+        :param account: SignalAccount: The account to sync.
+        :return: None
+        :raises SignalError: On signal error.
+        """
+        response_obj: dict[str, Any] = await self.request("listGroups", {"account": account.number})
+        __check_response_for_error__(response_obj)
+        await self.__run_locked__(account, account.groups.__merge__, response_obj['result'])
+        return
+
+    async def receive(self, account: SignalAccount, do_expunge: bool = True) -> AsyncIterator[SignalMessage]:
+        """
+        Receive messages for an account: 'async for message in signal.receive(account):'
+        Messages are parsed and stored exactly as the receive thread does; Breaking out of the loop unsubscribes.
+        :param account: SignalAccount: The account to receive for.
+        :param do_expunge: bool: True, we should automatically expunge expired messages.
+        :return: AsyncIterator[SignalMessage]: The received messages.
+        :raises RuntimeError: If signal refuses the subscription.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.receive.__name__)
+        if not isinstance(account, SignalAccount):
+            logger.critical("Raising TypeError:")
+            __type_error__("account", "SignalAccount", account)
+
+        # Load the account's data off the event loop, if it's lazy and not loaded yet:
+        await asyncio.get_running_loop().run_in_executor(None, account.preload)
+
+        # Do send sync request if we're not the primary device:
+        if account.device_id != 1:
+            response_obj: dict[str, Any] = await self.request("sendSyncRequest", {"account": account.number})
+            __check_response_for_error__(response_obj, [])
+
+        # Subscribe:
+        response_obj = await self.request("subscribeReceive", {"account": account.number})
+        error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
+        if error_occurred:
+            error_message: str = "Signal error while trying to start receiving. Code %i, Message: %s" \
+                                 % (signal_code, signal_message)
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        subscription_id: int = response_obj['result']
+        queue: asyncio.Queue = self._subscriptions.setdefault(subscription_id, asyncio.Queue())
+        parser: SignalEnvelopeParser = SignalEnvelopeParser(account=account)
+        account.is_receiving = True
+        await self.__run_locked__(account, setattr, account.messages, 'auto_expunge', do_expunge)
+        try:
+            while True:
+                message_obj: Optional[dict[str, Any]] = await queue.get()
+                if message_obj is None:
+                    break  # Connection closed.
+                envelope_dict: Optional[dict[str, Any]] = SignalEnvelopeParser.__get_envelope__(message_obj)
+                if envelope_dict is None:
+                    continue
+                message: Optional[SignalMessage] = await self.__run_locked__(account, parser.parse, envelope_dict)
+                if do_expunge:
+                    await self.__run_locked__(account, account.messages.do_expunge)
+                if message is not None:
+                    yield message
+        finally:
+            account.is_receiving = False
+            await self.__run_locked__(account, setattr, account.messages, 'auto_expunge', False)
+            self._ended_subscriptions.add(subscription_id)
+            self._subscriptions.pop(subscription_id, None)
+            if self._reader_task is not None and not self._reader_task.done():
+                try:
+                    await self.request("unsubscribeReceive", {"subscription": subscription_id})
+                except CommunicationsError:
+                    logger.warning("Failed to unsubscribe, connection lost.")
+        return
+
+    ##########################
+    # Properties:
+    ##########################
+    @property
+    def server_address(self) -> tuple[str, int] | str:
+        """
+        The address of the signal-cli daemon.
+        :return: tuple[str, int] | str: Either (HOSTNAME, PORT) or "PATH_TO_SOCKET".
+        """
+        return self._server_address
+
+    @property
+    def is_connected(self) -> bool:
+        """
+        Are we connected?
+        :return: bool: True if connected.
+        """
+        return self._reader_task is not None and not self._reader_task.done()
@@ -23,6 +23,8 @@ class SignalAttachment(object):
     """
     Class to store an attachment.
     """
+    __slots__ = ('_config_path', 'content_type', 'filename', 'id', 'size', 'height', 'width', 'caption', 'local_path',
+                 'exists', 'thumbnail')
 
     def __init__(self,
                  config_path: str,
@@ -89,8 +91,6 @@ class SignalAttachment(object):
         # Set internal vars:
         self._config_path: str = config_path
         """The path to the signal-cli config directory."""
-        self._xdgopen_path: Optional[str] = __find_xdgopen__()
-        """The path to xdg-open executable."""
 
         # Set external vars:
         self.content_type: Optional[str] = None
@@ -266,11 +266,12 @@ class SignalAttachment(object):
         Call xdg-open on the local copy of the attachment if it exists.
         :returns: bool: True if xdg-open was successfully called.
         """
-        if self._xdgopen_path is None:
+        xdgopen_path: Optional[str] = __find_xdgopen__()
+        if xdgopen_path is None:
             return False
         if self.local_path is not None and self.exists:
             try:
-                check_call([self._xdgopen_path, self.local_path])
+                check_call([xdgopen_path, self.local_path])
                 return True
             except CalledProcessError:
                 return False
@@ -4,14 +4,10 @@ File: signalCallMessage.py
 """
 import logging
 from typing import Optional, Any
-import socket
+from .signalAccountContext import SignalAccountContext
 from .signalCommon import __type_error__, MessageTypes
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 
 
@@ -19,26 +15,16 @@ class SignalCallMessage(SignalMessage):
     """
     Class to store a call message.
     """
+    __slots__ = ('offer_id', 'sdp', 'call_type', 'opaque')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  ) -> None:
         """
         Initialize a call message.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This account's ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts SignalContacts object.
-        :param groups: SignalGroups: This accounts SignalGroups object.
-        :param devices: SignalDevices: This accounts SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object for the device we're using.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: dict[str, Any]: Load properties from a dict created by __to_dict__()
         :param raw_message:  dict[str, Any]: Load properties from a dict provided by signal.
         """
@@ -52,8 +38,7 @@ class SignalCallMessage(SignalMessage):
         self.opaque: Optional[str] = None
 
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, None, None, None, None, MessageTypes.CALL)
+        super().__init__(context, from_dict, raw_message, None, None, None, None, MessageTypes.CALL)
 
         # Mark this as delivered:
         if self.timestamp is not None:
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+File: signalCallbackDispatcher.py
+Run receive callbacks on a pool of worker threads.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Optional, Callable, Any
+
+from .signalCommon import __type_error__
+from .signalMessage import SignalMessage
+
+
+class SignalCallbackDispatcher(object):
+    """
+    A pool of worker threads running receive callbacks, so a slow callback doesn't stall reception.
+    Each worker has a bounded queue of its own, and every message of a conversation goes to the same worker, so the
+    messages of one conversation are handled in the order they were received. When a worker's queue is full,
+    submitting blocks until there is room.
+    """
+
+    def __init__(self,
+                 num_workers: int = 4,
+                 max_queue_size: int = 1000,
+                 stop_callback: Optional[Callable[[Any], Any]] = None,
+                 ) -> None:
+        """
+        Create and start the workers.
+        :param num_workers: int: The number of worker threads.
+        :param max_queue_size: int: The maximum number of messages waiting per worker.
+        :param stop_callback: Optional[Callable[[SignalAccount], Any]]: Called with the account when a callback
+            returns True, to stop reception; If None, the receiver is stopped directly.
+        :raises TypeError: If a parameter is of invalid type.
+        :raises ValueError: If num_workers or max_queue_size is less than 1.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(num_workers, int):
+            logger.critical("Raising TypeError:")
+            __type_error__("num_workers", "int", num_workers)
+        if not isinstance(max_queue_size, int):
+            logger.critical("Raising TypeError:")
+            __type_error__("max_queue_size", "int", max_queue_size)
+        if stop_callback is not None and not callable(stop_callback):
+            logger.critical("Raising TypeError:")
+            __type_error__("stop_callback", "Optional[Callable]", stop_callback)
+        if num_workers < 1 or max_queue_size < 1:
+            error_message: str = "num_workers and max_queue_size must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Set internal vars:
+        self._stop_callback: Optional[Callable[[Any], Any]] = stop_callback
+        """Called to stop reception for an account."""
+        self._queues: list[queue.Queue] = [queue.Queue(max_queue_size) for _ in range(num_workers)]
+        """The queue of each worker."""
+        self._running: bool = True
+        """Are we running?"""
+        self._metrics_lock: threading.Lock = threading.Lock()
+        """Lock protecting the metrics."""
+        self._num_dispatched: int = 0
+        """The number of messages submitted."""
+        self._num_completed: int = 0
+        """The number of messages handled."""
+        self._num_blocked: int = 0
+        """The number of submits that blocked on a full queue."""
+        self._max_queue_depth: int = 0
+        """The deepest the queues have been."""
+        self._total_wait: float = 0.0
+        """The total time messages waited in the queues, in seconds."""
+        self._total_latency: float = 0.0
+        """The total time spent in callbacks, in seconds."""
+        self._max_latency: float = 0.0
+        """The longest time spent in a callback, in seconds."""
+
+        # Start the workers:
+        self._workers: list[threading.Thread] = []
+        """The worker threads."""
+        for index, work_queue in enumerate(self._queues):
+            worker = threading.Thread(target=self.__work__, args=(work_queue,),
+                                      name="SignalCallbackWorker-%i" % index, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        return
+
+    ##########################
+    # Helpers:
+    ##########################
+    def __work__(self, work_queue: queue.Queue) -> None:
+        """
+        Worker thread; Run queued messages through their receiver until stopped.
+        :param work_queue: queue.Queue: This worker's queue.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__work__.__name__)
+        while True:
+            # Once stopped, finish what's queued, as the stop sentinel may not have fit on a full queue:
+            if self._running:
+                item: Optional[tuple[Any, SignalMessage, float]] = work_queue.get()
+            else:
+                try:
+                    item = work_queue.get_nowait()
+                except queue.Empty:
+                    return  # Stopped.
+            if item is None:
+                return  # Stopped.
+            receiver, message, queued_at = item
+            # Reception may have been stopped while this was queued:
+            if not receiver.is_receiving:
+                continue
+            started_at: float = time.perf_counter()
+            try:
+                stop: bool = receiver.__dispatch__(message)
+            except Exception as e:
+                logger.critical("Callback for %s failed: %s: %s" % (receiver.name, type(e).__name__, str(e.args)))
+                stop = False
+            latency: float = time.perf_counter() - started_at
+            with self._metrics_lock:
+                self._num_completed += 1
+                self._total_wait += started_at - queued_at
+                self._total_latency += latency
+                if latency > self._max_latency:
+                    self._max_latency = latency
+            if stop and receiver.is_receiving:
+                self.__stop_receiver__(receiver)
+
+    def __stop_receiver__(self, receiver) -> None:  # receiver type SignalReceiver
+        """
+        Stop reception for a receiver whose callback returned True.
+        :param receiver: SignalReceiver: The receiver to stop.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__stop_receiver__.__name__)
+        logger.debug("Callback requested reception stop for: %s" % receiver.name)
+        try:
+            if self._stop_callback is not None:
+                self._stop_callback(receiver.account)
+            else:
+                receiver.stop()
+        except Exception as e:
+            logger.warning("Failed to stop reception for %s: %s: %s"
+                           % (receiver.name, type(e).__name__, str(e.args)))
+        return
+
+    ##########################
+    # Methods:
+    ##########################
+    def submit(self, receiver, conversation_key: str, message: SignalMessage) -> None:  # receiver type SignalReceiver
+        """
+        Queue a message to have its callbacks run by the receiver, blocking while the worker's queue is full.
+        :param receiver: SignalReceiver: The receiver to run the callbacks.
+        :param conversation_key: str: Identifies the conversation, messages with the same key are handled in order.
+        :param message: SignalMessage: The message.
+        :return: None
+        :raises RuntimeError: If the dispatcher was stopped.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.submit.__name__)
+        if not self._running:
+            error_message: str = "Dispatcher stopped."
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        work_queue: queue.Queue = self._queues[hash((receiver.name, conversation_key)) % len(self._queues)]
+        item: tuple[Any, SignalMessage, float] = (receiver, message, time.perf_counter())
+        try:
+            work_queue.put_nowait(item)
+        except queue.Full:
+            logger.debug("Callback queue full, reception waiting for the callbacks to catch up.")
+            with self._metrics_lock:
+                self._num_blocked += 1
+            work_queue.put(item)
+        depth: int = work_queue.qsize()
+        with self._metrics_lock:
+            self._num_dispatched += 1
+            if depth > self._max_queue_depth:
+                self._max_queue_depth = depth
+        return
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop the workers once they've handled what is already queued; Safe to call from a callback.
+        :param wait: bool: Wait for the workers to finish, other than the one calling.
+        :return: None
+        """
+        self._running = False
+        # Wake the workers waiting on an empty queue; A worker with a full queue sees we've stopped without it, so
+        # don't block here, the caller may be the worker that would empty it:
+        for work_queue in self._queues:
+            try:
+                work_queue.put_nowait(None)
+            except queue.Full:
+                pass
+        if wait:
+            for worker in self._workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+        return
+
+    ##########################
+    # Properties:
+    ##########################
+    @property
+    def num_workers(self) -> int:
+        """
+        The number of worker threads.
+        :return: int: The number of workers.
+        """
+        return len(self._workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        The number of messages waiting across all the queues.
+        :return: int: The number of messages waiting.
+        """
+        return sum(work_queue.qsize() for work_queue in self._queues)
+
+    @property
+    def max_queue_depth(self) -> int:
+        """
+        The deepest a single worker's queue has been.
+        :return: int: The maximum depth.
+        """
+        return self._max_queue_depth
+
+    @property
+    def num_dispatched(self) -> int:
+        """
+        The number of messages submitted.
+        :return: int: The number of messages.
+        """
+        return self._num_dispatched
+
+    @property
+    def num_completed(self) -> int:
+        """
+        The number of messages whose callbacks have run.
+        :return: int: The number of messages.
+        """
+        return self._num_completed
+
+    @property
+    def num_blocked(self) -> int:
+        """
+        The number of times reception waited on a full queue.
+        :return: int: The number of times.
+        """
+        return self._num_blocked
+
+    @property
+    def average_wait(self) -> float:
+        """
+        The average time a message waited in a queue before its callbacks ran.
+        :return: float: The average wait in seconds.
+        """
+        if self._num_completed == 0:
+            return 0.0
+        return self._total_wait / self._num_completed
+
+    @property
+    def average_latency(self) -> float:
+        """
+        The average time spent running the callbacks for a message.
+        :return: float: The average latency in seconds.
+        """
+        if self._num_completed == 0:
+            return 0.0
+        return self._total_latency / self._num_completed
+
+    @property
+    def max_latency(self) -> float:
+        """
+        The longest time spent running the callbacks for a message.
+        :return: float: The maximum latency in seconds.
+        """
+        return self._max_latency
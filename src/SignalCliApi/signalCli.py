@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import logging
-import json
 import os
 import socket
 import time
@@ -10,17 +9,21 @@ from typing import Optional, Callable, Any, NoReturn
 
 from .signalAccount import SignalAccount
 from .signalAccounts import SignalAccounts
+from .signalMessages import __close_all_messages__
 from . import signalCommon
 from .signalCommon import (__type_error__, __find_signal__, __find_qrencode__,
                            __parse_signal_return_code__, __socket_create__,
-                           __socket_connect__, __socket_close__, __socket_receive_blocking__,
-                           __socket_send__, phone_number_regex, __type_err_msg__,
-                           __parse_signal_response__, __check_response_for_error__)
+                           __socket_connect__, __socket_close__, __socket_request__, __close_socket_pool__,
+                           phone_number_regex, __type_err_msg__, __check_response_for_error__, StorageTypes,
+                           ACCOUNT_LOAD_WORKERS)
 from .run_callback import __run_callback__, __type_check_callback__
 from .run_callback import set_suppress_error as set_callback_suppress_error
 from .run_callback import type_string as callback_type_string
 from .signalLinkThread import SignalLinkThread
-from .signalReceiveThread import SignalReceiveThread
+from .signalReceiver import SignalReceiver
+from .signalReceiveReactor import SignalReceiveReactor
+from .signalSubscription import SignalSubscription
+from .signalCallbackDispatcher import SignalCallbackDispatcher
 from .signalSticker import SignalStickerPacks
 from .signalExceptions import LinkNotStarted, LinkInProgress, SignalError, CallbackCausedError, \
     SignalAlreadyRunningError
@@ -39,6 +42,18 @@ class SignalCli(object):
                  callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
                  callback_raises_error: bool = True,
                  debug: bool = False,
+                 single_subscription: bool = False,
+                 callback_workers: int = 0,
+                 callback_queue_size: int = 1000,
+                 receive_workers: int = 4,
+                 receive_queue_size: int = 1000,
+                 messages_flush_interval: float = 1.0,
+                 messages_flush_batch: int = 100,
+                 messages_storage: StorageTypes = StorageTypes.JSON,
+                 pending_receipts_ttl: float = 86400.0,
+                 pending_receipts_max: int = 1000,
+                 account_load_workers: int = ACCOUNT_LOAD_WORKERS,
+                 lazy_accounts: bool = False,
                  ) -> None:
         """
         Initialize signal-cli, starting the process if required.
@@ -58,6 +73,30 @@ class SignalCli(object):
          callback exceptions will only be logged to the logging facility. False, the exception
          CallbackCausedError is raised with the information and Exception object of what went wrong.
         :param debug: Bool: Produce debug output on stdout.
+        :param single_subscription: bool: True, receive for every account over one shared subscription, routing
+        messages by account number; False, each receiving account has a subscription of its own.
+        :param callback_workers: int: The number of threads to run receive callbacks on; 0 runs them on the receiving
+        thread. Messages of the same conversation are always handled in order.
+        :param callback_queue_size: int: The maximum number of messages waiting per callback thread, reception waits
+        when it's reached.
+        :param receive_workers: int: The number of threads handling received messages; Messages of the same account
+        are always handled in order, on the same thread.
+        :param receive_queue_size: int: The maximum number of messages waiting per receive thread, reading waits when
+        it's reached.
+        :param messages_flush_interval: float: Seconds changed messages may wait before being written to disk; 0 writes
+        every change immediately.
+        :param messages_flush_batch: int: The number of changes to an account's messages that forces them to be
+        written to disk.
+        :param messages_storage: StorageTypes: StorageTypes.JSON rewrites messages.json with the whole history,
+        StorageTypes.JOURNAL appends each change to messages.journal, compacting it into messages.json now and then,
+        StorageTypes.SQLITE keeps messages in messages.db, loading them as they're looked up.
+        :param pending_receipts_ttl: float: Seconds a receipt for a message we don't have is kept, waiting for the
+            message; 0 keeps them until evicted for space.
+        :param pending_receipts_max: int: The maximum number of receipts kept waiting for their messages, per account.
+        :param account_load_workers: int: The number of accounts loaded at once; An account that fails to load is
+            reported to the callback, and kept in accounts.load_errors, without stopping the others.
+        :param lazy_accounts: bool: True, only read the account files at start up, loading each account's devices,
+            contacts, groups, messages and profile on first use, on start_receive(), or on SignalAccount.preload().
         :raises TypeError: If a parameter is of invalid type.
         :raises FileNotFoundError: If a file / directory doesn't exist when it should.
         :raises FileExistsError: If a socket file exists when it shouldn't.
@@ -145,9 +184,95 @@ class SignalCli(object):
             logger.critical("Raising TypeError:")
             __type_error__('debug', 'bool', debug)
 
+        # Check single subscription:
+        if not isinstance(single_subscription, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__('single_subscription', 'bool', single_subscription)
+
+        # Check callback workers and queue size:
+        if not isinstance(callback_workers, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('callback_workers', 'int', callback_workers)
+        elif callback_workers < 0:
+            error_message: str = "callback_workers can't be negative."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+        if not isinstance(callback_queue_size, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('callback_queue_size', 'int', callback_queue_size)
+        elif callback_queue_size < 1:
+            error_message: str = "callback_queue_size must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Check receive workers and queue size:
+        if not isinstance(receive_workers, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('receive_workers', 'int', receive_workers)
+        elif receive_workers < 1:
+            error_message: str = "receive_workers must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+        if not isinstance(receive_queue_size, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('receive_queue_size', 'int', receive_queue_size)
+        elif receive_queue_size < 1:
+            error_message: str = "receive_queue_size must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Check messages flush interval and batch:
+        if not isinstance(messages_flush_interval, (int, float)):
+            logger.critical("Raising TypeError:")
+            __type_error__('messages_flush_interval', 'float', messages_flush_interval)
+        if not isinstance(messages_flush_batch, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('messages_flush_batch', 'int', messages_flush_batch)
+        elif messages_flush_batch < 1:
+            error_message: str = "messages_flush_batch must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Check messages storage:
+        if not isinstance(messages_storage, StorageTypes):
+            logger.critical("Raising TypeError:")
+            __type_error__('messages_storage', 'StorageTypes', messages_storage)
+
+        # Check pending receipts ttl and max:
+        if not isinstance(pending_receipts_ttl, (int, float)):
+            logger.critical("Raising TypeError:")
+            __type_error__('pending_receipts_ttl', 'float', pending_receipts_ttl)
+        if not isinstance(pending_receipts_max, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('pending_receipts_max', 'int', pending_receipts_max)
+        elif pending_receipts_max < 1:
+            error_message: str = "pending_receipts_max must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Check account load workers:
+        if not isinstance(account_load_workers, int):
+            logger.critical("Raising TypeError:")
+            __type_error__('account_load_workers', 'int', account_load_workers)
+        elif account_load_workers < 1:
+            error_message: str = "account_load_workers must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Check lazy accounts:
+        if not isinstance(lazy_accounts, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__('lazy_accounts', 'bool', lazy_accounts)
+
         # Set internal vars:
         # Set _CALLBACK_RAISES_ERROR value:
         signalCommon.CALLBACK_RAISES_ERROR = callback_raises_error
+        # Set how messages are written behind:
+        signalCommon.MESSAGES_FLUSH_INTERVAL = float(messages_flush_interval)
+        signalCommon.MESSAGES_FLUSH_BATCH = messages_flush_batch
+        signalCommon.MESSAGES_STORAGE = messages_storage
+        signalCommon.PENDING_RECEIPTS_TTL = float(pending_receipts_ttl)
+        signalCommon.PENDING_RECEIPTS_MAX = pending_receipts_max
         if callback_raises_error:
             set_callback_suppress_error(False)
         else:
@@ -256,13 +381,33 @@ class SignalCli(object):
 
         # Load accounts:
         logger.info("Loading accounts.")
+        __run_callback__(self._callback, 'loading accounts')
         self.accounts = SignalAccounts(sync_socket=self._sync_socket, command_socket=self._command_socket,
-                                       config_path=self.config_path, sticker_packs=self.sticker_packs, do_load=True)
+                                       config_path=self.config_path, sticker_packs=self.sticker_packs, do_load=True,
+                                       callback=self._callback, load_workers=account_load_workers,
+                                       lazy=lazy_accounts)
         """The SignalAccounts object."""
-
-        # Create dict to hold processes:
-        self._receive_threads: dict[str, Optional[SignalReceiveThread]] = {}
-        """The dict to store the receive threads."""
+        __run_callback__(self._callback, 'accounts loaded')
+
+        # Create dict to hold receivers:
+        self._receivers: dict[str, Optional[SignalReceiver]] = {}
+        """The dict to store the receivers, keyed by account number."""
+        self._receive_reactor: Optional[SignalReceiveReactor] = None
+        """The thread receiving for every account, started on the first start_receive()."""
+        self._receive_workers: int = receive_workers
+        """The number of threads handling received messages."""
+        self._receive_queue_size: int = receive_queue_size
+        """The maximum number of messages waiting per receive thread."""
+        self._single_subscription: bool = single_subscription
+        """Should every account receive over one shared subscription?"""
+        self._subscription: Optional[SignalSubscription] = None
+        """The shared subscription, created on the first start_receive() in single subscription mode."""
+        self._callback_workers: int = callback_workers
+        """The number of threads to run callbacks on, 0 for inline."""
+        self._callback_queue_size: int = callback_queue_size
+        """The maximum number of messages waiting per callback thread."""
+        self._callback_dispatcher: Optional[SignalCallbackDispatcher] = None
+        """The callback dispatcher, created on the first start_receive() if callback_workers isn't 0."""
 
         self._link_thread: Optional[SignalLinkThread] = None
         """The link thread that's running."""
@@ -303,6 +448,8 @@ class SignalCli(object):
             __socket_close__(self._command_socket)  # Raises CommunicationsError
             self._command_socket = None
             logger.debug("Command socket closed.")
+        logger.debug("Closing send socket pool.")
+        __close_socket_pool__()
         return
 
     def __wait_for_signal_socket_file__(self, socket_file_path: str, timeout: float = 10.0) -> None:
@@ -399,9 +546,9 @@ class SignalCli(object):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__del__.__name__)
 
         try:
-            for thread_id in self._receive_threads.keys():
-                if self._receive_threads[thread_id] is not None:
-                    self._receive_threads[thread_id].join(1.0)
+            if self._receive_reactor is not None:
+                self._receive_reactor.stop(wait=False)
+                self._receive_reactor.join(1.0)
         except Exception as e:
             logger.warning("Error occurred during termination of receive process.")
             logger.warning("Error type: %s" % str(type(e)))
@@ -428,6 +575,28 @@ class SignalCli(object):
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.stop_signal.__name__)
 
+        # Stop receiving, waiting for the messages being handled, and their callbacks, as they may change the messages:
+        if self._receive_reactor is not None:
+            logger.debug("Stopping receive reactor.")
+            self._receive_reactor.stop(wait=True)
+            self._receive_reactor = None
+        if self._subscription is not None:
+            self._subscription.stop()
+            self._subscription = None
+        if self._callback_dispatcher is not None:
+            logger.debug("Stopping callback dispatcher.")
+            self._callback_dispatcher.stop(wait=True)
+            self._callback_dispatcher = None
+
+        for account_number, receiver in self._receivers.items():
+            if receiver is not None:
+                receiver.stop()
+                self._receivers[account_number] = None
+
+        # Write any unwritten messages, and close the stores, now nothing is receiving:
+        logger.debug("Closing messages.")
+        __close_all_messages__()
+
         # Close the sockets:
         logger.debug("Closing sockets.")
         __run_callback__(self._callback, "closing sockets")
@@ -514,7 +683,6 @@ class SignalCli(object):
         # Create register account command object and json command string:
         register_account_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "register",
             "params": {
                 "account": number,
@@ -522,11 +690,8 @@ class SignalCli(object):
                 "voice": voice,
             }
         }
-        json_command_str = json.dumps(register_account_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, register_account_command_obj)
         # TODO: Fix error checking:
         # Check for error:
         if 'error' in response_obj.keys():
@@ -534,18 +699,16 @@ class SignalCli(object):
             logger.info("Deleting incomplete account.")
             delete_local_data_command_obj = {
                 "jsonrpc": "2.0",
-                "id": 1,
                 "method": "deleteLocalAccountData",
                 "params": {
                     "account": number
                 }
             }
-            json_command_str = json.dumps(delete_local_data_command_obj) + '\n'
             # Communicate with signal:
-            __socket_send__(self._sync_socket, json_command_str)
-            response_str = __socket_receive_blocking__(self._sync_socket)  # output unused, we don't care if it failed.
+            # Response unused, we don't care if it failed:
+            delete_response_obj: dict[str, Any] = __socket_request__(self._sync_socket, delete_local_data_command_obj)
             # TODO: Error check delete request response and at least warn about it.
-            logger.debug("Delete account response: %s" % response_str)
+            logger.debug("Delete account response: %s" % str(delete_response_obj))
             error_message = "Signal error, code: %i, message: %s" \
                             % (response_obj['error']['code'], response_obj['error']['message'])
             logger.error("Raising SignalError(%s)" % error_message)
@@ -607,17 +770,11 @@ class SignalCli(object):
         # Create link request object:
         link_request_command_obj: dict[str, Any] = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "startLink",
         }
 
-        # Create json command string:
-        json_command_str: str = json.dumps(link_request_command_obj) + '\n'
-
         # Communicate with signal:
-        __socket_send__(self._command_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._command_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._command_socket, link_request_command_obj)
         __check_response_for_error__(response_obj)
 
         # Gather the link from response obj:
@@ -687,7 +844,6 @@ class SignalCli(object):
         # Generate the finishLink command object:
         link_finish_command_obj: dict[str, Any] = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "finishLink",
             "params": {
                 "deviceLinkUri": self._link_uri,
@@ -696,13 +852,8 @@ class SignalCli(object):
         if device_name is not None:
             link_finish_command_obj['params']['deviceName'] = device_name
 
-        # Generate json command string:
-        json_command_str = json.dumps(link_finish_command_obj) + '\n'
-
         # Communicate with signal:
-        __socket_send__(self._command_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._command_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)  # Raises Invalid server response
+        response_obj: dict[str, Any] = __socket_request__(self._command_socket, link_finish_command_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [-1, -2, -3])
@@ -741,7 +892,7 @@ class SignalCli(object):
                       reaction_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
                       call_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
                       do_expunge: bool = True,
-                      ) -> SignalReceiveThread:
+                      ) -> SignalReceiver:
         """
         Start receiving messages for the given account.
         NOTE: Callback signature is (account: SignalAccount, message: SignalMessage)
@@ -756,39 +907,67 @@ class SignalCli(object):
         :param reaction_message_callback: Optional[Callable]: Callback for reaction messages.
         :param call_message_callback: Optional[Callable]: Callback for incoming call messages.
         :param do_expunge: bool: Honour expiry times.
-        :returns: SignalReceiveThread: The created thread.
+        :returns: SignalReceiver: The created receiver.
         :raises: TypeError: If the account is not an SignalAccount object, or if a callback is defined, but not callable.
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.start_receive.__name__)
         logger.info("Start receive started.")
-        # Argument checks NOTE: SignalReceiveThread type checks callbacks:
+        # Argument checks NOTE: SignalReceiver type checks callbacks:
         if not isinstance(account, SignalAccount):
             logger.critical("Raising TypeError:")
             logger.critical(__type_err_msg__('account', 'SignalAccount', account))
             __type_error__("account", "SignalAccount", account)
 
-        # Start receive:
-        thread_id: str = account.number
-        thread = SignalReceiveThread(server_address=self._server_address,
-                                     command_socket=self._command_socket,
-                                     config_path=self.config_path,
-                                     account=account,
-                                     sticker_packs=self.sticker_packs,
-                                     all_messages_callback=all_messages_callback,
-                                     received_message_callback=received_message_callback,
-                                     receipt_message_callback=receipt_message_callback,
-                                     sync_message_callback=sync_message_callback,
-                                     typing_message_callback=typing_message_callback,
-                                     story_message_callback=story_message_callback,
-                                     payment_message_callback=payment_message_callback,
-                                     reaction_message_callback=reaction_message_callback,
-                                     call_message_callback=call_message_callback,
-                                     do_expunge=do_expunge,
-                                     )
-        thread.start()
-        self._receive_threads[thread_id] = thread
+        # Create the callback dispatcher if required:
+        if self._callback_workers > 0 and self._callback_dispatcher is None:
+            logger.debug("Starting callback dispatcher.")
+            self._callback_dispatcher = SignalCallbackDispatcher(num_workers=self._callback_workers,
+                                                                 max_queue_size=self._callback_queue_size,
+                                                                 stop_callback=self.stop_receive)
+
+        # Load the account's data, if it's lazy and not loaded yet:
+        account.preload()
+
+        # Create the receiver and subscribe:
+        receiver = SignalReceiver(server_address=self._server_address,
+                                  command_socket=self._command_socket,
+                                  config_path=self.config_path,
+                                  account=account,
+                                  sticker_packs=self.sticker_packs,
+                                  all_messages_callback=all_messages_callback,
+                                  received_message_callback=received_message_callback,
+                                  receipt_message_callback=receipt_message_callback,
+                                  sync_message_callback=sync_message_callback,
+                                  typing_message_callback=typing_message_callback,
+                                  story_message_callback=story_message_callback,
+                                  payment_message_callback=payment_message_callback,
+                                  reaction_message_callback=reaction_message_callback,
+                                  call_message_callback=call_message_callback,
+                                  do_expunge=do_expunge,
+                                  subscribe=not self._single_subscription,
+                                  dispatcher=self._callback_dispatcher,
+                                  )
+        receiver.__subscribe__()
+
+        # Start the reactor if required:
+        if self._receive_reactor is None:
+            logger.debug("Starting receive reactor.")
+            self._receive_reactor = SignalReceiveReactor(num_workers=self._receive_workers,
+                                                         max_queue_size=self._receive_queue_size)
+            self._receive_reactor.start()
+        # Hand the receiver to the shared subscription, subscribing if required, or to the reactor:
+        if self._single_subscription:
+            if self._subscription is None:
+                logger.debug("Starting shared subscription.")
+                self._subscription = SignalSubscription(server_address=self._server_address)
+                self._subscription.__subscribe__()
+                self._receive_reactor.add(self._subscription)
+            self._subscription.add(receiver)
+        else:
+            self._receive_reactor.add(receiver)
+        self._receivers[account.number] = receiver
         account.is_receiving = True
-        return thread
+        return receiver
 
     def stop_receive(self, account: SignalAccount) -> bool:
         """
@@ -798,27 +977,27 @@ class SignalCli(object):
         :raises: TypeError: If the parameter account is not an SignalAccount object.
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.stop_receive.__name__)
-        logger.info("Stopping reception thread.")
+        logger.info("Stopping reception.")
         # Argument checks:
         if not isinstance(account, SignalAccount):
             logger.critical("Raising TypeError:")
             logger.critical(__type_err_msg__('account', "SignalAccount", account))
             __type_error__("account", "SignalAccount", account)
-        # Set the thread id:
-        thread_id: str = account.number
-        # Check that the thread was started:
-        if thread_id not in self._receive_threads.keys():
+        # Check that the receiver was started:
+        receiver: Optional[SignalReceiver] = self._receivers.get(account.number)
+        if receiver is None:
             logger.warning("Trying to stop receive for an account that isn't receiving.")
             return False
-        # Get the thread and stop it:
-
-        thread = self._receive_threads[thread_id]
-        logger.debug("Stopping thread...")
-        thread.stop()
-        thread.join()
+        # Remove the receiver from the shared subscription or reactor, and stop it:
+        logger.debug("Stopping receiver...")
+        if self._subscription is not None:
+            self._subscription.remove(receiver)
+        else:
+            self._receive_reactor.remove(receiver)
+        receiver.stop()
         account.is_receiving = False
-        logger.debug("Thread stopped.")
-        self._receive_threads[thread_id] = None
+        logger.debug("Receiver stopped.")
+        self._receivers[account.number] = None
         logger.info("Reception stopped.")
         return True
 
@@ -879,3 +1058,28 @@ class SignalCli(object):
         :return: Optional[SignalLinkThread]: The SignalLinkThread object, other wise if not linking, None.
         """
         return self._link_thread
+
+    @property
+    def server_address(self) -> tuple[str, int] | str:
+        """
+        The address of the signal-cli daemon.
+        :return: tuple[str, int] | str: Either (HOSTNAME, PORT) or "PATH_TO_SOCKET".
+        """
+        return self._server_address
+
+    @property
+    def command_socket(self) -> Optional[socket.socket]:
+        """
+        The socket message objects run their commands through.
+        :return: Optional[socket.socket]: The command socket, None if not connected.
+        """
+        return self._command_socket
+
+    @property
+    def callback_dispatcher(self) -> Optional[SignalCallbackDispatcher]:
+        """
+        The dispatcher running receive callbacks, its properties report queue depth and callback latency.
+        :return: Optional[SignalCallbackDispatcher]: The dispatcher, None if callbacks run inline, or reception hasn't
+            started.
+        """
+        return self._callback_dispatcher
@@ -5,9 +5,14 @@ File: signalCommon.py
     this takes off.
 """
 
+import itertools
 import json
-from subprocess import check_output, CalledProcessError
-from typing import Pattern, NoReturn, Optional, Any, Final, Callable
+import shutil
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from typing import Pattern, NoReturn, Optional, Any, Final, Callable, Iterator
 import socket
 import select
 import re
@@ -51,6 +56,14 @@ PRIMARY_DEVICE_ID: Final[int] = 1
 """The device ID of the primary device for an account."""
 STICKER_MANIFEST_FILENAME: Final[str] = 'manifest.json'
 """The filename of a sticker manifest file."""
+READ_CHUNK_SIZE: Final[int] = 65536
+"""The number of bytes to read from a socket at once."""
+SOCKET_POOL_SIZE: Final[int] = 4
+"""The maximum number of sockets kept by the send socket pool."""
+ACCOUNT_LOAD_WORKERS: Final[int] = 8
+"""The default number of accounts loaded at once."""
+ASYNC_READ_LIMIT: Final[int] = 16 * 1024 * 1024
+"""The longest line an asyncio stream will read; Envelopes with large previews can be big."""
 
 STRINGS: dict[str, str] = {
     'lessThanASecond': 'less than a second ago',
@@ -73,14 +86,42 @@ CALLBACK_RAISES_ERROR: bool = False
 """Does a callback raise an exception?"""
 _CLOSING_SOCKET: bool = False
 """Are we closing a socket right now?"""
-_OPEN_SOCKETS: list[dict[str, socket.socket | str | tuple[str, int]]] = []
-"""A list of open sockets, and the server they're associated with so we can automatically reconnect them."""
+_OPEN_SOCKETS: dict[socket.socket, dict[str, socket.socket | str | tuple[str, int]]] = {}
+"""The open sockets, and the server they're associated with so we can automatically reconnect them, keyed by socket."""
+_SOCKET_READERS: dict[socket.socket, 'SocketReader'] = {}
+"""The buffered readers for each socket, keyed by socket."""
+_RPC_CLIENTS: dict[socket.socket, 'JsonRpcClient'] = {}
+"""The JSON-RPC clients for each socket, keyed by socket."""
+_RPC_CLIENTS_LOCK: threading.Lock = threading.Lock()
+"""Lock protecting the JSON-RPC client registry."""
+_SOCKET_POOL: Optional['SocketPool'] = None
+"""The shared pool of sockets used for sending messages."""
+_SOCKET_POOL_LOCK: threading.Lock = threading.Lock()
+"""Lock protecting the shared socket pool."""
+_POOLED_REQUEST_IDS: Iterator[int] = itertools.count(1)
+"""Request id generator for requests run on pooled sockets."""
+_TOOL_PATHS: dict[str, Optional[str]] = {}
+"""The paths of the external tools looked for so far, None for those not found; Shared by the whole process."""
+_TOOL_PATHS_LOCK: threading.Lock = threading.Lock()
+"""Lock protecting the tool paths."""
 SERVER_ADDRESS: Optional[str | tuple[str, int]] = None
 """The current server address."""
 HONOUR_VIEW_ONCE: bool = True
 """Should we honour the view once message property?"""
 HONOUR_EXPIRY: bool = True
 """Should we honour the expiry times of the messages?"""
+MESSAGES_FLUSH_INTERVAL: float = 1.0
+"""Seconds changed messages may wait before being written to disk, 0 writes them immediately."""
+MESSAGES_FLUSH_BATCH: int = 100
+"""The number of changes to messages that forces them to be written to disk."""
+MESSAGES_JOURNAL_COMPACT_SIZE: int = 1000
+"""The number of journal records that triggers writing a new messages snapshot, when journaling."""
+PENDING_RECEIPTS_TTL: float = 86400.0
+"""Seconds a receipt waits for its message before being dropped, 0 keeps them until evicted for space."""
+PENDING_RECEIPTS_MAX: int = 1000
+"""The maximum number of receipts waiting for their messages, per account."""
+RPC_REQUEST_TIMEOUT: float = 60.0
+"""Seconds a JSON-RPC request waits for its response before failing."""
 
 
 ###########################
@@ -206,6 +247,22 @@ class ConversationTypes(IntEnum):
     """Conversation with a group."""
 
 
+class StorageTypes(IntEnum):
+    """
+    Enum to store how message history is stored.
+    """
+    JSON = auto()
+    """The whole history is rewritten to messages.json."""
+    JOURNAL = auto()
+    """Changes are appended to messages.journal, and periodically compacted into messages.json."""
+    SQLITE = auto()
+    """Messages are stored in messages.db, and only loaded as they're looked up."""
+
+
+MESSAGES_STORAGE: StorageTypes = StorageTypes.JSON
+"""How message history is stored."""
+
+
 class ReceiptTypes(IntEnum):
     """
     Enum to store different receipt types:
@@ -268,38 +325,44 @@ class TypingStates(IntEnum):
 ####################################
 # Find command helpers:
 ####################################
+def __find_tool__(name: str, warning_message: Optional[str] = None) -> Optional[str]:
+    """
+    Find an external tool on the PATH. The result, found or not, is kept for the life of the process, so each tool is
+    only looked for once, however many objects ask for it.
+    :param name: str: The name of the executable.
+    :param warning_message: Optional[str]: Logged as a warning the first time the tool isn't found.
+    :return: Optional[str]: The full path to the tool, or None if not found.
+    """
+    with _TOOL_PATHS_LOCK:
+        if name in _TOOL_PATHS:
+            return _TOOL_PATHS[name]
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + __find_tool__.__name__)
+        logger.debug("Searching for %s..." % name)
+        tool_path: Optional[str] = shutil.which(name)
+        if tool_path is not None:
+            logger.debug("%s found at '%s'." % (name, tool_path))
+        elif warning_message is not None:
+            logger.warning(warning_message)
+        else:
+            logger.debug("%s not found." % name)
+        _TOOL_PATHS[name] = tool_path
+        return tool_path
+
+
 def __find_xdgopen__() -> Optional[str]:
     """
-    Use which to find xdg-open
+    Find xdg-open.
     :return: Optional[str]: The path to xdg-open or None if not found.
     """
-    logger: logging.Logger = logging.getLogger(__name__ + '.' + __find_xdgopen__.__name__)
-    logger.debug("Searching for xdg-open...")
-    xdgopen_path: Optional[str]
-    try:
-        xdgopen_path = check_output(['which', 'xdg-open'], text=True).rstrip()
-        logger.debug("xdg-open found at '%s'." % xdgopen_path)
-    except CalledProcessError:
-        logger.warning("xdg-open not found, the functions named display() will do nothing.")
-        xdgopen_path = None
-    return xdgopen_path
+    return __find_tool__('xdg-open', "xdg-open not found, the functions named display() will do nothing.")
 
 
 def __find_qrencode__() -> Optional[str]:
     """
-    Use which to find qrencode.
+    Find qrencode.
     :return: Optional[str]: The path to qrencode, or None if not found.
     """
-    logger: logging.Logger = logging.getLogger(__name__ + '.' + __find_qrencode__.__name__)
-    logger.debug("Searching for qrencode...")
-    qrencode_path: Optional[str]
-    try:
-        qrencode_path = check_output(['which', 'qrencode'], text=True).rstrip()
-        logger.debug("qrencode found at: %s" % qrencode_path)
-    except CalledProcessError:
-        qrencode_path = None
-        logger.warning("qrencode not found, cannot generate link qr-codes.")
-    return qrencode_path
+    return __find_tool__('qrencode', "qrencode not found, cannot generate link qr-codes.")
 
 
 def __find_convert__() -> Optional[str]:
@@ -307,16 +370,7 @@ def __find_convert__() -> Optional[str]:
     Find the imageMagick convert utility.
     :return: Optional[str]: The full path convert, or None if not found.
     """
-    logger: logging.Logger = logging.getLogger(__name__ + '.' + __find_convert__.__name__)
-    logger.debug("Searching for convert...")
-    convert_path: Optional[str]
-    try:
-        convert_path = check_output(['which', 'convert'], text=True).rstrip()
-        logger.debug("convert found at: %s" % convert_path)
-        return convert_path
-    except CalledProcessError:
-        logger.warning("convert not found, cannot generate thumbnails.")
-    return None
+    return __find_tool__('convert', "convert not found, cannot generate thumbnails.")
 
 
 def __find_signal__() -> str | NoReturn:
@@ -326,33 +380,10 @@ def __find_signal__() -> str | NoReturn:
     :raises FileNotFoundError: If signal executable is not found.
     """
     logger: logging.Logger = logging.getLogger(__name__ + '.' + __find_signal__.__name__)
-    signal_path: str
-    try:
-        logger.debug("Searching for signal-cli...")
-        signal_path = check_output(['which', 'signal-cli'], text=True)
-        signal_path = signal_path.strip()
-        logger.debug("signal-cli found at: %s" % signal_path)
-        return signal_path
-    except CalledProcessError:
-        logger.debug("signal-cli not found.")
-    # Check for 'signal-cli-native':
-    try:
-        logger.debug("Searching for signal-cli-native...")
-        signal_path = check_output(['which', 'signal-cli-native'], text=True)
-        signal_path = signal_path.strip()
-        logger.debug("signal-cli-native found at: %s" % signal_path)
-        return signal_path
-    except CalledProcessError:
-        logger.debug("signal-cli-native not found.")
-    # Check for 'signal-cli-jre':
-    try:
-        logger.debug("Searching for signal-cli-jre...")
-        signal_path = check_output(['which', 'signal-cli-jre'], text=True)
-        signal_path = signal_path.strip()
-        logger.debug("signal-cli-jre found at: %s" % signal_path)
-        return signal_path
-    except CalledProcessError:
-        logger.debug("signal-cli-jre not found.")
+    for name in ('signal-cli', 'signal-cli-native', 'signal-cli-jre'):
+        signal_path: Optional[str] = __find_tool__(name)
+        if signal_path is not None:
+            return signal_path
     # Exit if we couldn't find signal
     error_message: str = ("FATAL: Could not find [ signal-cli | signal-cli-native | signal-cli-jre ].  "
                           "Please ensure it's installed and in your $PATH environment variable.")
@@ -394,15 +425,101 @@ def __parse_signal_return_code__(return_code: int, command_line: str | list[str]
         raise SignalError(error_message, return_code)
 
 
+####################################
+# Socket reader:
+####################################
+class SocketReader(object):
+    """
+    Buffered, newline framed reader for a signal-cli socket.
+    Reads from the socket in large chunks into a reusable buffer, and hands back one line at a time, keeping any
+    leftover bytes for the next call.
+    """
+    def __init__(self, sock: socket.socket, chunk_size: int = READ_CHUNK_SIZE) -> None:
+        """
+        Initialize the reader.
+        :param sock: socket.socket: The socket to read from.
+        :param chunk_size: int: The maximum number of bytes to read from the socket at once.
+        """
+        object.__init__(self)
+        self._socket: socket.socket = sock
+        """The socket we're reading from."""
+        self._chunk: bytearray = bytearray(chunk_size)
+        """The reusable receive buffer."""
+        self._chunk_view: memoryview = memoryview(self._chunk)
+        """A view of the receive buffer, so we can slice it without copying."""
+        self._buffer: bytearray = bytearray()
+        """Bytes received, but not yet returned."""
+        self._search_start: int = 0
+        """Where to start searching for the next newline, so we don't rescan bytes already checked."""
+        return
+
+    def has_line(self) -> bool:
+        """
+        Is there a complete line in the buffer?
+        :return: bool: True if a line can be read without touching the socket.
+        """
+        if self._buffer.find(b'\n', self._search_start) == -1:
+            self._search_start = len(self._buffer)
+            return False
+        return True
+
+    def fill(self) -> int:
+        """
+        Read one chunk from the socket into the buffer.
+        :return: int: The number of bytes read.
+        :raises socket.error: On error reading from the socket.
+        :raises CommunicationsError: If the remote end closed the connection.
+        """
+        byte_count: int = self._socket.recv_into(self._chunk)
+        if byte_count == 0:
+            raise CommunicationsError("Socket closed by remote end.", None)
+        self._buffer += self._chunk_view[:byte_count]
+        return byte_count
+
+    def pop_line(self) -> Optional[str]:
+        """
+        Remove and return the next complete line from the buffer.
+        :return: Optional[str]: The line, including the trailing newline, or None if no complete line is buffered.
+        """
+        index: int = self._buffer.find(b'\n', self._search_start)
+        if index == -1:
+            self._search_start = len(self._buffer)
+            return None
+        line: bytes = bytes(self._buffer[:index + 1])
+        del self._buffer[:index + 1]
+        self._search_start = 0
+        return line.decode()
+
+    def clear(self) -> None:
+        """
+        Drop any buffered bytes, used when the socket is reconnected.
+        :return: None
+        """
+        self._buffer.clear()
+        self._search_start = 0
+        return
+
+
+def __get_socket_reader__(sock: socket.socket) -> SocketReader:
+    """
+    Get the reader for a socket, creating it if required.
+    :param sock: socket.socket: The socket to get the reader for.
+    :return: SocketReader: The reader.
+    """
+    global _SOCKET_READERS
+    reader: Optional[SocketReader] = _SOCKET_READERS.get(sock)
+    if reader is None:
+        reader = SocketReader(sock)
+        _SOCKET_READERS[sock] = reader
+    return reader
+
+
 ####################################
 # Socket helpers:
 ####################################
 def __find_socket_dict_by_socket__(sock: socket.socket) -> Optional[dict[str, socket.socket | str | tuple[str, int]]]:
     global _OPEN_SOCKETS
-    for socket_dict in _OPEN_SOCKETS:
-        if socket_dict['socket'] == sock:
-            return socket_dict
-    return None
+    return _OPEN_SOCKETS.get(sock)
 
 
 def __socket_create__(server_address: Optional[tuple[str, int] | str] = None) -> socket.socket:
@@ -443,13 +560,13 @@ def __socket_create__(server_address: Optional[tuple[str, int] | str] = None) ->
         logger.critical("Raising TypeError:")
         logger.critical(__type_err_msg__('server_address', 'tuple[str, int] | str', server_address))
         __type_error__('server_address', 'tuple[str, int] | str', server_address)
-    # Create the socket dict and append it to the socket list.
+    # Create the socket dict and add it to the open sockets.
     socket_dict: dict[str, socket.socket | str | tuple[str, int]] = {
         'server': server_address,
         'socket': sock,
         'status': 'created'
     }
-    _OPEN_SOCKETS.append(socket_dict)
+    _OPEN_SOCKETS[sock] = socket_dict
     return sock
 
 
@@ -491,11 +608,14 @@ def __socket_reconnect__(sock: socket.socket) -> None:
     logger: logging.Logger = logging.getLogger(__name__ + '.' + __socket_reconnect__.__name__)
     socket_dict = __find_socket_dict_by_socket__(sock)
     if socket_dict['status'] == 'connected':
+        # Any partially read line belongs to the old connection:
+        __get_socket_reader__(sock).clear()
         try:
             __socket_close__(sock)
         except socket.error as e:
             warning_message = "Error while closing socket, ignoring."
             logger.warning(warning_message)
+        _OPEN_SOCKETS[sock] = socket_dict
         try:
             __socket_connect__(sock, socket_dict['server'])
         except socket.error as e:
@@ -537,36 +657,38 @@ def __socket_send__(sock: socket.socket, message: str) -> int:
     return bytes_sent
 
 
-def __socket_receive_blocking__(sock: socket.socket) -> str:
+def __socket_receive_blocking__(sock: socket.socket, timeout: Optional[float] = None) -> str:
     """
     Read a string from a socket; Blocks until msg read.
     :param sock: socket.socket: The socket to read from.
+    :param timeout: Optional[float]: How long to wait for a whole message in seconds, None waits forever.
     :return: str: The read message.
-    :raises CommunicationsError: On failure to read from the socket.
+    :raises CommunicationsError: On failure to read from the socket, or if the message doesn't arrive in time.
     """
     global _CLOSING_SOCKET
     logger_name: str = __name__ + '.' + __socket_receive_blocking__.__name__
     logger: logging.Logger = logging.getLogger(logger_name)
+    reader: SocketReader = __get_socket_reader__(sock)
+    deadline: Optional[float] = time.monotonic() + timeout if timeout is not None else None
     try:
         while True:
-            readable, _, erred = select.select([sock], [], [sock], 0.5)
+            message: Optional[str] = reader.pop_line()
+            if message is not None:
+                logger.debug("Returning message: %s" % message)
+                return message
+            wait_time: float = 0.5
+            if deadline is not None:
+                wait_time = min(wait_time, deadline - time.monotonic())
+                if wait_time <= 0:
+                    error_message: str = "Timed out after %.1f seconds waiting for a message." % timeout
+                    logger.critical("Raising CommunicationsError(%s)." % error_message)
+                    raise CommunicationsError(error_message, None)
+            readable, _, erred = select.select([sock], [], [sock], wait_time)
             if len(erred) > 0:
                 logger.critical("GOT ERRORS DURING SELECT.")
             if len(readable) > 0:
-                message = b''
-                byte_count: int = 0
-                while True:
-                    data = sock.recv(1)
-                    message += data
-                    byte_count += 1
-                    try:
-                        if data.decode() == '\n':
-                            logger.debug("Received %i bytes." % byte_count)
-                            break
-                    except UnicodeDecodeError:
-                        pass
-                logger.debug("Returning message: %s" % message.decode())
-                return message.decode()
+                byte_count: int = reader.fill()
+                logger.debug("Received %i bytes." % byte_count)
     except socket.error as e:
         error_message = "Failed to read from socket: %s" % (str(e.args))
         if _CLOSING_SOCKET and e.args[0] == 9:
@@ -587,25 +709,24 @@ def __socket_receive_non_blocking__(sock: socket.socket, wait_time: float = 0.1)
     global _CLOSING_SOCKET
     logger_name: str = __name__ + '.' + __socket_receive_non_blocking__.__name__
     logger: logging.Logger = logging.getLogger(logger_name)
+    reader: SocketReader = __get_socket_reader__(sock)
+    # A line may already be buffered from a previous read:
+    message: Optional[str] = reader.pop_line()
+    if message is not None:
+        logger.debug("Returning message: %s" % message)
+        return message
     try:
         readable, _, erred = select.select([sock], [], [sock], wait_time)
         if len(erred) > 0:
             logger.critical("GOT ERRORS WHILE SELECTING SOCKET.")
         if len(readable) > 0:
-            message = b''
-            byte_count: int = 0
-            while True:
-                data = sock.recv(1)
-                message += data
-                byte_count += 1
-                try:
-                    if data.decode() == '\n':
-                        logger.debug("Received %i bytes." % byte_count)
-                        break
-                except UnicodeDecodeError:
-                    pass
-            logger.debug("Returning message: %s" % message.decode())
-            return message.decode()
+            # Keep reading until a whole line has arrived:
+            while not reader.has_line():
+                byte_count: int = reader.fill()
+                logger.debug("Received %i bytes." % byte_count)
+            message = reader.pop_line()
+            logger.debug("Returning message: %s" % message)
+            return message
     except socket.error as e:
         error_message = "Failed to read from socket: %s" % (str(e.args))
         if _CLOSING_SOCKET:
@@ -623,11 +744,17 @@ def __socket_close__(sock: socket.socket) -> None:
     :return: None
     :raises CommunicationsError: On error closing socket.
     """
-    global _CLOSING_SOCKET
+    global _CLOSING_SOCKET, _SOCKET_READERS, _RPC_CLIENTS, _OPEN_SOCKETS
     logger_name: str = __name__ + '.' + __socket_close__.__name__
     logger: logging.Logger = logging.getLogger(logger_name)
     logger.debug("Closing socket.")
     _CLOSING_SOCKET = True
+    with _RPC_CLIENTS_LOCK:
+        client: Optional[JsonRpcClient] = _RPC_CLIENTS.pop(sock, None)
+    if client is not None:
+        client.close()
+    _SOCKET_READERS.pop(sock, None)
+    _OPEN_SOCKETS.pop(sock, None)
     try:
         sock.close()
     except socket.error as e:
@@ -639,6 +766,210 @@ def __socket_close__(sock: socket.socket) -> None:
     return None
 
 
+####################################
+# Socket pool:
+####################################
+class SocketPool(object):
+    """
+    A bounded pool of connected sockets to signal-cli.
+    Sockets are health checked on checkout, and broken ones are closed and replaced.
+    """
+    def __init__(self,
+                 server_address: Optional[tuple[str, int] | str] = None,
+                 max_size: int = SOCKET_POOL_SIZE
+                 ) -> None:
+        """
+        Initialize the pool, sockets are created on demand.
+        :param server_address: Optional[tuple[str, int] | str]: The server address, defaults to SERVER_ADDRESS.
+        :param max_size: int: The maximum number of sockets, both idle and checked out.
+        """
+        object.__init__(self)
+        if server_address is None:
+            server_address = SERVER_ADDRESS
+        if server_address is None:
+            raise ValueError("No server address defined.")
+        self._server_address: tuple[str, int] | str = server_address
+        """The server address the sockets connect to."""
+        self._max_size: int = max_size
+        """The maximum number of sockets."""
+        self._idle: list[socket.socket] = []
+        """Connected sockets waiting to be checked out."""
+        self._num_sockets: int = 0
+        """The number of sockets owned by the pool, idle or checked out."""
+        self._condition: threading.Condition = threading.Condition()
+        """Condition signaled when a socket is returned."""
+        self._closed: bool = False
+        """Has this pool been closed?"""
+        return
+
+    @staticmethod
+    def __is_healthy__(sock: socket.socket) -> bool:
+        """
+        Check that an idle socket is still usable.
+        An idle socket should have nothing to read; If it's readable the remote end either closed it, or left a stale
+        response on it, either way it can't be used.
+        :param sock: socket.socket: The socket to check.
+        :return: bool: True if the socket can be used.
+        """
+        if sock.fileno() == -1:
+            return False
+        try:
+            readable, _, erred = select.select([sock], [], [sock], 0)
+        except (socket.error, ValueError):
+            return False
+        return len(readable) == 0 and len(erred) == 0
+
+    def __discard__(self, sock: socket.socket) -> None:
+        """
+        Close a socket, and forget about it.
+        :param sock: socket.socket: The socket to discard.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + SocketPool.__name__ + '.' +
+                                                   self.__discard__.__name__)
+        try:
+            __socket_close__(sock)
+        except CommunicationsError:
+            logger.warning("Error while closing broken socket, ignoring.")
+        with self._condition:
+            self._num_sockets -= 1
+            self._condition.notify()
+        return
+
+    def checkout(self, timeout: Optional[float] = None) -> socket.socket:
+        """
+        Check out a connected socket, waiting for one if the pool is exhausted.
+        :param timeout: Optional[float]: How long to wait in seconds, None waits forever.
+        :return: socket.socket: The connected socket; Must be returned with checkin().
+        :raises CommunicationsError: If the pool is closed, on timeout, or on failure to connect.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + SocketPool.__name__ + '.' +
+                                                   self.checkout.__name__)
+        while True:
+            sock: Optional[socket.socket] = None
+            with self._condition:
+                if self._closed:
+                    raise CommunicationsError("Socket pool is closed.", None)
+                if len(self._idle) == 0 and self._num_sockets >= self._max_size:
+                    if not self._condition.wait(timeout):
+                        error_message: str = "Timed out waiting for a pooled socket."
+                        logger.critical("Raising CommunicationsError(%s)." % error_message)
+                        raise CommunicationsError(error_message, None)
+                    continue
+                if len(self._idle) > 0:
+                    sock = self._idle.pop()
+                else:
+                    self._num_sockets += 1
+            if sock is None:
+                # Connect outside the lock, so other threads can check in / out meanwhile:
+                try:
+                    sock = __socket_create__(self._server_address)
+                    __socket_connect__(sock, self._server_address)
+                except (CommunicationsError, ValueError, TypeError):
+                    with self._condition:
+                        self._num_sockets -= 1
+                        self._condition.notify()
+                    raise
+                return sock
+            if SocketPool.__is_healthy__(sock):
+                return sock
+            logger.warning("Replacing broken pooled socket.")
+            self.__discard__(sock)
+
+    def checkin(self, sock: socket.socket, broken: bool = False) -> None:
+        """
+        Return a checked out socket to the pool.
+        :param sock: socket.socket: The socket to return.
+        :param broken: bool: True if the socket failed while checked out, it will be closed and replaced.
+        :return: None
+        """
+        if broken:
+            self.__discard__(sock)
+            return
+        with self._condition:
+            if not self._closed:
+                self._idle.append(sock)
+                self._condition.notify()
+                return
+        self.__discard__(sock)
+        return
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[socket.socket]:
+        """
+        Check out a socket for the duration of a with block.
+        The socket is treated as broken if an exception escapes the block, since we can't know if the whole response
+        was read.
+        :param timeout: Optional[float]: How long to wait for a socket in seconds, None waits forever.
+        :return: Iterator[socket.socket]: The connected socket.
+        :raises CommunicationsError: On failure to get a socket.
+        """
+        sock: socket.socket = self.checkout(timeout)
+        try:
+            yield sock
+        except BaseException:
+            self.checkin(sock, broken=True)
+            raise
+        self.checkin(sock)
+
+    def close(self) -> None:
+        """
+        Close the idle sockets; Checked out sockets are closed as they're returned.
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            idle: list[socket.socket] = self._idle
+            self._idle = []
+            self._condition.notify_all()
+        for sock in idle:
+            self.__discard__(sock)
+        return
+
+    @property
+    def server_address(self) -> tuple[str, int] | str:
+        """
+        The server address the pool connects to.
+        :return: tuple[str, int] | str: The server address.
+        """
+        return self._server_address
+
+    @property
+    def num_idle(self) -> int:
+        """
+        The number of idle sockets.
+        :return: int: The number of idle sockets.
+        """
+        return len(self._idle)
+
+
+def __get_socket_pool__() -> SocketPool:
+    """
+    Get the shared socket pool for the current server address, creating it if required.
+    :return: SocketPool: The socket pool.
+    """
+    global _SOCKET_POOL
+    with _SOCKET_POOL_LOCK:
+        if _SOCKET_POOL is None or _SOCKET_POOL.server_address != SERVER_ADDRESS:
+            if _SOCKET_POOL is not None:
+                _SOCKET_POOL.close()
+            _SOCKET_POOL = SocketPool(SERVER_ADDRESS)
+        return _SOCKET_POOL
+
+
+def __close_socket_pool__() -> None:
+    """
+    Close the shared socket pool, if there is one.
+    :return: None
+    """
+    global _SOCKET_POOL
+    with _SOCKET_POOL_LOCK:
+        if _SOCKET_POOL is not None:
+            _SOCKET_POOL.close()
+            _SOCKET_POOL = None
+    return
+
+
 ################################
 # Signal response helpers:
 ################################
@@ -683,6 +1014,257 @@ def __check_response_for_error__(response_obj: dict[str, Any],
     return False, 0, 'no error'
 
 
+################################
+# JSON-RPC client:
+################################
+class JsonRpcClient(object):
+    """
+    Multiplexed JSON-RPC client for a single signal-cli connection.
+    Every request gets a unique id, and a reader thread routes each response to the caller waiting on that id, so
+    any number of threads can have requests in flight on the same socket.
+    """
+    def __init__(self, sock: socket.socket) -> None:
+        """
+        Initialize the client and start the reader thread.
+        :param sock: socket.socket: The connected socket to run requests on.
+        """
+        object.__init__(self)
+        self._socket: socket.socket = sock
+        """The socket requests are run on."""
+        self._ids: Iterator[int] = itertools.count(1)
+        """Request id generator."""
+        self._pending: dict[int, Future] = {}
+        """Futures waiting for a response, keyed by request id."""
+        self._lock: threading.RLock = threading.RLock()
+        """Lock protecting the pending table, and the closed flag."""
+        self._send_lock: threading.Lock = threading.Lock()
+        """Lock serialising socket writes; The reader never takes it, so a failed send may close us while holding it."""
+        self._closed: bool = False
+        """Has this client been closed?"""
+        self._reader_thread: threading.Thread = threading.Thread(target=self.__read_loop__, daemon=True,
+                                                                 name="JsonRpcClient-%i" % sock.fileno())
+        """The thread routing responses to their callers."""
+        self._reader_thread.start()
+        return
+
+    def __read_loop__(self) -> None:
+        """
+        Reader thread; Route responses until the client is closed, or the connection fails, then fail any requests
+        still waiting, however the loop ended.
+        :return: None
+        """
+        try:
+            self.__read_responses__()
+        finally:
+            with self._lock:
+                self._closed = True
+            # Stop here, so the next request starts a fresh client:
+            with _RPC_CLIENTS_LOCK:
+                if _RPC_CLIENTS.get(self._socket) is self:
+                    del _RPC_CLIENTS[self._socket]
+            self.__fail_pending__(CommunicationsError("Connection closed.", None))
+        return
+
+    def __read_responses__(self) -> None:
+        """
+        Read responses from the socket, and resolve the matching futures.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + JsonRpcClient.__name__ + '.' +
+                                                   self.__read_responses__.__name__)
+        reader: SocketReader = __get_socket_reader__(self._socket)
+        while not self._closed:
+            try:
+                message: Optional[str] = reader.pop_line()
+                if message is None:
+                    readable, _, _ = select.select([self._socket], [], [], 0.5)
+                    if len(readable) > 0:
+                        reader.fill()
+                    continue
+            except (socket.error, ValueError, CommunicationsError) as e:
+                if self._closed:
+                    break
+                error_message: str = "Failed to read from socket: %s" % str(e.args)
+                logger.critical(error_message)
+                self.__fail_pending__(CommunicationsError(error_message, e if isinstance(e, socket.error) else None))
+                return
+            try:
+                response_obj: dict[str, Any] = __parse_signal_response__(message)
+            except InvalidServerResponse as e:
+                # We can't tell who this response was for, so fail everyone waiting:
+                self.__fail_pending__(e)
+                continue
+            request_id: Optional[int] = response_obj.get('id') if isinstance(response_obj, dict) else None
+            with self._lock:
+                future: Optional[Future] = self._pending.pop(request_id, None)
+            if future is None:
+                logger.warning("Dropping message not matching a pending request.")
+                logger.debug("response_obj = %s" % str(response_obj))
+                continue
+            future.set_result(response_obj)
+        return
+
+    def __fail_pending__(self, error: Exception) -> None:
+        """
+        Fail every pending request with the given error.
+        :param error: Exception: The exception to set on the futures.
+        :return: None
+        """
+        with self._lock:
+            pending: list[Future] = list(self._pending.values())
+            self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+        return
+
+    def submit(self, command_obj: dict[str, Any]) -> Future:
+        """
+        Send a request without waiting for the response.
+        :param command_obj: dict[str, Any]: The command object, any 'id' is replaced with a unique request id.
+        :return: Future: Resolves to the response object.
+        :raises CommunicationsError: If the client is closed, or on failure to send.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise CommunicationsError("JSON-RPC client is closed.", None)
+            request_id: int = next(self._ids)
+            command_obj['id'] = request_id
+            self._pending[request_id] = future
+        # Send without the pending lock; A broken pipe reconnects the socket, which closes this client:
+        with self._send_lock:
+            try:
+                __socket_send__(self._socket, json.dumps(command_obj) + '\n')
+            except CommunicationsError:
+                with self._lock:
+                    self._pending.pop(request_id, None)
+                raise
+        return future
+
+    def request(self, command_obj: dict[str, Any], timeout: Optional[float] = None) -> dict[str, Any]:
+        """
+        Send a request and wait for its response.
+        :param command_obj: dict[str, Any]: The command object.
+        :param timeout: Optional[float]: How long to wait in seconds, None waits RPC_REQUEST_TIMEOUT seconds.
+        :return: dict[str, Any]: The response object.
+        :raises CommunicationsError: On communication failure, or if the response doesn't arrive in time.
+        :raises InvalidServerResponse: If signal-cli sent back invalid JSON.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + JsonRpcClient.__name__ + '.' +
+                                                   self.request.__name__)
+        if timeout is None:
+            timeout = RPC_REQUEST_TIMEOUT
+        future: Future = self.submit(command_obj)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(command_obj['id'], None)
+            error_message: str = "Timed out after %.1f seconds waiting for the response to '%s'." \
+                                 % (timeout, command_obj.get('method'))
+            logger.critical("Raising CommunicationsError(%s)." % error_message)
+            raise CommunicationsError(error_message, None)
+
+    def close(self) -> None:
+        """
+        Stop the reader thread, failing any requests still waiting.
+        :return: None
+        """
+        with self._lock:
+            self._closed = True
+        # Join without holding the lock, the reader takes it to route responses:
+        if threading.current_thread() is not self._reader_thread:
+            self._reader_thread.join(1.0)
+        self.__fail_pending__(CommunicationsError("JSON-RPC client is closed.", None))
+        return
+
+    @property
+    def is_closed(self) -> bool:
+        """
+        Has this client been closed?
+        :return: bool: True if closed.
+        """
+        return self._closed
+
+    @property
+    def num_pending(self) -> int:
+        """
+        The number of requests waiting for a response.
+        :return: int: The number of pending requests.
+        """
+        return len(self._pending)
+
+
+def __get_rpc_client__(sock: socket.socket) -> JsonRpcClient:
+    """
+    Get the JSON-RPC client for a socket, creating it if required.
+    :param sock: socket.socket: The connected socket.
+    :return: JsonRpcClient: The client.
+    """
+    global _RPC_CLIENTS
+    with _RPC_CLIENTS_LOCK:
+        client: Optional[JsonRpcClient] = _RPC_CLIENTS.get(sock)
+        if client is None or client.is_closed:
+            client = JsonRpcClient(sock)
+            _RPC_CLIENTS[sock] = client
+    return client
+
+
+def __socket_request__(sock: socket.socket, command_obj: dict[str, Any]) -> dict[str, Any]:
+    """
+    Run a JSON-RPC request on a socket, and wait for its response.
+    :param sock: socket.socket: The socket to run the request on.
+    :param command_obj: dict[str, Any]: The command object; The 'id' is assigned automatically.
+    :return: dict[str, Any]: The response object.
+    :raises CommunicationsError: On communication failure.
+    :raises InvalidServerResponse: If signal-cli sent back invalid JSON.
+    """
+    return __get_rpc_client__(sock).request(command_obj)
+
+
+def __socket_submit__(sock: socket.socket, command_obj: dict[str, Any]) -> Future:
+    """
+    Send a JSON-RPC request on a socket without waiting, so several requests can be in flight at once.
+    :param sock: socket.socket: The socket to run the request on.
+    :param command_obj: dict[str, Any]: The command object; The 'id' is assigned automatically.
+    :return: Future: Resolves to the response object.
+    :raises CommunicationsError: On failure to send.
+    """
+    return __get_rpc_client__(sock).submit(command_obj)
+
+
+def __pooled_request__(command_obj: dict[str, Any], timeout: Optional[float] = None) -> dict[str, Any]:
+    """
+    Run a JSON-RPC request on a socket checked out of the shared pool, so it runs alongside requests on other
+    connections, rather than waiting its turn on one; On a timeout, or a response to some other request, the socket
+    is discarded rather than returned to the pool, as we can't know what's left on it.
+    :param command_obj: dict[str, Any]: The command object; The 'id' is assigned automatically.
+    :param timeout: Optional[float]: How long to wait for a socket and the response in seconds, None waits
+        RPC_REQUEST_TIMEOUT seconds.
+    :return: dict[str, Any]: The response object.
+    :raises CommunicationsError: On communication failure, failure to get a socket, on timeout, or if the response
+        isn't for this request.
+    :raises InvalidServerResponse: If signal-cli sent back invalid JSON.
+    """
+    logger: logging.Logger = logging.getLogger(__name__ + '.' + __pooled_request__.__name__)
+    if timeout is None:
+        timeout = RPC_REQUEST_TIMEOUT
+    deadline: float = time.monotonic() + timeout
+    request_id: int = next(_POOLED_REQUEST_IDS)
+    command_obj['id'] = request_id
+    with __get_socket_pool__().connection(timeout) as sock:
+        __socket_send__(sock, json.dumps(command_obj) + '\n')
+        response_str: str = __socket_receive_blocking__(sock, max(0.0, deadline - time.monotonic()))
+        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        if not isinstance(response_obj, dict) or response_obj.get('id') != request_id:
+            error_message: str = "Response to '%s' doesn't match its request id %i." \
+                                 % (command_obj.get('method'), request_id)
+            logger.critical("Raising CommunicationsError(%s)." % error_message)
+            raise CommunicationsError(error_message, None)
+    return response_obj
+
+
 ################################
 # Type checking helpers:
 ###############################
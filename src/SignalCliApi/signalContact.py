@@ -5,12 +5,11 @@ Store and manage a single contact.
 """
 import logging
 from datetime import timedelta
-from typing import TypeVar, Optional, Any
+from typing import TypeVar, Optional, Any, Callable
 import socket
-import json
 
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, __parse_signal_response__, \
-    __check_response_for_error__, UNKNOWN_CONTACT_NAME, SELF_CONTACT_NAME, TypingStates, RecipientTypes
+from .signalCommon import __type_error__, __socket_request__, __check_response_for_error__, \
+    UNKNOWN_CONTACT_NAME, SELF_CONTACT_NAME, TypingStates, RecipientTypes
 from .signalProfile import SignalProfile
 from .signalRecipient import SignalRecipient
 from .signalTimestamp import SignalTimestamp
@@ -111,10 +110,12 @@ class SignalContact(SignalRecipient):
         """The full path to the account data directory."""
         self._account_id: str = account_id
         """This account's ID."""
+        self._name_callback: Optional[Callable[[Any, Optional[str]], None]] = None
+        """Called with this contact and its old name when its name changes, to keep the name index current."""
+        self._name: Optional[str] = name
+        """The name of the contact."""
 
         # Set external properties:
-        self.name: Optional[str] = name
-        """The name of the contact."""
         self.number: Optional[str] = number
         """The phone number of the contact."""
         self.uuid: Optional[str] = uuid
@@ -361,7 +362,6 @@ class SignalContact(SignalRecipient):
         # create command object and json command string:
         set_name_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "updateContact",
             "params": {
                 "account": self._account_id,
@@ -369,11 +369,8 @@ class SignalContact(SignalRecipient):
                 "name": name,
             }
         }
-        json_command_str = json.dumps(set_name_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_name_command_obj)
         error_occurred, error_code, error_message = __check_response_for_error__(response_obj, [-1])
 
         if error_occurred:
@@ -387,6 +384,16 @@ class SignalContact(SignalRecipient):
     #########################
     # Helpers:
     #########################
+    def __set_name_callback__(self, callback: Optional[Callable[[Any, Optional[str]], None]]) -> None:
+        """
+        Set the callback run when this contact's name changes.
+        :param callback: Optional[Callable[[SignalContact, Optional[str]], None]]: The callback, called with this
+            contact and its old name, or None to clear it.
+        :return: None
+        """
+        self._name_callback = callback
+        return
+
     def __update__(self, other: Self) -> None:
         """
         Update a contact given another contact assumed to be more recent.
@@ -441,3 +448,28 @@ class SignalContact(SignalRecipient):
         else:
             self.last_seen = time_seen
         return
+
+    ############################
+    # Properties:
+    ############################
+    @property
+    def name(self) -> Optional[str]:
+        """
+        The name of the contact.
+        :return: Optional[str]: The name.
+        """
+        return self._name
+
+    @name.setter
+    def name(self, value: Optional[str]) -> None:
+        """
+        Set the name of the contact, locally; Use set_name() to change it in signal.
+        Setter.
+        :param value: Optional[str]: The value to set to.
+        :return: None
+        """
+        old_name: Optional[str] = self._name
+        self._name = value
+        if old_name != value and self._name_callback is not None:
+            self._name_callback(self, old_name)
+        return
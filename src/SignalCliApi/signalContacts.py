@@ -4,13 +4,14 @@ File: signalContacts.py
 Manage the signal contacts.
 """
 from typing import Optional, Iterator, TextIO, Any, Match
+from contextlib import contextmanager
 import os
 import json
 import socket
 import logging
 
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, phone_number_regex, uuid_regex, \
-    NUMBER_FORMAT_STR, UUID_FORMAT_STR, SELF_CONTACT_NAME, __parse_signal_response__, __check_response_for_error__, \
+from .signalCommon import __type_error__, __socket_request__, phone_number_regex, uuid_regex, \
+    NUMBER_FORMAT_STR, UUID_FORMAT_STR, SELF_CONTACT_NAME, __check_response_for_error__, \
     UNKNOWN_CONTACT_NAME, SyncTypes
 from .signalContact import SignalContact
 from .signalExceptions import ParameterError, InvalidDataFile
@@ -27,6 +28,7 @@ class SignalContacts(object):
                  account_path: str,
                  do_load: bool = False,
                  do_sync: bool = False,
+                 raw_contacts: Optional[list[dict[str, Any]]] = None,
                  ) -> None:
         """
         Initialize the contacts.
@@ -37,6 +39,8 @@ class SignalContacts(object):
         :param account_path: str: The path to the account data directory.
         :param do_load: bool: Load contacts from disk.
         :param do_sync: bool: Load contact from signal, and merge with existing contacts.
+        :param raw_contacts: Optional[list[dict[str, Any]]]: The result of listContacts, already fetched, to merge in
+            place of syncing.
         """
         # Super:
         object.__init__(self)
@@ -68,6 +72,9 @@ class SignalContacts(object):
         if not isinstance(do_sync, bool):
             logger.critical("Raising TypeError:")
             __type_error__("do_sync", "bool", do_sync)
+        if raw_contacts is not None and not isinstance(raw_contacts, list):
+            logger.critical("Raising TypeError:")
+            __type_error__("raw_contacts", "Optional[list[dict[str, Any]]]", raw_contacts)
 
         # Value checks:
         if not os.path.exists(config_path):
@@ -96,6 +103,18 @@ class SignalContacts(object):
         """The full path to this accounts contacts JSON file."""
         self._contacts: list[SignalContact] = []
         """The main list of contacts."""
+        self._by_number: dict[str, SignalContact] = {}
+        """Index of the contacts by number."""
+        self._by_uuid: dict[str, SignalContact] = {}
+        """Index of the contacts by uuid."""
+        self._by_name: dict[str, SignalContact] = {}
+        """Index of the contacts by name."""
+        self._self_contact: Optional[SignalContact] = None
+        """The cached self-contact."""
+        self._bulk_depth: int = 0
+        """How many bulk_load() blocks we're in; Saves are put off while above 0."""
+        self._dirty: bool = False
+        """Was a save put off by bulk_load()?"""
 
         # Load from file:
         if do_load:
@@ -107,8 +126,13 @@ class SignalContacts(object):
                 logger.warning(warning_message)
                 self.__save__()
 
-        # Sync with signal:
-        if do_sync:
+        # Merge contacts already fetched from signal, or sync with signal:
+        if raw_contacts is not None:
+            logger.debug("Merging listed contacts.")
+            self.__merge__(raw_contacts)
+            logger.debug("Saving merged contact data.")
+            self.__save__()
+        elif do_sync:
             logger.debug("Syncing contacts with signal.")
             self.__sync__()
             logger.debug("Saving merged contact data.")
@@ -215,6 +239,7 @@ class SignalContacts(object):
                                     account_path=self._account_path, from_dict=contact_dict)
             self._contacts.append(contact)
             count += 1
+        self.__reindex__()
         logger.debug("Loaded %i contacts from the dict." % count)
         return
 
@@ -228,6 +253,9 @@ class SignalContacts(object):
         :raises RuntimeError: On an error while opening file.
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__save__.__name__)
+        if self._bulk_depth > 0:
+            self._dirty = True
+            return
         logger.info("Saving contacts to disk: '%s'." % self._json_file_path)
         # Create the 'contacts' object, and json string:
         contacts_obj: dict[str, Any] = self.__to_dict__()
@@ -245,9 +273,26 @@ class SignalContacts(object):
                                  % (self._json_file_path, str(e.args))
             logger.critical("Raising RuntimeError(%s)." % error_message)
             raise RuntimeError(error_message)
+        self._dirty = False
         logger.info("Contacts successfully saved to disk.")
         return
 
+    @contextmanager
+    def bulk_load(self) -> Iterator[None]:
+        """
+        Context manager putting off saves until the block exits, then saving once if anything changed.
+        Used while loading many messages, each of which would otherwise rewrite contacts.json.
+        :return: Iterator[None]
+        :raises RuntimeError: On an error saving the contacts at exit.
+        """
+        self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0 and self._dirty:
+                self.__save__()
+
     def __load__(self) -> None:
         """
         Load the contact from the JSON contacts file.
@@ -288,47 +333,126 @@ class SignalContacts(object):
         # Create list contacts command object, and json command string:
         list_contacts_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "listContacts",
             "params": {
                 "account": self._account_id
             }
         }
-        json_command_str = json.dumps(list_contacts_command_obj) + '\n'
         # Communicate with signal-cli:
-        __socket_send__(self._sync_socket, json_command_str)  # Raises CommunicationError
-        response_str = __socket_receive_blocking__(self._sync_socket)  # Raises CommunicationError
-        response_obj = __parse_signal_response__(response_str)
+        response_obj = __socket_request__(self._sync_socket, list_contacts_command_obj)  # Raises CommunicationsError.
         __check_response_for_error__(response_obj)  # Raises Signal Error on all signal errors.
-
-        # Load contacts:
-        new_contacts: list[SignalContact] = []
-        total_count: int = 0
-        new_count: int = 0
-        for raw_contact in response_obj['result']:
+        added, _, _ = self.__merge__(response_obj['result'])
+        return added
+
+    def __merge__(self, raw_contacts: list[dict[str, Any]]
+                  ) -> tuple[list[SignalContact], list[SignalContact], list[SignalContact]]:
+        """
+        Merge the result of listContacts into the contacts, matching them by uuid, then by number.
+        :param raw_contacts: list[dict[str, Any]]: The contacts as returned by signal.
+        :return: tuple[list[SignalContact], list[SignalContact], list[SignalContact]]: The contacts added, the contacts
+            changed, and the contacts signal no longer lists; The last are kept, as messages may refer to them.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__merge__.__name__)
+        added: list[SignalContact] = []
+        changed: list[SignalContact] = []
+        matched: set[int] = set()
+        for raw_contact in raw_contacts:
             # Create new contact:
             new_contact = SignalContact(command_socket=self._command_socket, sync_socket=self._sync_socket,
                                         config_path=self._config_path, account_id=self._account_id,
                                         account_path=self._account_path, raw_contact=raw_contact)
-            # Increment total count:
-            total_count += 1
             # Check for existing contact:
-            contact_found = False
-            for contact in self._contacts:
-                if new_contact == contact:
-                    contact.__update__(new_contact)
-                    contact_found = True
-            # If contact not found add the new contact.
-            if not contact_found:
-                new_count += 1
+            contact: Optional[SignalContact] = None
+            if new_contact.uuid is not None:
+                contact = self._by_uuid.get(new_contact.uuid)
+            if contact is None and new_contact.number is not None:
+                contact = self._by_number.get(new_contact.number)
+            # If contact not found add the new contact, otherwise update it:
+            if contact is None:
                 self._contacts.append(new_contact)
-                new_contacts.append(new_contact)
-        logger.info("%i contact synced %i new contacts found." % (total_count, new_count))
-        return new_contacts
+                self.__index__(new_contact)
+                matched.add(id(new_contact))
+                added.append(new_contact)
+            elif id(contact) not in matched:
+                matched.add(id(contact))
+                old_dict: dict[str, Any] = contact.__to_dict__()
+                contact.__update__(new_contact)
+                if contact.__to_dict__() != old_dict:
+                    changed.append(contact)
+        removed: list[SignalContact] = [contact for contact in self._contacts
+                                        if id(contact) not in matched and not contact.is_self]
+        logger.info("%i contacts synced: %i added, %i changed, %i no longer listed."
+                    % (len(raw_contacts), len(added), len(changed), len(removed)))
+        return added, changed, removed
 
     ##################################
     # Helpers:
     ##################################
+    def __index__(self, contact: SignalContact) -> None:
+        """
+        Add a contact to the indexes, an earlier contact with the same key is kept, as a search would find it first.
+        :param contact: SignalContact: The contact to index.
+        :return: None
+        """
+        if contact.number is not None:
+            self._by_number.setdefault(contact.number, contact)
+        if contact.uuid is not None:
+            self._by_uuid.setdefault(contact.uuid, contact)
+        if contact.name is not None:
+            self._by_name.setdefault(contact.name, contact)
+        contact.__set_name_callback__(self.__name_changed__)
+        return
+
+    def __name_changed__(self, contact: SignalContact, old_name: Optional[str]) -> None:
+        """
+        Move a contact in the name index when its name changes; Called by the contact.
+        :param contact: SignalContact: The renamed contact.
+        :param old_name: Optional[str]: The name it had.
+        :return: None
+        """
+        if old_name is not None and self._by_name.get(old_name) is contact:
+            del self._by_name[old_name]
+            # Another contact may share the old name:
+            for other_contact in self._contacts:
+                if other_contact.name == old_name:
+                    self._by_name[old_name] = other_contact
+                    break
+        if contact.name is not None:
+            self._by_name.setdefault(contact.name, contact)
+        return
+
+    def __reindex__(self) -> None:
+        """
+        Rebuild the indexes from the contact list.
+        :return: None
+        """
+        self._by_number = {}
+        self._by_uuid = {}
+        self._by_name = {}
+        self._self_contact = None
+        for contact in self._contacts:
+            self.__index__(contact)
+        return
+
+    def __lookup__(self, index: dict[str, SignalContact], attribute: str, value: str) -> Optional[SignalContact]:
+        """
+        Look up a contact in an index, rebuilding the indexes if the entry found has changed since it was indexed;
+        Names are kept current by __name_changed__(), so a miss is a miss.
+        :param index: dict[str, SignalContact]: The index to look in.
+        :param attribute: str: The contact attribute the index is keyed by.
+        :param value: str: The value to look up.
+        :return: Optional[SignalContact]: The contact, or None if not found.
+        """
+        contact: Optional[SignalContact] = index.get(value)
+        if contact is not None and getattr(contact, attribute) == value:
+            return contact
+        # Numbers and uuids are changed directly on the contact; So a stale entry means reindexing:
+        if contact is not None:
+            self.__reindex__()
+            index = {'number': self._by_number, 'uuid': self._by_uuid, 'name': self._by_name}[attribute]
+            return index.get(value)
+        return None
+
     def __parse_sync_message__(self, sync_message) -> None:  # sync_message type = SignalSyncMessage
         """
         Parse a sync message.
@@ -422,17 +546,10 @@ class SignalContacts(object):
 
         # Search for contact:
         found_contact: Optional[SignalContact] = None
-        for contact in self._contacts:
-            # Check for contact:
-            if number is not None and contact.number == number:
-                found_contact = contact
-                break
-            elif uuid is not None and contact.uuid == uuid:
-                found_contact = contact
-                break
-            elif number is not None and uuid is not None and (contact.number == number or contact.uuid == uuid):
-                found_contact = contact
-                break
+        if number is not None:
+            found_contact = self.__lookup__(self._by_number, 'number', number)
+        if found_contact is None and uuid is not None:
+            found_contact = self.__lookup__(self._by_uuid, 'uuid', uuid)
 
         # If contact found:
         if found_contact is not None:
@@ -451,6 +568,7 @@ class SignalContacts(object):
                     should_save = True
             if should_save:
                 logger.debug("contact data updated, saving.")
+                self.__index__(found_contact)
                 self.__save__()
             return False, found_contact
         # Add contact:
@@ -490,10 +608,7 @@ class SignalContacts(object):
             logger.critical("Raising ValueError(%s)." % error_message)
             raise ValueError(error_message)
         # Search for contact:
-        for contact in self._contacts:
-            if contact.number == number:
-                return contact
-        return None
+        return self.__lookup__(self._by_number, 'number', number)
 
     def get_by_uuid(self, uuid: str) -> Optional[SignalContact]:
         """
@@ -516,10 +631,7 @@ class SignalContacts(object):
             logger.critical("Raising ValueError(%s)." % error_message)
             raise ValueError(error_message)
         # Search for contact:
-        for contact in self._contacts:
-            if contact.uuid == uuid:
-                return contact
-        return None
+        return self.__lookup__(self._by_uuid, 'uuid', uuid)
 
     def get_by_id(self, contact_id: str) -> Optional[SignalContact]:
         """
@@ -554,8 +666,11 @@ class SignalContacts(object):
         :return SignalContact: The 'self' contact, or None if not found.
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.get_self.__name__)
+        if self._self_contact is not None and self._self_contact.is_self:
+            return self._self_contact
         for contact in self._contacts:
             if contact.is_self:
+                self._self_contact = contact
                 return contact
         logger.warning("'Self-Contact' not found ????'")
         return None
@@ -580,10 +695,7 @@ class SignalContacts(object):
             logger.critical("Raising ValueError(%s)." % error_message)
             raise ValueError(error_message)
         # Search for contact:
-        for contact in self._contacts:
-            if contact.name == name:
-                return contact
-        return None
+        return self.__lookup__(self._by_name, 'name', name)
 
     #########################
     # Methods:
@@ -632,7 +744,6 @@ class SignalContacts(object):
         # Create add contact command object and json command string:
         add_contact_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "updateContact",
             "params": {
                 "account": self._account_id,
@@ -642,12 +753,9 @@ class SignalContacts(object):
         }
         if expiration is not None:
             add_contact_command_obj['params']['expiration'] = expiration
-        json_command_str = json.dumps(add_contact_command_obj) + '\n'
 
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, add_contact_command_obj)
         error_occurred, error_code, error_message = __check_response_for_error__(response_obj, [-1, ])
 
         # Parse Error:
@@ -672,6 +780,7 @@ class SignalContacts(object):
 
         # Store the contact:
         self._contacts.append(new_contact)
+        self.__index__(new_contact)
         self.__save__()
 
         # Return appropriately:
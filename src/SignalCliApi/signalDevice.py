@@ -16,6 +16,9 @@ class SignalDevice(object):
     """
     Class to store a device.
     """
+    __slots__ = ('_sync_socket', '_account_id', 'id', 'name', 'created', 'last_seen', 'is_this_device',
+                 'is_primary_device')
+
     def __init__(self,
                  sync_socket: socket.socket,
                  account_id: str,
@@ -4,12 +4,11 @@ File: signalDevices.py
 Handle a list of Devices.
 """
 from typing import Optional, Any, Iterator
-import json
 import socket
 import logging
 
-from .signalCommon import __socket_receive_blocking__, __socket_send__, __type_error__, __parse_signal_response__, \
-    __check_response_for_error__, UNKNOWN_DEVICE_NAME
+from .signalCommon import __socket_request__, __type_error__, __check_response_for_error__, \
+    UNKNOWN_DEVICE_NAME
 from .signalDevice import SignalDevice
 from .signalTimestamp import SignalTimestamp
 from .signalExceptions import SignalError
@@ -23,6 +22,7 @@ class SignalDevices(object):
                  this_device: Optional[int] = None,
                  from_dict: Optional[dict[str, Any]] = None,
                  do_sync: bool = False,
+                 raw_devices: Optional[list[dict[str, Any]]] = None,
                  ) -> None:
         """
         Initialize devices:
@@ -31,6 +31,8 @@ class SignalDevices(object):
         :param this_device: Optional[int]: The device we're currently using.
         :param from_dict: Optional[dict[str, Any]]: Load this device from the given dict created by __to_dict__()
         :param do_sync: bool: Sync the device info with signal, defaults to False
+        :param raw_devices: Optional[list[dict[str, Any]]]: The result of listDevices, already fetched, to load in
+            place of syncing.
         """
         # Setup logging:
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
@@ -51,6 +53,9 @@ class SignalDevices(object):
         if not isinstance(do_sync, bool):
             logger.critical("Raising TypeError:")
             __type_error__("do_sync", "bool", do_sync)
+        if raw_devices is not None and not isinstance(raw_devices, list):
+            logger.critical("Raising TypeError:")
+            __type_error__("raw_devices", "Optional[list[dict[str, Any]]]", raw_devices)
 
         # Set internal vars:
         self._sync_socket: socket.socket = sync_socket
@@ -67,6 +72,11 @@ class SignalDevices(object):
             logger.debug("Loading from dict.")
             self.__from_dict__(from_dict)
 
+        # Load devices already fetched from signal:
+        elif raw_devices is not None:
+            logger.debug("Loading listed devices.")
+            self.__merge__(raw_devices)
+
         # Load devices from signal:
         elif do_sync:
             logger.debug("Syncing with signal.")
@@ -129,10 +139,11 @@ class SignalDevices(object):
     ##############################
     # Sync with signal:
     ##############################
-    def __sync__(self) -> None:
+    def __sync__(self) -> tuple[list[SignalDevice], list[SignalDevice], list[SignalDevice]]:
         """
         Sync devices with signal.
-        :return: None
+        :return: tuple[list[SignalDevice], list[SignalDevice], list[SignalDevice]]: The devices added, changed, and no
+            longer listed.
         :raises CommunicationError: On error communicating with signal.
         :raises InvalidServerResponse: On JSON decode error of server response.
         :raises SignalError: On signal returning an error.
@@ -143,35 +154,51 @@ class SignalDevices(object):
         # Create list devices command Obj:
         list_devices_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "listDevices",
             'params': {'account': self._account_id}
         }
 
-        # Create json command string
-        json_command = json.dumps(list_devices_command_obj) + '\n'
-
         # Communicate with the socket:
-        __socket_send__(self._sync_socket, json_command)  # Raises CommunicationsError.
-        response_string = __socket_receive_blocking__(self._sync_socket)  # Raises CommunicationsError.
-        response_obj: dict[str, Any] = __parse_signal_response__(response_string)  # Raises InvalidServerResponse
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, list_devices_command_obj)
         __check_response_for_error__(response_obj)  # Raises Signal Error on any error
 
-        # Parse devices response:
-        for raw_device in response_obj['result']:
+        return self.__merge__(response_obj['result'])
+
+    def __merge__(self, raw_devices: list[dict[str, Any]]
+                  ) -> tuple[list[SignalDevice], list[SignalDevice], list[SignalDevice]]:
+        """
+        Merge the result of listDevices into the devices, matching them by device id.
+        :param raw_devices: list[dict[str, Any]]: The devices as returned by signal.
+        :return: tuple[list[SignalDevice], list[SignalDevice], list[SignalDevice]]: The devices added, the devices
+            changed, and the devices signal no longer lists; The last are kept, as messages may refer to them.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__merge__.__name__)
+        devices_by_id: dict[int, SignalDevice] = {}
+        for device in self._devices:
+            devices_by_id.setdefault(device.id, device)
+        added: list[SignalDevice] = []
+        changed: list[SignalDevice] = []
+        matched: set[int] = set()
+        for raw_device in raw_devices:
             new_device = SignalDevice(sync_socket=self._sync_socket, account_id=self._account_id,
                                       this_device=self._this_device,
                                       raw_device=raw_device)
-            # Check for an existing device:
-            device_found = False
-            for device in self._devices:
-                if device == new_device:
-                    device.__merge__(new_device)
-                    device_found = True
-            # Add the device if not found:
-            if not device_found:
+            # Check for an existing device, adding the device if not found:
+            device: Optional[SignalDevice] = devices_by_id.get(new_device.id)
+            if device is None:
                 self._devices.append(new_device)
-        return
+                devices_by_id[new_device.id] = new_device
+                added.append(new_device)
+            else:
+                old_dict: dict[str, Any] = device.__to_dict__()
+                device.__merge__(new_device)
+                if device.__to_dict__() != old_dict:
+                    changed.append(device)
+            matched.add(new_device.id)
+        removed: list[SignalDevice] = [device for device in self._devices if device.id not in matched]
+        logger.debug("%i devices synced: %i added, %i changed, %i no longer listed."
+                     % (len(raw_devices), len(added), len(changed), len(removed)))
+        return added, changed, removed
 
     #################################
     # Helpers:
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+File: signalEnvelopeParser.py
+Turn the envelopes signal-cli sends into message objects, and apply them to an account.
+"""
+import logging
+from typing import Optional, Any
+
+from .signalAccount import SignalAccount
+from .signalCallMessage import SignalCallMessage
+from .signalCommon import __type_error__, SyncTypes, TypingStates, RecipientTypes
+from .signalGroupUpdate import SignalGroupUpdate
+from .signalMessage import SignalMessage
+from .signalReaction import SignalReaction
+from .signalReceipt import SignalReceipt
+from .signalReceivedMessage import SignalReceivedMessage
+from .signalStoryMessage import SignalStoryMessage
+from .signalSyncMessage import SignalSyncMessage
+from .signalTypingMessage import SignalTypingMessage
+
+
+class SignalEnvelopeParser(object):
+    """
+    Parses incoming envelopes for an account.
+    Shared by the receive thread and the asyncio front-end, so both build the same message objects.
+    """
+
+    def __init__(self, account: SignalAccount) -> None:
+        """
+        Initialize the parser.
+        :param account: SignalAccount: The account to parse envelopes for; Messages are built with its context.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(account, SignalAccount):
+            logger.critical("Raising TypeError:")
+            __type_error__("account", "SignalAccount", account)
+
+        # Set internal variables:
+        self._account: SignalAccount = account
+        """The account we're parsing for."""
+        return
+
+    ###########################
+    # Parsers:
+    ###########################
+    def __parse_data_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse a dataMessage incoming message.
+        :param envelope_dict: dict[str, Any]: The dict provided by signal.
+        :return: Optional[SignalMessage]: The parsed message.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__parse_data_message__.__name__)
+
+        # Fetch data message:
+        data_message: dict[str, Any] = envelope_dict['dataMessage']
+
+        #######################
+        # REACTIONS:
+        #######################
+        if 'reaction' in data_message.keys():
+            # Create reaction Message:
+            reaction = SignalReaction(
+                context=self._account.context, raw_message=envelope_dict
+            )
+            # Parse the reaction:
+            logger.debug("Got reaction message, parsing.")
+            self._account.messages.__parse_reaction__(reaction)
+            reaction.sender.__seen__(reaction.timestamp)
+            return reaction
+        ######################
+        # GROUP UPDATES:
+        ######################
+        else:
+            # TODO: See if there is a better way to do this, this feels and reads pretty hacky.
+            is_group_update: bool
+            try:
+                if data_message['groupInfo']['type'] == 'UPDATE':
+                    is_group_update = True
+                else:
+                    is_group_update = False
+            except KeyError:
+                is_group_update = False
+            if is_group_update:
+                message = SignalGroupUpdate(
+                    context=self._account.context, raw_message=envelope_dict
+                )
+                logger.debug("Got a group update message, syncing groups.")
+                message.recipient.__sync__()
+                self._account.messages.append(message)
+                message.sender.__seen__(message.timestamp)
+                return message
+            ##################################
+            # Received Message:
+            ##################################
+            else:
+                # Create a Received message:
+                message = SignalReceivedMessage(
+                    context=self._account.context,
+                    raw_message=envelope_dict,
+                )
+                logger.debug("Got a received message, storing.")
+                # Store the received message:
+                self._account.messages.append(message)
+                # Sender is no longer typing:
+                if message.sender.is_typing:
+                    # Create a typing stopped message:
+                    stop_typing_message = SignalTypingMessage(context=self._account.context, sender=message.sender,
+                                                              recipient=message.recipient, device=message.device,
+                                                              timestamp=message.timestamp, action=TypingStates.STOPPED,
+                                                              time_changed=message.timestamp)
+                    # Send the typing message to the sending for parsing:
+                    message.sender.__parse_typing_message__(stop_typing_message)
+                    # Store the typing message.
+                    self._account.messages.append(stop_typing_message)
+                # Mark the sender as seen:
+                message.sender.__seen__(message.timestamp)
+                message.device.__seen__(message.timestamp)
+                message.recipient.__seen__(message.timestamp)
+                return message
+
+    def __parse_receipt_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse a receipt message.
+        :param envelope_dict: dict[str, Any]: The incoming message.
+        :return: Optional[SignalMessage]: The parsed message.
+        """
+        message = SignalReceipt(
+            context=self._account.context, raw_message=envelope_dict
+        )
+        # Parse receipt:
+        self._account.messages.__parse_receipt__(message)
+        return message
+
+    def __parse_sync_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse a sync message.
+        :param envelope_dict: dict[str, Any]: The incoming message.
+        :return: Optional[SignalMessage]: The parsed message, None if the sync message was empty.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__parse_sync_message__.__name__)
+
+        # Check to see if this is an empty sync message:
+        if envelope_dict['syncMessage'] == {}:
+            logger.warning("Got empty sync message, skipping.")
+            return None
+        # Create the SignalSyncMessage object:
+        message = SignalSyncMessage(
+            context=self._account.context,
+            raw_message=envelope_dict
+        )
+        if message.sync_type == SyncTypes.READ_MESSAGES or message.sync_type == SyncTypes.SENT_MESSAGES or \
+                message.sync_type == SyncTypes.SENT_REACTION:
+            self._account.messages.__parse_sync_message__(message)
+        elif message.sync_type == SyncTypes.CONTACTS:
+            self._account.contacts.__sync__()
+        elif message.sync_type == SyncTypes.GROUPS:
+            self._account.groups.__sync__()
+        elif message.sync_type == SyncTypes.BLOCKS:
+            self._account.contacts.__parse_sync_message__(message)
+            self._account.groups.__parse_sync_message__(message)
+        elif message.sync_type == SyncTypes.SENT_MESSAGES:
+            self._account.messages.__parse_sync_message__(message)
+        else:
+            error_message: str = "Unhandled sync type: %s" % str(message.sync_type)
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        # Append the message to messages:
+        self._account.messages.append(message)
+        return message
+
+    def __parse_typing_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse an incoming typing message.
+        :param envelope_dict: dict[str, Any]: The incoming message.
+        :return: Optional[SignalMessage]: The parsed message.
+        """
+        message = SignalTypingMessage(
+            context=self._account.context, raw_message=envelope_dict
+        )
+        # Parse typing message:
+        if message.recipient.recipient_type == RecipientTypes.GROUP:
+            message.recipient.__parse_typing_message__(message)
+        else:
+            message.sender.__parse_typing_message__(message)
+        # Append the typing message:
+        self._account.messages.append(message)
+
+        return message
+
+    def __parse_story_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse an incoming story message.
+        :param envelope_dict: dict[str, Any]: The incoming message.
+        :return: Optional[SignalMessage]: The parsed message.
+        """
+        message = SignalStoryMessage(
+            context=self._account.context, raw_message=envelope_dict
+        )
+        self._account.messages.append(message)
+        return message
+
+    def __parse_call_message__(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse an incoming call message.
+        :param envelope_dict: dict[str, Any]: The incoming message.
+        :return: Optional[SignalMessage]: The parsed message.
+        """
+        message = SignalCallMessage(context=self._account.context, raw_message=envelope_dict)
+        return message
+
+    ###########################
+    # Helpers:
+    ###########################
+    @staticmethod
+    def __get_envelope__(message_obj: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """
+        Get the envelope out of a 'receive' notification.
+        :param message_obj: dict[str, Any]: The parsed notification from signal.
+        :return: Optional[dict[str, Any]]: The envelope, or None if this isn't a well-formed 'receive' notification.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + SignalEnvelopeParser.__get_envelope__.__name__)
+
+        # Make sure there is a method in the response:
+        if 'method' not in message_obj.keys():
+            logger.warning("Message received with no method.")
+            logger.debug("message_obj = %s" % str(message_obj))
+            return None
+
+        # Make sure that method is 'receive':
+        if message_obj['method'] != 'receive':
+            logger.warning("Message received with method other than 'receive': method = %s" % message_obj['method'])
+            logger.debug('message_obj = %s' % str(message_obj))
+            return None
+
+        # Make sure there are 'params' in the response:
+        if 'params' not in message_obj.keys():
+            logger.warning("Message has no 'params'.")
+            logger.debug("message_obj = %s" % str(message_obj))
+            return None
+
+        # Make sure there are 'result' in the 'params':
+        if 'result' not in message_obj['params'].keys():
+            logger.warning("Message doesn't have a result.")
+            logger.debug("message_obj = %s" % str(message_obj))
+            return None
+
+        # Make sure there is an 'envelope' in the message 'result':
+        if 'envelope' not in message_obj['params']['result'].keys():
+            logger.warning("Message with no envelope received.")
+            logger.debug("message_obj = %s" % str(message_obj))
+            return None
+
+        return message_obj['params']['result']['envelope']
+
+    ###########################
+    # Methods:
+    ###########################
+    def parse(self, envelope_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Parse an envelope, updating the account with it.
+        :param envelope_dict: dict[str, Any]: The envelope from a 'receive' notification.
+        :return: Optional[SignalMessage]: The parsed message, or None if the envelope was empty or unrecognized.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.parse.__name__)
+        if 'dataMessage' in envelope_dict.keys():
+            return self.__parse_data_message__(envelope_dict)
+        elif 'receiptMessage' in envelope_dict.keys():
+            return self.__parse_receipt_message__(envelope_dict)
+        elif 'syncMessage' in envelope_dict.keys():
+            return self.__parse_sync_message__(envelope_dict)
+        elif 'typingMessage' in envelope_dict.keys():
+            return self.__parse_typing_message__(envelope_dict)
+        elif 'storyMessage' in envelope_dict.keys():
+            return self.__parse_story_message__(envelope_dict)
+        elif 'callMessage' in envelope_dict.keys():
+            return self.__parse_call_message__(envelope_dict)
+        logger.warning("Unrecognized incoming envelope. Perhaps a payment message.")
+        logger.debug("envelope_dict.keys() = %s" % str(envelope_dict.keys()))
+        logger.debug("envelope_dict = %s" % str(envelope_dict))
+        return None
+
+    ###########################
+    # Properties:
+    ###########################
+    @property
+    def account(self) -> SignalAccount:
+        """
+        The account this parser is for.
+        :return: SignalAccount: The account.
+        """
+        return self._account
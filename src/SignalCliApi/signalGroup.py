@@ -7,11 +7,10 @@ import logging
 from datetime import timedelta
 from typing import TypeVar, Optional, Any
 import socket
-import json
 
 # from . import SignalTypingMessage
-from .signalCommon import __socket_receive_blocking__, __socket_send__, __type_error__, __parse_signal_response__, \
-    __check_response_for_error__, UNKNOWN_GROUP_NAME, RecipientTypes, TypingStates
+from .signalCommon import __socket_request__, __type_error__, __check_response_for_error__, \
+    UNKNOWN_GROUP_NAME, RecipientTypes, TypingStates
 from .signalContacts import SignalContacts
 from .signalContact import SignalContact
 from .signalRecipient import SignalRecipient
@@ -474,18 +473,14 @@ class SignalGroup(SignalRecipient):
         # Create command object and json command string:
         list_group_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "listGroups",
             "params": {
                 "account": self._account_id,
                 "groupId": self.id,
             }
         }
-        json_command_str = json.dumps(list_group_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)  # Raises CommunicationError.
-        response_str = __socket_receive_blocking__(self._sync_socket)  # Raises CommunicationsError.
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)  # Raises InvalidServerResponse.
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, list_group_command_obj)
         __check_response_for_error__(response_obj)  # Raises SignalError on all signal errors.
 
         # Get the result and update:
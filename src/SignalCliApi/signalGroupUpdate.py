@@ -4,13 +4,9 @@ File: signalGroupUpdate.py
 Store and handle a group update message.
 """
 from typing import Optional
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalCommon import MessageTypes
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 
 
@@ -18,14 +14,10 @@ class SignalGroupUpdate(SignalMessage):
     """
     Class for a group update message.
     """
+    __slots__ = ('body',)
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict] = None,
                  raw_message: Optional[dict] = None,
                  ) -> None:
@@ -33,8 +25,7 @@ class SignalGroupUpdate(SignalMessage):
         # Set external properties:
         self.body: str = ''
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, None, None, None, None, MessageTypes.GROUP_UPDATE)
+        super().__init__(context, from_dict, raw_message, None, None, None, None, MessageTypes.GROUP_UPDATE)
         # Generate the body.
         self.__updateBody__()
         return
@@ -6,10 +6,9 @@ Contain and manage a list of groups.
 import logging
 from typing import Optional, Iterator, Any
 import socket
-import json
 
-from .signalCommon import __socket_receive_blocking__, __socket_send__, __type_error__, __parse_signal_response__, \
-    __check_response_for_error__, UNKNOWN_GROUP_NAME, SyncTypes
+from .signalCommon import __socket_request__, __type_error__, __check_response_for_error__, \
+    UNKNOWN_GROUP_NAME, SyncTypes
 from .signalGroup import SignalGroup
 from .signalContacts import SignalContacts
 
@@ -25,7 +24,8 @@ class SignalGroups(object):
                  account_id: str,
                  account_contacts: SignalContacts,
                  from_dict: Optional[dict[str, Any]] = None,
-                 do_sync: bool = False
+                 do_sync: bool = False,
+                 raw_groups: Optional[list[dict[str, Any]]] = None,
                  ) -> None:
         """
 
@@ -36,6 +36,8 @@ class SignalGroups(object):
         :param account_contacts: SignalContacts: The account's SignalContacts object.
         :param from_dict: dict[str, Any]: Load the groups from a dict created by __to_dict__().
         :param do_sync: bool: Sync data with signal; Defaults to False.
+        :param raw_groups: Optional[list[dict[str, Any]]]: The result of listGroups, already fetched, to merge in place
+            of syncing.
         """
         # Super:
         object.__init__(self)
@@ -62,6 +64,9 @@ class SignalGroups(object):
         if not isinstance(do_sync, bool):
             logger.critical("Raising TypeError")
             __type_error__("do_sync", "bool", do_sync)
+        if raw_groups is not None and not isinstance(raw_groups, list):
+            logger.critical("Raising TypeError")
+            __type_error__("raw_groups", "Optional[list[dict[str, Any]]]", raw_groups)
 
         # Set internal vars:
         self._sync_socket: socket.socket = sync_socket
@@ -81,8 +86,12 @@ class SignalGroups(object):
         if from_dict is not None:
             logger.debug("Loading from dict.")
             self.__from_dict__(from_dict)
+        # Load groups already fetched from signal:
+        if raw_groups is not None:
+            logger.debug("Merging listed groups.")
+            self.__merge__(raw_groups)
         # Load from signal
-        if do_sync:
+        elif do_sync:
             logger.debug("Syncing with signal.")
             self.__sync__()
         return
@@ -147,23 +156,29 @@ class SignalGroups(object):
         # Create command object and json command string:
         list_groups_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "listGroups",
             "params": {
                 "account": self._account_id,
             }
         }
-        json_command_str = json.dumps(list_groups_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)  # Raises CommunicationsError.
-        response_str: str = __socket_receive_blocking__(self._sync_socket)  # Raises CommunicationsError.
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)  # Raises InvalidServerResponse.
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, list_groups_command_obj)
         __check_response_for_error__(response_obj)  # Raises SignalError.
+        self.__merge__(response_obj['result'])
+        return
 
+    def __merge__(self, raw_groups: list[dict[str, Any]]) -> None:
+        """
+        Merge the result of listGroups into the groups.
+        :param raw_groups: list[dict[str, Any]]: The groups as returned by signal.
+        :return: None
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__merge__.__name__)
         # Parse results:
         group_count: int = 0
         new_group_count: int = 0
-        for raw_group in response_obj['result']:
+        for raw_group in raw_groups:
             group_count += 1
             new_group = SignalGroup(sync_socket=self._sync_socket, command_socket=self._command_socket,
                                     config_path=self._config_path, account_id=self._account_id,
@@ -15,6 +15,8 @@ class SignalMention(object):
     """
     Object for a mention.
     """
+    __slots__ = ('_contacts', 'contact', 'start', 'length')
+
     def __init__(self,
                  contacts: SignalContacts,
                  from_dict: Optional[dict[str, Any]] = None,
@@ -17,6 +17,8 @@ class SignalMentions(object):
     """
     Object to store the mentions in the message.
     """
+    __slots__ = ('_contacts', '_mentions')
+
     def __init__(self,
                  contacts: SignalContacts,
                  from_dict: Optional[dict[str, Any]] = None,
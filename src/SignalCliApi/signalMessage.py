@@ -3,16 +3,13 @@
 File: signalMessage.py
 Store and handle a base message.
 """
-from typing import TypeVar, Optional, Any
-import socket
+from typing import TypeVar, Optional, Any, Callable
 import logging
 
+from .signalAccountContext import SignalAccountContext
 from .signalCommon import __type_error__, MessageTypes, RecipientTypes
-from .signalContacts import SignalContacts
 from .signalContact import SignalContact
-from .signalDevices import SignalDevices
 from .signalDevice import SignalDevice
-from .signalGroups import SignalGroups
 from .signalGroup import SignalGroup
 from .signalTimestamp import SignalTimestamp
 
@@ -23,14 +20,12 @@ class SignalMessage(object):
     """
     Base class for a message.
     """
+    __slots__ = ('_context', '_expiry_callback', '_sender', '_recipient', '_recipient_type', '_device', '_timestamp',
+                 '_message_type', '_is_delivered', '_time_delivered', '_is_read', '_time_read', '_is_viewed',
+                 '_time_viewed')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  sender: Optional[SignalContact] = None,
@@ -41,13 +36,7 @@ class SignalMessage(object):
                  ) -> None:
         """
         Initialize a message.
-        :param command_socket: Socket.socket: The socket to preform command operations with
-        :param account_id: str: This account ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts SignalContacts object.
-        :param groups: SignalGroups: This accounts SignalGroups object.
-        :param devices: SignalDevices: This accounts SignalDevices object.
-        :param this_device: SignalDevice: The device object for this device.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict] = None: Load from a dict provided by __to_dict__()
         :param raw_message: Optional[dict] = None: Load from a dict provided by signal.
         :param sender: Optional[SignalContact] = None: The sender SignalContact of this message.
@@ -65,27 +54,9 @@ class SignalMessage(object):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
 
         # Arg Type Checks:
-        if not isinstance(command_socket, socket.socket):
-            logger.critical("Raising TypeError:")
-            __type_error__('command_socket', 'socket', command_socket)
-        if not isinstance(account_id, str):
-            logger.critical("Raising TypeError:")
-            __type_error__('contact_id', 'str', account_id)
-        if not isinstance(config_path, str):
-            logger.critical("Raising TypeError:")
-            __type_error__('config_path', 'str', config_path)
-        if not isinstance(contacts, SignalContacts):
-            logger.critical("Raising TypeError:")
-            __type_error__("contacts", "SignalContacts", contacts)
-        if not isinstance(groups, SignalGroups):
+        if not isinstance(context, SignalAccountContext):
             logger.critical("Raising TypeError:")
-            __type_error__("groups", "SignalGroups", groups)
-        if not isinstance(devices, SignalDevices):
-            logger.critical("Raising TypeError:")
-            __type_error__("devices", "SignalDevices", devices)
-        if not isinstance(this_device, SignalDevice):
-            logger.critical("Raising TypeError:")
-            __type_error__("this_device", "SignalDevice", this_device)
+            __type_error__("context", "SignalAccountContext", context)
         if from_dict is not None and not isinstance(from_dict, dict):
             logger.critical("Raising TypeError:")
             __type_error__("from_dict", "dict", from_dict)
@@ -109,20 +80,10 @@ class SignalMessage(object):
             __type_error__("message_type", "MessageTypes(enum)", message_type)
 
         # Set internal vars:
-        self._command_socket: socket.socket = command_socket
-        """The socket to preform command operations on."""
-        self._account_id: str = account_id
-        """This accounts ID."""
-        self._config_path: str = config_path
-        """The full path to signal-cli config directory."""
-        self._contacts: SignalContacts = contacts
-        """This accounts SignalContacts object."""
-        self._groups: SignalGroups = groups
-        """This accounts SignalGroups object."""
-        self._devices: SignalDevices = devices
-        """This accounts SignalDevice object."""
-        self._this_device: SignalDevice = this_device
-        """The SignalDevice for this device we're using."""
+        self._context: SignalAccountContext = context
+        """The account's shared context."""
+        self._expiry_callback: Optional[Callable[[Any], None]] = None
+        """Called with this message when its expiry is set, to schedule expunging it."""
 
         # Set external properties:
         self._sender: SignalContact = sender
@@ -180,27 +141,27 @@ class SignalMessage(object):
         :return: None
         """
         # Parse Sender
-        added, self._sender = self._contacts.__get_or_add__(name=raw_message['sourceName'],
+        added, self._sender = self._context.contacts.__get_or_add__(name=raw_message['sourceName'],
                                                             number=raw_message['sourceNumber'],
                                                             uuid=raw_message['sourceUuid'])
         if added:
-            self._contacts.__save__()
+            self._context.contacts.__save__()
         # Parse recipient:
         self._recipient = None
         if 'dataMessage' in raw_message.keys():
             data_message: dict[str, Any] = raw_message['dataMessage']
             if 'groupInfo' in data_message.keys():
-                added, self._recipient = self._groups.__get_or_add__(
+                added, self._recipient = self._context.groups.__get_or_add__(
                     group_id=data_message['groupInfo']['groupId'])
                 self._recipient_type = RecipientTypes.GROUP
         if self.recipient is None:
-            self._recipient = self._contacts.get_self()
+            self._recipient = self._context.contacts.get_self()
             self._recipient_type = RecipientTypes.CONTACT
         # Parse device:
         added, self._device = self.sender.devices.__get_or_add__(
             device_id=raw_message['sourceDevice'])
         if added:
-            self._contacts.__save__()
+            self._context.contacts.__save__()
         # Parse Timestamp:
         self._timestamp = SignalTimestamp(timestamp=raw_message['timestamp'])
         return
@@ -272,20 +233,20 @@ class SignalMessage(object):
         :return: None
         """
         # Parse sender:
-        _, self._sender = self._contacts.__get_or_add__(contact_id=from_dict['sender'])
+        _, self._sender = self._context.contacts.__get_or_add__(contact_id=from_dict['sender'])
         # Parse recipient type:
         self._recipient_type = RecipientTypes(from_dict['recipientType'])
         # Parse recipient:
         if from_dict['recipient'] is not None:
             if self.recipient_type == RecipientTypes.CONTACT:
-                _, self._recipient = self._contacts.__get_or_add__(
+                _, self._recipient = self._context.contacts.__get_or_add__(
                     contact_id=from_dict['recipient'])
             elif self.recipient_type == RecipientTypes.GROUP:
-                _, self._recipient = self._groups.__get_or_add__(group_id=from_dict['recipient'])
+                _, self._recipient = self._context.groups.__get_or_add__(group_id=from_dict['recipient'])
         # Parse device:
 
         _, self._device = self.sender.devices.__get_or_add__(device_id=from_dict['device'])
-        self._contacts.__save__()
+        self._context.contacts.__save__()
         # Parse timestamp:
         self._timestamp = SignalTimestamp(from_dict=from_dict['timestamp'])
         # Parse message Type:
@@ -310,6 +271,27 @@ class SignalMessage(object):
             self._time_viewed = None
         return
 
+    ###############################
+    # Expiry:
+    ###############################
+    def __set_expiry_callback__(self, callback: Optional[Callable[[Any], None]]) -> None:
+        """
+        Set the callback run when this message's expiry is set.
+        :param callback: Optional[Callable[[SignalMessage], None]]: The callback, or None to clear it.
+        :return: None
+        """
+        self._expiry_callback = callback
+        return
+
+    def __expiry_set__(self) -> None:
+        """
+        Run the expiry callback, called by subclasses once they've set the expiration timestamp.
+        :return: None
+        """
+        if self._expiry_callback is not None:
+            self._expiry_callback(self)
+        return
+
     ###############################
     # Methods:
     ###############################
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+File: signalMessageJournal.py
+Append-only journal storage for message history.
+"""
+import logging
+import os
+import json
+from typing import Optional, Any, TextIO, Callable
+
+from .signalExceptions import InvalidDataFile
+from .signalTimestamp import SignalTimestamp
+
+JOURNALED_LISTS: tuple[str, ...] = ('messages', 'syncMessages', 'typingMessages', 'storyMessages')
+"""The lists of the messages dict that are journaled message by message."""
+
+
+class SignalMessageJournal(object):
+    """
+    Stores the messages dict created by SignalMessages.__to_dict__() as a snapshot, plus a journal of the changes
+    made since, one JSON line per change. A change is written by appending one line, rather than by rewriting the
+    history; compact() folds the journal into a new snapshot.
+    """
+
+    def __init__(self,
+                 snapshot_path: str,
+                 journal_path: str,
+                 resolve_id: Optional[Callable[[str], str]] = None,
+                 ) -> None:
+        """
+        Initialize the journal.
+        :param snapshot_path: str: The full path to the snapshot file, the same format as messages.json.
+        :param journal_path: str: The full path to the journal file.
+        :param resolve_id: Optional[Callable[[str], str]]: Maps the sender and recipient ids of a message to the ids
+            it's keyed by; See __get_key__().
+        """
+        # Super:
+        object.__init__(self)
+
+        # Set internal vars:
+        self._snapshot_path: str = snapshot_path
+        """The full path to the snapshot file."""
+        self._journal_path: str = journal_path
+        """The full path to the journal file."""
+        self._resolve_id: Optional[Callable[[str], str]] = resolve_id
+        """Maps sender and recipient ids to the ids messages are keyed by."""
+        self._file_handle: Optional[TextIO] = None
+        """The journal file, open for appending."""
+        self._num_records: int = 0
+        """The number of records in the journal."""
+        return
+
+    ##########################
+    # Helpers:
+    ##########################
+    @staticmethod
+    def __get_key__(message_dict: dict[str, Any], resolve_id: Optional[Callable[[str], str]] = None) -> str:
+        """
+        Get the key identifying a message in its __to_dict__() form.
+        A contact's id is its number once the number is known, and its uuid until then, so the sender and recipient
+        ids stored in a message can change; resolve_id maps them to an id that doesn't, like the contact's uuid.
+        :param message_dict: dict[str, Any]: The message dict.
+        :param resolve_id: Optional[Callable[[str], str]]: Maps the sender and recipient ids to the ids to key by; None
+            keys by the ids as stored.
+        :return: str: The key.
+        """
+        # The timestamp may be in either of the formats SignalTimestamp has stored:
+        timestamp: Optional[int] = None
+        if message_dict.get('timestamp') is not None:
+            timestamp = SignalTimestamp.__get_milliseconds__(message_dict['timestamp'])
+        sender: Optional[str] = message_dict.get('sender')
+        recipient: Optional[str] = message_dict.get('recipient')
+        if resolve_id is not None:
+            if sender is not None:
+                sender = resolve_id(sender)
+            if recipient is not None:
+                recipient = resolve_id(recipient)
+        return json.dumps([message_dict.get('messageType'), sender, recipient, message_dict.get('device'), timestamp])
+
+    def __upgrade_key__(self, key: str) -> str:
+        """
+        Convert a key from a journal record to the form __get_key__() makes now: Timestamps stored as float seconds
+        are converted, and the sender and recipient ids resolved again, as they may have changed since it was written.
+        :param key: str: The key from a journal record.
+        :return: str: The key as __get_key__() makes it now.
+        """
+        fields: list[Any] = json.loads(key)
+        if isinstance(fields[4], dict):
+            fields[4] = SignalTimestamp.__get_milliseconds__(fields[4])
+        if self._resolve_id is not None:
+            for index in (1, 2):
+                if fields[index] is not None:
+                    fields[index] = self._resolve_id(fields[index])
+        return json.dumps(fields)
+
+    def __write__(self, record: dict[str, Any]) -> None:
+        """
+        Append a record to the journal.
+        :param record: dict[str, Any]: The record.
+        :return: None
+        :raises RuntimeError: On error writing the journal.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__write__.__name__)
+        try:
+            if self._file_handle is None:
+                self._file_handle = open(self._journal_path, 'a')
+            self._file_handle.write(json.dumps(record) + '\n')
+            self._file_handle.flush()
+        except OSError as e:
+            error_message: str = "Failed to write to '%s': %s" % (self._journal_path, str(e.args))
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        self._num_records += 1
+        return
+
+    def __replay__(self, messages_dict: dict[str, Any]) -> None:
+        """
+        Apply the records in the journal to a messages dict.
+        :param messages_dict: dict[str, Any]: The messages dict loaded from the snapshot, changed in place.
+        :return: None
+        :raises RuntimeError: On error reading the journal.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__replay__.__name__)
+        # Key the lists, so records can find their message:
+        keyed: dict[str, dict[str, dict[str, Any]]] = {}
+        for list_name in JOURNALED_LISTS:
+            keyed[list_name] = {}
+            for message_dict in messages_dict.setdefault(list_name, []):
+                keyed[list_name][self.__get_key__(message_dict, self._resolve_id)] = message_dict
+        # Apply the records:
+        try:
+            file_handle: TextIO = open(self._journal_path, 'r')
+            lines: list[str] = file_handle.readlines()
+            file_handle.close()
+        except OSError as e:
+            error_message: str = "Couldn't open '%s' for reading: %s" % (self._journal_path, str(e.args))
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        self._num_records = 0
+        valid_size: int = 0
+        for line_number, line in enumerate(lines, 1):
+            try:
+                if not line.endswith('\n'):
+                    raise json.JSONDecodeError("Unterminated record", line, len(line))
+                record: dict[str, Any] = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn write at the end is what a crash leaves behind, stop there, and cut it off so new records
+                # aren't appended after it:
+                logger.warning("Ignoring unreadable journal record %i of %i in '%s'."
+                               % (line_number, len(lines), self._journal_path))
+                try:
+                    os.truncate(self._journal_path, valid_size)
+                except OSError as e:
+                    error_message = "Couldn't truncate '%s': %s" % (self._journal_path, str(e.args))
+                    logger.critical("Raising RuntimeError(%s)." % error_message)
+                    raise RuntimeError(error_message)
+                break
+            valid_size += len(line.encode())
+            self._num_records += 1
+            if record['op'] == 'put':
+                keyed[record['list']][self.__get_key__(record['message'], self._resolve_id)] = record['message']
+            elif record['op'] == 'remove':
+                for key in record['keys']:
+                    keyed[record['list']].pop(self.__upgrade_key__(key), None)
+            elif record['op'] == 'set':
+                messages_dict[record['list']] = record['items']
+        for list_name in JOURNALED_LISTS:
+            messages_dict[list_name] = list(keyed[list_name].values())
+        return
+
+    ##########################
+    # Methods:
+    ##########################
+    def load(self) -> Optional[dict[str, Any]]:
+        """
+        Load the snapshot, and replay the journal on top of it.
+        :return: Optional[dict[str, Any]]: The messages dict, or None if there is neither a snapshot nor a journal.
+        :raises RuntimeError: On error reading a file.
+        :raises InvalidDataFile: If the snapshot isn't valid json.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.load.__name__)
+        if not os.path.exists(self._snapshot_path) and not os.path.exists(self._journal_path):
+            return None
+        messages_dict: dict[str, Any] = {}
+        if os.path.exists(self._snapshot_path):
+            try:
+                file_handle: TextIO = open(self._snapshot_path, 'r')
+                messages_dict = json.loads(file_handle.read())
+                file_handle.close()
+            except OSError as e:
+                error_message: str = "Couldn't open '%s' for reading: %s" % (self._snapshot_path, str(e.args))
+                logger.critical("Raising RuntimeError(%s)." % error_message)
+                raise RuntimeError(error_message)
+            except json.JSONDecodeError as e:
+                error_message: str = "Couldn't load json from '%s': %s" % (self._snapshot_path, e.msg)
+                logger.critical("Raising InvalidDataFile(%s)" % error_message)
+                raise InvalidDataFile(error_message, e, self._snapshot_path)
+        for list_name in ('syncMessages', 'typingMessages', 'storyMessages', 'unparsedReceipts'):
+            messages_dict.setdefault(list_name, [])
+        if os.path.exists(self._journal_path):
+            self.__replay__(messages_dict)
+            logger.debug("Replayed %i journal records." % self._num_records)
+        return messages_dict
+
+    def put(self, list_name: str, message_dict: dict[str, Any]) -> None:
+        """
+        Record a new or changed message.
+        :param list_name: str: The list in the messages dict the message belongs to.
+        :param message_dict: dict[str, Any]: The message's __to_dict__().
+        :return: None
+        :raises RuntimeError: On error writing the journal.
+        """
+        self.__write__({'op': 'put', 'list': list_name, 'message': message_dict})
+        return
+
+    def remove(self, list_name: str, message_dicts: list[dict[str, Any]]) -> None:
+        """
+        Record the removal of messages.
+        :param list_name: str: The list in the messages dict the messages belong to.
+        :param message_dicts: list[dict[str, Any]]: The __to_dict__() of each removed message.
+        :return: None
+        :raises RuntimeError: On error writing the journal.
+        """
+        keys: list[str] = [self.__get_key__(message_dict, self._resolve_id) for message_dict in message_dicts]
+        self.__write__({'op': 'remove', 'list': list_name, 'keys': keys})
+        return
+
+    def set(self, list_name: str, items: list[dict[str, Any]]) -> None:
+        """
+        Record the replacement of a whole list, for small lists not keyed by message.
+        :param list_name: str: The list in the messages dict.
+        :param items: list[dict[str, Any]]: The new contents of the list.
+        :return: None
+        :raises RuntimeError: On error writing the journal.
+        """
+        self.__write__({'op': 'set', 'list': list_name, 'items': items})
+        return
+
+    def compact(self, messages_dict: dict[str, Any]) -> None:
+        """
+        Write a new snapshot, and empty the journal.
+        :param messages_dict: dict[str, Any]: The current messages dict.
+        :return: None
+        :raises RuntimeError: On error writing a file.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.compact.__name__)
+        logger.debug("Compacting %i journal records." % self._num_records)
+        temp_path: str = self._snapshot_path + '.tmp'
+        try:
+            file_handle: TextIO = open(temp_path, 'w')
+            file_handle.write(json.dumps(messages_dict, indent=4))
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+            file_handle.close()
+            # Swap the snapshot in, then drop the journal it contains:
+            os.replace(temp_path, self._snapshot_path)
+            self.close()
+            if os.path.exists(self._journal_path):
+                os.remove(self._journal_path)
+        except OSError as e:
+            error_message: str = "Failed to write '%s': %s" % (self._snapshot_path, str(e.args))
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        self._num_records = 0
+        return
+
+    def close(self) -> None:
+        """
+        Close the journal file.
+        :return: None
+        """
+        if self._file_handle is not None:
+            self._file_handle.close()
+            self._file_handle = None
+        return
+
+    ##########################
+    # Properties:
+    ##########################
+    @property
+    def num_records(self) -> int:
+        """
+        The number of records in the journal since the last snapshot.
+        :return: int: The number of records.
+        """
+        return self._num_records
+
+    @property
+    def journal_path(self) -> str:
+        """
+        The full path to the journal file.
+        :return: str: The path.
+        """
+        return self._journal_path
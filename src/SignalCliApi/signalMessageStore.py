@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+File: signalMessageStore.py
+SQLite storage for message history.
+"""
+import logging
+import sqlite3
+import json
+from typing import Optional, Any, Callable
+
+from .signalCommon import MessageTypes, RecipientTypes
+from .signalMessageJournal import SignalMessageJournal
+from .signalTimestamp import SignalTimestamp
+
+_SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS messages (
+    key TEXT PRIMARY KEY,
+    list TEXT NOT NULL,
+    message_type INTEGER,
+    sender TEXT,
+    recipient TEXT,
+    conversation TEXT,
+    timestamp REAL,
+    is_delivered INTEGER,
+    is_read INTEGER,
+    is_viewed INTEGER,
+    expires REAL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_conversation ON messages (list, conversation, timestamp);
+CREATE INDEX IF NOT EXISTS messages_sender ON messages (sender, timestamp);
+CREATE INDEX IF NOT EXISTS messages_recipient ON messages (recipient, timestamp);
+CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp);
+CREATE INDEX IF NOT EXISTS messages_read ON messages (list, message_type, is_read);
+CREATE INDEX IF NOT EXISTS messages_delivered ON messages (list, is_delivered);
+CREATE INDEX IF NOT EXISTS messages_expires ON messages (expires) WHERE expires IS NOT NULL;
+CREATE TABLE IF NOT EXISTS mentions (
+    message_key TEXT NOT NULL REFERENCES messages (key) ON DELETE CASCADE,
+    contact_id TEXT NOT NULL,
+    start INTEGER,
+    length INTEGER
+);
+CREATE INDEX IF NOT EXISTS mentions_contact ON mentions (contact_id);
+CREATE INDEX IF NOT EXISTS mentions_message ON mentions (message_key);
+CREATE TABLE IF NOT EXISTS reactions (
+    message_key TEXT NOT NULL REFERENCES messages (key) ON DELETE CASCADE,
+    sender TEXT,
+    emoji TEXT,
+    timestamp REAL
+);
+CREATE INDEX IF NOT EXISTS reactions_message ON reactions (message_key);
+CREATE TABLE IF NOT EXISTS attachments (
+    message_key TEXT NOT NULL REFERENCES messages (key) ON DELETE CASCADE,
+    attachment_id TEXT,
+    content_type TEXT,
+    filename TEXT,
+    size INTEGER,
+    local_path TEXT
+);
+CREATE INDEX IF NOT EXISTS attachments_message ON attachments (message_key);
+CREATE TABLE IF NOT EXISTS lists (
+    name TEXT PRIMARY KEY,
+    items TEXT NOT NULL
+);
+"""
+"""The database schema."""
+_SCHEMA_VERSION: int = 1
+"""The schema version, kept in the database's user_version; Version 1 keys messages by the contacts' uuids."""
+
+
+class SignalMessageStore(object):
+    """
+    Stores message history in a SQLite database. Each message is stored as its __to_dict__(), alongside indexed
+    columns, and tables of its mentions, reactions and attachments, so messages can be looked up without loading
+    the history. It takes the same put(), remove() and set() records as SignalMessageJournal.
+    Messages are keyed, and their sender, recipient, conversation and mentions stored, by the ids resolve_id maps
+    them to, so they don't change when a contact's id does; The ids queried by are mapped the same way.
+    """
+
+    def __init__(self, db_path: str, self_id: str, resolve_id: Optional[Callable[[str], str]] = None) -> None:
+        """
+        Open, creating if required, the database.
+        :param db_path: str: The full path to the database file.
+        :param self_id: str: The id of the account's own contact, used to work out conversations.
+        :param resolve_id: Optional[Callable[[str], str]]: Maps contact ids to the ids stored; See
+            SignalMessageJournal.__get_key__().
+        :raises RuntimeError: On error opening the database.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Set internal vars:
+        self._db_path: str = db_path
+        """The full path to the database file."""
+        self._resolve_id: Optional[Callable[[str], str]] = resolve_id
+        """Maps contact ids to the ids stored."""
+        self._self_id: str = self.__resolve__(self_id)
+        """The id of the account's own contact."""
+
+        # Open the database, NOTE: Callers serialise access, so it can be shared between threads:
+        try:
+            self._connection: sqlite3.Connection = sqlite3.connect(db_path, check_same_thread=False)
+            """The database connection."""
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("PRAGMA foreign_keys=ON")
+            self._connection.executescript(_SCHEMA)
+            self._connection.commit()
+            if self._connection.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                self.__rekey__()
+        except sqlite3.Error as e:
+            error_message: str = "Couldn't open '%s': %s" % (db_path, str(e.args))
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        return
+
+    ##########################
+    # Helpers:
+    ##########################
+    @staticmethod
+    def __get_milliseconds__(timestamp_dict: Optional[dict[str, Any]]) -> Optional[int]:
+        """
+        Get the milliseconds from a SignalTimestamp.__to_dict__(), in either format.
+        :param timestamp_dict: Optional[dict[str, Any]]: The timestamp dict.
+        :return: Optional[int]: The milliseconds, or None if no timestamp.
+        """
+        if timestamp_dict is None:
+            return None
+        return SignalTimestamp.__get_milliseconds__(timestamp_dict)
+
+    def __resolve__(self, contact_id: Optional[str]) -> Optional[str]:
+        """
+        Map a contact id to the id stored.
+        :param contact_id: Optional[str]: The id.
+        :return: Optional[str]: The id stored, None if contact_id is None.
+        """
+        if contact_id is None or self._resolve_id is None:
+            return contact_id
+        return self._resolve_id(contact_id)
+
+    def __get_key__(self, message_dict: dict[str, Any]) -> str:
+        """
+        Get the key of a message, the same key the journal uses.
+        :param message_dict: dict[str, Any]: The message dict.
+        :return: str: The key.
+        """
+        return SignalMessageJournal.__get_key__(message_dict, self._resolve_id)
+
+    def __get_conversation__(self, message_dict: dict[str, Any]) -> Optional[str]:
+        """
+        Get the conversation a message is in, the group id, or the id of the contact that isn't us.
+        :param message_dict: dict[str, Any]: The message dict.
+        :return: Optional[str]: The conversation id, as stored.
+        """
+        if message_dict.get('recipientType') == RecipientTypes.GROUP.value:
+            return message_dict.get('recipient')
+        if self.__resolve__(message_dict.get('sender')) == self._self_id:
+            return self.__resolve__(message_dict.get('recipient'))
+        return self.__resolve__(message_dict.get('sender'))
+
+    def __rekey__(self) -> None:
+        """
+        Key the messages, and store their ids, as this version does; Rows that now share a key are versions of one
+        message, only the last inserted is kept.
+        :return: None
+        :raises sqlite3.Error: On database error.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__rekey__.__name__)
+        rows: list[tuple[str, str, str]] = self._connection.execute(
+            "SELECT key, list, body FROM messages ORDER BY rowid").fetchall()
+        new_keys: dict[str, str] = {}
+        last_keys: dict[str, str] = {}
+        for old_key, _, body in rows:
+            new_keys[old_key] = self.__get_key__(json.loads(body))
+            last_keys[new_keys[old_key]] = old_key
+        # Drop the older versions first, freeing their keys:
+        kept_keys: set[str] = set(last_keys.values())
+        duplicate_keys: list[tuple[str]] = [(old_key,) for old_key, _, _ in rows if old_key not in kept_keys]
+        self._connection.executemany("DELETE FROM messages WHERE key = ?", duplicate_keys)
+        for old_key, list_name, body in rows:
+            if old_key not in kept_keys:
+                continue
+            if new_keys[old_key] != old_key:
+                # Rename in place, so the message keeps its place in the history; __put__ replaces the metadata:
+                for table in ('mentions', 'reactions', 'attachments'):
+                    self._connection.execute("DELETE FROM %s WHERE message_key = ?" % table, (old_key,))
+                self._connection.execute("UPDATE messages SET key = ? WHERE key = ?", (new_keys[old_key], old_key))
+            self.__put__(list_name, json.loads(body))
+        self._connection.execute("PRAGMA user_version = %i" % _SCHEMA_VERSION)
+        self._connection.commit()
+        logger.info("Re-keyed %i messages, dropped %i older versions." % (len(rows), len(duplicate_keys)))
+        return
+
+    def __put__(self, list_name: str, message_dict: dict[str, Any]) -> None:
+        """
+        Insert or update a message, without committing.
+        :param list_name: str: The list in the messages dict the message belongs to.
+        :param message_dict: dict[str, Any]: The message's __to_dict__().
+        :return: None
+        """
+        key: str = self.__get_key__(message_dict)
+        row: tuple = (key, list_name, message_dict.get('messageType'), self.__resolve__(message_dict.get('sender')),
+                      self.__resolve__(message_dict.get('recipient')), self.__get_conversation__(message_dict),
+                      self.__get_milliseconds__(message_dict.get('timestamp')), message_dict.get('isDelivered'),
+                      message_dict.get('isRead'), message_dict.get('isViewed'),
+                      self.__get_milliseconds__(message_dict.get('expirationTimestamp')), json.dumps(message_dict))
+        # Upsert, so the row keeps its place in the history:
+        self._connection.execute(
+            "INSERT INTO messages (key, list, message_type, sender, recipient, conversation, timestamp, "
+            "is_delivered, is_read, is_viewed, expires, body) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET list=excluded.list, sender=excluded.sender, "
+            "recipient=excluded.recipient, conversation=excluded.conversation, is_delivered=excluded.is_delivered, "
+            "is_read=excluded.is_read, is_viewed=excluded.is_viewed, expires=excluded.expires, body=excluded.body",
+            row)
+        # Replace the metadata:
+        for table in ('mentions', 'reactions', 'attachments'):
+            self._connection.execute("DELETE FROM %s WHERE message_key = ?" % table, (key,))
+        mentions_dict: Optional[dict[str, Any]] = message_dict.get('mentions')
+        if mentions_dict is not None:
+            self._connection.executemany(
+                "INSERT INTO mentions (message_key, contact_id, start, length) VALUES (?, ?, ?, ?)",
+                [(key, self.__resolve__(mention['contactId']), mention['start'], mention['length'])
+                 for mention in mentions_dict['mentions']])
+        reactions_dict: Optional[dict[str, Any]] = message_dict.get('reactions')
+        if reactions_dict is not None:
+            self._connection.executemany(
+                "INSERT INTO reactions (message_key, sender, emoji, timestamp) VALUES (?, ?, ?, ?)",
+                [(key, reaction.get('sender'), reaction.get('emoji'),
+                  self.__get_milliseconds__(reaction.get('timestamp'))) for reaction in reactions_dict['reactions']])
+        attachments: Optional[list[dict[str, Any]]] = message_dict.get('attachments')
+        if attachments is not None:
+            self._connection.executemany(
+                "INSERT INTO attachments (message_key, attachment_id, content_type, filename, size, local_path) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, attachment.get('id'), attachment.get('contentType'), attachment.get('filename'),
+                  attachment.get('size'), attachment.get('localPath')) for attachment in attachments])
+        return
+
+    def __commit__(self) -> None:
+        """
+        Commit the current transaction.
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__commit__.__name__)
+        try:
+            self._connection.commit()
+        except sqlite3.Error as e:
+            error_message: str = "Failed to write '%s': %s" % (self._db_path, str(e.args))
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+        return
+
+    ##########################
+    # Records:
+    ##########################
+    def put(self, list_name: str, message_dict: dict[str, Any]) -> None:
+        """
+        Store a new or changed message.
+        :param list_name: str: The list in the messages dict the message belongs to.
+        :param message_dict: dict[str, Any]: The message's __to_dict__().
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        self.__put__(list_name, message_dict)
+        self.__commit__()
+        return
+
+    def put_many(self, list_name: str, message_dicts: list[dict[str, Any]]) -> None:
+        """
+        Store several new or changed messages in one transaction.
+        :param list_name: str: The list in the messages dict the messages belong to.
+        :param message_dicts: list[dict[str, Any]]: The messages' __to_dict__().
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        for message_dict in message_dicts:
+            self.__put__(list_name, message_dict)
+        self.__commit__()
+        return
+
+    def remove(self, list_name: str, message_dicts: list[dict[str, Any]]) -> None:
+        """
+        Remove messages.
+        :param list_name: str: The list in the messages dict the messages belong to.
+        :param message_dicts: list[dict[str, Any]]: The __to_dict__() of each removed message.
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        self._connection.executemany("DELETE FROM messages WHERE list = ? AND key = ?",
+                                     [(list_name, self.__get_key__(message_dict))
+                                      for message_dict in message_dicts])
+        self.__commit__()
+        return
+
+    def set(self, list_name: str, items: list[dict[str, Any]]) -> None:
+        """
+        Replace a whole list, for small lists not keyed by message.
+        :param list_name: str: The list in the messages dict.
+        :param items: list[dict[str, Any]]: The new contents of the list.
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        self._connection.execute("INSERT OR REPLACE INTO lists (name, items) VALUES (?, ?)",
+                                 (list_name, json.dumps(items)))
+        self.__commit__()
+        return
+
+    def import_dict(self, messages_dict: dict[str, Any]) -> None:
+        """
+        Store everything in a messages dict created by SignalMessages.__to_dict__(), in one transaction.
+        :param messages_dict: dict[str, Any]: The messages dict.
+        :return: None
+        :raises RuntimeError: On database error.
+        """
+        for list_name in ('messages', 'syncMessages', 'typingMessages', 'storyMessages'):
+            for message_dict in messages_dict.get(list_name, []):
+                self.__put__(list_name, message_dict)
+        self._connection.execute("INSERT OR REPLACE INTO lists (name, items) VALUES (?, ?)",
+                                 ('unparsedReceipts', json.dumps(messages_dict.get('unparsedReceipts', []))))
+        self.__commit__()
+        return
+
+    ##########################
+    # Queries:
+    ##########################
+    def load_list(self, list_name: str) -> list[dict[str, Any]]:
+        """
+        Load a whole list.
+        :param list_name: str: The list in the messages dict.
+        :return: list[dict[str, Any]]: The contents of the list.
+        """
+        if list_name == 'unparsedReceipts':
+            row: Optional[tuple] = self._connection.execute("SELECT items FROM lists WHERE name = ?",
+                                                            (list_name,)).fetchone()
+            if row is None:
+                return []
+            return json.loads(row[0])
+        return [message_dict for _, message_dict in self.query(list_name=list_name)]
+
+    def query(self,
+              list_name: str = 'messages',
+              message_type: Optional[MessageTypes] = None,
+              conversation: Optional[str] = None,
+              sender: Optional[str] = None,
+              recipient: Optional[str] = None,
+              timestamp: Optional[int] = None,
+              is_read: Optional[bool] = None,
+              is_viewed: Optional[bool] = None,
+              is_delivered: Optional[bool] = None,
+              mentioned: Optional[str] = None,
+              limit: Optional[int] = None,
+              ) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Find messages, in the order they were stored; Criteria left as None aren't checked.
+        :param list_name: str: The list in the messages dict to search.
+        :param message_type: Optional[MessageTypes]: The message type.
+        :param conversation: Optional[str]: The conversation id, a group id, or the id of the contact that isn't us.
+        :param sender: Optional[str]: The sender's id.
+        :param recipient: Optional[str]: The recipient's id.
+        :param timestamp: Optional[int]: The timestamp in milliseconds.
+        :param is_read: Optional[bool]: The read flag.
+        :param is_viewed: Optional[bool]: The viewed flag.
+        :param is_delivered: Optional[bool]: The delivered flag.
+        :param mentioned: Optional[str]: The id of a contact mentioned in the message.
+        :param limit: Optional[int]: The maximum number of messages to return.
+        :return: list[tuple[str, dict[str, Any]]]: The key and __to_dict__() of each message found.
+        """
+        # Map the contact ids to those stored:
+        conversation, sender = self.__resolve__(conversation), self.__resolve__(sender)
+        recipient, mentioned = self.__resolve__(recipient), self.__resolve__(mentioned)
+        conditions: list[str] = ["list = ?"]
+        params: list[Any] = [list_name]
+        for column, value in (('message_type', message_type), ('conversation', conversation), ('sender', sender),
+                              ('recipient', recipient), ('timestamp', timestamp), ('is_read', is_read),
+                              ('is_viewed', is_viewed), ('is_delivered', is_delivered)):
+            if value is not None:
+                conditions.append("%s = ?" % column)
+                params.append(int(value) if isinstance(value, (bool, MessageTypes)) else value)
+        if mentioned is not None:
+            conditions.append("key IN (SELECT message_key FROM mentions WHERE contact_id = ?)")
+            params.append(mentioned)
+        sql: str = "SELECT key, body FROM messages WHERE %s ORDER BY rowid" % " AND ".join(conditions)
+        if limit is not None:
+            sql += " LIMIT %i" % limit
+        return [(key, json.loads(body)) for key, body in self._connection.execute(sql, params)]
+
+    def remove_expired(self, now: int) -> list[str]:
+        """
+        Remove the messages that have expired.
+        :param now: int: The current time in milliseconds.
+        :return: list[str]: The keys of the removed messages.
+        :raises RuntimeError: On database error.
+        """
+        keys: list[str] = [row[0] for row in self._connection.execute(
+            "SELECT key FROM messages WHERE expires IS NOT NULL AND expires <= ?", (now,))]
+        if len(keys) > 0:
+            self._connection.execute("DELETE FROM messages WHERE expires IS NOT NULL AND expires <= ?", (now,))
+            self.__commit__()
+        return keys
+
+    def next_expiry(self) -> Optional[int]:
+        """
+        Get when the next message expires.
+        :return: Optional[int]: The earliest expiry in milliseconds, or None if no
+            message expires.
+        """
+        row: tuple = self._connection.execute("SELECT MIN(expires) FROM messages WHERE expires IS NOT NULL").fetchone()
+        return row[0]
+
+    def count(self, list_name: str = 'messages') -> int:
+        """
+        Count the messages in a list.
+        :param list_name: str: The list in the messages dict.
+        :return: int: The number of messages.
+        """
+        return self._connection.execute("SELECT COUNT(*) FROM messages WHERE list = ?", (list_name,)).fetchone()[0]
+
+    def close(self) -> None:
+        """
+        Close the database.
+        :return: None
+        """
+        self._connection.close()
+        return
+
+    ##########################
+    # Properties:
+    ##########################
+    @property
+    def db_path(self) -> str:
+        """
+        The full path to the database file.
+        :return: str: The path.
+        """
+        return self._db_path
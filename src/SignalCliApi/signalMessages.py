@@ -4,68 +4,57 @@ File: signalMessages.py
 Store and handle message lists.
 """
 import logging
-from typing import Optional, Iterable, Any, TextIO
+from typing import Optional, Iterable, Iterator, Any
 import os
-import socket
 import json
+import threading
+import atexit
+import weakref
+import heapq
+import itertools
+import time
 from syslog import syslog, LOG_INFO
+from . import signalCommon
+from .signalAccountContext import SignalAccountContext
 from .signalAttachment import SignalAttachment
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, \
+from .signalCommon import __type_error__, \
     MessageTypes, \
-    __parse_signal_response__, \
-    __check_response_for_error__, RecipientTypes, SyncTypes, MessageFilter, __socket_create__, \
+    __check_response_for_error__, RecipientTypes, SyncTypes, MessageFilter, \
     SERVER_ADDRESS, \
-    __socket_connect__, __socket_close__, HONOUR_VIEW_ONCE, HONOUR_EXPIRY
+    __pooled_request__, HONOUR_VIEW_ONCE, HONOUR_EXPIRY, StorageTypes, phone_number_regex
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalGroupUpdate import SignalGroupUpdate
 from .signalMention import SignalMention
 from .signalMentions import SignalMentions
 from .signalMessage import SignalMessage
+from .signalMessageJournal import SignalMessageJournal
+from .signalMessageStore import SignalMessageStore
+from .signalPendingReceipts import SignalPendingReceipts
 from .signalPreview import SignalPreview
 from .signalQuote import SignalQuote
 from .signalReaction import SignalReaction
 from .signalReceipt import SignalReceipt
 from .signalReceivedMessage import SignalReceivedMessage
 from .signalSentMessage import SignalSentMessage
-from .signalSticker import SignalSticker, SignalStickerPacks
+from .signalSticker import SignalSticker
 from .signalStoryMessage import SignalStoryMessage
 from .signalSyncMessage import SignalSyncMessage
 from .signalTimestamp import SignalTimestamp
 from .signalTypingMessage import SignalTypingMessage
-from .signalExceptions import InvalidDataFile, ParameterError
+from .signalExceptions import ParameterError
 
 
 class SignalMessages(object):
     """Class to hold all messages, and act like a list."""
 
     def __init__(self,
-                 command_socket: socket.socket,
-                 config_path: str,
-                 account_id: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 account_path: str,
-                 this_device: SignalDevice,
-                 sticker_packs: SignalStickerPacks,
+                 context: SignalAccountContext,
                  do_load: bool = False,
                  ) -> None:
         """
         Initialize the messages object.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param account_id: str: This account's ID.
-        :param contacts: SignalContacts: This accounts SignalContacts object.
-        :param groups: SignalGroups: This accounts SignalGroups object.
-        :param devices: SignalDevices: This account SignalDevices object.
-        :param account_path: str: The full path to the account data directory.
-        :param this_device: SignalDevice: This device, SignalDevice object.
-        :param sticker_packs: SignalStickerPacks: The loaded SignalStickerPacks object.
+        :param context: SignalAccountContext: The account's shared context.
         :param do_load: bool: True, load from disk, False, do not.
         """
         # Super:
@@ -75,58 +64,59 @@ class SignalMessages(object):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
 
         # Argument checks:
-        if not isinstance(command_socket, socket.socket):
+        if not isinstance(context, SignalAccountContext):
             logger.critical("Raising TypeError:")
-            __type_error__("command_socket", "socket.socket", command_socket)
-        if not isinstance(config_path, str):
-            logger.critical("Raising TypeError:")
-            __type_error__("config_path", "str", config_path)
-        if not isinstance(account_id, str):
-            logger.critical("Raising TypeError:")
-            __type_error__("account_id", "str", account_id)
-        if not isinstance(contacts, SignalContacts):
-            logger.critical("Raising TypeError:")
-            __type_error__("contacts", "SignalContacts", contacts)
-        if not isinstance(devices, SignalDevices):
-            logger.critical("Raising TypeError:")
-            __type_error__("devices", "SignalDevices", devices)
-        if not isinstance(this_device, SignalDevice):
-            logger.critical("Raising TypeError:")
-            __type_error__("this_devices", "SignalDevice", this_device)
-        if not isinstance(sticker_packs, SignalStickerPacks):
-            logger.critical("Raising TypeError:")
-            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
+            __type_error__("context", "SignalAccountContext", context)
         if not isinstance(do_load, bool):
             logger.critical("Raising TypeError:")
             __type_error__("do_load", "bool", do_load)
 
         # Set internal vars:
-        self._command_socket: socket.socket = command_socket
-        """The socket to run commands on."""
-        self._config_path: str = config_path
-        """The full path to the signal-cli config directory."""
-        self._account_id: str = account_id
-        """This account's ID."""
-        self._contacts: SignalContacts = contacts
-        """This account's SignalContacts object."""
-        self._groups: SignalGroups = groups
-        """This account's SignalGroups object."""
-        self._devices: SignalDevices = devices
-        """This account's SignalDevices object."""
-        self._this_device: SignalDevice = this_device
-        """This device's SignalDevice object."""
-        self._sticker_packs: SignalStickerPacks = sticker_packs
-        """The loaded sticker packs object."""
-        self._file_path: str = os.path.join(account_path, "messages.json")
+        self._context: SignalAccountContext = context
+        """The account's shared context."""
+        self._file_path: str = os.path.join(context.account_path, "messages.json")
         """The full path to the messages.json file."""
-        self._sending: bool = False
-        """Are we currently sending a message?"""
-        self._unparsed_receipts: list[SignalReceipt] = []
-        """A list of un-parsed receipts."""
+        self._lock: threading.RLock = threading.RLock()
+        """Lock serialising access to the message lists, and the file."""
+        self._num_sending: int = 0
+        """The number of messages currently being sent."""
+        self._dirty: bool = False
+        """Are there changes not yet written to disk?"""
+        self._num_changes: int = 0
+        """The number of changes since the last write."""
+        self._flush_timer: Optional[threading.Timer] = None
+        """The timer writing the changes to disk, running while dirty."""
+        self._journal: SignalMessageJournal = SignalMessageJournal(
+            self._file_path, os.path.join(context.account_path, "messages.journal"), self.__resolve_key_id__)
+        """The journal, messages.json is its snapshot."""
+        self._journaling: bool = signalCommon.MESSAGES_STORAGE == StorageTypes.JOURNAL
+        """Are changes being journaled, rather than written behind?"""
+        self._store: Optional[SignalMessageStore] = None
+        """The SQLite store, if storing messages in SQLite."""
+        if signalCommon.MESSAGES_STORAGE == StorageTypes.SQLITE:
+            self._store = SignalMessageStore(os.path.join(context.account_path, "messages.db"),
+                                             context.account_id, self.__resolve_key_id__)
+        self._loaded: dict[str, SignalSentMessage | SignalReceivedMessage] = {}
+        """The messages loaded from the SQLite store, keyed by store key, so each is only created once."""
+        self._by_timestamp: dict[int, list[SignalSentMessage | SignalReceivedMessage]] = {}
+        """Index of the messages list by timestamp, in milliseconds."""
+        self._expiry_heap: list[tuple[int, int, SignalSentMessage | SignalReceivedMessage]] = []
+        """Min-heap of (expiration timestamp in milliseconds, sequence, message) for the messages that expire."""
+        self._expiry_sequence: Iterator[int] = itertools.count()
+        """Breaks ties in the expiry heap, so messages are never compared."""
+        self._expiry_timer: Optional[threading.Timer] = None
+        """Timer running the expunge when the next message expires."""
+        self._expiry_due: Optional[int] = None
+        """When the expiry timer is due, in milliseconds."""
+        self._auto_expunge: bool = False
+        """Are expired messages expunged when they expire? Set while receiving with do_expunge."""
+        self._unparsed_receipts: SignalPendingReceipts = SignalPendingReceipts(signalCommon.PENDING_RECEIPTS_TTL,
+                                                                               signalCommon.PENDING_RECEIPTS_MAX)
+        """The un-parsed receipts, waiting for their messages."""
 
         # Set external properties:
         self.messages: list[SignalSentMessage | SignalReceivedMessage] = []
-        """List of sent / received messages."""
+        """List of sent / received messages; When storing in SQLite, only those loaded from the store so far."""
         self.sync: list[SignalGroupUpdate | SignalSyncMessage] = []
         """List of sync messages."""
         self.typing: list[SignalTypingMessage] = []
@@ -135,13 +125,18 @@ class SignalMessages(object):
         """List of story messages."""
 
         # Do load:
-        if do_load:
-            if os.path.exists(self._file_path):
+        if self._store is not None:
+            logger.debug("Loading from SQLite.")
+            self.__load_store__()
+        elif do_load:
+            if os.path.exists(self._file_path) or os.path.exists(self._journal.journal_path):
                 logger.debug("Loading from disk.")
                 self.__load__()
             else:
                 logger.debug("Creating empty messages.json")
                 self.__save__()
+        # Make sure changes are written, and the store closed, at exit:
+        _ALL_MESSAGES.add(self)
         return
 
     ################################
@@ -161,8 +156,7 @@ class SignalMessages(object):
         }
         # Store messages: SignalSentMessage | SignalReceivedMessage
         for message in self.messages:
-            if (not message.is_expired or not HONOUR_EXPIRY) and (
-                    not message.view_once or not HONOUR_VIEW_ONCE):
+            if self.__is_stored__(message):
                 messages_dict["messages"].append(message.__to_dict__())
         # Store sync messages: (sync and group update)
         for message in self.sync:
@@ -187,99 +181,101 @@ class SignalMessages(object):
         :param from_dict: dict[str, Any]: The dict provided by __to_dict__().
         :return: None
         """
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__from_dict__.__name__)
+        # Loading a message saves the contacts, save them once at the end instead:
+        with self._context.contacts.bulk_load():
+            self.__load_lists__(from_dict)
+        return
 
+    def __load_lists__(self, from_dict: dict[str, Any]) -> None:
+        """
+        Load the lists from a JSON friendly dict.
+        :param from_dict: dict[str, Any]: The dict provided by __to_dict__().
+        :return: None
+        """
         # Load messages: SignalSentMessage | SignalReceivedMessage
         self.messages = []
+        self._by_timestamp = {}
         for message_dict in from_dict['messages']:
+            message = self.__message_from_dict__('messages', message_dict)
+            if message is not None:
+                self.messages.append(message)
+                self.__index_message__(message)
+        # Load sync messages: SignalGroupUpdate | SignalSyncMessage
+        self.sync = []
+        for message_dict in from_dict['syncMessages']:
+            message = self.__message_from_dict__('syncMessages', message_dict)
+            if message is not None:
+                self.sync.append(message)
+        # Load typing messages:
+        self.typing = []
+        for message_dict in from_dict['typingMessages']:
+            message = self.__message_from_dict__('typingMessages', message_dict)
+            if message is not None:
+                self.typing.append(message)
+        # Load Story Messages:
+        self.story = []
+        for message_dict in from_dict['storyMessages']:
+            message = self.__message_from_dict__('storyMessages', message_dict)
+            if message is not None:
+                self.story.append(message)
+
+        # Load unparsed receipts:
+        self._unparsed_receipts = SignalPendingReceipts(signalCommon.PENDING_RECEIPTS_TTL,
+                                                        signalCommon.PENDING_RECEIPTS_MAX)
+        for receipt_dict in from_dict['unparsedReceipts']:
+            receipt = SignalReceipt(context=self._context, from_dict=receipt_dict)
+            self._unparsed_receipts.add(receipt)
+        return
+
+    def __message_from_dict__(self, list_name: str, message_dict: dict[str, Any]) -> Optional[SignalMessage]:
+        """
+        Create a message from its dict in one of the lists created by __to_dict__().
+        :param list_name: str: The list the dict is from.
+        :param message_dict: dict[str, Any]: The message dict.
+        :return: Optional[SignalMessage]: The message, or None if the message type is invalid for the list.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__message_from_dict__.__name__)
+        message: Optional[SignalMessage] = None
+        if list_name == 'messages':
+            # SignalSentMessage | SignalReceivedMessage
             if message_dict['messageType'] == MessageTypes.SENT.value:
-                message = SignalSentMessage(command_socket=self._command_socket,
-                                            account_id=self._account_id,
-                                            config_path=self._config_path, contacts=self._contacts,
-                                            groups=self._groups, devices=self._devices,
-                                            this_device=self._this_device,
-                                            sticker_packs=self._sticker_packs,
+                message = SignalSentMessage(context=self._context,
                                             from_dict=message_dict)
 
             elif message_dict['messageType'] == MessageTypes.RECEIVED.value:
-                message = SignalReceivedMessage(command_socket=self._command_socket,
-                                                account_id=self._account_id,
-                                                config_path=self._config_path,
-                                                contacts=self._contacts, groups=self._groups,
-                                                devices=self._devices,
-                                                this_device=self._this_device,
-                                                sticker_packs=self._sticker_packs,
+                message = SignalReceivedMessage(context=self._context,
                                                 from_dict=message_dict)
             else:
                 warning_message: str = ("Invalid message type in messages from_dict: %s"
-                                        % from_dict['message_type'])
+                                        % message_dict['messageType'])
                 logger.warning(warning_message)
-                continue
-            self.messages.append(message)
-        # Load sync messages: SignalGroupUpdate | SignalSyncMessage
-        self.sync = []
-        for message_dict in from_dict['syncMessages']:
+        elif list_name == 'syncMessages':
+            # SignalGroupUpdate | SignalSyncMessage
             if message_dict['messageType'] == MessageTypes.GROUP_UPDATE.value:
-                message = SignalGroupUpdate(command_socket=self._command_socket,
-                                            account_id=self._account_id,
-                                            config_path=self._config_path, contacts=self._contacts,
-                                            groups=self._groups, devices=self._devices,
-                                            this_device=self._this_device, from_dict=message_dict)
+                message = SignalGroupUpdate(context=self._context, from_dict=message_dict)
             elif message_dict['messageType'] == MessageTypes.SYNC.value:
-                message = SignalSyncMessage(command_socket=self._command_socket,
-                                            account_id=self._account_id,
-                                            config_path=self._config_path, contacts=self._contacts,
-                                            groups=self._groups, devices=self._devices,
-                                            this_device=self._this_device,
-                                            sticker_packs=self._sticker_packs,
+                message = SignalSyncMessage(context=self._context,
                                             from_dict=message_dict)
             else:
                 warning_message: str = ("Invalid message type in for sync messages:"
                                         "message type: %i" % message_dict['messageType'])
                 logger.warning(warning_message)
-                continue
-            self.sync.append(message)
-        # Load typing messages:
-        self.typing = []
-        for message_dict in from_dict['typingMessages']:
+        elif list_name == 'typingMessages':
             if message_dict['messageType'] == MessageTypes.TYPING.value:
-                message = SignalTypingMessage(command_socket=self._command_socket,
-                                              account_id=self._account_id,
-                                              config_path=self._config_path,
-                                              contacts=self._contacts,
-                                              groups=self._groups, devices=self._devices,
-                                              this_device=self._this_device, from_dict=message_dict)
-                self.typing.append(message)
+                message = SignalTypingMessage(context=self._context, from_dict=message_dict)
             else:
                 warning_message: str = "Invalid message type in typing messages: MessageType: %i" \
                                        % message_dict['messageType']
                 logger.warning(warning_message)
-        # Load Story Messages:
-        self.story = []
-        for message_dict in from_dict['storyMessages']:
+        elif list_name == 'storyMessages':
             if message_dict['messageType'] == MessageTypes.STORY.value:
-                message = SignalStoryMessage(command_socket=self._command_socket,
-                                             account_id=self._account_id,
-                                             config_path=self._config_path, contacts=self._contacts,
-                                             groups=self._groups, devices=self._devices,
-                                             this_device=self._this_device, from_dict=message_dict)
-                self.story.append(message)
+                message = SignalStoryMessage(context=self._context, from_dict=message_dict)
             else:
                 warning_message: str = "Invalid message type in story messages: MessageType: %i" \
                                        % message_dict['messageType']
                 logger.warning(warning_message)
-
-        # Load unparsed receipts:
-        self._unparsed_receipts = []
-        for receipt_dict in from_dict['unparsedReceipts']:
-            receipt = SignalReceipt(command_socket=self._command_socket,
-                                    account_id=self._account_id,
-                                    config_path=self._config_path, contacts=self._contacts,
-                                    groups=self._groups, devices=self._devices,
-                                    this_device=self._this_device, from_dict=receipt_dict)
-
-        return
+        return message
 
     #################################
     # Load / save:
@@ -292,45 +288,381 @@ class SignalMessages(object):
         # Setup logging:
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__load__.__name__)
         logger.debug("Loading messages from disk.")
-        # Try to open the file:
-        try:
-            file_handle: TextIO = open(self._file_path, 'r')
-            messages_dict: dict[str, Any] = json.loads(file_handle.read())
-            file_handle.close()
-        except (OSError, FileNotFoundError, PermissionError) as e:
-            error_message = "Couldn't open '%s' for reading: %s" % (self._file_path, str(e.args))
-            logger.critical("Raising RuntimeError(%s)" % error_message)
-            raise RuntimeError(error_message)
-        except json.JSONDecodeError as e:
-            error_message = "Couldn't load json from '%s': %s" % (self._file_path, e.msg)
-            logger.critical("Raising InvalidDataFile(%s)" % error_message)
-            raise InvalidDataFile(error_message, e, self._file_path)
+        # Load messages.json, replaying any journal on top of it, raises RuntimeError, or InvalidDataFile:
+        messages_dict: dict[str, Any] = self._journal.load()
         # Load the dict:
         self.__from_dict__(messages_dict)
+        # If we're not journaling, fold a journal left from journaling into messages.json:
+        if not self._journaling and os.path.exists(self._journal.journal_path):
+            logger.debug("Compacting journal left behind.")
+            self._journal.compact(self.__to_dict__())
         logger.debug("Messages loaded from disk.")
         return
 
+    def __load_store__(self) -> None:
+        """
+        Load the small lists from the SQLite store, importing messages.json the first time.
+        The messages list is left to be loaded as messages are looked up.
+        :return: None
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__load_store__.__name__)
+        if self._store.count('messages') == 0 and self._store.count('syncMessages') == 0:
+            # Raises RuntimeError, or InvalidDataFile:
+            messages_dict: Optional[dict[str, Any]] = self._journal.load()
+            if messages_dict is not None:
+                logger.info("Importing messages.json into '%s'." % self._store.db_path)
+                self._store.import_dict(messages_dict)
+        self.__from_dict__({
+            'messages': [],
+            'syncMessages': self._store.load_list('syncMessages'),
+            'typingMessages': self._store.load_list('typingMessages'),
+            'storyMessages': self._store.load_list('storyMessages'),
+            'unparsedReceipts': self._store.load_list('unparsedReceipts'),
+        })
+        # Schedule the expunge of the messages in the store, if expunging:
+        if HONOUR_EXPIRY:
+            self.__arm_expiry_timer__()
+        return
+
+    def __query__(self, **criteria: Any) -> list[SignalSentMessage | SignalReceivedMessage]:
+        """
+        Look up messages in the SQLite store, loading the ones not loaded yet.
+        :param criteria: Any: The criteria to pass to SignalMessageStore.query().
+        :return: list[SignalSentMessage | SignalReceivedMessage]: The messages found.
+        """
+        found: list[SignalSentMessage | SignalReceivedMessage] = []
+        with self._lock, self._context.contacts.bulk_load():
+            for key, message_dict in self._store.query(**criteria):
+                message = self._loaded.get(key)
+                if message is None:
+                    message = self.__message_from_dict__('messages', message_dict)
+                    if message is None:
+                        continue
+                    self._loaded[key] = message
+                    self.messages.append(message)
+                    self.__index_message__(message)
+                found.append(message)
+        return found
+
     def __save__(self) -> None:
         """
         Save the messages to disk.
         :return: None
         :raises RuntimeError: On error opening the file for writing.
         """
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__save__.__name__)
-        logger.debug("Saving messages.")
-        # Create a messages Object, and json save string:
-        messages_dict: dict[str, Any] = self.__to_dict__()
-        json_messages_str: str = json.dumps(messages_dict, indent=4)
-        # Open the file and save the JSON:
+        with self._lock:
+            logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__save__.__name__)
+            logger.debug("Saving messages.")
+            # Create a messages Object, and json save string:
+            messages_dict: dict[str, Any] = self.__to_dict__()
+            json_messages_str: str = json.dumps(messages_dict, indent=4)
+            # Open the file and save the JSON:
+            try:
+                file_handle = open(self._file_path, 'w')
+                file_handle.write(json_messages_str)
+                file_handle.close()
+            except (OSError, FileNotFoundError, PermissionError) as e:
+                error_message = "Failed to open '%s' for writing: %s" % (self._file_path, str(e.args))
+                raise RuntimeError(error_message)
+            return
+
+    def __mark_dirty__(self) -> None:
+        """
+        Note a change to be written to disk; It's written once MESSAGES_FLUSH_BATCH changes have built up, or
+        MESSAGES_FLUSH_INTERVAL seconds after the first change, whichever comes first.
+        :return: None
+        """
+        with self._lock:
+            self._dirty = True
+            if self._store is not None:
+                return  # Written on flush().
+            self._num_changes += 1
+            flush_interval: float = signalCommon.MESSAGES_FLUSH_INTERVAL
+            if flush_interval <= 0 or self._num_changes >= signalCommon.MESSAGES_FLUSH_BATCH:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(flush_interval, self.__timed_flush__)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+        return
+
+    def __timed_flush__(self) -> None:
+        """
+        Flush timer callback, a failed write is logged, and retried on the next change.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__timed_flush__.__name__)
+        try:
+            self.flush()
+        except RuntimeError as e:
+            logger.warning("Failed to write messages: %s" % str(e.args))
+        return
+
+    def __changed__(self, message: SignalMessage) -> None:
+        """
+        Note a new or changed message; Journal it, or write the messages behind.
+        :param message: SignalMessage: The message.
+        :return: None
+        """
+        with self._lock:
+            if self._store is not None:
+                self._dirty = True
+                if self.__is_stored__(message):
+                    message_dict: dict[str, Any] = message.__to_dict__()
+                    self._store.put(self.__get_list_name__(message), message_dict)
+                    if self.__get_list_name__(message) == 'messages':
+                        self._loaded[SignalMessageJournal.__get_key__(message_dict, self.__resolve_key_id__)] = message
+                return
+            if not self._journaling:
+                self.__mark_dirty__()
+                return
+            self._dirty = True
+            if self.__is_stored__(message):
+                self._journal.put(self.__get_list_name__(message), message.__to_dict__())
+            self.__check_compact__()
+        return
+
+    def __removed__(self, messages: list[SignalMessage]) -> None:
+        """
+        Note removed messages; Journal them, or write the messages behind.
+        :param messages: list[SignalMessage]: The removed messages, all from the same list.
+        :return: None
+        """
+        with self._lock:
+            if self._store is not None:
+                message_dicts: list[dict[str, Any]] = [message.__to_dict__() for message in messages]
+                self._store.remove(self.__get_list_name__(messages[0]), message_dicts)
+                for message_dict in message_dicts:
+                    self._loaded.pop(SignalMessageJournal.__get_key__(message_dict, self.__resolve_key_id__), None)
+                return
+            if not self._journaling:
+                self.__mark_dirty__()
+                return
+            self._dirty = True
+            self._journal.remove(self.__get_list_name__(messages[0]), [message.__to_dict__() for message in messages])
+            self.__check_compact__()
+        return
+
+    def __receipts_changed__(self) -> None:
+        """
+        Note a change to the unparsed receipts; Journal them, or write the messages behind.
+        :return: None
+        """
+        with self._lock:
+            if self._store is not None:
+                self._store.set('unparsedReceipts', [receipt.__to_dict__() for receipt in self._unparsed_receipts])
+                return
+            if not self._journaling:
+                self.__mark_dirty__()
+                return
+            self._dirty = True
+            self._journal.set('unparsedReceipts', [receipt.__to_dict__() for receipt in self._unparsed_receipts])
+            self.__check_compact__()
+        return
+
+    def __check_compact__(self) -> None:
+        """
+        Compact the journal into a new messages.json once it's grown long enough.
+        :return: None
+        """
+        if self._journal.num_records >= signalCommon.MESSAGES_JOURNAL_COMPACT_SIZE:
+            self.flush()
+        return
+
+    @staticmethod
+    def __is_stored__(message: SignalMessage) -> bool:
+        """
+        Is the message written to disk? Expired and view once messages aren't, depending on settings.
+        :param message: SignalMessage: The message.
+        :return: bool: True if the message is stored.
+        """
+        if isinstance(message, (SignalSentMessage, SignalReceivedMessage)):
+            return (not message.is_expired or not HONOUR_EXPIRY) and (not message.view_once or not HONOUR_VIEW_ONCE)
+        return True
+
+    def __index_message__(self, message: SignalSentMessage | SignalReceivedMessage) -> None:
+        """
+        Add a message to the timestamp index.
+        :param message: SignalSentMessage | SignalReceivedMessage: The message to index.
+        :return: None
+        """
+        self._by_timestamp.setdefault(message.timestamp.timestamp, []).append(message)
+        message.__set_expiry_callback__(self.__schedule_expiry__)
+        if message.expiration_timestamp is not None:
+            self.__schedule_expiry__(message)
+        return
+
+    def __unindex_message__(self, message: SignalSentMessage | SignalReceivedMessage) -> None:
+        """
+        Remove a message from the timestamp index.
+        :param message: SignalSentMessage | SignalReceivedMessage: The message to remove.
+        :return: None
+        """
+        messages: Optional[list[SignalSentMessage | SignalReceivedMessage]] = \
+            self._by_timestamp.get(message.timestamp.timestamp)
+        if messages is None:
+            return
+        for index, indexed_message in enumerate(messages):
+            if indexed_message is message:
+                del messages[index]
+                break
+        if len(messages) == 0:
+            del self._by_timestamp[message.timestamp.timestamp]
+        message.__set_expiry_callback__(None)
+        return
+
+    def __is_indexed__(self, message: SignalSentMessage | SignalReceivedMessage) -> bool:
+        """
+        Is a message in the messages list, by way of the timestamp index?
+        :param message: SignalSentMessage | SignalReceivedMessage: The message to check.
+        :return: bool: True if the message is in the list.
+        """
+        for indexed_message in self._by_timestamp.get(message.timestamp.timestamp, []):
+            if indexed_message is message:
+                return True
+        return False
+
+    ##################################
+    # Expiry:
+    ##################################
+    def __schedule_expiry__(self, message: SignalSentMessage | SignalReceivedMessage) -> None:
+        """
+        Schedule a message to be expunged when it expires; Called when the message's expiry is set.
+        :param message: SignalSentMessage | SignalReceivedMessage: The message.
+        :return: None
+        """
+        if message.expiration_timestamp is None or not HONOUR_EXPIRY:
+            return
+        with self._lock:
+            expires: int = message.expiration_timestamp.timestamp
+            heapq.heappush(self._expiry_heap, (expires, next(self._expiry_sequence), message))
+            if self._expiry_due is None or expires < self._expiry_due:
+                self.__arm_expiry_timer__()
+        return
+
+    def __get_next_expiry__(self) -> Optional[int]:
+        """
+        Get when the next message expires.
+        :return: Optional[int]: The timestamp in milliseconds, or None if nothing expires.
+        """
+        next_expiry: Optional[int] = None
+        if len(self._expiry_heap) > 0:
+            next_expiry = self._expiry_heap[0][0]
+        if self._store is not None:
+            # Messages in the store that aren't loaded expire too:
+            store_expiry: Optional[int] = self._store.next_expiry()
+            if store_expiry is not None and (next_expiry is None or store_expiry < next_expiry):
+                next_expiry = store_expiry
+        return next_expiry
+
+    def __arm_expiry_timer__(self) -> None:
+        """
+        Start the expiry timer for the next message to expire, replacing any running timer; Only runs while
+        auto_expunge is set.
+        :return: None
+        """
+        with self._lock:
+            next_expiry: Optional[int] = self.__get_next_expiry__() if self._auto_expunge else None
+            if next_expiry == self._expiry_due:
+                return
+            if self._expiry_timer is not None:
+                self._expiry_timer.cancel()
+                self._expiry_timer = None
+            self._expiry_due = next_expiry
+            if next_expiry is None:
+                return
+            delay: float = max(0.0, (next_expiry / 1000) - time.time())
+            self._expiry_timer = threading.Timer(delay, self.__timed_expunge__)
+            self._expiry_timer.daemon = True
+            self._expiry_timer.start()
+        return
+
+    def __timed_expunge__(self) -> None:
+        """
+        Expiry timer callback, a failed expunge is logged, and retried on the next expunge.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__timed_expunge__.__name__)
+        with self._lock:
+            self._expiry_timer = None
+            self._expiry_due = None
+            if not self._auto_expunge:
+                return
         try:
-            file_handle = open(self._file_path, 'w')
-            file_handle.write(json_messages_str)
-            file_handle.close()
-        except (OSError, FileNotFoundError, PermissionError) as e:
-            error_message = "Failed to open '%s' for writing: %s" % (self._file_path, str(e.args))
-            raise RuntimeError(error_message)
+            self.do_expunge()
+        except RuntimeError as e:
+            logger.warning("Failed to expunge messages: %s" % str(e.args))
         return
 
+    def __is_in_conversation__(self,
+                               message: SignalSentMessage | SignalReceivedMessage,
+                               target: SignalContact | SignalGroup,
+                               ) -> bool:
+        """
+        Is a message in the conversation with a contact or group, as get_conversation() decides it?
+        :param message: SignalSentMessage | SignalReceivedMessage: The message to check.
+        :param target: SignalContact | SignalGroup: The contact or group.
+        :return: bool: True if the message is in the conversation.
+        """
+        if isinstance(target, SignalGroup):
+            return message.recipient.get_id() == target.get_id()
+        self_contact = self._context.contacts.get_self()
+        if message.sender == self_contact and message.recipient == target:
+            return True
+        return message.sender == target and message.recipient == self_contact
+
+    @staticmethod
+    def __get_filter_criteria__(message_filter: int) -> dict[str, bool]:
+        """
+        Get the SignalMessageStore.query() criteria for MessageFilter flags.
+        :param message_filter: int: The MessageFilter flags.
+        :return: dict[str, bool]: The criteria.
+        """
+        criteria: dict[str, bool] = {}
+        if message_filter & MessageFilter.READ:
+            criteria['is_read'] = True
+        elif message_filter & MessageFilter.NOT_READ:
+            criteria['is_read'] = False
+        if message_filter & MessageFilter.VIEWED:
+            criteria['is_viewed'] = True
+        elif message_filter & MessageFilter.NOT_VIEWED:
+            criteria['is_viewed'] = False
+        if message_filter & MessageFilter.DELIVERED:
+            criteria['is_delivered'] = True
+        elif message_filter & MessageFilter.NOT_DELIVERED:
+            criteria['is_delivered'] = False
+        return criteria
+
+    @staticmethod
+    def __get_list_name__(message: SignalMessage) -> str:
+        """
+        Get the name of the list in the messages dict a message is stored in.
+        :param message: SignalMessage: The message.
+        :return: str: The list name.
+        """
+        if isinstance(message, (SignalGroupUpdate, SignalSyncMessage)):
+            return 'syncMessages'
+        elif isinstance(message, SignalTypingMessage):
+            return 'typingMessages'
+        elif isinstance(message, SignalStoryMessage):
+            return 'storyMessages'
+        return 'messages'
+
+    def __resolve_key_id__(self, contact_id: str) -> str:
+        """
+        Get the id to key a message by for a sender or recipient id: The contact's uuid if it's known, as a contact's
+        id changes from its uuid to its number once the number is learned.
+        :param contact_id: str: The id stored in the message dict.
+        :return: str: The contact's uuid, or the id as is for groups, unknown contacts, and contacts without a uuid.
+        """
+        if self._context.contacts is None or phone_number_regex.match(contact_id) is None:
+            return contact_id
+        contact: Optional[SignalContact] = self._context.contacts.get_by_number(contact_id)
+        if contact is None or contact.uuid is None:
+            return contact_id
+        return contact.uuid
+
     ##################################
     # Helpers:
     ##################################
@@ -340,36 +672,33 @@ class SignalMessages(object):
         :param reaction: SignalReaction: The reaction to parse.
         :return: bool: True if the reaction was parsed, False if not.
         """
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' +
-                                                   self.__parse_reaction__.__name__)
-
-        # Get the messages from the recipients:
-        search_messages: list[SignalMessage] = []
-        if reaction.recipient_type == RecipientTypes.CONTACT:
-            messages = self.get_by_sender(reaction.recipient)
-            search_messages.extend(messages)
-        elif reaction.recipient_type == RecipientTypes.GROUP:
-            messages = self.get_by_recipient(reaction.recipient)
-            search_messages.extend(messages)
-        else:
-            # Invalid recipient type:
-            error_message = "Invalid reaction cannot parse."
-            logger.critical("Raising RuntimeError(%s)." % error_message)
-            raise RuntimeError(error_message)
-        # Find the message that was reacted to:
-        reacted_message: Optional[SignalSentMessage | SignalReceivedMessage | SignalMessage] = None
-        for message in search_messages:
-            if message.sender == reaction.target_author:
-                if message.timestamp == reaction.target_timestamp:
+        with self._lock:
+            # Setup logging:
+            logger: logging.Logger = logging.getLogger(__name__ + '.' +
+                                                       self.__parse_reaction__.__name__)
+
+            # Check the recipient type:
+            if reaction.recipient_type not in (RecipientTypes.CONTACT, RecipientTypes.GROUP):
+                # Invalid recipient type:
+                error_message = "Invalid reaction cannot parse."
+                logger.critical("Raising RuntimeError(%s)." % error_message)
+                raise RuntimeError(error_message)
+            # Find the message that was reacted to, from the messages with its timestamp:
+            reacted_message: Optional[SignalSentMessage | SignalReceivedMessage | SignalMessage] = None
+            for message in self.get_by_timestamp(reaction.target_timestamp):
+                if message.sender != reaction.target_author:
+                    continue
+                if reaction.recipient_type == RecipientTypes.CONTACT and message.sender == reaction.recipient:
                     reacted_message = message
-        # If the message isn't in history, do nothing:
-        if reacted_message is None:
-            return False
-        # Have the message add / change / remove the reaction:
-        reacted_message.reactions.__parse__(reaction)
-        self.__save__()  # save the results.
-        return True
+                elif reaction.recipient_type == RecipientTypes.GROUP and message.recipient == reaction.recipient:
+                    reacted_message = message
+            # If the message isn't in history, do nothing:
+            if reacted_message is None:
+                return False
+            # Have the message add / change / remove the reaction:
+            reacted_message.reactions.__parse__(reaction)
+            self.__changed__(reacted_message)
+            return True
 
     def __parse_receipt__(self, receipt: SignalReceipt) -> None:
         """
@@ -377,29 +706,25 @@ class SignalMessages(object):
         :param receipt: SignalReceipt: The receipt message to parse.
         :return: None
         """
-        # Mark seen:
-        receipt.sender.__seen__(receipt.timestamp)
-        receipt.device.__seen__(receipt.timestamp)
-        receipt.recipient.__seen__(receipt.timestamp)
-        # Build a list of unparsed receipts
-        receipts = [receipt, *self._unparsed_receipts]
-        self._unparsed_receipts = []
-        should_save: bool = False
-        for _receipt in receipts:
-            # Parse receipts:
-            receipt_parsed: bool = False
-            for message in self.get_sent():
-                for timestamp in _receipt.timestamps:
-                    if message.timestamp == timestamp:
-                        message.__parse_receipt__(_receipt)
-                        receipt_parsed = True
-            if receipt_parsed:
-                should_save = True
-            else:
-                self._unparsed_receipts.append(_receipt)
-        if should_save:
-            self.__save__()
-        return
+        with self._lock:
+            # Mark seen:
+            receipt.sender.__seen__(receipt.timestamp)
+            receipt.device.__seen__(receipt.timestamp)
+            receipt.recipient.__seen__(receipt.timestamp)
+            # Parse the receipt, keeping it for later if its messages aren't here yet:
+            changed_messages: list[SignalSentMessage] = []
+            for timestamp in receipt.timestamps:
+                for message in self.get_by_timestamp(timestamp):
+                    if isinstance(message, SignalSentMessage):
+                        message.__parse_receipt__(receipt)
+                        if message not in changed_messages:
+                            changed_messages.append(message)
+            for message in changed_messages:
+                self.__changed__(message)
+            if len(changed_messages) == 0:
+                self._unparsed_receipts.add(receipt)
+                self.__receipts_changed__()
+            return
 
     def __parse_read_message_sync__(self, sync_message: SignalSyncMessage) -> None:
         """
@@ -413,19 +738,15 @@ class SignalMessages(object):
         sync_message.recipient.__seen__(sync_message.timestamp)
 
         # Parse the read message sync message:
-        should_save: bool = False
         for contact, timestamp in sync_message.read_messages:
-            search_messages = self.get_by_sender(contact)
-            for message in search_messages:
-                if message.timestamp == timestamp:
+            for message in self.get_by_timestamp(timestamp):
+                if message.sender == contact:
                     if not message.is_read:
-                        should_save = True
                         if isinstance(message, SignalReceivedMessage):
                             message.mark_read(when=sync_message.timestamp, send_receipt=False)
                         else:
                             message.mark_read(when=sync_message.timestamp)
-        if should_save:
-            self.__save__()
+                        self.__changed__(message)
         return
 
     def __parse_sent_message_sync__(self, sync_message: SignalSyncMessage) -> None:
@@ -434,21 +755,14 @@ class SignalMessages(object):
         :param sync_message: SyncMessage: The sync message to parse.
         :return: None
         """
-        message = SignalSentMessage(command_socket=self._command_socket,
-                                    account_id=self._account_id, config_path=self._config_path,
-                                    contacts=self._contacts, groups=self._groups,
-                                    devices=self._devices, this_device=self._this_device,
-                                    sticker_packs=self._sticker_packs,
+        message = SignalSentMessage(context=self._context,
                                     raw_message=sync_message.raw_sent_message)
         message.mark_delivered()
         self.append(message)
         return
 
     def __parse_sent_reaction_sync__(self, sync_message: SignalSyncMessage) -> None:
-        reaction = SignalReaction(command_socket=self._command_socket, account_id=self._account_id,
-                                  config_path=self._config_path, contacts=self._contacts,
-                                  groups=self._groups, devices=self._devices,
-                                  this_device=self._this_device,
+        reaction = SignalReaction(context=self._context,
                                   sync_message=sync_message.raw_sent_message)
         self.__parse_reaction__(reaction)
         return
@@ -460,22 +774,22 @@ class SignalMessages(object):
         :return: None
         :raises TypeError: On an invalid SignalSyncMessage type.
         """
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' +
-                                                   self.__parse_sync_message__.__name__)
-        if sync_message.sync_type == SyncTypes.READ_MESSAGES:
-            self.__parse_read_message_sync__(sync_message)
-        elif sync_message.sync_type == SyncTypes.SENT_MESSAGES:
-            self.__parse_sent_message_sync__(sync_message)
-        elif sync_message.sync_type == SyncTypes.SENT_REACTION:
-            self.__parse_sent_reaction_sync__(sync_message)
-        else:
-            error_message = ("Can only parse SyncTypes.READ_MESSAGES, SyncTypes.SENT_MESSAGES,"
-                             " and SyncTypes.SENT_REACTION, not: %s" % str(sync_message.sync_type))
-            logger.critical("Raising TypeError(%s)." % error_message)
-            raise TypeError(error_message)
-        self.__save__()
-        return
+        with self._lock:
+            # Setup logging:
+            logger: logging.Logger = logging.getLogger(__name__ + '.' +
+                                                       self.__parse_sync_message__.__name__)
+            if sync_message.sync_type == SyncTypes.READ_MESSAGES:
+                self.__parse_read_message_sync__(sync_message)
+            elif sync_message.sync_type == SyncTypes.SENT_MESSAGES:
+                self.__parse_sent_message_sync__(sync_message)
+            elif sync_message.sync_type == SyncTypes.SENT_REACTION:
+                self.__parse_sent_reaction_sync__(sync_message)
+            else:
+                error_message = ("Can only parse SyncTypes.READ_MESSAGES, SyncTypes.SENT_MESSAGES,"
+                                 " and SyncTypes.SENT_REACTION, not: %s" % str(sync_message.sync_type))
+                logger.critical("Raising TypeError(%s)." % error_message)
+                raise TypeError(error_message)
+            return
 
     ##################################
     # Getters:
@@ -492,7 +806,9 @@ class SignalMessages(object):
         if not isinstance(timestamp, SignalTimestamp):
             logger.critical("Raising TypeError:")
             __type_error__("timestamp", "SignalTimestamp", timestamp)
-        return [message for message in self.messages if message.timestamp == timestamp]
+        if self._store is not None:
+            return self.__query__(timestamp=timestamp.timestamp)
+        return list(self._by_timestamp.get(timestamp.timestamp, []))
 
     def get_by_recipient(self, recipient: SignalGroup | SignalContact) -> list[SignalMessage]:
         """
@@ -504,6 +820,8 @@ class SignalMessages(object):
         if not isinstance(recipient, SignalContact) and not isinstance(recipient, SignalGroup):
             logger.critical("Raising TypeError:")
             __type_error__("recipient", "SignalContact | SignalGroup", recipient)
+        if self._store is not None:
+            return self.__query__(recipient=recipient.get_id())
         return [message for message in self.messages if message.recipient == recipient]
 
     def get_by_sender(self, sender: SignalContact) -> list[SignalMessage]:
@@ -516,13 +834,19 @@ class SignalMessages(object):
         if not isinstance(sender, SignalContact):
             logger.critical("Raising TypeError:")
             __type_error__("sender", "SignalContact", sender)
+        if self._store is not None:
+            return self.__query__(sender=sender.get_id())
         messages = [message for message in self.messages if message.sender == sender]
         return messages
 
     def get_received_messages(self) -> list[SignalReceivedMessage]:
+        if self._store is not None:
+            return self.__query__(message_type=MessageTypes.RECEIVED)
         return [message for message in self.messages if isinstance(message, SignalReceivedMessage)]
 
     def get_sent_messages(self) -> list[SignalSentMessage]:
+        if self._store is not None:
+            return self.__query__(message_type=MessageTypes.SENT)
         return [message for message in self.messages if isinstance(message, SignalSentMessage)]
 
     def get_received_unread(self, sender: Optional[SignalContact] = None) -> list[SignalMessage]:
@@ -543,6 +867,9 @@ class SignalMessages(object):
         will be considered.
 
         """
+        if self._store is not None:
+            return self.__query__(message_type=MessageTypes.RECEIVED, is_read=False,
+                                  sender=sender.get_id() if sender is not None else None)
         if sender is None:
             messages = self.get_received_messages()
         else:
@@ -552,6 +879,9 @@ class SignalMessages(object):
     def get_sent_unread(self,
                         recipient: Optional[SignalContact | SignalGroup] = None,
                         ) -> list[SignalMessage]:
+        if self._store is not None:
+            return self.__query__(message_type=MessageTypes.SENT, is_read=False,
+                                  recipient=recipient.get_id() if recipient is not None else None)
         if recipient is None:
             messages = self.get_sent_messages()
         else:
@@ -572,9 +902,14 @@ class SignalMessages(object):
         :raises: TypeError: If target is not a SignalContact or SignalGroup object.
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.get_conversation.__name__)
+        if self._store is not None:
+            if not isinstance(target, (SignalContact, SignalGroup)):
+                logger.critical("Raising TypeError:")
+                __type_error__("target", "SignalContact | SignalGroup", target)
+            return self.__query__(conversation=target.get_id(), **self.__get_filter_criteria__(message_filter))
         return_messages = []
         if isinstance(target, SignalContact):
-            self_contact = self._contacts.get_self()
+            self_contact = self._context.contacts.get_self()
             for message in self.messages:
                 if message.sender == self_contact and message.recipient == target:
                     return_messages.append(message)
@@ -651,9 +986,12 @@ class SignalMessages(object):
             __type_error__("timestamp", "SignalTimestamp", timestamp)
 
         # Find Message:
-        search_messages = self.get_conversation(target_conversation)
-        for message in search_messages:
-            if message.sender == target_author and message.timestamp == target_timestamp:
+        if self._store is not None:
+            found = self.__query__(conversation=target_conversation.get_id(), sender=target_author.get_id(),
+                                   timestamp=target_timestamp.timestamp, limit=1)
+            return found[0] if len(found) > 0 else None
+        for message in self.get_by_timestamp(target_timestamp):
+            if message.sender == target_author and self.__is_in_conversation__(message, target_conversation):
                 return message
         return None
 
@@ -673,15 +1011,13 @@ class SignalMessages(object):
             logger.critical("Raising TypeError:")
             __type_error__("quote", "SignalQuote", quote)
         # Search messages in conversation:
-        for message in self.get_conversation(quote.conversation):
-            if message.sender == quote.author:
-                if message.timestamp == quote.timestamp:
-                    return message
-        return None
+        return self.find(quote.author, quote.timestamp, quote.conversation)
 
     def get_mentioned(self, contact: Optional[SignalContact]) -> list[SignalReceivedMessage]:
         if contact is None:
-            contact = self._contacts.get_self()
+            contact = self._context.contacts.get_self()
+        if self._store is not None:
+            return self.__query__(message_type=MessageTypes.RECEIVED, mentioned=contact.get_id())
 
         messages: list[SignalReceivedMessage] = self.get_received_messages()
         mentioned: list[SignalReceivedMessage] = []
@@ -696,19 +1032,78 @@ class SignalMessages(object):
     ##################################
     # Methods:
     ##################################
-    def do_expunge(self) -> None:
+    def flush(self) -> None:
         """
-        Expunge expired messages.
+        Write any changes to disk now.
         :return: None
+        :raises RuntimeError: On error opening the file for writing.
         """
-        saved_messages: list[SignalSentMessage | SignalReceivedMessage] = []
-        for message in self.messages:
-            if not message.is_expired:
-                saved_messages.append(message)
-        self.messages = saved_messages
-        self.__save__()
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            if self._store is not None:
+                # Messages loaded from the store may have been changed directly, store them all again:
+                self._store.put_many('messages', [message.__to_dict__() for message in self.messages
+                                                  if self.__is_stored__(message)])
+            elif self._journaling:
+                self._journal.compact(self.__to_dict__())
+            else:
+                self.__save__()
+            self._dirty = False
+            self._num_changes = 0
         return
 
+    def close(self) -> None:
+        """
+        Write any changes to disk, stop the expiry timer, and close the journal, or the SQLite store; When storing in
+        SQLite, the messages can't be changed afterwards.
+        :return: None
+        :raises RuntimeError: On error writing the changes.
+        """
+        with self._lock:
+            self.flush()
+            if self._expiry_timer is not None:
+                self._expiry_timer.cancel()
+                self._expiry_timer = None
+                self._expiry_due = None
+            self._journal.close()
+            if self._store is not None:
+                self._store.close()
+            _ALL_MESSAGES.discard(self)
+        return
+
+    def do_expunge(self) -> None:
+        """
+        Expunge the messages that are due to expire, writing the change once; Only the front of the expiry schedule is
+        looked at, so this is cheap when nothing is due.
+        :return: None
+        """
+        with self._lock:
+            now: float = time.time()
+            expired_messages: list[SignalSentMessage | SignalReceivedMessage] = []
+            while len(self._expiry_heap) > 0 and self._expiry_heap[0][0] <= now * 1000:
+                expires, _, message = heapq.heappop(self._expiry_heap)
+                # Skip entries for messages since removed, or whose expiry has changed:
+                if message.expiration_timestamp is None or message.expiration_timestamp.timestamp != expires:
+                    continue
+                if not self.__is_indexed__(message):
+                    continue
+                expired_messages.append(message)
+                self.__unindex_message__(message)
+            if len(expired_messages) > 0:
+                expired_ids: set[int] = {id(message) for message in expired_messages}
+                self.messages = [message for message in self.messages if id(message) not in expired_ids]
+                self.__removed__(expired_messages)
+            if self._store is not None:
+                # The store removes the expired messages that aren't loaded:
+                for key in self._store.remove_expired(int(now * 1000)):
+                    self._loaded.pop(key, None)
+            self.__arm_expiry_timer__()
+            return
+
     def append(self, message: SignalMessage) -> None:
         """
         Append a message to the appropriate message list.
@@ -716,77 +1111,59 @@ class SignalMessages(object):
         :returns: None
         :raises TypeError: If 'message' is not a SignalMessage.
         """
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.append.__name__)
-        # Type check message:
-        if not isinstance(message, (
-                SignalSentMessage, SignalReceivedMessage, SignalGroupUpdate, SignalSyncMessage,
-                SignalTypingMessage)):
-            logger.critical("Raising TypeError:")
-            __type_error__("message", "SignalSentMessage | SignalReceivedMessage | "
-                                      "SignalGroupUpdate | SignalSyncMessage | SignalTypingMessage",
-                           message)
-
-        # Mark seen:
-        message.sender.__seen__(message.timestamp)
-        message.recipient.__seen__(message.timestamp)
-        message.device.__seen__(message.timestamp)
-        # Sort the message based on the message type:
-        if isinstance(message, (SignalSentMessage, SignalReceivedMessage)):
-            self.messages.append(message)
-        elif isinstance(message, (SignalGroupUpdate, SignalSyncMessage)):
-            self.sync.append(message)
-        elif isinstance(message, SignalTypingMessage):
-            self.typing.append(message)
-
-        # Save the messages.
-        self.__save__()
-        return
-
-    def send_message(self,
-                     recipients: Iterable[
-                                     SignalContact | SignalGroup] | SignalContact | SignalGroup,
-                     body: Optional[str] = None,
-                     attachments: Optional[
-                         Iterable[SignalAttachment | str] | SignalAttachment | str] = None,
-                     mentions: Optional[
-                         Iterable[SignalMention] | SignalMentions | SignalMention] = None,
-                     quote: Optional[SignalQuote] = None,
-                     sticker: Optional[SignalSticker] = None,
-                     previews: Optional[Iterable[SignalPreview]] = None,
-    ) -> tuple[tuple[bool, SignalContact | SignalGroup, str | SignalSentMessage], ...]:
+        with self._lock:
+            # Setup logging:
+            logger: logging.Logger = logging.getLogger(__name__ + '.' + self.append.__name__)
+            # Type check message:
+            if not isinstance(message, (
+                    SignalSentMessage, SignalReceivedMessage, SignalGroupUpdate, SignalSyncMessage,
+                    SignalTypingMessage)):
+                logger.critical("Raising TypeError:")
+                __type_error__("message", "SignalSentMessage | SignalReceivedMessage | "
+                                          "SignalGroupUpdate | SignalSyncMessage | SignalTypingMessage",
+                               message)
+
+            # Mark seen:
+            message.sender.__seen__(message.timestamp)
+            message.recipient.__seen__(message.timestamp)
+            message.device.__seen__(message.timestamp)
+            # Sort the message based on the message type:
+            if isinstance(message, (SignalSentMessage, SignalReceivedMessage)):
+                self.messages.append(message)
+                self.__index_message__(message)
+                # Apply the receipts that arrived before the message:
+                if isinstance(message, SignalSentMessage) and len(self._unparsed_receipts) > 0:
+                    receipts: list[SignalReceipt] = self._unparsed_receipts.claim(message.timestamp)
+                    for receipt in receipts:
+                        message.__parse_receipt__(receipt)
+                    if len(receipts) > 0:
+                        self.__receipts_changed__()
+            elif isinstance(message, (SignalGroupUpdate, SignalSyncMessage)):
+                self.sync.append(message)
+            elif isinstance(message, SignalTypingMessage):
+                self.typing.append(message)
 
+            # Save the messages.
+            self.__changed__(message)
+            return
+
+    def __prepare_send__(self,
+                         recipients: Iterable[SignalContact | SignalGroup] | SignalContact | SignalGroup,
+                         body: Optional[str],
+                         attachments: Optional[Iterable[SignalAttachment | str] | SignalAttachment | str],
+                         mentions: Optional[Iterable[SignalMention] | SignalMentions | SignalMention],
+                         quote: Optional[SignalQuote],
+                         sticker: Optional[SignalSticker],
+                         previews: Optional[Iterable[SignalPreview]],
+                         ) -> tuple[dict[str, Any], dict[str, Any]]:
         """
-        Send a message.
-        :param recipients: Iterable[SignalContact | SignalGroup] | SignalContact | SignalGroup:
-        The recipients of the message.
-        :param body: Optional[str]: The body of the message.
-        :param attachments: Optional[Iterable[SignalAttachment | str] | SignalAttachment | str ]:
-        Attachments to the message.
-        :param mentions: Optional[Iterable[SignalMention] | SignalMentions | SignalMention]:
-        Mentions in the message.
-        :param quote: Optional[SignalQuote]: A SignalQuote object for the message.
-        :param sticker: Optional[SignalSticker]: A sticker to send.
-        :param previews: Optional[Iterable[SignalPreview]]: A preview for the url in the message,
-        url must appear in the body of the message.
-        :returns: tuple[tuple[bool, SignalContact | SignalGroup, str | SentMessage]]: A tuple of
-        tuples, the outer-tuple is one element per message sent.
-        The inner tuple's first element, a bool, is True or False for if the message was sent
-        successfully or not.
-        The second element of the inner tuple is the SignalContact | SignalGroup the message was
-        sent to.
-        The third element of the inner tuple, a str | SentMessage, is either a string containing an
-        error message when sending fails, or the SentMessage object on sending success.
-        :raises: TypeError: If a recipient is not a SignalContact or SignalGroup object, if body is
-        not a string, if attachments is not an SignalAttachment object or a string, or a list of
-        SignalAttachment objects, or strings, if mentions is not a list of SignalMention objects,
-        or not a SignalMentions object, if quote is not a SignalQuote object, if sticker is not a
-        SignalSticker object, or if previews is not an Optional[Iterable[SignalPreview] object.
-        :raises: ValueError: If body is an empty string, if attachments is an empty list, or if
-        mentions is an empty list.
+        Validate the parameters of a message, and build the send command object.
+        See send_message() for the parameters, and the exceptions raised.
+        :return: tuple[dict[str, Any], dict[str, Any]]: The send command object, and the send context to pass to
+            __parse_send_response__().
         """
         # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.send_message.__name__)
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__prepare_send__.__name__)
 
         # Validate recipients:
         recipient_type: Optional[RecipientTypes] = None
@@ -840,7 +1217,7 @@ class SignalMessages(object):
                 target_attachments = [attachments]
             elif isinstance(attachments, str):
                 target_attachments = [
-                    SignalAttachment(config_path=self._config_path, local_path=attachments)]
+                    SignalAttachment(config_path=self._context.config_path, local_path=attachments)]
             elif isinstance(attachments, Iterable):
                 target_attachments = []
                 for i, attachment in enumerate(attachments):
@@ -851,7 +1228,7 @@ class SignalMessages(object):
                         target_attachments.append(attachment)
                     else:
                         target_attachments.append(
-                            SignalAttachment(config_path=self._config_path, local_path=attachment))
+                            SignalAttachment(config_path=self._context.config_path, local_path=attachment))
             else:
                 logger.critical("Raising TypeError:")
                 __type_error__("attachments",
@@ -933,7 +1310,7 @@ class SignalMessages(object):
             "id": 2,
             "method": "send",
             "params": {
-                "account": self._account_id,
+                "account": self._context.account_id,
             }
         }
 
@@ -997,121 +1374,185 @@ class SignalMessages(object):
                 preview_list.append(preview_dict)
             send_command_obj['params']['previews'] = preview_list
 
-        # Create json command string:
-        json_command_str = json.dumps(send_command_obj) + '\n'
+        # Keep what we need to parse the response:
+        send_context: dict[str, Any] = {
+            'recipient_type': recipient_type,
+            'target_recipients': target_recipients,
+            'body': body,
+            'target_attachments': target_attachments,
+            'target_mentions': target_mentions,
+            'quote': quote,
+            'sticker': sticker,
+            'previews': previews,
+        }
+        return send_command_obj, send_context
 
-        # Mark system as sending:
-        self._sending = True
-        # Create socket:
-        sock = __socket_create__()
-        __socket_connect__(sock)
-        # Communicate with signal:
-        __socket_send__(sock, json_command_str)
-        response_str = __socket_receive_blocking__(sock)
-        __socket_close__(sock)
-        # Mark system as finished sending
-        self._sending = False
-
-        # Parse response and check for error:
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
-        # TODO: Check if there are other errors somehow.
-        error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
-
-        # Check for error:
-        if error_occurred:
-            return_value: list[tuple[bool, SignalContact | SignalGroup, str]] = []
-            error_message: str = "signal error while sending message: Code: %i, Message: %s" \
-                                 % (signal_code, signal_message)
-            if recipient_type == RecipientTypes.CONTACT:
-                for recipient in target_recipients:
-                    return_value.append((False, recipient, error_message))
-            elif recipient_type == RecipientTypes.GROUP:
-                for group in target_recipients:
-                    for recipient in group.members:
+    def __parse_send_response__(self,
+                                response_obj: dict[str, Any],
+                                send_context: dict[str, Any],
+                                ) -> tuple[tuple[bool, SignalContact | SignalGroup, str | SignalSentMessage], ...]:
+        """
+        Parse the response to a send command, storing the sent messages.
+        :param response_obj: dict[str, Any]: The parsed response from signal.
+        :param send_context: dict[str, Any]: The send context returned by __prepare_send__().
+        :return: tuple[tuple[bool, SignalContact | SignalGroup, str | SignalSentMessage], ...]: See send_message().
+        """
+        with self._lock:
+            recipient_type: RecipientTypes = send_context['recipient_type']
+            target_recipients: list[SignalContact | SignalGroup] = send_context['target_recipients']
+            body: Optional[str] = send_context['body']
+            target_attachments: Optional[list[SignalAttachment]] = send_context['target_attachments']
+            target_mentions: Optional[list[SignalMention] | SignalMentions] = send_context['target_mentions']
+            quote: Optional[SignalQuote] = send_context['quote']
+            sticker: Optional[SignalSticker] = send_context['sticker']
+            previews: Optional[Iterable[SignalPreview]] = send_context['previews']
+
+            # TODO: Check if there are other errors somehow.
+            error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
+
+            # Check for error:
+            if error_occurred:
+                return_value: list[tuple[bool, SignalContact | SignalGroup, str]] = []
+                error_message: str = "signal error while sending message: Code: %i, Message: %s" \
+                                     % (signal_code, signal_message)
+                if recipient_type == RecipientTypes.CONTACT:
+                    for recipient in target_recipients:
                         return_value.append((False, recipient, error_message))
-            return tuple(return_value)
+                elif recipient_type == RecipientTypes.GROUP:
+                    for group in target_recipients:
+                        for recipient in group.members:
+                            return_value.append((False, recipient, error_message))
+                return tuple(return_value)
+
+            # Some messages sent, some may have failed.
+            results_list: list[dict[str, Any]] = response_obj['result']['results']
+
+            # Gather timestamp:
+            timestamp = SignalTimestamp(timestamp=response_obj['result']['timestamp'])
+
+            # Parse results:
+            return_value: list[tuple[bool, SignalContact | SignalGroup, SignalSentMessage]] = []
+            if recipient_type == RecipientTypes.GROUP:
+                sent_messages: list[SignalSentMessage] = []
+                for recipient in target_recipients:
+                    sent_message = SignalSentMessage(context=self._context,
+                                                     recipient=recipient, timestamp=timestamp,
+                                                     body=body,
+                                                     attachments=target_attachments,
+                                                     mentions=target_mentions, quote=quote,
+                                                     sticker=sticker, is_sent=True,
+                                                     sent_to=target_recipients,
+                                                     previews=previews, expiration=recipient.expiration)
+                    self.append(sent_message)
+                    sent_messages.append(sent_message)
+                for result in results_list:
+                    # Gather the group and contact:
+                    group_id = result['groupId']
+                    _, group = self._context.groups.__get_or_add__(group_id=group_id)
+                    contact_id = result['recipientAddress']['number']
+                    if contact_id is None or contact_id == '':
+                        contact_id = result['recipientAddress']['uuid']
+                    _, contact = self._context.contacts.__get_or_add__(contact_id=contact_id)
+                    # Message sent successfully
+                    if result['type'] == "SUCCESS":
+                        for message in sent_messages:
+                            if message.recipient == group:
+                                message.sent_to.append(contact)
+                                return_value.append((True, contact, message))
+                    # Message failed to send:
+                    else:
+                        return_value.append((False, contact, result['type']))
+                return tuple(return_value)
+
+            elif recipient_type == RecipientTypes.CONTACT:
+                for result in results_list:
+                    # Gather contact:
+                    contact_id = result['recipientAddress']['number']
+                    if contact_id is None or contact_id == '':
+                        contact_id = result['recipientAddress']['uuid']
+                    _, contact = self._context.contacts.__get_or_add__(contact_id=contact_id)
+
+                    # Message Sent successfully:
+                    if result['type'] == 'SUCCESS':
+
+                        # Create a sent message
+                        sent_message = SignalSentMessage(context=self._context,
+                                                         recipient=contact, timestamp=timestamp,
+                                                         body=body,
+                                                         attachments=target_attachments,
+                                                         mentions=target_mentions,
+                                                         quote=quote, sticker=sticker, is_sent=True,
+                                                         sent_to=target_recipients, previews=previews,
+                                                         expiration=contact.expiration)
+                        return_value.append((True, contact, sent_message))
+                        if sent_message.recipient == self._context.contacts.get_self():
+                            sent_message.mark_delivered(sent_message.timestamp)
+                        self.append(sent_message)
+                    # Message failed to send:
+                    else:
+                        return_value.append((False, contact, result['type']))
+                return tuple(return_value)
 
-        # Some messages sent, some may have failed.
-        results_list: list[dict[str, Any]] = response_obj['result']['results']
+    def send_message(self,
+                     recipients: Iterable[
+                                     SignalContact | SignalGroup] | SignalContact | SignalGroup,
+                     body: Optional[str] = None,
+                     attachments: Optional[
+                         Iterable[SignalAttachment | str] | SignalAttachment | str] = None,
+                     mentions: Optional[
+                         Iterable[SignalMention] | SignalMentions | SignalMention] = None,
+                     quote: Optional[SignalQuote] = None,
+                     sticker: Optional[SignalSticker] = None,
+                     previews: Optional[Iterable[SignalPreview]] = None,
+    ) -> tuple[tuple[bool, SignalContact | SignalGroup, str | SignalSentMessage], ...]:
 
-        # Gather timestamp:
-        timestamp = SignalTimestamp(timestamp=response_obj['result']['timestamp'])
+        """
+        Send a message.
+        :param recipients: Iterable[SignalContact | SignalGroup] | SignalContact | SignalGroup:
+        The recipients of the message.
+        :param body: Optional[str]: The body of the message.
+        :param attachments: Optional[Iterable[SignalAttachment | str] | SignalAttachment | str ]:
+        Attachments to the message.
+        :param mentions: Optional[Iterable[SignalMention] | SignalMentions | SignalMention]:
+        Mentions in the message.
+        :param quote: Optional[SignalQuote]: A SignalQuote object for the message.
+        :param sticker: Optional[SignalSticker]: A sticker to send.
+        :param previews: Optional[Iterable[SignalPreview]]: A preview for the url in the message,
+        url must appear in the body of the message.
+        :returns: tuple[tuple[bool, SignalContact | SignalGroup, str | SentMessage]]: A tuple of
+        tuples, the outer-tuple is one element per message sent.
+        The inner tuple's first element, a bool, is True or False for if the message was sent
+        successfully or not.
+        The second element of the inner tuple is the SignalContact | SignalGroup the message was
+        sent to.
+        The third element of the inner tuple, a str | SentMessage, is either a string containing an
+        error message when sending fails, or the SentMessage object on sending success.
+        :raises: TypeError: If a recipient is not a SignalContact or SignalGroup object, if body is
+        not a string, if attachments is not an SignalAttachment object or a string, or a list of
+        SignalAttachment objects, or strings, if mentions is not a list of SignalMention objects,
+        or not a SignalMentions object, if quote is not a SignalQuote object, if sticker is not a
+        SignalSticker object, or if previews is not an Optional[Iterable[SignalPreview] object.
+        :raises: ValueError: If body is an empty string, if attachments is an empty list, or if
+        mentions is an empty list.
+        """
+        # Validate the parameters and build the command object:
+        send_command_obj, send_context = self.__prepare_send__(recipients, body, attachments, mentions, quote, sticker,
+                                                               previews)
 
-        # Parse results:
-        return_value: list[tuple[bool, SignalContact | SignalGroup, SignalSentMessage]] = []
-        if recipient_type == RecipientTypes.GROUP:
-            sent_messages: list[SignalSentMessage] = []
-            for recipient in target_recipients:
-                sent_message = SignalSentMessage(command_socket=self._command_socket,
-                                                 account_id=self._account_id,
-                                                 config_path=self._config_path,
-                                                 contacts=self._contacts,
-                                                 groups=self._groups, devices=self._devices,
-                                                 this_device=self._this_device,
-                                                 sticker_packs=self._sticker_packs,
-                                                 recipient=recipient, timestamp=timestamp,
-                                                 body=body,
-                                                 attachments=target_attachments,
-                                                 mentions=target_mentions, quote=quote,
-                                                 sticker=sticker, is_sent=True,
-                                                 sent_to=target_recipients,
-                                                 previews=previews, expiration=recipient.expiration)
-                self.append(sent_message)
-                sent_messages.append(sent_message)
-            for result in results_list:
-                # Gather the group and contact:
-                group_id = result['groupId']
-                _, group = self._groups.__get_or_add__(group_id=group_id)
-                contact_id = result['recipientAddress']['number']
-                if contact_id is None or contact_id == '':
-                    contact_id = result['recipientAddress']['uuid']
-                _, contact = self._contacts.__get_or_add__(contact_id=contact_id)
-                # Message sent successfully
-                if result['type'] == "SUCCESS":
-                    for message in sent_messages:
-                        if message.recipient == group:
-                            message.sent_to.append(contact)
-                            return_value.append((True, contact, message))
-                # Message failed to send:
-                else:
-                    return_value.append((False, contact, result['type']))
-            return tuple(return_value)
+        # Mark system as sending:
+        with self._lock:
+            self._num_sending += 1
+        # Communicate with signal over a pooled socket, with a fresh id, and waiting at most RPC_REQUEST_TIMEOUT,
+        # NOTE: The lock isn't held, so reception carries on meanwhile:
+        try:
+            response_obj: dict[str, Any] = __pooled_request__(send_command_obj)
+        finally:
+            # Mark system as finished sending
+            with self._lock:
+                self._num_sending -= 1
 
-        elif recipient_type == RecipientTypes.CONTACT:
-            for result in results_list:
-                # Gather contact:
-                contact_id = result['recipientAddress']['number']
-                if contact_id is None or contact_id == '':
-                    contact_id = result['recipientAddress']['uuid']
-                _, contact = self._contacts.__get_or_add__(contact_id=contact_id)
-
-                # Message Sent successfully:
-                if result['type'] == 'SUCCESS':
-
-                    # Create a sent message
-                    sent_message = SignalSentMessage(command_socket=self._command_socket,
-                                                     account_id=self._account_id,
-                                                     config_path=self._config_path,
-                                                     contacts=self._contacts,
-                                                     groups=self._groups, devices=self._devices,
-                                                     this_device=self._this_device,
-                                                     sticker_packs=self._sticker_packs,
-                                                     recipient=contact, timestamp=timestamp,
-                                                     body=body,
-                                                     attachments=target_attachments,
-                                                     mentions=target_mentions,
-                                                     quote=quote, sticker=sticker, is_sent=True,
-                                                     sent_to=target_recipients, previews=previews,
-                                                     expiration=contact.expiration)
-                    return_value.append((True, contact, sent_message))
-                    if sent_message.recipient == self._contacts.get_self():
-                        sent_message.mark_delivered(sent_message.timestamp)
-                    self.append(sent_message)
-                    self.__save__()
-                # Message failed to send:
-                else:
-                    return_value.append((False, contact, result['type']))
-            return tuple(return_value)
+        # Check for error, NOTE: __parse_send_response__() takes the lock to store the messages:
+        return self.__parse_send_response__(response_obj, send_context)
 
     ################################
     # Properties:
@@ -1122,7 +1563,58 @@ class SignalMessages(object):
         Return sending status.
         :returns: bool: Sending status. True if sending, False if not.
         """
-        return self._sending
+        return self._num_sending > 0
+
+    @property
+    def pending_receipts(self) -> SignalPendingReceipts:
+        """
+        The receipts waiting for their messages, with counters of those matched and evicted.
+        :return: SignalPendingReceipts: The pending receipts.
+        """
+        return self._unparsed_receipts
+
+    @property
+    def lock(self) -> threading.RLock:
+        """
+        The lock serialising access to the messages; Hold it while reading or changing the message lists from
+        another thread.
+        :returns: threading.RLock: The lock.
+        """
+        return self._lock
+
+    @property
+    def is_dirty(self) -> bool:
+        """
+        Are there changes waiting to be written to disk?
+        :returns: bool: True if there are unwritten changes.
+        """
+        return self._dirty
+
+    @property
+    def auto_expunge(self) -> bool:
+        """
+        Are messages expunged as they expire? Set by the receivers while receiving with do_expunge; do_expunge() can
+        be called either way.
+        :returns: bool: True if expunging as messages expire.
+        """
+        return self._auto_expunge
+
+    @auto_expunge.setter
+    def auto_expunge(self, value: bool) -> None:
+        """
+        Start or stop expunging messages as they expire.
+        Setter.
+        :param value: bool: The value to set to.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + 'auto_expunge_setter()')
+        if not isinstance(value, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__("value", "bool", value)
+        with self._lock:
+            self._auto_expunge = value
+            self.__arm_expiry_timer__()
+        return
 
     @property
     def num_received_unread(self) -> int:
@@ -1131,3 +1623,24 @@ class SignalMessages(object):
     @property
     def num_sent_unread(self) -> int:
         return len(self.get_sent_unread())
+
+
+_ALL_MESSAGES: weakref.WeakSet[SignalMessages] = weakref.WeakSet()
+"""Every open SignalMessages object, so the unwritten changes can be written, and the stores closed, at exit."""
+
+
+def __close_all_messages__() -> None:
+    """
+    Write the unwritten changes of every SignalMessages object to disk, and close their stores.
+    :return: None
+    """
+    logger: logging.Logger = logging.getLogger(__name__ + '.' + __close_all_messages__.__name__)
+    for messages in list(_ALL_MESSAGES):
+        try:
+            messages.close()
+        except RuntimeError as e:
+            logger.warning("Failed to write messages: %s" % str(e.args))
+    return
+
+
+atexit.register(__close_all_messages__)
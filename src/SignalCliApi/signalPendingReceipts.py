@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+File: signalPendingReceipts.py
+Hold receipts for messages we don't have yet.
+"""
+import logging
+from typing import Iterator
+
+from .signalReceipt import SignalReceipt
+from .signalTimestamp import SignalTimestamp
+
+
+class SignalPendingReceipts(object):
+    """
+    Receipts that didn't match a sent message, indexed by the timestamps they refer to, so a sent message arriving
+    later claims its receipts with a lookup. Receipts older than the TTL are dropped, and once the buffer is full the
+    oldest are evicted to make room.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        """
+        Initialize the buffer.
+        :param ttl: float: Seconds a receipt is kept, counted from when it was sent; 0 or less keeps them for ever.
+        :param max_size: int: The maximum number of receipts kept.
+        """
+        # Super:
+        object.__init__(self)
+
+        # Set internal vars:
+        self._ttl: float = ttl
+        """Seconds a receipt is kept."""
+        self._max_size: int = max_size
+        """The maximum number of receipts kept."""
+        self._receipts: dict[int, SignalReceipt] = {}
+        """The receipts, keyed by id(), in the order they were added."""
+        self._by_timestamp: dict[int, list[SignalReceipt]] = {}
+        """The receipts, by the timestamp of each message they refer to, in milliseconds."""
+        self._num_matched: int = 0
+        """The number of receipts claimed by a message."""
+        self._num_evicted: int = 0
+        """The number of receipts dropped for age or space."""
+        return
+
+    ##########################
+    # Overrides:
+    ##########################
+    def __iter__(self) -> Iterator[SignalReceipt]:
+        """
+        Iterate over the receipts, oldest first.
+        :return: Iterator[SignalReceipt]
+        """
+        return iter(list(self._receipts.values()))
+
+    def __len__(self) -> int:
+        """
+        The number of receipts waiting.
+        :return: int: The number of receipts.
+        """
+        return len(self._receipts)
+
+    ##########################
+    # Helpers:
+    ##########################
+    def __remove__(self, receipt: SignalReceipt) -> None:
+        """
+        Remove a receipt from the buffer, and its index entries.
+        :param receipt: SignalReceipt: The receipt to remove.
+        :return: None
+        """
+        del self._receipts[id(receipt)]
+        for timestamp in receipt.timestamps:
+            receipts: list[SignalReceipt] = self._by_timestamp.get(timestamp.timestamp, [])
+            if receipt in receipts:
+                receipts.remove(receipt)
+            if len(receipts) == 0:
+                self._by_timestamp.pop(timestamp.timestamp, None)
+        return
+
+    ##########################
+    # Methods:
+    ##########################
+    def add(self, receipt: SignalReceipt) -> None:
+        """
+        Add a receipt, evicting expired receipts, and the oldest if full.
+        :param receipt: SignalReceipt: The receipt to add.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.add.__name__)
+        if id(receipt) in self._receipts:
+            return
+        self.expire()
+        while len(self._receipts) >= self._max_size > 0:
+            oldest: SignalReceipt = next(iter(self._receipts.values()))
+            logger.debug("Pending receipts full, evicting the oldest.")
+            self.__remove__(oldest)
+            self._num_evicted += 1
+        self._receipts[id(receipt)] = receipt
+        for timestamp in receipt.timestamps:
+            self._by_timestamp.setdefault(timestamp.timestamp, []).append(receipt)
+        return
+
+    def claim(self, timestamp: SignalTimestamp) -> list[SignalReceipt]:
+        """
+        Take the receipts for a message out of the buffer.
+        :param timestamp: SignalTimestamp: The timestamp of the message.
+        :return: list[SignalReceipt]: The receipts for the message, oldest first.
+        """
+        receipts: list[SignalReceipt] = list(self._by_timestamp.get(timestamp.timestamp, []))
+        for receipt in receipts:
+            self.__remove__(receipt)
+        self._num_matched += len(receipts)
+        return receipts
+
+    def expire(self) -> int:
+        """
+        Drop the receipts older than the TTL; Receipts are added in about the order they were sent, so this stops at the
+        first receipt still in date.
+        :return: int: The number of receipts dropped.
+        """
+        if self._ttl <= 0 or len(self._receipts) == 0:
+            return 0
+        cutoff: float = SignalTimestamp(now=True).timestamp - (self._ttl * 1000)
+        expired: list[SignalReceipt] = []
+        for receipt in self._receipts.values():
+            if receipt.timestamp is not None and receipt.timestamp.timestamp >= cutoff:
+                break
+            expired.append(receipt)
+        for receipt in expired:
+            self.__remove__(receipt)
+        self._num_evicted += len(expired)
+        return len(expired)
+
+    ##########################
+    # Properties:
+    ##########################
+    @property
+    def num_pending(self) -> int:
+        """
+        The number of receipts waiting for their message.
+        :return: int: The number of receipts.
+        """
+        return len(self._receipts)
+
+    @property
+    def num_matched(self) -> int:
+        """
+        The number of receipts claimed by a message arriving after them.
+        :return: int: The number of receipts.
+        """
+        return self._num_matched
+
+    @property
+    def num_evicted(self) -> int:
+        """
+        The number of receipts dropped for age, or to make room.
+        :return: int: The number of receipts.
+        """
+        return self._num_evicted
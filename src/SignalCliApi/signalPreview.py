@@ -5,9 +5,9 @@ Store and handle a preview.
 """
 import logging
 from typing import Optional, Any
-import urllib.request
 import urllib.error
 import hashlib
+import importlib.util
 import os
 import shutil
 import sys
@@ -15,17 +15,15 @@ from .signalAttachment import SignalAttachment
 from .signalCommon import __type_error__
 from .signalExceptions import ParameterError
 
-CAN_PREVIEW: bool
-try:
-    from linkpreview import link_preview
-    CAN_PREVIEW = True
-except ModuleNotFoundError:
+# linkpreview pulls in requests and bs4, so only check that it's there; It's imported when a preview is generated:
+CAN_PREVIEW: bool = importlib.util.find_spec('linkpreview') is not None
+if not CAN_PREVIEW:
     logging.getLogger(__name__).warning("linkpreview not installed, can't generate previews.")
-    CAN_PREVIEW = False
 
 
 class SignalPreview(object):
     """Class containing a preview of a link."""
+    __slots__ = ('_config_path', 'url', 'title', 'description', 'image', '_preview_path')
 
     def __init__(self,
                  config_path: str,
@@ -174,6 +172,9 @@ class SignalPreview(object):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__generate_preview__.__name__)
         # Generate preview:
         logger.debug("Generating preview with linkpreview...")
+        # These are only needed to generate a preview, and are slow to import, so import them here:
+        from linkpreview import link_preview
+        import urllib.request
         preview = link_preview(self.url)
         logger.debug("Preview generated.")
         # Set title:
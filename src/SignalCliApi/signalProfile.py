@@ -9,8 +9,7 @@ import os
 import json
 import socket
 
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, __parse_signal_response__, \
-    __check_response_for_error__
+from .signalCommon import __type_error__, __socket_request__, __check_response_for_error__
 from .signalTimestamp import SignalTimestamp
 from .signalExceptions import InvalidDataFile
 
@@ -365,7 +364,6 @@ class SignalProfile(object):
         # Create set given name object and json command string:
         set_given_name_obj = {
             "jsonrpc": "2.0",
-            "id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
@@ -373,12 +371,8 @@ class SignalProfile(object):
             }
         }
 
-        json_command_str: str = json.dumps(set_given_name_obj) + '\n'
-
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_given_name_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -415,18 +409,14 @@ class SignalProfile(object):
         # Create command object and json command string:
         set_family_name_command_obj = {
             "jsonrpc": "2.0",
-            "id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
                 "family_name": value,
             }
         }
-        json_command_str: str = json.dumps(set_family_name_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_family_name_command_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -464,18 +454,14 @@ class SignalProfile(object):
         # Create command object and json command string:
         set_about_command_obj = {
             "jsonrpc": "2.0",
-            "id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
                 "about": value,
             }
         }
-        json_command_str: str = json.dumps(set_about_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_about_command_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -513,18 +499,14 @@ class SignalProfile(object):
         # Create command object and json command string:
         set_emoji_command_obj = {
             "jsonrpc": "2.0",
-            "id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
                 "aboutEmoji": value,
             }
         }
-        json_command_str: str = json.dumps(set_emoji_command_obj) + '\n'
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_emoji_command_obj)
 
         # Check error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -562,19 +544,15 @@ class SignalProfile(object):
         # Create command object and json command string:
         set_coin_address_command_obj = {
             "jsonrpc": "2.0",
-            "id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
                 "mobileCoinAddress": value,
             }
         }
-        json_command_str: str = json.dumps(set_coin_address_command_obj) + '\n'
 
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_coin_address_command_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_error = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -612,19 +590,15 @@ class SignalProfile(object):
         # Create command object and json command string:
         set_avatar_command_obj = {
             "jsonrpc": "2.0",
-            "contact_id": 2,
             "method": "updateProfile",
             "params": {
                 "account": self._account_id,
                 "avatar": value,
             }
         }
-        json_command_str: str = json.dumps(set_avatar_command_obj) + '\n'
 
         # Communicate with signal:
-        __socket_send__(self._sync_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._sync_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        response_obj: dict[str, Any] = __socket_request__(self._sync_socket, set_avatar_command_obj)
 
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, NON_FATAL_ERROR_CODES)
@@ -6,12 +6,11 @@ Store and manage a signal quote.
 import logging
 from typing import Optional, Iterable, Any
 
+from .signalAccountContext import SignalAccountContext
 from .signalAttachment import SignalAttachment
 from .signalCommon import __type_error__, ConversationTypes
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMention import SignalMention
 from .signalMentions import SignalMentions
 from .signalTimestamp import SignalTimestamp
@@ -22,10 +21,11 @@ class SignalQuote(object):
     """
     Class to store a quote for a message.
     """
+    __slots__ = ('_context', 'timestamp', 'author', 'text', 'attachments', 'mentions', 'conversation',
+                 'conversation_type')
+
     def __init__(self,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_quote: Optional[dict[str, Any]] = None,
                  timestamp: Optional[SignalTimestamp] = None,
@@ -37,9 +37,7 @@ class SignalQuote(object):
                  ) -> None:
         """
         Initialize a quote.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: The dict created by __to_dict__().
         :param raw_quote: Optional[dict[str, Any]]: The dict provided by signal.
         :param timestamp: Optional[SignalTimestamp]: The timestamp.# TODO: Figure out a better description.
@@ -54,18 +52,10 @@ class SignalQuote(object):
 
         # Setup logging:
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
-        # Check config_path:
-        if not isinstance(config_path, str):
-            logger.critical("Raising TypeError:")
-            __type_error__("config_path", "str", config_path)
-        # Check contacts:
-        if not isinstance(contacts, SignalContacts):
-            logger.critical("Raising TypeError:")
-            __type_error__("contacts", "SignalContacts", contacts)
-        # Check groups:
-        if not isinstance(groups, SignalGroups):
+        # Check context:
+        if not isinstance(context, SignalAccountContext):
             logger.critical("Raising TypeError:")
-            __type_error__("groups", "SignalGroups", groups)
+            __type_error__("context", "SignalAccountContext", context)
         # Check from_dict:
         if from_dict is not None and isinstance(from_dict, dict) is None:
             logger.critical("Raising TypeError:")
@@ -128,12 +118,8 @@ class SignalQuote(object):
             raise ParameterError(error_message)
 
         # Set internal vars:
-        self._config_path: str = config_path
-        """The full path to the signal-cli config directory."""
-        self._contacts: SignalContacts = contacts
-        """This accounts' SignalContacts object."""
-        self._groups: SignalGroups = groups
-        """This accounts' SignalGroups object."""
+        self._context: SignalAccountContext = context
+        """The account's shared context."""
 
         # Set external properties:
         self.timestamp: SignalTimestamp = timestamp
@@ -153,9 +139,9 @@ class SignalQuote(object):
         if isinstance(mentions, SignalMentions):
             self.mentions = mentions
         elif len(mention_list) == 0:
-            self.mentions = SignalMentions(contacts=contacts)
+            self.mentions = SignalMentions(contacts=context.contacts)
         else:
-            self.mentions = SignalMentions(contacts=contacts, mentions=mention_list)
+            self.mentions = SignalMentions(contacts=context.contacts, mentions=mention_list)
         self.conversation: Optional[SignalContact | SignalGroup] = conversation
         """The conversation SignalContact or SignalGroup the quoted message is in."""
         self.conversation_type: Optional[ConversationTypes] = None
@@ -189,17 +175,18 @@ class SignalQuote(object):
         # Load author
         author_number: str = raw_quote['authorNumber']
         author_uuid: str = raw_quote['authorUuid']
-        added, self.author = self._contacts.__get_or_add__(number=author_number, uuid=author_uuid,)
+        added, self.author = self._context.contacts.__get_or_add__(number=author_number, uuid=author_uuid,)
         # Load text
         self.text = raw_quote['text']
         # Load attachments
         self.attachments = []
         raw_attachments: list[dict[str, Any]] = raw_quote['attachments']
         for raw_attachment in raw_attachments:
-            self.attachments.append(SignalAttachment(config_path=self._config_path, raw_attachment=raw_attachment))
+            self.attachments.append(SignalAttachment(config_path=self._context.config_path,
+                                                     raw_attachment=raw_attachment))
         # Load Mentions:
         if 'mentions' in raw_quote.keys():
-            self.mentions = SignalMentions(contacts=self._contacts, raw_mentions=raw_quote['mentions'])
+            self.mentions = SignalMentions(contacts=self._context.contacts, raw_mentions=raw_quote['mentions'])
         return
 
     #################
@@ -248,25 +235,25 @@ class SignalQuote(object):
         # Set author
         self.author = None
         if from_dict['author'] is not None:
-            _, self.author = self._contacts.__get_or_add__(contact_id=from_dict['author'])
+            _, self.author = self._context.contacts.__get_or_add__(contact_id=from_dict['author'])
         # Set text
         self.text = from_dict['text']
         # Set attachments:
         self.attachments = []
         for attachment_dict in from_dict['attachments']:
-            self.attachments.append(SignalAttachment(config_path=self._config_path, from_dict=attachment_dict))
+            self.attachments.append(SignalAttachment(config_path=self._context.config_path, from_dict=attachment_dict))
         # Set mentions:
         self.mentions = None
         if from_dict['mentions'] is not None:
-            self.mentions = SignalMentions(contacts=self._contacts, from_dict=from_dict['mentions'])
+            self.mentions = SignalMentions(contacts=self._context.contacts, from_dict=from_dict['mentions'])
         # Set conversation type:
         self.conversation_type = ConversationTypes(from_dict['conversationType'])
         # Set conversation:
         self.conversation = None
         if self.conversation_type == ConversationTypes.CONTACT:
-            _, self.conversation = self._contacts.__get_or_add__(contact_id=from_dict['conversation'])
+            _, self.conversation = self._context.contacts.__get_or_add__(contact_id=from_dict['conversation'])
         elif self.conversation_type == ConversationTypes.GROUP:
-            _, self.conversation = self._groups.__get_or_add__(group_id=from_dict['conversation'])
+            _, self.conversation = self._context.groups.__get_or_add__(group_id=from_dict['conversation'])
         return
 
     ##########################
@@ -5,17 +5,12 @@ Store and handle a reaction to a message.
 """
 import logging
 from typing import TypeVar, Optional, Any
-import socket
-import json
 
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, MessageTypes, RecipientTypes, \
-    __parse_signal_response__, __check_response_for_error__
+from .signalAccountContext import SignalAccountContext
+from .signalCommon import __type_error__, __socket_request__, MessageTypes, RecipientTypes, \
+    __check_response_for_error__
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 from .signalTimestamp import SignalTimestamp
 
@@ -26,15 +21,11 @@ class SignalReaction(SignalMessage):
     """
     Class to store a reaction message.
     """
+    __slots__ = ('_has_been_removed', '_is_change', 'emoji', 'target_author', 'target_timestamp', 'is_remove',
+                 'previous_emoji', 'is_parsed', 'body')
 
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  sync_message: Optional[dict[str, Any]] = None,
@@ -46,13 +37,7 @@ class SignalReaction(SignalMessage):
                  ) -> None:
         """
         Initialize a reaction message.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This account's ID.
-        :param config_path: str: The full path to signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object for the device we're currently on.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: Load properties from a dict provided by __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: Load properties from a dict provided by signal.
         :param sync_message: Optional[dict[str, Any]]: Load properties from a dict provided by the sync message.
@@ -100,8 +85,8 @@ class SignalReaction(SignalMessage):
         """Has this reaction been parsed?"""
 
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, contacts.get_self(), recipient, this_device, None, MessageTypes.REACTION)
+        super().__init__(context, from_dict, raw_message, context.contacts.get_self(), recipient,
+                         context.this_device, None, MessageTypes.REACTION)
         if sync_message is not None:
             self.__from_sync_message__(sync_message)
         # Set body:
@@ -121,7 +106,7 @@ class SignalReaction(SignalMessage):
         super().__from_raw_message__(sync_message)
         reaction_dict: dict[str, Any] = sync_message['syncMessage']['sentMessage']['reaction']
         self.emoji = reaction_dict['emoji']
-        _, self.target_author = self._contacts.__get_or_add__(number=reaction_dict['targetAuthorNumber'],
+        _, self.target_author = self._context.contacts.__get_or_add__(number=reaction_dict['targetAuthorNumber'],
                                                               uuid = reaction_dict['targetAuthorUuid'])
         self.target_timestamp = SignalTimestamp(timestamp=reaction_dict['targetSentTimestamp'])
         self.is_remove = reaction_dict['isRemove']
@@ -137,7 +122,7 @@ class SignalReaction(SignalMessage):
         reaction_dict: dict[str, Any] = raw_message['dataMessage']['reaction']
         # print(reactionDict)
         self.emoji = reaction_dict['emoji']
-        _, self.target_author = self._contacts.__get_or_add__(number=reaction_dict['targetAuthorNumber'],
+        _, self.target_author = self._context.contacts.__get_or_add__(number=reaction_dict['targetAuthorNumber'],
                                                               uuid=reaction_dict['targetAuthorUuid'])
         self.target_timestamp = SignalTimestamp(timestamp=reaction_dict['targetSentTimestamp'])
         self.is_remove = reaction_dict['isRemove']
@@ -200,7 +185,7 @@ class SignalReaction(SignalMessage):
         self.emoji = from_dict['emoji']
         # Parse target author:
         if from_dict['targetAuthorId'] is not None:
-            _, self.target_author = self._contacts.__get_or_add__(contact_id=from_dict['targetAuthorId'])
+            _, self.target_author = self._context.contacts.__get_or_add__(contact_id=from_dict['targetAuthorId'])
         else:
             self.target_author = None
         # Parse target timestamp:
@@ -232,13 +217,22 @@ class SignalReaction(SignalMessage):
             logger.critical("Raising RuntimeError(%s)." % error_message)
             raise RuntimeError(error_message)
 
-        # Create reaction command object and json command string:
+        # Communicate with signal:
+        response_obj: dict[str, Any] = __socket_request__(self._context.command_socket, self.__build_send_command__())
+        return self.__parse_send_response__(response_obj)
+
+    def __build_send_command__(self) -> dict[str, Any]:
+        """
+        Build the sendReaction command object.
+        :return: dict[str, Any]: The command object.
+        :raises ValueError: On invalid recipient type.
+        """
+        # Create reaction command object:
         send_reaction_command_obj = {
             "jsonrpc": "2.0",
-            "id": 10,
             "method": "sendReaction",
             "params": {
-                "account": self._account_id,
+                "account": self._context.account_id,
                 "emoji": self.emoji,
                 "targetAuthor": self.target_author.get_id(),
                 "targetTimestamp": self.target_timestamp.timestamp,
@@ -251,15 +245,14 @@ class SignalReaction(SignalMessage):
             send_reaction_command_obj['params']['groupId'] = self.recipient.get_id()
         else:
             raise ValueError("recipient type = %s" % str(self.recipient_type))
+        return send_reaction_command_obj
 
-        # Create the JSON command string:
-        json_command_str: str = json.dumps(send_reaction_command_obj) + '\n'
-
-        # Communicate with signal:
-        __socket_send__(self._command_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._command_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
-
+    def __parse_send_response__(self, response_obj: dict[str, Any]) -> tuple[bool, str]:
+        """
+        Parse the response to a sendReaction command.
+        :param response_obj: dict[str, Any]: The parsed response from signal.
+        :return: tuple[bool, str]: See send().
+        """
         # Check for error:
         error_occurred, error_code, error_message = __check_response_for_error__(response_obj, [])
         if error_occurred:
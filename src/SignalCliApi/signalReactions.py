@@ -5,16 +5,12 @@ Store and manage a list of SignalReactions.
 """
 import logging
 from typing import Optional, Iterable, Iterator, Any
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalTimestamp import SignalTimestamp
 from .signalCommon import __type_error__
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalReaction import SignalReaction
 
 
@@ -22,25 +18,15 @@ class SignalReactions(object):
     """
     Class to store reactions to a message.
     """
+    __slots__ = ('_context', '_reactions')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  ) -> None:
         """
         Initialize a SignalReactions object.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object for the device we're using.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: The dict provided by __to_dict__().
         """
         # Super:
@@ -50,46 +36,16 @@ class SignalReactions(object):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
 
         # Argument checks:
-        if not isinstance(command_socket, socket.socket):
-            logger.critical("Raising TypeError:")
-            __type_error__("command_socket", "socket.socket", command_socket)
-        if not isinstance(account_id, str):
-            logger.critical("Raising TypeError:")
-            __type_error__("account_id", "str", account_id)
-        if not isinstance(config_path, str):
-            logger.critical("Raising TypeError:")
-            __type_error__('config_path', 'str', config_path)
-        if not isinstance(contacts, SignalContacts):
-            logger.critical("Raising TypeError:")
-            __type_error__("contacts", "SignalContacts", contacts)
-        if not isinstance(groups, SignalGroups):
-            logger.critical("Raising TypeError:")
-            __type_error__("groups", "SignalGroups", groups)
-        if not isinstance(devices, SignalDevices):
-            logger.critical("Raising TypeError:")
-            __type_error__("devices", "SignalDevices", devices)
-        if not isinstance(this_device, SignalDevice):
+        if not isinstance(context, SignalAccountContext):
             logger.critical("Raising TypeError:")
-            __type_error__("this_device", "SignalDevice", this_device)
+            __type_error__("context", "SignalAccountContext", context)
         if from_dict is not None and not isinstance(from_dict, dict):
             logger.critical("Raising TypeError:")
             __type_error__("from_dict", "dict", from_dict)
 
         # Set internal vars:
-        self._command_socket: socket.socket = command_socket
-        """The socket to run commands on."""
-        self._account_id: str = account_id
-        """This accounts' ID."""
-        self._config_path: str = config_path
-        """The full path to the signal-cli config directory."""
-        self._contacts: SignalContacts = contacts
-        """This accounts' SignalContacts object."""
-        self._groups: SignalGroups = groups
-        """This accounts' SignalGroups object."""
-        self._devices: SignalDevices = devices
-        """This accounts' SignalDevices object."""
-        self._this_device: SignalDevice = this_device
-        """The SignalDevice object for the device we're currently using."""
+        self._context: SignalAccountContext = context
+        """The account's shared context."""
         self._reactions: list[SignalReaction] = []
         """The list of reactions."""
 
@@ -156,10 +112,7 @@ class SignalReactions(object):
         logger.debug("Entered")
         self._reactions = []
         for reaction_dict in from_dict['reactions']:
-            reaction = SignalReaction(command_socket=self._command_socket, account_id=self._account_id,
-                                      config_path=self._config_path, contacts=self._contacts, groups=self._groups,
-                                      devices=self._devices, this_device=self._this_device, from_dict=reaction_dict
-                                      )
+            reaction = SignalReaction(context=self._context, from_dict=reaction_dict)
             self._reactions.append(reaction)
         logger.debug("Loaded %i reactions." % len(self._reactions))
         return
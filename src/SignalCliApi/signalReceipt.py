@@ -5,15 +5,12 @@ Store and handle a signal receipt message.
 """
 import logging
 from typing import Optional, Iterable, Any
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalCommon import __type_error__, MessageTypes, ReceiptTypes
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
 from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 from .signalTimestamp import SignalTimestamp
 
@@ -22,14 +19,10 @@ class SignalReceipt(SignalMessage):
     """
     Class to store a receipt.
     """
+    __slots__ = ('_is_parsed', 'when', 'receipt_type', 'timestamps', 'body')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  sender: Optional[SignalContact] = None,
@@ -39,13 +32,7 @@ class SignalReceipt(SignalMessage):
                  ) -> None:
         """
         Initialize a SignalReceipt.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object for the device we're using.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: The dict created by __to_dict__()
         :param raw_message: Optional[dict[str, Any]]: The dict provided by signal.
         :param sender: Optional[SignalContact]: The sender of the receipt.
@@ -71,8 +58,7 @@ class SignalReceipt(SignalMessage):
         self.body: str = ''
         """The body of the message."""
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, sender, recipient, device, timestamp, MessageTypes.RECEIPT)
+        super().__init__(context, from_dict, raw_message, sender, recipient, device, timestamp, MessageTypes.RECEIPT)
 
         # Mark this receipt as read, viewed and delivered:
         if self.timestamp is not None:
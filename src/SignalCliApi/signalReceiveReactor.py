@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+File: signalReceiveReactor.py
+Read for any number of accounts on a single thread, and hand the messages to worker threads.
+"""
+import logging
+import queue
+import selectors
+import socket
+import threading
+from typing import Any, Optional
+
+from .signalCommon import __type_error__, __get_socket_reader__, SocketReader
+from .signalExceptions import CommunicationsError
+from .signalReceiver import SignalReceiver
+from .signalSubscription import SignalSubscription
+
+
+class SignalReceiveReactor(threading.Thread):
+    """
+    A single thread watching the subscription socket of every receiving account with a selector, and handing each
+    incoming message to that account's SignalReceiver, routing the messages read by a SignalSubscription shared by
+    several accounts to the account each is for.
+    The reactor thread only reads and routes; The messages are handled on a pool of worker threads, each with a bounded
+    queue of its own, and every message of an account goes to the same worker, so they're handled in the order they
+    arrived, while different accounts are handled in parallel.
+    When a worker's queue is full, reading waits until there is room.
+    """
+
+    def __init__(self, num_workers: int = 4, max_queue_size: int = 1000) -> None:
+        """
+        Initialize the reactor, start() it to begin receiving.
+        :param num_workers: int: The number of worker threads handling messages.
+        :param max_queue_size: int: The maximum number of messages waiting per worker.
+        :raises TypeError: If a parameter is of invalid type.
+        :raises ValueError: If num_workers or max_queue_size is less than 1.
+        """
+        # Run super init:
+        super().__init__(None, name="SignalReceiveReactor", daemon=True)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(num_workers, int):
+            logger.critical("Raising TypeError:")
+            __type_error__("num_workers", "int", num_workers)
+        if not isinstance(max_queue_size, int):
+            logger.critical("Raising TypeError:")
+            __type_error__("max_queue_size", "int", max_queue_size)
+        if num_workers < 1 or max_queue_size < 1:
+            error_message: str = "num_workers and max_queue_size must be at least 1."
+            logger.critical("Raising ValueError(%s)." % error_message)
+            raise ValueError(error_message)
+
+        # Set internal vars:
+        self._selector: selectors.BaseSelector = selectors.DefaultSelector()
+        """The selector watching the subscription sockets."""
+        self._lock: threading.Lock = threading.Lock()
+        """Lock protecting the pending changes."""
+        self._to_add: list[SignalReceiver | SignalSubscription] = []
+        """Receivers waiting to be registered by the reactor thread."""
+        self._to_remove: list[SignalReceiver | SignalSubscription] = []
+        """Receivers waiting to be unregistered by the reactor thread."""
+        self._receivers: dict[socket.socket, SignalReceiver | SignalSubscription] = {}
+        """The registered receivers, keyed by their subscription socket."""
+        self._running: bool = True
+        """Is the reactor running?"""
+        self._draining: bool = False
+        """Has the reactor stopped queueing messages? The workers then finish what's queued, and exit."""
+        # The selector also watches this pair, so other threads can wake it up:
+        self._wake_read, self._wake_write = socket.socketpair()
+        self._wake_read.setblocking(False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ, None)
+        self._queues: list[queue.Queue] = [queue.Queue(max_queue_size) for _ in range(num_workers)]
+        """The queue of (source, receiver, message) for each worker; The source is the receiver or subscription that
+        read the message, a subscription queues the parsed notification."""
+        self._workers: list[threading.Thread] = []
+        """The worker threads, started with the reactor."""
+        for index, work_queue in enumerate(self._queues):
+            self._workers.append(threading.Thread(target=self.__work__, args=(work_queue,),
+                                                  name="SignalReceiveWorker-%i" % index, daemon=True))
+        return
+
+    ###########################
+    # Helpers:
+    ###########################
+    def __wake__(self) -> None:
+        """
+        Wake the reactor thread up, so it sees pending changes.
+        :return: None
+        """
+        try:
+            self._wake_write.send(b'\x00')
+        except (BlockingIOError, OSError):
+            pass  # Already woken, or shutting down.
+        return
+
+    def __apply_changes__(self) -> None:
+        """
+        Register and unregister receivers as requested by other threads.
+        :return: None
+        """
+        with self._lock:
+            to_add: list[SignalReceiver | SignalSubscription] = self._to_add
+            to_remove: list[SignalReceiver | SignalSubscription] = self._to_remove
+            self._to_add = []
+            self._to_remove = []
+        for receiver in to_remove:
+            self.__unregister__(receiver)
+        for receiver in to_add:
+            self._selector.register(receiver.receive_socket, selectors.EVENT_READ, receiver)
+            self._receivers[receiver.receive_socket] = receiver
+            # Messages may have been buffered while subscribing:
+            self.__drain__(receiver, __get_socket_reader__(receiver.receive_socket))
+        return
+
+    def __unregister__(self, receiver: SignalReceiver | SignalSubscription) -> None:
+        """
+        Stop watching a receiver's socket.
+        :param receiver: SignalReceiver | SignalSubscription: The receiver to stop watching.
+        :return: None
+        """
+        if self._receivers.get(receiver.receive_socket) is receiver:
+            del self._receivers[receiver.receive_socket]
+        try:
+            self._selector.unregister(receiver.receive_socket)
+        except (KeyError, ValueError):
+            pass  # Not registered, or socket already closed.
+        return
+
+    def __drain__(self, receiver: SignalReceiver | SignalSubscription, reader: SocketReader) -> None:
+        """
+        Queue every complete line buffered for a receiver on its worker; Lines read by a subscription are routed, and
+        queued on the worker of the account they're for.
+        :param receiver: SignalReceiver | SignalSubscription: The receiver.
+        :param reader: SocketReader: The receiver's socket reader.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__drain__.__name__)
+        while receiver.is_receiving:
+            message: Optional[str] = reader.pop_line()
+            if message is None:
+                return
+            if isinstance(receiver, SignalSubscription):
+                try:
+                    routed: Optional[tuple[SignalReceiver, dict[str, Any]]] = receiver.__route__(message)
+                except Exception as e:
+                    logger.critical("Subscription %s failed, stopping it: %s: %s"
+                                    % (receiver.name, type(e).__name__, str(e.args)))
+                    self.__unregister__(receiver)
+                    receiver.stop()
+                    return
+                if routed is None:
+                    continue
+                item: tuple[SignalReceiver | SignalSubscription, SignalReceiver, str | dict[str, Any]] = \
+                    (receiver, routed[0], routed[1])
+            else:
+                item = (receiver, receiver, message)
+            # Every message for an account goes to the same worker:
+            work_queue: queue.Queue = self._queues[hash(item[1].name) % len(self._queues)]
+            try:
+                work_queue.put_nowait(item)
+            except queue.Full:
+                logger.debug("Receive queue full, reading waiting for %s to catch up." % item[1].name)
+                # Give up once stopped, the worker may be the one stopping us:
+                while self._running:
+                    try:
+                        work_queue.put(item, timeout=0.5)
+                        break
+                    except queue.Full:
+                        pass
+                else:
+                    logger.warning("Stopped while waiting, dropping the rest of the messages for %s." % item[1].name)
+                    return
+        return
+
+    def __work__(self, work_queue: queue.Queue) -> None:
+        """
+        Worker thread; Hand queued messages to their receiver until stopped.
+        :param work_queue: queue.Queue: This worker's queue.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__work__.__name__)
+        while True:
+            # Once draining, finish what's queued, as the stop sentinel may not have fit on a full queue:
+            if not self._draining:
+                item: Optional[tuple[SignalReceiver | SignalSubscription, SignalReceiver, str | dict[str, Any]]] = \
+                    work_queue.get()
+            else:
+                try:
+                    item = work_queue.get_nowait()
+                except queue.Empty:
+                    return  # Stopped.
+            if item is None:
+                return  # Stopped.
+            source, receiver, message = item
+            # Reception may have been stopped while this was queued:
+            if not receiver.is_receiving:
+                continue
+            try:
+                if source is receiver:
+                    stop: bool = receiver.__handle_message__(message)
+                else:
+                    stop = receiver.__handle_notification__(message)
+            except Exception as e:
+                # A failing account shouldn't take the others down with it:
+                logger.critical("Receiver for %s failed, stopping it: %s: %s"
+                                % (receiver.name, type(e).__name__, str(e.args)))
+                stop = True
+            if stop:
+                # Stop just this account, leaving a shared subscription running for the others:
+                if source is receiver:
+                    self.remove(receiver)
+                else:
+                    source.remove(receiver)
+                receiver.stop()
+
+    ###########################
+    # Run:
+    ###########################
+    def run(self) -> None:
+        """
+        Thread override.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.run.__name__)
+        for worker in self._workers:
+            worker.start()
+        while self._running:
+            for key, _ in self._selector.select():
+                receiver: Optional[SignalReceiver | SignalSubscription] = key.data
+                if receiver is None:
+                    # Wake up call, clear it:
+                    try:
+                        while self._wake_read.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                if not receiver.is_receiving:
+                    self.__unregister__(receiver)
+                    continue
+                reader: SocketReader = __get_socket_reader__(receiver.receive_socket)
+                try:
+                    reader.fill()
+                except (CommunicationsError, OSError) as e:
+                    if receiver.is_receiving:
+                        logger.critical("Lost subscription socket for %s: %s"
+                                        % (receiver.name, str(e.args)))
+                    self.__unregister__(receiver)
+                    receiver.stop()
+                    continue
+                self.__drain__(receiver, reader)
+            self.__apply_changes__()
+        # Shutdown:
+        for receiver in list(self._receivers.values()):
+            self.__unregister__(receiver)
+        # The workers finish what's queued for receivers still receiving; Don't block on a full queue, the worker
+        # emptying it may be the one stopping us:
+        self._draining = True
+        for work_queue in self._queues:
+            try:
+                work_queue.put_nowait(None)
+            except queue.Full:
+                pass
+        for worker in self._workers:
+            worker.join()
+        self._selector.close()
+        self._wake_read.close()
+        self._wake_write.close()
+        return
+
+    ###########################
+    # Methods:
+    ###########################
+    def add(self, receiver: SignalReceiver | SignalSubscription) -> None:
+        """
+        Start handling a subscribed receiver.
+        :param receiver: SignalReceiver | SignalSubscription: The receiver, __subscribe__() must have been called.
+        :return: None
+        """
+        with self._lock:
+            self._to_add.append(receiver)
+        self.__wake__()
+        return
+
+    def remove(self, receiver: SignalReceiver | SignalSubscription) -> None:
+        """
+        Stop handling a receiver; Call receiver.stop() to close its socket.
+        :param receiver: SignalReceiver | SignalSubscription: The receiver to remove.
+        :return: None
+        """
+        with self._lock:
+            if receiver in self._to_add:
+                self._to_add.remove(receiver)
+            else:
+                self._to_remove.append(receiver)
+        self.__wake__()
+        return
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop the reactor thread, the workers stop once they've handled what is already queued; Safe to call from a
+        receive callback.
+        :param wait: bool: Wait for the reactor and its workers to finish, other than the worker calling.
+        :return: None
+        """
+        self._running = False
+        self.__wake__()
+        if wait:
+            current_thread: threading.Thread = threading.current_thread()
+            if current_thread in self._workers:
+                # The reactor thread waits on us, wait for the other workers:
+                for worker in self._workers:
+                    if worker is not current_thread and worker.is_alive():
+                        worker.join()
+            elif current_thread is not self and self.is_alive():
+                self.join()
+        return
+
+    ###########################
+    # Properties:
+    ###########################
+    @property
+    def num_receivers(self) -> int:
+        """
+        The number of receivers being handled.
+        :return: int: The number of receivers.
+        """
+        return len(self._receivers)
@@ -5,20 +5,14 @@ Store and handle an incoming message.
 """
 import logging
 from typing import TypeVar, Optional, Iterable, Any
-import socket
-import json
-from datetime import timedelta, datetime
-import pytz
+from datetime import timedelta, datetime, timezone
 
+from .signalAccountContext import SignalAccountContext
 from .signalAttachment import SignalAttachment
-from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, MessageTypes, RecipientTypes, \
-    ReceiptTypes, __parse_signal_response__, __check_response_for_error__
+from .signalCommon import __type_error__, __socket_request__, MessageTypes, RecipientTypes, \
+    ReceiptTypes, __check_response_for_error__
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMention import SignalMention
 from .signalMentions import SignalMentions
 from .signalMessage import SignalMessage
@@ -26,7 +20,7 @@ from .signalPreview import SignalPreview
 from .signalQuote import SignalQuote
 from .signalReaction import SignalReaction
 from .signalReactions import SignalReactions
-from .signalSticker import SignalSticker, SignalStickerPacks
+from .signalSticker import SignalSticker
 from .signalTimestamp import SignalTimestamp
 from .signalSentMessage import SignalSentMessage
 
@@ -38,43 +32,22 @@ class SignalReceivedMessage(SignalMessage):
     """
     Class to store a message that has been received.
     """
+    __slots__ = ('body', 'attachments', 'mentions', 'reactions', 'sticker', 'quote', 'expiration',
+                 'expiration_timestamp', '_is_expired', 'view_once', 'previews', 'is_group_invite',
+                 'is_expiration_update')
 
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
-                 sticker_packs: SignalStickerPacks,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict] = None,
                  raw_message: Optional[dict] = None,
                  ) -> None:
         """
         Initialize a ReceivedMessage object.
-        :param command_socket: socket.socket: The socket to use for commands.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object for the device we're on.
-        :param sticker_packs: SignalStickerPacks: The loaded sticker packs.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: A dict created by __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: A dict provided by signal.
         """
         # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
-        # Check sticker packs:
-        if not isinstance(sticker_packs, SignalStickerPacks):
-            logger.critical("Raising TypeError:")
-            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
-
-        # Set internal vars:
-        self._sticker_packs: SignalStickerPacks = sticker_packs
-        """The loaded sticker packs."""
-
         # Set external properties:
         # Set body:
         self.body: Optional[str] = None
@@ -83,12 +56,10 @@ class SignalReceivedMessage(SignalMessage):
         self.attachments: Optional[list[SignalAttachment]] = None
         """The attachments to this message.."""
         # Set mentions:
-        self.mentions: SignalMentions = SignalMentions(contacts=contacts)
+        self.mentions: SignalMentions = SignalMentions(contacts=context.contacts)
         """Any mentions in this message."""
         # Set reactions:
-        self.reactions: SignalReactions = SignalReactions(command_socket=command_socket, account_id=account_id,
-                                                          config_path=config_path, contacts=contacts, groups=groups,
-                                                          devices=devices, this_device=this_device)
+        self.reactions: SignalReactions = SignalReactions(context=context)
         """The reactions to this message."""
         # Set sticker:
         self.sticker: Optional[SignalSticker] = None
@@ -112,9 +83,7 @@ class SignalReceivedMessage(SignalMessage):
         """Any previews this message holds."""
 
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices,
-                         this_device, from_dict, raw_message, None, None, None, None,
-                         MessageTypes.RECEIVED)
+        super().__init__(context, from_dict, raw_message, None, None, None, None, MessageTypes.RECEIVED)
 
         # Mark this as delivered:
         if self.timestamp is not None:
@@ -132,10 +101,10 @@ class SignalReceivedMessage(SignalMessage):
             self.recipient.expiration = self.expiration
             # If it's a contact save the contact list:
             if self.recipient.recipient_type == RecipientTypes.CONTACT:
-                self._contacts.__save__()
+                self._context.contacts.__save__()
             # Set the sender string:
             sender: str
-            if self.sender == self._contacts.get_self():
+            if self.sender == self._context.contacts.get_self():
                 sender = "You"
             else:
                 sender = self.sender.get_display_name()
@@ -173,36 +142,34 @@ class SignalReceivedMessage(SignalMessage):
         if 'attachments' in data_message.keys():
             self.attachments = []
             for raw_attachment in data_message['attachments']:
-                attachment = SignalAttachment(config_path=self._config_path,
+                attachment = SignalAttachment(config_path=self._context.config_path,
                                               raw_attachment=raw_attachment)
                 self.attachments.append(attachment)
 
         # Parse mentions:
         if 'mentions' in data_message.keys():
-            self.mentions = SignalMentions(contacts=self._contacts,
+            self.mentions = SignalMentions(contacts=self._context.contacts,
                                            raw_mentions=data_message['mentions'])
 
         # Parse sticker:
         if 'sticker' in data_message.keys():
-            self._sticker_packs.__update__()  # Update in case this is a new sticker.
-            self.sticker = self._sticker_packs.get_sticker(
+            self._context.sticker_packs.__update__()  # Update in case this is a new sticker.
+            self.sticker = self._context.sticker_packs.get_sticker(
                 pack_id=data_message['sticker']['packId'],
                 sticker_id=data_message['sticker']['stickerId'])
         # Parse Quote
         if 'quote' in data_message.keys():
             if self.recipient_type == RecipientTypes.GROUP:
-                self.quote = SignalQuote(config_path=self._config_path, contacts=self._contacts,
-                                         groups=self._groups, raw_quote=data_message['quote'],
+                self.quote = SignalQuote(context=self._context, raw_quote=data_message['quote'],
                                          conversation=self.recipient)
             elif self.recipient_type == RecipientTypes.CONTACT:
-                self.quote = SignalQuote(config_path=self._config_path, contacts=self._contacts,
-                                         groups=self._groups, raw_quote=data_message['quote'],
+                self.quote = SignalQuote(context=self._context, raw_quote=data_message['quote'],
                                          conversation=self.sender)
         # Parse preview:
         self.previews = []
         if 'previews' in data_message.keys():
             for rawPreview in data_message['previews']:
-                preview = SignalPreview(config_path=self._config_path, raw_preview=rawPreview)
+                preview = SignalPreview(config_path=self._context.config_path, raw_preview=rawPreview)
                 self.previews.append(preview)
 
         return
@@ -272,20 +239,18 @@ class SignalReceivedMessage(SignalMessage):
         if from_dict['attachments'] is not None:
             self.attachments = []
             for attachment_dict in from_dict['attachments']:
-                attachment = SignalAttachment(config_path=self._config_path, from_dict=attachment_dict)
+                attachment = SignalAttachment(config_path=self._context.config_path, from_dict=attachment_dict)
                 self.attachments.append(attachment)
         # Load mentions:
-        self.mentions = SignalMentions(contacts=self._contacts, from_dict=from_dict['mentions'])
+        self.mentions = SignalMentions(contacts=self._context.contacts, from_dict=from_dict['mentions'])
         # Load reactions:
-        self.reactions = SignalReactions(command_socket=self._command_socket, account_id=self._account_id,
-                                         config_path=self._config_path, contacts=self._contacts, groups=self._groups,
-                                         devices=self._devices, this_device=self._this_device,
+        self.reactions = SignalReactions(context=self._context,
                                          from_dict=from_dict['reactions']
                                          )
         # Load sticker:
         self.sticker = None
         if from_dict['sticker'] is not None:
-            self.sticker = self._sticker_packs.get_sticker(
+            self.sticker = self._context.sticker_packs.get_sticker(
                 pack_id=from_dict['sticker']['packId'],
                 sticker_id=from_dict['sticker']['stickerId']
             )
@@ -293,7 +258,7 @@ class SignalReceivedMessage(SignalMessage):
         # Load quote
         self.quote = None
         if from_dict['quote'] is not None:
-            self.quote = SignalQuote(config_path=self._config_path, contacts=self._contacts, groups=self._groups,
+            self.quote = SignalQuote(context=self._context,
                                      from_dict=from_dict['quote'])
         # Load expiration:
         # self.is_expired = from_dict['isExpired']
@@ -311,7 +276,7 @@ class SignalReceivedMessage(SignalMessage):
         self.previews = []
         if from_dict['previews'] is not None:
             for preview_dict in from_dict['previews']:
-                self.previews.append(SignalPreview(config_path=self._config_path, from_dict=preview_dict))
+                self.previews.append(SignalPreview(config_path=self._context.config_path, from_dict=preview_dict))
         return
 
     #####################
@@ -329,8 +294,20 @@ class SignalReceivedMessage(SignalMessage):
         :raises InvalidServerResponse: On error loading signal JSON.
         :raises SignalError: On error sent by signal.
         """
+        # Communicate with signal:
+        response_obj: dict[str, Any] = __socket_request__(self._context.command_socket,
+                                                          self.__build_receipt_command__(receipt_type))
+        return self.__parse_receipt_response__(response_obj)
+
+    def __build_receipt_command__(self, receipt_type: ReceiptTypes) -> dict[str, Any]:
+        """
+        Build the sendReceipt command object.
+        :param receipt_type: ReceiptTypes: The type of receipt to send; Either ReceiptTypes.READ or ReceiptTypes.VIEWED.
+        :return: dict[str, Any]: The command object.
+        :raises RuntimeError: On invalid receipt type.
+        """
         # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__send_receipt__.__name__)
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__build_receipt_command__.__name__)
         # Parse receipt type:
         type_string: str
         if receipt_type == ReceiptTypes.READ:
@@ -345,22 +322,24 @@ class SignalReceivedMessage(SignalMessage):
         # Create send receipt command object and json command string.
         send_receipt_command_obj = {
             "jsonrpc": "2.0",
-            "id": 0,
             "method": "sendReceipt",
             "params": {
-                "account": self._account_id,
+                "account": self._context.account_id,
                 "recipient": self.sender.get_id(),
                 "type": type_string,
                 "targetTimestamp": self.timestamp.timestamp,
             }
         }
-        json_command_str: str = json.dumps(send_receipt_command_obj) + '\n'
-
-        # Communicate with signal:
-        __socket_send__(self._command_socket, json_command_str)
-        response_str: str = __socket_receive_blocking__(self._command_socket)
-        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        return send_receipt_command_obj
 
+    def __parse_receipt_response__(self, response_obj: dict[str, Any]) -> tuple[bool, SignalTimestamp | str]:
+        """
+        Parse the response to a sendReceipt command.
+        :param response_obj: dict[str, Any]: The parsed response from signal.
+        :return: tuple[bool, str | SignalTimestamp]: See __send_receipt__().
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__parse_receipt_response__.__name__)
         # Check for error:
         error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
         if error_occurred:
@@ -380,7 +359,7 @@ class SignalReceivedMessage(SignalMessage):
                 logger.warning(warning_message)
             else:
                 recipient: dict[str, str] = result['recipientAddress']
-                _, contact = self._contacts.__get_or_add__(number=recipient['number'],
+                _, contact = self._context.contacts.__get_or_add__(number=recipient['number'],
                                                            uuid=recipient['uuid'])
                 contact.__seen__(when)
         return True, when
@@ -397,6 +376,7 @@ class SignalReceivedMessage(SignalMessage):
             self.expiration_timestamp = SignalTimestamp(datetime_obj=expiry_datetime)
         else:
             self.expiration_timestamp = None
+        self.__expiry_set__()
         return
 
     def __check_invite__(self) -> bool:
@@ -508,12 +488,10 @@ class SignalReceivedMessage(SignalMessage):
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.get_quote.__name__)
         quote: SignalQuote
         if self.recipient_type == RecipientTypes.CONTACT:
-            quote = SignalQuote(config_path=self._config_path, contacts=self._contacts,
-                                groups=self._groups, timestamp=self.timestamp, author=self.sender,
+            quote = SignalQuote(context=self._context, timestamp=self.timestamp, author=self.sender,
                                 text=self.body, mentions=self.mentions, conversation=self.sender)
         elif self.recipient_type == RecipientTypes.GROUP:
-            quote = SignalQuote(config_path=self._config_path, contacts=self._contacts,
-                                groups=self._groups, timestamp=self.timestamp, author=self.sender,
+            quote = SignalQuote(context=self._context, timestamp=self.timestamp, author=self.sender,
                                 text=self.body, mentions=self.mentions, conversation=self.recipient)
         else:
             error_message: str = "invalid recipient_type: %s" % str(self.recipient_type)
@@ -558,17 +536,11 @@ class SignalReceivedMessage(SignalMessage):
         # Create reaction
         reaction: SignalReaction
         if self.recipient_type == RecipientTypes.CONTACT:
-            reaction = SignalReaction(command_socket=self._command_socket,
-                                      account_id=self._account_id, config_path=self._config_path,
-                                      contacts=self._contacts, groups=self._groups,
-                                      devices=self._devices, this_device=self._this_device,
+            reaction = SignalReaction(context=self._context,
                                       recipient=self.sender, emoji=emoji, target_author=self.sender,
                                       target_timestamp=self.timestamp)
         elif self.recipient_type == RecipientTypes.GROUP:
-            reaction = SignalReaction(command_socket=self._command_socket,
-                                      account_id=self._account_id, config_path=self._config_path,
-                                      contacts=self._contacts, groups=self._groups,
-                                      devices=self._devices, this_device=self._this_device,
+            reaction = SignalReaction(context=self._context,
                                       recipient=self.recipient, emoji=emoji,
                                       target_author=self.sender, target_timestamp=self.timestamp)
         else:
@@ -629,6 +601,6 @@ class SignalReceivedMessage(SignalMessage):
         :return:
         """
         if self.expiration_timestamp is not None:
-            if self.expiration_timestamp.datetime_obj <= pytz.utc.localize(datetime.utcnow()):
+            if self.expiration_timestamp.datetime_obj <= datetime.now(timezone.utc):
                 return True
         return False
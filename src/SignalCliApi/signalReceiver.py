@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+File: signalReceiver.py
+Subscribe to and handle incoming messages for a single account.
+"""
+import logging
+from typing import Callable, Optional, Any
+import socket
+import json
+
+from .signalAccount import SignalAccount
+from .signalCallbackDispatcher import SignalCallbackDispatcher
+from .signalCallMessage import SignalCallMessage
+from .signalEnvelopeParser import SignalEnvelopeParser
+from .signalCommon import __socket_create__, __socket_connect__, __socket_close__, __socket_receive_blocking__, \
+    __socket_send__, __type_error__, __parse_signal_response__, __check_response_for_error__, __socket_request__, \
+    RecipientTypes
+from . import run_callback
+from .run_callback import __run_callback__, __type_check_callback__
+from .signalGroupUpdate import SignalGroupUpdate
+from .signalMessage import SignalMessage
+from .signalReaction import SignalReaction
+from .signalReceipt import SignalReceipt
+from .signalReceivedMessage import SignalReceivedMessage
+from .signalSticker import SignalStickerPacks
+from .signalStoryMessage import SignalStoryMessage
+from .signalSyncMessage import SignalSyncMessage
+from .signalTypingMessage import SignalTypingMessage
+
+
+class SignalReceiver(object):
+    """
+    Receives for a single account: Owns the account's subscription socket, parses what arrives on it, and runs the
+    callbacks. It doesn't read the socket itself; SignalReceiveThread or SignalReceiveReactor feed it messages.
+    """
+
+    def __init__(self,
+                 server_address: tuple[str, int] | str,
+                 command_socket: socket.socket,
+                 config_path: str,
+                 sticker_packs: SignalStickerPacks,
+                 account: SignalAccount,
+                 all_messages_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 received_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 receipt_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 sync_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 typing_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 story_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 payment_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 reaction_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 call_message_callback: Optional[tuple[Callable, Optional[list[Any]]]] = None,
+                 suppress_callback_error: bool = False,
+                 do_expunge: bool = True,
+                 subscribe: bool = True,
+                 dispatcher: Optional[SignalCallbackDispatcher] = None,
+                 ) -> None:
+        """
+        Create the receiver, and connect its socket if it subscribes on its own.
+        Callbacks must have the signature of:
+            callback(account: SignalAccount, message: SignalMessage, *additional_params) where the first element passed is the
+            SignalAccount object for the message received, and the second element is the message that was received.
+        The return value of callback can be True, False, or None. If the specific callback returns a boolean, it is
+            returned; If the specific callback returns None, then the return value of the all messages callback is
+            returned.  If True is returned, Reception is stopped. If anything else is returned, then reception
+            continues.
+        :param server_address: tuple[str, int] | str: The server address to connect the reception socket to.
+        :param command_socket: socket.socket: The socket to run commands through.
+        :param config_path: str: The full path to the signal-cli config directory.
+        :param sticker_packs: SignalStickerPacks: The loaded SignalStickerPacks object.
+        :param account: SignalAccount: The account to receive for.
+        :param all_messages_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for ALL messages.
+        :param received_message_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for received
+            messages.
+        :param receipt_message_callback:Optional[tuple[Callable, Optional[list[Any]]]]: Callback for message receipts.
+        :param sync_message_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for sync messages.
+        :param typing_message_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for typing change
+            messages.
+        :param story_message_callback:Optional[tuple[Callable, Optional[list[Any]]]]: Callback for story messages.
+        :param payment_message_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for payment messages.
+        :param reaction_message_callback: Optional[tuple[Callable, Optional[list[Any]]]]: Callback for reaction
+            messages.
+        :param call_message_callback:Optional[tuple[Callable, Optional[list[Any]]]]: Callback for call messages.
+        :param suppress_callback_error: bool: Should we supress callback errors? Defaults to False.
+        :param do_expunge: bool: True, we should automatically expunge expired messages.
+        :param subscribe: bool: True, the receiver subscribes on a socket of its own; False, a SignalSubscription
+            shared by several accounts feeds it.
+        :param dispatcher: Optional[SignalCallbackDispatcher]: Run the callbacks on this dispatcher's workers; If
+            None, the callbacks run on the receiving thread.
+        """
+        # Run super init:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(server_address, tuple) and not isinstance(server_address, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("server_address", "tuple[str, int] | str", server_address)
+        if not isinstance(command_socket, socket.socket):
+            logger.critical("Raising TypeError:")
+            __type_error__("command_socket", "socket.socket", command_socket)
+        if not isinstance(config_path, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("config_path", "str", config_path)
+        if not isinstance(sticker_packs, SignalStickerPacks):
+            logger.critical("Raising TypeError:")
+            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
+        if not isinstance(account, SignalAccount):
+            logger.critical("Raising TypeError:")
+            __type_error__("account", "SignalAccount", account)
+        if not __type_check_callback__(all_messages_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("all_messages_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           all_messages_callback)
+        if not __type_check_callback__(received_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("received_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           received_message_callback)
+        if not __type_check_callback__(receipt_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("receipt_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           receipt_message_callback)
+        if not __type_check_callback__(sync_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("sync_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           sync_message_callback)
+        if not __type_check_callback__(typing_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("typing_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           typing_message_callback)
+        if not __type_check_callback__(story_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("story_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           story_message_callback)
+        if not __type_check_callback__(payment_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("payment_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           payment_message_callback)
+        if not __type_check_callback__(reaction_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("reaction_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           reaction_message_callback)
+        if not __type_check_callback__(call_message_callback)[0]:
+            logger.critical("Raising TypeError:")
+            __type_error__("call_message_callback", "Optional[tuple[Callable, Optional[list[Any]]]]",
+                           call_message_callback)
+        if not isinstance(suppress_callback_error, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__('suppress_callback_error', 'bool', suppress_callback_error)
+        if not isinstance(do_expunge, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__("do_expunge", "bool", do_expunge)
+        if not isinstance(subscribe, bool):
+            logger.critical("Raising TypeError:")
+            __type_error__("subscribe", "bool", subscribe)
+        if dispatcher is not None and not isinstance(dispatcher, SignalCallbackDispatcher):
+            logger.critical("Raising TypeError:")
+            __type_error__("dispatcher", "Optional[SignalCallbackDispatcher]", dispatcher)
+
+        # Set suppress callback error.
+        run_callback.set_suppress_error(suppress_callback_error)
+
+        # Set internal variables:
+        self._command_socket: socket.socket = command_socket
+        """The socket to run command operations on."""
+        self._config_path: str = config_path
+        """The full path to the signal-cli config directory."""
+        self._account: SignalAccount = account
+        """The account we're receiving for."""
+        self._sticker_packs: SignalStickerPacks = sticker_packs
+        """The loaded sticker packs object."""
+        self._parser: SignalEnvelopeParser = SignalEnvelopeParser(account=account)
+        """The parser turning envelopes into messages."""
+
+        # Set callbacks:
+        self._all_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = all_messages_callback
+        """Call back to call on receipt of ALL messages."""
+        self._recv_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = received_message_callback
+        """Call back to call on receipt of a ReceivedMessage."""
+        self._rcpt_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = receipt_message_callback
+        """Call back to call on receipt of a receipt message."""
+        self._sync_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = sync_message_callback
+        """Call back to call on receipt of a sync message."""
+        self._type_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = typing_message_callback
+        """Call back to call on receipt of a typing message."""
+        self._stry_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = story_message_callback
+        """Call back to call on receipt of a story message."""
+        self._pymt_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = payment_message_callback
+        """Call back to call on receipt of a payment message."""
+        self._ract_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = reaction_message_callback
+        """Call back to call on receipt of a reaction message."""
+        self._call_msg_cb: Optional[tuple[Callable, Optional[list[Any]]]] = call_message_callback
+        """Call back to call on receipt of a call message."""
+
+        # Set other internal properties:
+        self._do_expunge: bool = do_expunge
+        """Should we expunge on update?"""
+        self._dispatcher: Optional[SignalCallbackDispatcher] = dispatcher
+        """The dispatcher running our callbacks, None to run them inline."""
+        self._receiving: bool = False
+        """Are we receiving?"""
+        self._subscription_id: Optional[int] = None
+        """The subscription ID provided by Signal."""
+        # Create and connect the socket, if we subscribe on our own:
+        self._receive_socket: Optional[socket.socket] = None
+        """The socket our subscription is on, None if fed by a shared SignalSubscription."""
+        if subscribe:
+            self._receive_socket = __socket_create__(server_address)
+            __socket_connect__(self._receive_socket, server_address)
+        return
+
+    def __call_callback__(self,
+                          callback: Optional[tuple[Callable, Optional[list[Any]]]],
+                          account: SignalAccount,
+                          message: SignalMessage,
+                          ) -> Optional[bool]:
+        """
+        Execute a callback and return True for stopping reception, False for do not stop reception; The order of
+        priority of return values is all messages callback, specified callback. So if all messages returns None, then
+        the return value of the specified callback is returned.
+        :param callback: Optional[tuple[Callable, Optional[list[Any]]]]: The callback to call, and any parameters to
+            pass to it, if None the callback is not executed.
+        :param account: SignalAccount: The account we're receiving for.
+        :param message: SignalMessage: The message we've received.
+        :return: Optional[bool]: If True is returned, the callback stops the reception thread, If False or None are
+             returned, then reception continues.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__call_callback__.__name__)
+        # Call specified call back:
+        logger.debug("Calling specific callback for: %s" % str(type(message)))
+        cb_return_value: Optional[bool] = __run_callback__(callback, account, message)
+        # Call all messages callback:
+        logger.debug("Calling all message callback.")
+        all_return_value: Optional[bool] = __run_callback__(self._all_msg_cb, account, message)
+        # Determine return value:
+        if cb_return_value is None:
+            logger.debug("Returning all message callback return value.")
+            return all_return_value
+        logger.debug("Returning specific message callback return value.")
+        return cb_return_value
+
+    def __get_callback__(self, message: SignalMessage) -> Optional[tuple[Callable, Optional[list[Any]]]]:
+        """
+        Get the specific callback for a parsed message.
+        :param message: SignalMessage: The parsed message.
+        :return: Optional[tuple[Callable, Optional[list[Any]]]]: The callback for this type of message.
+        """
+        if isinstance(message, SignalReaction):
+            return self._ract_msg_cb
+        elif isinstance(message, (SignalGroupUpdate, SignalSyncMessage)):
+            return self._sync_msg_cb
+        elif isinstance(message, SignalReceivedMessage):
+            return self._recv_msg_cb
+        elif isinstance(message, SignalReceipt):
+            return self._rcpt_msg_cb
+        elif isinstance(message, SignalTypingMessage):
+            return self._type_msg_cb
+        elif isinstance(message, SignalStoryMessage):
+            return self._stry_msg_cb
+        elif isinstance(message, SignalCallMessage):
+            return self._call_msg_cb
+        return None
+
+    def __get_conversation_key__(self, message: SignalMessage) -> str:
+        """
+        Get the key identifying the conversation a message belongs to.
+        :param message: SignalMessage: The message.
+        :return: str: The group id, or the id of the other contact.
+        """
+        if message.recipient_type == RecipientTypes.GROUP or message.sender is None or message.sender.is_self:
+            if message.recipient is not None:
+                return message.recipient.get_id()
+        if message.sender is not None:
+            return message.sender.get_id()
+        return ''
+
+    def __dispatch__(self, message: SignalMessage) -> bool:
+        """
+        Run the callbacks for a parsed message.
+        :param message: SignalMessage: The parsed message.
+        :return: bool: True if a callback asked to stop receiving.
+        """
+        return self.__call_callback__(self.__get_callback__(message), self._account, message) is True
+
+    #############################
+    # Receive:
+    #############################
+    def __send_sync_request__(self) -> None:
+        """
+        Ask the primary device for a sync, if this isn't the primary device.
+        :return: None
+        :raises SignalError: On signal error.
+        :raises CommunicationsError: On error communicating with signal.
+        """
+        if self._account.device_id == 1:
+            return
+        # Create sync request object:
+        sync_request_command_obj: dict[str, Any] = {
+            "jsonrpc": "2.0",
+            "id": 10,
+            "method": "sendSyncRequest",
+            "params": {
+                "account": self._account.number,
+            }
+        }
+        # Communicate with Signal, on our own socket if we have one since it's not being read yet:
+        if self._receive_socket is not None:
+            __socket_send__(self._receive_socket, json.dumps(sync_request_command_obj) + '\n')
+            response_str = __socket_receive_blocking__(self._receive_socket)
+            response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        else:
+            response_obj = __socket_request__(self._command_socket, sync_request_command_obj)
+        # There are no non fatal errors during reception:
+        __check_response_for_error__(response_obj, [])
+        return
+
+    def __subscribe__(self) -> None:
+        """
+        Subscribe to messages for the account.
+        :return: None
+        :raises RuntimeError: If signal refuses the subscription.
+        :raises CommunicationsError: On error communicating with signal.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__subscribe__.__name__)
+
+        # Do send sync request if we're not the primary device:
+        self.__send_sync_request__()
+
+        # A shared subscription does the subscribing for us:
+        if self._receive_socket is None:
+            self._receiving = True
+            self._account.messages.auto_expunge = self._do_expunge
+            return
+
+        # Create receive object and json command string:
+        start_receive_command_object: dict[str, Any] = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "subscribeReceive",
+            "params": {
+                "account": self._account.number,
+            }
+        }
+        json_command_str: str = json.dumps(start_receive_command_object) + '\n'
+
+        # Communicate start receive with signal:
+        __socket_send__(self._receive_socket, json_command_str)
+        response_str = __socket_receive_blocking__(self._receive_socket)
+        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
+        if error_occurred:
+            error_message: str = "Signal error while trying to start receiving. Code %i, Message: %s" \
+                                 % (signal_code, signal_message)
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+
+        # Set subscription ID, and start receiving:
+        self._subscription_id = response_obj['result']
+        self._receiving = True
+        self._account.messages.auto_expunge = self._do_expunge
+        return
+
+    def __handle_message__(self, response_str: str) -> bool:
+        """
+        Handle a message read from the subscription socket.
+        :param response_str: str: The line read from the socket.
+        :return: bool: True if a callback asked to stop receiving.
+        """
+        # Create msg object, and check the incoming message for an error, NOTE: There are no non-fatal errors
+        # during reception:
+        message_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        __check_response_for_error__(message_obj, [])
+        return self.__handle_notification__(message_obj)
+
+    def __handle_notification__(self, message_obj: dict[str, Any]) -> bool:
+        """
+        Handle a parsed 'receive' notification for our account.
+        :param message_obj: dict[str, Any]: The parsed notification.
+        :return: bool: True if a callback asked to stop receiving.
+        """
+        # Pull out the envelope:
+        envelope_dict: Optional[dict[str, Any]] = SignalEnvelopeParser.__get_envelope__(message_obj)
+        if envelope_dict is None:
+            return False
+        # Parse it, holding the messages lock only while the account's objects are being changed, the callbacks run
+        # without it so they can send:
+        with self._account.messages.lock:
+            message: Optional[SignalMessage] = self._parser.parse(envelope_dict)
+        if message is None:
+            return False
+        if self._dispatcher is not None:
+            # The dispatcher honours a request to stop:
+            self._dispatcher.submit(self, self.__get_conversation_key__(message), message)
+        elif self.__dispatch__(message):
+            return True  # Stop receiving.
+
+        ###############################
+        # Check for expired messages:
+        ###############################
+        if self._do_expunge:
+            self._account.messages.do_expunge()
+        return False
+
+    def stop(self) -> None:
+        """
+        Stops the reception, closing our subscription socket if we have one.
+        :returns: None
+        """
+        self._receiving = False
+        self._account.is_receiving = False
+        self._account.messages.auto_expunge = False
+        if self._receive_socket is not None:
+            __socket_close__(self._receive_socket)
+        return
+
+    #############################
+    # Properties:
+    #############################
+    @property
+    def name(self) -> str:
+        """
+        A name for logging.
+        :return: str: The name.
+        """
+        return self._account.number
+
+    @property
+    def subscription_id(self) -> Optional[int]:
+        """
+        The subscription ID provided by signal.
+        :return: Optional[int]: The subscription ID, None if not subscribed.
+        """
+        return self._subscription_id
+
+    @property
+    def receive_socket(self) -> Optional[socket.socket]:
+        """
+        The socket the subscription is on.
+        :return: Optional[socket.socket]: The subscription socket, None if fed by a shared SignalSubscription.
+        """
+        return self._receive_socket
+
+    @property
+    def account(self) -> SignalAccount:
+        """
+        The account we're receiving for.
+        :return: SignalAccount: The account.
+        """
+        return self._account
+
+    @property
+    def is_receiving(self) -> bool:
+        """
+        Are we receiving?
+        :return: bool: True if subscribed and not stopped.
+        """
+        return self._receiving
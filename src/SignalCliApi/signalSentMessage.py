@@ -5,20 +5,14 @@ File: signalSentMessage.py
 """
 import logging
 from typing import TypeVar, Optional, Iterable, Any
-import socket
-from datetime import timedelta, datetime
-
-import pytz
+from datetime import timedelta, datetime, timezone
 
+from .signalAccountContext import SignalAccountContext
 from .signalAttachment import SignalAttachment
 from .signalCommon import __type_error__, __socket_receive_blocking__, __socket_send__, UNKNOWN_DEVICE_NAME, \
     MessageTypes, \
     RecipientTypes, ReceiptTypes, __parse_signal_response__, __check_response_for_error__
-from .signalContacts import SignalContacts
 from .signalContact import SignalContact
-from .signalDevices import SignalDevices
-from .signalDevice import SignalDevice
-from .signalGroups import SignalGroups
 from .signalGroup import SignalGroup
 from .signalMention import SignalMention
 from .signalMentions import SignalMentions
@@ -28,7 +22,7 @@ from .signalQuote import SignalQuote
 from .signalReaction import SignalReaction
 from .signalReactions import SignalReactions
 from .signalReceipt import SignalReceipt
-from .signalSticker import SignalSticker, SignalStickerPacks
+from .signalSticker import SignalSticker
 from .signalTimestamp import SignalTimestamp
 
 # Define Self:
@@ -51,16 +45,12 @@ class SignalSentMessage(SignalMessage):
     """
     Class to store a sent message.
     """
+    __slots__ = ('body', 'attachments', 'mentions', 'reactions', 'sticker', 'quote', 'expiration',
+                 'expiration_timestamp', 'view_once', 'is_sent', 'sent_to', 'delivery_receipts', 'read_receipts',
+                 'viewed_receipts', 'previews', 'is_expiration_update')
 
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
-                 sticker_packs: SignalStickerPacks,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  recipient: Optional[SignalContact | SignalGroup] = None,
@@ -79,14 +69,7 @@ class SignalSentMessage(SignalMessage):
                  ) -> None:
         """
         Initialize a SentMessage object.
-        :param command_socket: socket.socket: The socket to use for command operations.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object representing the device we're on.
-        :param sticker_packs: SignalStickerPacks: The loaded SignalStickerPacks object.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: The dict created by __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: The dict provided by signal.
         :param recipient: Optional[SignalContact | SignalGroup]: The recipient of this message.
@@ -110,11 +93,6 @@ class SignalSentMessage(SignalMessage):
         # Setup logging:
         logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
 
-        # Check sticker_packs:
-        if not isinstance(sticker_packs, SignalStickerPacks):
-            logger.critical("Raising TypeError:")
-            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
-
         # Check Body:
         if body is not None and not isinstance(body, str):
             logger.critical("Raising TypeError:")
@@ -222,10 +200,6 @@ class SignalSentMessage(SignalMessage):
         if not isinstance(view_once, bool):
             __type_error__('view_once', 'bool', view_once)
 
-        # Set internal vars:
-        self._sticker_packs = sticker_packs
-        """The loaded sticker packs object."""
-
         # Set external properties:
         # Set body:
         self.body: Optional[str] = body
@@ -243,22 +217,18 @@ class SignalSentMessage(SignalMessage):
         if isinstance(mentions, SignalMentions):
             self.mentions = mentions
         elif len(mentions_list) == 0:
-            self.mentions = SignalMentions(contacts=contacts)
+            self.mentions = SignalMentions(contacts=context.contacts)
         else:
-            self.mentions = SignalMentions(contacts=contacts, mentions=mentions_list)
+            self.mentions = SignalMentions(contacts=context.contacts, mentions=mentions_list)
         # Set reactions:
         self.reactions: SignalReactions
         """Any reactions to the message."""
         if isinstance(reactions, SignalReactions):
             self.reactions = reactions
         elif len(reaction_list) == 0:
-            self.reactions = SignalReactions(command_socket=command_socket, account_id=account_id,
-                                             config_path=config_path, contacts=contacts, groups=groups, devices=devices,
-                                             this_device=this_device)
+            self.reactions = SignalReactions(context=context)
         else:
-            self.reactions = SignalReactions(command_socket=command_socket, account_id=account_id,
-                                             config_path=config_path, contacts=contacts, groups=groups, devices=devices,
-                                             this_device=this_device, reactions=reaction_list)
+            self.reactions = SignalReactions(context=context, reactions=reaction_list)
         # Set sticker:
         self.sticker: Optional[SignalSticker] = sticker
         """The sticker for this message."""
@@ -299,8 +269,8 @@ class SignalSentMessage(SignalMessage):
         """Any URL previews for this message."""
 
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, contacts.get_self(), recipient, this_device, timestamp, MessageTypes.SENT)
+        super().__init__(context, from_dict, raw_message, context.contacts.get_self(), recipient, context.this_device,
+                         timestamp, MessageTypes.SENT)
         self.is_expiration_update: bool = self.__check_expiry_update__()
         """Is this an expiration update message?"""
         if self.is_expiration_update:
@@ -308,10 +278,10 @@ class SignalSentMessage(SignalMessage):
             self.recipient.expiration = self.expiration
             # If it's a contact save the contact list:
             if self.recipient.recipient_type == RecipientTypes.CONTACT:
-                self._contacts.__save__()
+                self._context.contacts.__save__()
             # Set the sender string:
             sender: str
-            if self.sender == self._contacts.get_self():
+            if self.sender == self._context.contacts.get_self():
                 sender = "You"
             else:
                 sender = self.sender.get_display_name()
@@ -339,17 +309,17 @@ class SignalSentMessage(SignalMessage):
         # Load recipient and recipient type:
         if raw_sent_message['destination'] is not None:
             self._recipient_type = RecipientTypes.CONTACT
-            _, self._recipient = self._contacts.__get_or_add__(number=raw_sent_message['destinationNumber'],
+            _, self._recipient = self._context.contacts.__get_or_add__(number=raw_sent_message['destinationNumber'],
                                                                uuid=raw_sent_message['destinationUuid'])
         elif 'groupInfo' in raw_sent_message.keys():
             self._recipient_type = RecipientTypes.GROUP
-            _, self._recipient = self._groups.__get_or_add__(group_id=raw_sent_message['groupInfo']['groupId'])
+            _, self._recipient = self._context.groups.__get_or_add__(group_id=raw_sent_message['groupInfo']['groupId'])
 
         # Load timestamp:
         self._timestamp = SignalTimestamp(timestamp=raw_sent_message['timestamp'])
 
         # Load Device: NOTE: This in the raw_message not the raw_sent_message
-        _, self._device = self._devices.__get_or_add__(device_id=raw_message['sourceDevice'])
+        _, self._device = self._context.devices.__get_or_add__(device_id=raw_message['sourceDevice'])
 
         # Load body:
         self.body = raw_sent_message['message']
@@ -359,24 +329,25 @@ class SignalSentMessage(SignalMessage):
         if 'attachments' in raw_sent_message.keys():
             self.attachments = []
             for raw_attachment in raw_sent_message['attachments']:
-                self.attachments.append(SignalAttachment(config_path=self._config_path, raw_attachment=raw_attachment))
+                self.attachments.append(SignalAttachment(config_path=self._context.config_path,
+                                                         raw_attachment=raw_attachment))
 
         # Load sticker:
         self.sticker = None
         if 'sticker' in raw_sent_message.keys():
-            self.sticker = self._sticker_packs.get_sticker(pack_id=raw_sent_message['sticker']['pack_id'],
+            self.sticker = self._context.sticker_packs.get_sticker(pack_id=raw_sent_message['sticker']['pack_id'],
                                                            sticker_id=raw_sent_message['sticker']['sticker_id'])
 
         # Load mentions:
         if 'mentions' in raw_sent_message.keys():
-            self.mentions = SignalMentions(contacts=self._contacts, raw_mentions=raw_sent_message['mentions'])
+            self.mentions = SignalMentions(contacts=self._context.contacts, raw_mentions=raw_sent_message['mentions'])
         else:
-            self.mentions = SignalMentions(contacts=self._contacts)
+            self.mentions = SignalMentions(contacts=self._context.contacts)
 
         # Load quote:
         self.quote = None
         if 'quote' in raw_sent_message.keys():
-            self.quote = SignalQuote(config_path=self._config_path, contacts=self._contacts, groups=self._groups,
+            self.quote = SignalQuote(context=self._context,
                                      raw_quote=raw_sent_message['quote'], conversation=self.recipient)
 
         # Load expiry:
@@ -394,7 +365,7 @@ class SignalSentMessage(SignalMessage):
         self.previews = []
         if 'previews' in raw_sent_message.keys():
             for raw_preview in raw_sent_message['previews']:
-                preview = SignalPreview(config_path=self._config_path, raw_preview=raw_preview)
+                preview = SignalPreview(config_path=self._context.config_path, raw_preview=raw_preview)
                 self.previews.append(preview)
 
         # Set sent, since this is coming from a sync message.
@@ -516,25 +487,23 @@ class SignalSentMessage(SignalMessage):
         if from_dict['attachments'] is not None:
             self.attachments = []
             for attachmentDict in from_dict['attachments']:
-                attachment = SignalAttachment(config_path=self._config_path, from_dict=attachmentDict)
+                attachment = SignalAttachment(config_path=self._context.config_path, from_dict=attachmentDict)
                 self.attachments.append(attachment)
 
         # Load mentions:
         # self.mentions = None
         # if from_dict['mentions'] is not None:
-        self.mentions = SignalMentions(contacts=self._contacts, from_dict=from_dict['mentions'])
+        self.mentions = SignalMentions(contacts=self._context.contacts, from_dict=from_dict['mentions'])
 
         # Load reactions:
-        self.reactions = SignalReactions(command_socket=self._command_socket, account_id=self._account_id,
-                                         config_path=self._config_path, contacts=self._contacts, groups=self._groups,
-                                         devices=self._devices, this_device=self._this_device,
+        self.reactions = SignalReactions(context=self._context,
                                          from_dict=from_dict['reactions'])
 
         # Load sticker
         self.sticker = None
         if from_dict['sticker'] is not None:
             sticker_dict: dict[str, str | int] = from_dict['sticker']
-            self.sticker = self._sticker_packs.get_sticker(
+            self.sticker = self._context.sticker_packs.get_sticker(
                 pack_id=sticker_dict['packId'],  # String
                 sticker_id=sticker_dict['stickerId']  # Integer
             )
@@ -542,7 +511,7 @@ class SignalSentMessage(SignalMessage):
         # Load Quote:
         self.quote = None
         if from_dict['quote'] is not None:
-            self.quote = SignalQuote(config_path=self._config_path, contacts=self._contacts, groups=self._groups,
+            self.quote = SignalQuote(context=self._context,
                                      from_dict=from_dict['quote'])
 
         # Load expiration:
@@ -568,40 +537,31 @@ class SignalSentMessage(SignalMessage):
         self.sent_to = []
         if from_dict['sentTo'] is not None:
             for contact_id in from_dict['sentTo']:
-                _, contact = self._contacts.__get_or_add__(contact_id=contact_id)
+                _, contact = self._context.contacts.__get_or_add__(contact_id=contact_id)
                 self.sent_to.append(contact)
 
         # Load delivery_receipts:
         self.delivery_receipts = []
         for receiptDict in from_dict['deliveryReceipts']:
-            receipt = SignalReceipt(command_socket=self._command_socket, account_id=self._account_id,
-                                    config_path=self._config_path,
-                                    contacts=self._contacts, groups=self._groups, devices=self._devices,
-                                    this_device=self._this_device, from_dict=receiptDict)
+            receipt = SignalReceipt(context=self._context, from_dict=receiptDict)
             self.delivery_receipts.append(receipt)
 
         # Load read_receipts:
         self.read_receipts = []
         for receiptDict in from_dict['readReceipts']:
-            receipt = SignalReceipt(command_socket=self._command_socket, account_id=self._account_id,
-                                    config_path=self._config_path,
-                                    contacts=self._contacts, groups=self._groups, devices=self._devices,
-                                    this_device=self._this_device, from_dict=receiptDict)
+            receipt = SignalReceipt(context=self._context, from_dict=receiptDict)
             self.read_receipts.append(receipt)
 
         # Load viewed_receipts:
         self.viewed_receipts = []
         for receiptDict in from_dict['viewedReceipts']:
-            receipt = SignalReceipt(command_socket=self._command_socket, account_id=self._account_id,
-                                    config_path=self._config_path,
-                                    contacts=self._contacts, groups=self._groups, devices=self._devices,
-                                    this_device=self._this_device, from_dict=receiptDict)
+            receipt = SignalReceipt(context=self._context, from_dict=receiptDict)
             self.viewed_receipts.append(receipt)
 
         # Load previews:
         self.previews = []
         for previewDict in from_dict['previews']:
-            preview = SignalPreview(self._config_path, from_dict=previewDict)
+            preview = SignalPreview(self._context.config_path, from_dict=previewDict)
             self.previews.append(preview)
         return
 
@@ -652,6 +612,7 @@ class SignalSentMessage(SignalMessage):
             self.expiration_timestamp = SignalTimestamp(datetime_obj=expiry_datetime)
         else:
             self.expiration_timestamp = None
+        self.__expiry_set__()
         return
 
     def __check_expiry_update__(self) -> bool:
@@ -690,7 +651,7 @@ class SignalSentMessage(SignalMessage):
         Get a quote object for this message.
         :return: SignalQuote: This message as a SignalQuote object.
         """
-        quote = SignalQuote(config_path=self._config_path, contacts=self._contacts, groups=self._groups,
+        quote = SignalQuote(context=self._context,
                             timestamp=self.timestamp, author=self.sender, mentions=self.mentions,
                             conversation=self.recipient)
         return quote
@@ -728,17 +689,11 @@ class SignalSentMessage(SignalMessage):
 
         # Create reaction
         if self.recipient_type == RecipientTypes.CONTACT:
-            reaction = SignalReaction(command_socket=self._command_socket, account_id=self._account_id,
-                                      config_path=self._config_path,
-                                      contacts=self._contacts, groups=self._groups, devices=self._devices,
-                                      this_device=self._this_device, recipient=self.sender, emoji=emoji,
+            reaction = SignalReaction(context=self._context, recipient=self.sender, emoji=emoji,
                                       target_author=self.sender,
                                       target_timestamp=self.timestamp)
         elif self.recipient_type == RecipientTypes.GROUP:
-            reaction = SignalReaction(command_socket=self._command_socket, account_id=self._account_id,
-                                      config_path=self._config_path,
-                                      contacts=self._contacts, groups=self._groups, devices=self._devices,
-                                      this_device=self._this_device, recipient=self.recipient, emoji=emoji,
+            reaction = SignalReaction(context=self._context, recipient=self.recipient, emoji=emoji,
                                       target_author=self.sender, target_timestamp=self.timestamp)
         else:
             error_message = "Invalid recipient type."
@@ -792,7 +747,7 @@ class SignalSentMessage(SignalMessage):
         """
         logger: logging.Logger = logging.getLogger(__name__ + '.' + "is_expired.getter")
         if self.expiration_timestamp is not None:
-            now = pytz.utc.localize(datetime.utcnow())
+            now = datetime.now(timezone.utc)
             if self.expiration_timestamp.datetime_obj <= now:
                 # logger.debug("exp_ts = %s" % str(self.expiration_timestamp.datetime_obj))
                 # logger.debug("now = %s" % str(now))
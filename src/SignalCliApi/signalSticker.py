@@ -16,6 +16,8 @@ class SignalSticker(object):
     """
     SignalSticker object.
     """
+    __slots__ = ('_pack_id', '_pack_path', 'id', 'emoji', 'file_path', 'content_type')
+
     def __init__(self,
                  pack_id: str,
                  pack_path: str,
@@ -5,16 +5,13 @@ Store and handle a story message.
 """
 import logging
 from typing import Optional, Any
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalAttachment import SignalAttachment
 from .signalCommon import __type_error__, MessageTypes, AttachmentTypes
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
 from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
 from .signalGroup import SignalGroup
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 from .signalPreview import SignalPreview
 from .signalTextAttachment import SignalTextAttachment
@@ -25,14 +22,10 @@ class SignalStoryMessage(SignalMessage):
     """
     Class to store a story message.
     """
+    __slots__ = ('allows_replies', 'preview', 'attachment', 'attachment_type')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  sender: Optional[SignalContact] = None,
@@ -45,13 +38,7 @@ class SignalStoryMessage(SignalMessage):
                  ) -> None:
         """
         Initialize a story message.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object representing this device.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: A dict provided by __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: A dict provided by Signal.
         :param sender: Optional[SignalContact]: The sender of this message.
@@ -100,8 +87,7 @@ class SignalStoryMessage(SignalMessage):
             else:
                 self.attachment_type = AttachmentTypes.TEXT
         # Run super init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, sender, recipient, device, timestamp, MessageTypes.STORY)
+        super().__init__(context, from_dict, raw_message, sender, recipient, device, timestamp, MessageTypes.STORY)
         return
 
     ###########################
@@ -118,7 +104,7 @@ class SignalStoryMessage(SignalMessage):
         self.attachment = None
         self.attachment_type = AttachmentTypes.NOT_SET
         if 'fileAttachment' in raw_story_message.keys():
-            self.attachment = SignalAttachment(config_path=self._config_path,
+            self.attachment = SignalAttachment(config_path=self._context.config_path,
                                                raw_attachment=raw_story_message['fileAttachment'])
             self.attachment_type = AttachmentTypes.FILE
         elif 'textAttachment' in raw_story_message.keys():
@@ -127,7 +113,8 @@ class SignalStoryMessage(SignalMessage):
         # Preview:
         self.preview = None
         if 'preview' in raw_story_message.keys():
-            self.preview = SignalPreview(config_path=self._config_path, raw_preview=raw_story_message['preview'])
+            self.preview = SignalPreview(config_path=self._context.config_path,
+                                         raw_preview=raw_story_message['preview'])
         return
 
     ###########################
@@ -162,12 +149,13 @@ class SignalStoryMessage(SignalMessage):
         self.allows_replies = from_dict['allowsReplies']
         self.preview = None
         if from_dict['preview'] is not None:
-            self.preview = SignalPreview(config_path=self._config_path, from_dict=from_dict['preview'])
+            self.preview = SignalPreview(config_path=self._context.config_path, from_dict=from_dict['preview'])
         self.attachment_type = AttachmentTypes(from_dict['attachmentType'])
         self.attachment = None
         if from_dict['attachment'] is not None:
             if self.attachment_type == AttachmentTypes.FILE:
-                self.attachment = SignalAttachment(config_path=self._config_path, from_dict=from_dict['attachment'])
+                self.attachment = SignalAttachment(config_path=self._context.config_path,
+                                                   from_dict=from_dict['attachment'])
             elif self.attachment_type == AttachmentTypes.TEXT:
                 self.attachment = SignalTextAttachment(from_dict=from_dict['attachment'])
             else:
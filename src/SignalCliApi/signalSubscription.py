@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+File: signalSubscription.py
+A single subscription receiving for every account, routing each envelope to that account's receiver.
+"""
+import logging
+import threading
+from typing import Optional, Any
+import socket
+import json
+
+from .signalCommon import __socket_create__, __socket_connect__, __socket_close__, __socket_receive_blocking__, \
+    __socket_send__, __type_error__, __parse_signal_response__, __check_response_for_error__
+from .signalReceiver import SignalReceiver
+
+
+class SignalSubscription(object):
+    """
+    One subscribeReceive for all the accounts signal-cli serves: Owns the subscription socket, and reads the account
+    number off each notification, so it can be handed to that account's SignalReceiver. Notifications for accounts
+    with no receiver are dropped. Like SignalReceiver, it doesn't read the socket itself; SignalReceiveReactor reads it,
+    routes each notification, and queues it on the worker of the account it's for.
+    """
+
+    def __init__(self, server_address: tuple[str, int] | str) -> None:
+        """
+        Create the subscription, and connect its socket.
+        :param server_address: tuple[str, int] | str: The server address to connect the subscription socket to.
+        """
+        # Run super init:
+        object.__init__(self)
+
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
+
+        # Argument checks:
+        if not isinstance(server_address, tuple) and not isinstance(server_address, str):
+            logger.critical("Raising TypeError:")
+            __type_error__("server_address", "tuple[str, int] | str", server_address)
+
+        # Set internal vars:
+        self._receivers: dict[str, SignalReceiver] = {}
+        """The receivers to route to, keyed by account number."""
+        self._lock: threading.Lock = threading.Lock()
+        """Lock protecting the receivers dict."""
+        self._receiving: bool = False
+        """Are we receiving?"""
+        self._subscription_id: Optional[int] = None
+        """The subscription ID provided by Signal."""
+        # Create and connect the socket:
+        self._receive_socket: socket.socket = __socket_create__(server_address)
+        """The socket the subscription is on."""
+        __socket_connect__(self._receive_socket, server_address)
+        return
+
+    #############################
+    # Receive:
+    #############################
+    def __subscribe__(self) -> None:
+        """
+        Subscribe to messages for every account.
+        :return: None
+        :raises RuntimeError: If signal refuses the subscription.
+        :raises CommunicationsError: On error communicating with signal.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__subscribe__.__name__)
+
+        # Create receive object and json command string, NOTE: No account, so signal subscribes us to them all:
+        start_receive_command_object: dict[str, Any] = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "subscribeReceive",
+        }
+        json_command_str: str = json.dumps(start_receive_command_object) + '\n'
+
+        # Communicate start receive with signal:
+        __socket_send__(self._receive_socket, json_command_str)
+        response_str = __socket_receive_blocking__(self._receive_socket)
+        response_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        error_occurred, signal_code, signal_message = __check_response_for_error__(response_obj, [])
+        if error_occurred:
+            error_message: str = "Signal error while trying to start receiving. Code %i, Message: %s" \
+                                 % (signal_code, signal_message)
+            logger.critical("Raising RuntimeError(%s)." % error_message)
+            raise RuntimeError(error_message)
+
+        # Set subscription ID, and start receiving:
+        self._subscription_id = response_obj['result']
+        self._receiving = True
+        return
+
+    def __route__(self, response_str: str) -> Optional[tuple[SignalReceiver, dict[str, Any]]]:
+        """
+        Find the receiver of the account a message read from the subscription socket is for.
+        :param response_str: str: The line read from the socket.
+        :return: Optional[tuple[SignalReceiver, dict[str, Any]]]: The receiver, and the parsed notification to hand it,
+            or None if no receiver is receiving for the account.
+        :raises InvalidServerResponse: If the line isn't valid JSON.
+        :raises SignalError: If signal sent an error.
+        """
+        # Setup logging:
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__route__.__name__)
+
+        # Create msg object, and check the incoming message for an error, NOTE: There are no non-fatal errors
+        # during reception:
+        message_obj: dict[str, Any] = __parse_signal_response__(response_str)
+        __check_response_for_error__(message_obj, [])
+
+        # Find the account it's for:
+        account_number: Optional[str] = None
+        if 'params' in message_obj.keys():
+            if 'account' in message_obj['params'].keys():
+                account_number = message_obj['params']['account']
+            elif 'result' in message_obj['params'].keys():
+                account_number = message_obj['params']['result'].get('account')
+        with self._lock:
+            receiver: Optional[SignalReceiver] = self._receivers.get(account_number)
+        if receiver is None or not receiver.is_receiving:
+            logger.debug("Dropping message for account not receiving: %s" % str(account_number))
+            return None
+        return receiver, message_obj
+
+    def stop(self) -> None:
+        """
+        Stops the reception, closing the subscription socket, and stopping every receiver.
+        :returns: None
+        """
+        self._receiving = False
+        with self._lock:
+            receivers: list[SignalReceiver] = list(self._receivers.values())
+            self._receivers = {}
+        for receiver in receivers:
+            receiver.stop()
+        __socket_close__(self._receive_socket)
+        return
+
+    #############################
+    # Methods:
+    #############################
+    def add(self, receiver: SignalReceiver) -> None:
+        """
+        Start routing an account's messages to a receiver.
+        :param receiver: SignalReceiver: The receiver, created with subscribe=False, __subscribe__() must have been
+            called.
+        :return: None
+        """
+        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.add.__name__)
+        if not isinstance(receiver, SignalReceiver):
+            logger.critical("Raising TypeError:")
+            __type_error__("receiver", "SignalReceiver", receiver)
+        with self._lock:
+            self._receivers[receiver.account.number] = receiver
+        return
+
+    def remove(self, receiver: SignalReceiver) -> None:
+        """
+        Stop routing an account's messages to a receiver; Call receiver.stop() to stop it.
+        :param receiver: SignalReceiver: The receiver to remove.
+        :return: None
+        """
+        with self._lock:
+            if self._receivers.get(receiver.account.number) is receiver:
+                del self._receivers[receiver.account.number]
+        return
+
+    #############################
+    # Properties:
+    #############################
+    @property
+    def name(self) -> str:
+        """
+        A name for logging.
+        :return: str: The name.
+        """
+        return "subscription %s" % str(self._subscription_id)
+
+    @property
+    def subscription_id(self) -> Optional[int]:
+        """
+        The subscription ID provided by signal.
+        :return: Optional[int]: The subscription ID, None if not subscribed.
+        """
+        return self._subscription_id
+
+    @property
+    def receive_socket(self) -> socket.socket:
+        """
+        The socket the subscription is on.
+        :return: socket.socket: The subscription socket.
+        """
+        return self._receive_socket
+
+    @property
+    def is_receiving(self) -> bool:
+        """
+        Are we receiving?
+        :return: bool: True if subscribed and not stopped.
+        """
+        return self._receiving
+
+    @property
+    def num_receivers(self) -> int:
+        """
+        The number of receivers being routed to.
+        :return: int: The number of receivers.
+        """
+        return len(self._receivers)
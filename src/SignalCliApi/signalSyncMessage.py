@@ -5,15 +5,10 @@ Store and handle Sync Messages.
 """
 import logging
 from typing import Optional, Any
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
-from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
-from .signalSticker import SignalStickerPacks
 from .signalTimestamp import SignalTimestamp
 from .signalCommon import __type_error__, MessageTypes, SyncTypes
 
@@ -23,44 +18,19 @@ class SignalSyncMessage(SignalMessage):
     """
     Class to store the different type of sync messages.
     """
+    __slots__ = ('_sync_type', 'raw_sent_message', 'read_messages', 'blocked_contacts', 'blocked_groups')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
-                 sticker_packs: SignalStickerPacks,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  ) -> None:
         """
         Initialize a SyncMessage object.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to signal-cli directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The device object representing the device we're on.
-        :param sticker_packs: SignalStickerPacks: The loaded sticker packs.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: Load properties from a dict provided by __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: Load properties from a dict provided by Signal.
         """
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
-
-        # Argument checks:
-        if not isinstance(sticker_packs, SignalStickerPacks):
-            logger.critical("Raising TypeError:")
-            __type_error__("sticker_packs", "SignalStickerPacks", sticker_packs)
-
-        # Set internal properties:
-        # Set sticker packs:
-        self._sticker_packs: SignalStickerPacks = sticker_packs
-        """The loaded SignalStickerPacks object."""
-
         # Set external properties:
         # Set sync type:
         self._sync_type: SyncTypes = SyncTypes.NOT_SET
@@ -77,8 +47,7 @@ class SignalSyncMessage(SignalMessage):
         self.blocked_groups: list[str] = []
         """Blocked groups sync list."""
         # Run super Init:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, None, None, None, None, MessageTypes.SYNC)
+        super().__init__(context, from_dict, raw_message, None, None, None, None, MessageTypes.SYNC)
         # Mark viewed delivered and read:
         super().mark_delivered(self.timestamp)
         super().mark_read(self.timestamp)
@@ -109,7 +78,7 @@ class SignalSyncMessage(SignalMessage):
             read_message_list: list[dict[str, Any]] = raw_sync_message['readMessages']
             self.read_messages: list[tuple[SignalContact, SignalTimestamp]] = []
             for read_message_dict in read_message_list:
-                _, contact = self._contacts.__get_or_add__(contact_id=read_message_dict['sender'])
+                _, contact = self._context.contacts.__get_or_add__(contact_id=read_message_dict['sender'])
                 timestamp = SignalTimestamp(timestamp=read_message_dict['timestamp'])
                 self.read_messages.append((contact, timestamp))
         # Sent message:
@@ -191,7 +160,7 @@ class SignalSyncMessage(SignalMessage):
         # Load read messages:
         self.read_messages = []
         for (contact_id, timestamp_dict) in from_dict['readMessages']:
-            added, contact = self._contacts.__get_or_add__(contact_id=contact_id)
+            added, contact = self._context.contacts.__get_or_add__(contact_id=contact_id)
             timestamp = SignalTimestamp(from_dict=timestamp_dict)
             self.read_messages.append((contact, timestamp))
         # Set blocked groups and contacts:
@@ -15,6 +15,9 @@ from .signalTimestamp import SignalTimestamp
 
 class SignalThumbnail(object):
     """Class to store a thumbnail."""
+    __slots__ = ('_config_path', 'content_type', 'filename', 'local_path', 'exists', 'size', 'height', 'width',
+                 'caption', 'upload_timestamp', 'id')
+
     def __init__(self,
                  config_path: str,
                  from_dict: Optional[dict[str, Any]] = None,
@@ -71,8 +74,6 @@ class SignalThumbnail(object):
         # Set internal vars:
         self._config_path: str = config_path
         """The full path to the signal-cli config directory."""
-        self._xdgopen_path: Optional[str] = __find_xdgopen__()
-        """The full path to the xdg-open executable."""
 
         # Set external properties:
         # Content-Type:
@@ -213,12 +214,13 @@ class SignalThumbnail(object):
         Run xdgopen on the thumbnail.
         :returns: bool: True = xdgopen successfully called.
         """
-        if self._xdgopen_path is None:
+        xdgopen_path: Optional[str] = __find_xdgopen__()
+        if xdgopen_path is None:
             return False
         if not self.exists:
             return False
         try:
-            check_call([self._xdgopen_path, self.local_path])
+            check_call([xdgopen_path, self.local_path])
         except CalledProcessError:
             return False
         return True
@@ -7,8 +7,7 @@ import logging
 from typing import TypeVar, Optional, IO, Any
 import datetime
 import sys
-import pytz
-from tzlocal import get_localzone
+import time
 
 from .signalCommon import __type_error__, STRINGS
 from .signalExceptions import ParameterError
@@ -18,7 +17,10 @@ DEBUG: bool = False
 
 
 class SignalTimestamp(object):
-    """Time stamp object."""
+    """
+    Time stamp object; Stores the timestamp as an int of milliseconds, the datetime is only built when asked for.
+    """
+    __slots__ = ('_timestamp', '_datetime')
 
     def __init__(self,
                  timestamp: Optional[int] = None,
@@ -29,40 +31,37 @@ class SignalTimestamp(object):
         # Super:
         object.__init__(self)
 
-        # Setup logging:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
-
-        # Verify args:
+        # Verify args, only getting a logger on error, as timestamps are made in bulk:
         if timestamp is None and from_dict is None and datetime_obj is None and not now:
+            logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__init__.__name__)
             error_message = "'timestamp', 'from_dict', 'date_time' must be defined, or 'now' must be True."
             logger.critical("Raising ParameterError(%s)." % error_message)
             raise ParameterError(error_message)
 
         # Type check args:
         if timestamp is not None and not isinstance(timestamp, int):
-            logger.critical("Raising TypeError:")
+            logging.getLogger(__name__ + '.' + self.__init__.__name__).critical("Raising TypeError:")
             __type_error__("timestamp", "int", timestamp)
         if from_dict is not None and not isinstance(from_dict, dict):
-            logger.critical("Raising TypeError:")
+            logging.getLogger(__name__ + '.' + self.__init__.__name__).critical("Raising TypeError:")
             __type_error__("from_dict", "dict[str, object]", from_dict)
         if datetime_obj is not None and not isinstance(datetime_obj, datetime.datetime):
-            logger.critical("Raising TypeError:")
+            logging.getLogger(__name__ + '.' + self.__init__.__name__).critical("Raising TypeError:")
             __type_error__("date_time", "date_time.date_time", datetime_obj)
         if not isinstance(now, bool):
-            logger.critical("Raising TypeError:")
+            logging.getLogger(__name__ + '.' + self.__init__.__name__).critical("Raising TypeError:")
             __type_error__("now", "bool", now)
 
         # Set vars:
         self._timestamp: int = timestamp  # Int
-        """The integer timestamp."""
+        """The integer timestamp, in milliseconds."""
         self._datetime: Optional[datetime.datetime] = None  # Python tz aware date_time object.
-        """The tz aware datetime object."""
+        """The tz aware datetime object, built when first used."""
 
-        # Load from INT timestamp:
+        # An int timestamp is already set, otherwise load from dict:
         if self._timestamp is not None:
-            self.__set_date_time__()
-        # Load from dict:
-        elif from_dict is not None:
+            return
+        if from_dict is not None:
             self.__from_dict__(from_dict=from_dict)
         # Load from a datetime object:
         elif datetime_obj is not None:
@@ -75,13 +74,26 @@ class SignalTimestamp(object):
     ##########################
     # Init functions:
     ##########################
+    @staticmethod
+    def __get_milliseconds__(from_dict: dict[str, Any]) -> int:
+        """
+        Get the timestamp in milliseconds from a dict created by __to_dict__(); Either the int milliseconds it's
+        stored as now, or the float seconds it used to be stored as.
+        :param from_dict: dict[str, Any]: The dict created by __to_dict__().
+        :return: int: The timestamp in milliseconds.
+        """
+        timestamp: int | float = from_dict['timestamp']
+        if isinstance(timestamp, float):
+            return int(timestamp * 1000)
+        return timestamp
+
     def __to_dict__(self) -> dict[str, Any]:
         """
         Create a JSON friendly dict of the timestamp.
         :return: dict[str, Any]: The dict to pass to __from_dict__()
         """
         timestamp_dict = {
-            'timestamp': self._datetime.timestamp()
+            'timestamp': self._timestamp
         }
         return timestamp_dict
 
@@ -91,8 +103,8 @@ class SignalTimestamp(object):
         :param from_dict: dict[str, Any]: The dict created by __to_dict__()
         :return: None
         """
-        self._datetime = pytz.utc.localize(datetime.datetime.fromtimestamp(from_dict['timestamp']))
-        self._timestamp = int(from_dict['timestamp'] * 1000)
+        self._timestamp = self.__get_milliseconds__(from_dict)
+        self._datetime = None
         return
 
     def __from_now__(self) -> None:
@@ -100,23 +112,20 @@ class SignalTimestamp(object):
         Generate properties from now.
         :return: None
         """
-        self._datetime = pytz.utc.localize(datetime.datetime.utcnow())
-        seconds = int(self._datetime.timestamp())
-        self._timestamp = seconds * 1000
+        self._timestamp = int(time.time() * 1000)
+        self._datetime = None
         return
 
     def __from_date_time__(self, date_time: datetime.datetime) -> None:
         """
-        Generate properties from a datetime object.
+        Generate properties from a datetime object, a naive datetime is taken to be UTC.
         :param date_time: The datetime object to load from.
         :return: None
         """
-        try:
-            self._datetime = pytz.utc.localize(date_time)
-        except ValueError:
-            self._datetime = date_time
-        seconds = self._datetime.timestamp()
-        self._timestamp = int(seconds * 1000)
+        if date_time.tzinfo is None:
+            date_time = date_time.replace(tzinfo=datetime.timezone.utc)
+        self._datetime = date_time
+        self._timestamp = int(date_time.timestamp() * 1000)
         return
 
     def __set_date_time__(self) -> None:
@@ -124,10 +133,9 @@ class SignalTimestamp(object):
         Calculate the datetime property from the timestamp.
         :return: None
         """
-        seconds = int(self._timestamp // 1000)
-        microseconds = int((((self._timestamp / 1000) - seconds) * 1000) * 1000)
-        self._datetime = pytz.utc.localize(datetime.datetime.fromtimestamp(seconds))
-        self._datetime = self._datetime.replace(microsecond=microseconds)
+        seconds, milliseconds = divmod(self._timestamp, 1000)
+        self._datetime = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+        self._datetime = self._datetime.replace(microsecond=milliseconds * 1000)
         return
 
     ##########################################
@@ -143,18 +151,25 @@ class SignalTimestamp(object):
     def __float__(self) -> float:
         """
         Represent as a float.
-        :return: float
+        :return: float: The timestamp in seconds.
         """
-        return self._datetime.timestamp()
+        return self._timestamp / 1000
 
     def __str__(self) -> str:
         """
         Represent as a string.
         :return: str: A formatted string with timestamp int, and datetime in iso format.
         """
-        return_str: str = "%s<%i>" % (self._datetime.isoformat(), self._timestamp)
+        return_str: str = "%s<%i>" % (self.datetime_obj.isoformat(), self._timestamp)
         return return_str
 
+    def __hash__(self) -> int:
+        """
+        Hash on the timestamp, so equal timestamps hash the same.
+        :return: int
+        """
+        return hash(self._timestamp)
+
     def __eq__(self, other: Self | int) -> bool:
         """
         Calculate equality.
@@ -162,13 +177,12 @@ class SignalTimestamp(object):
         :return: bool
         :raises TypeError: If other is not a SignalTimestamp or int.
         """
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__eq__.__name__)
         if isinstance(other, SignalTimestamp):
-            return self._datetime == other._datetime
+            return self._timestamp == other._timestamp
         elif isinstance(other, int):
             return self._timestamp == other
         error_message: str = "Can only compare equality to SignalTimestamp or int."
-        logging.critical("Raising TypeError(%s)." % error_message)
+        logging.getLogger(__name__ + '.' + self.__eq__.__name__).critical("Raising TypeError(%s)." % error_message)
         raise TypeError(error_message)
 
     def __lt__(self, other: Self | int) -> bool:
@@ -177,23 +191,26 @@ class SignalTimestamp(object):
         :param other: SignalTimestamp or int: The object to compare to.
         :return: bool
         """
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__lt__.__name__)
         if isinstance(other, SignalTimestamp):
-            return self._datetime < other._datetime
+            return self._timestamp < other._timestamp
         elif isinstance(other, int):
             return self._timestamp < other
         error_message: str = "Can only compare less than to SignalTimestamp or int."
-        logger.critical("Raising TypeError(%s)." % error_message)
+        logging.getLogger(__name__ + '.' + self.__lt__.__name__).critical("Raising TypeError(%s)." % error_message)
         raise TypeError(error_message)
 
     def __gt__(self, other: Self | int) -> bool:
-        logger: logging.Logger = logging.getLogger(__name__ + '.' + self.__gt__.__name__)
+        """
+        Compare greater than.
+        :param other: SignalTimestamp or int: The object to compare to.
+        :return: bool
+        """
         if isinstance(other, SignalTimestamp):
-            return self._datetime > other._datetime
+            return self._timestamp > other._timestamp
         elif isinstance(other, int):
             return self._timestamp > other
         error_message: str = "Can only compare greater than to SignalTimestamp or int."
-        logger.critical("Raising TypeError(%s)." % error_message)
+        logging.getLogger(__name__ + '.' + self.__gt__.__name__).critical("Raising TypeError(%s)." % error_message)
         raise TypeError(error_message)
 
     ##########################
@@ -218,7 +235,7 @@ class SignalTimestamp(object):
             logger.critical("Raising TypeError:")
             __type_error__("local_time", "bool", local_time)
 
-        t_delta = self._datetime - pytz.utc.localize(datetime.datetime.utcnow())
+        t_delta = self.datetime_obj - datetime.datetime.now(datetime.timezone.utc)
         if t_delta.total_seconds() == 0:
             return STRINGS['lessThanASecond'] + '.'
         elif 0 < t_delta.total_seconds() < 2:
@@ -248,6 +265,8 @@ class SignalTimestamp(object):
         Get a datetime.datetime object that has been localized to the system timezone.
         :returns: datetime.datetime object representing the timestamp in local time.
         """
+        # tzlocal is only needed here, so import it on first use, rather than on every startup:
+        from tzlocal import get_localzone
         date_time_obj = self.get_datetime(include_micros)
         return date_time_obj.astimezone(get_localzone())
 
@@ -256,8 +275,8 @@ class SignalTimestamp(object):
         Get the number of seconds that has elapsed since this timestamp's time.
         :return: int: The number of seconds.
         """
-        now: datetime.datetime = pytz.utc.localize(datetime.datetime.utcnow())
-        t_delta: datetime.timedelta = now - self._datetime
+        now: datetime.datetime = datetime.datetime.now(datetime.timezone.utc)
+        t_delta: datetime.timedelta = now - self.datetime_obj
         return int(t_delta.total_seconds())
 
     def get_minutes_ago(self) -> int:
@@ -265,8 +284,8 @@ class SignalTimestamp(object):
         Get the number of minutes that has elapsed since this timestamp's time.
         :return: int: The number of minutes.
         """
-        now: datetime.datetime = pytz.utc.localize(datetime.datetime.utcnow())
-        t_delta: datetime.timedelta = now - self._datetime
+        now: datetime.datetime = datetime.datetime.now(datetime.timezone.utc)
+        t_delta: datetime.timedelta = now - self.datetime_obj
         return int(t_delta.total_seconds() / 60)
 
     def get_hours_ago(self) -> int:
@@ -274,8 +293,8 @@ class SignalTimestamp(object):
         Get the number of hours that has elapsed since this timestamp's time.
         :return: int: The number of hours.
         """
-        now: datetime.datetime = pytz.utc.localize(datetime.datetime.utcnow())
-        t_delta: datetime.timedelta = now - self._datetime
+        now: datetime.datetime = datetime.datetime.now(datetime.timezone.utc)
+        t_delta: datetime.timedelta = now - self.datetime_obj
         return int(t_delta.total_seconds() / 3600)
 
     def get_days_ago(self) -> int:
@@ -283,8 +302,8 @@ class SignalTimestamp(object):
         Get the number of days elapsed since this timestamp's time.
         :return: int: The number of days.
         """
-        now: datetime.datetime = pytz.utc.localize(datetime.datetime.utcnow())
-        t_delta: datetime.timedelta = now - self._datetime
+        now: datetime.datetime = datetime.datetime.now(datetime.timezone.utc)
+        t_delta: datetime.timedelta = now - self.datetime_obj
         return int(t_delta.total_seconds() / 86400)
 
     def get_weeks_ago(self) -> int:
@@ -334,36 +353,38 @@ class SignalTimestamp(object):
 
     @property
     def datetime_obj(self) -> datetime.datetime:
+        if self._datetime is None:
+            self.__set_date_time__()
         return self._datetime
 
     @property
     def year(self) -> int:
-        return self._datetime.year
+        return self.datetime_obj.year
 
     @property
     def month(self):
-        return self._datetime.month
+        return self.datetime_obj.month
 
     @property
     def day(self):
-        return self._datetime.day
+        return self.datetime_obj.day
 
     @property
     def hour(self):
-        return self._datetime.hour
+        return self.datetime_obj.hour
 
     @property
     def minute(self):
-        return self._datetime.minute
+        return self.datetime_obj.minute
 
     @property
     def second(self):
-        return self._datetime.second
+        return self.datetime_obj.second
 
     @property
     def microsecond(self):
-        return self._datetime.microsecond
+        return self.datetime_obj.microsecond
 
     @property
     def tz_info(self):
-        return self._datetime.tzinfo
+        return self.datetime_obj.tzinfo
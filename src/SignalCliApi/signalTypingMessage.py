@@ -5,14 +5,11 @@ Store and handle a typing message.
 """
 import logging
 from typing import Optional, Any
-import socket
 
+from .signalAccountContext import SignalAccountContext
 from .signalCommon import RecipientTypes, MessageTypes, TypingStates, __type_error__
 from .signalContact import SignalContact
-from .signalContacts import SignalContacts
 from .signalDevice import SignalDevice
-from .signalDevices import SignalDevices
-from .signalGroups import SignalGroups
 from .signalMessage import SignalMessage
 from .signalRecipient import SignalRecipient
 from .signalTimestamp import SignalTimestamp
@@ -20,14 +17,10 @@ from .signalTimestamp import SignalTimestamp
 
 class SignalTypingMessage(SignalMessage):
     """Class to store a typing message."""
+    __slots__ = ('_action', 'time_changed', 'body')
+
     def __init__(self,
-                 command_socket: socket.socket,
-                 account_id: str,
-                 config_path: str,
-                 contacts: SignalContacts,
-                 groups: SignalGroups,
-                 devices: SignalDevices,
-                 this_device: SignalDevice,
+                 context: SignalAccountContext,
                  from_dict: Optional[dict[str, Any]] = None,
                  raw_message: Optional[dict[str, Any]] = None,
                  sender: Optional[SignalContact] = None,
@@ -39,13 +32,7 @@ class SignalTypingMessage(SignalMessage):
                  ) -> None:
         """
         Initialize a Typing Message.
-        :param command_socket: socket.socket: The socket to run commands on.
-        :param account_id: str: This accounts' ID.
-        :param config_path: str: The full path to the signal-cli config directory.
-        :param contacts: SignalContacts: This accounts' SignalContacts object.
-        :param groups: SignalGroups: This accounts' SignalGroups object.
-        :param devices: SignalDevices: This accounts' SignalDevices object.
-        :param this_device: SignalDevice: The SignalDevice object that represents the device we're on.
+        :param context: SignalAccountContext: The account's shared context.
         :param from_dict: Optional[dict[str, Any]]: The dict created to __to_dict__().
         :param raw_message: Optional[dict[str, Any]]: A dict provided by Signal.
         :param sender: Optional[SignalContact]: The sender of this message.
@@ -76,8 +63,7 @@ class SignalTypingMessage(SignalMessage):
         """The SignalTimestamp of the action change."""
 
         # Run super:
-        super().__init__(command_socket, account_id, config_path, contacts, groups, devices, this_device, from_dict,
-                         raw_message, sender, recipient, device, timestamp, MessageTypes.TYPING)
+        super().__init__(context, from_dict, raw_message, sender, recipient, device, timestamp, MessageTypes.TYPING)
 
         # update body:
         self.__update_body__()
@@ -105,7 +91,7 @@ class SignalTypingMessage(SignalMessage):
             self.action = TypingStates.NOT_SET
         self.time_changed = SignalTimestamp(timestamp=typing_dict['timestamp'])
         if 'groupId' in typing_dict.keys():
-            group = self._groups.get_by_id(typing_dict['groupId'])
+            group = self._context.groups.get_by_id(typing_dict['groupId'])
             if group is not None:
                 self._recipient = group
         return
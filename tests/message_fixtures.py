@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+File: message_fixtures.py
+Fixtures shared by the message storage tests.
+"""
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from SignalCliApi import signalCommon
+from SignalCliApi.signalAccountContext import SignalAccountContext
+from SignalCliApi.signalCommon import SELF_CONTACT_NAME, MessageTypes, RecipientTypes, StorageTypes
+from SignalCliApi.signalContacts import SignalContacts
+from SignalCliApi.signalMessages import SignalMessages
+from SignalCliApi.signalSticker import SignalStickerPacks
+
+UUID: str = '9d8a3c2e-1f4b-4c6d-8e7f-0a1b2c3d4e5f'
+"""The uuid of the contact sending the messages."""
+NUMBER: str = '+15555550101'
+"""The number learned for the contact."""
+OTHER_NUMBER: str = '+15555550102'
+"""The number of a second contact."""
+ACCOUNT_ID: str = '+15555550100'
+"""The account the messages are sent to."""
+GROUP_ID: str = 'Z3JvdXAtaWQtZm9yLXRlc3RzLW9ubHk='
+"""The id of a group the messages can be sent to."""
+TIMESTAMP: int = 1700000000000
+"""The timestamp of the first message, in milliseconds."""
+SELF_RAW_CONTACT: dict[str, Any] = {
+    'name': SELF_CONTACT_NAME, 'number': ACCOUNT_ID, 'uuid': None, 'isBlocked': False, 'color': None,
+    'messageExpirationTime': 0, 'profile': {'givenName': '', 'familyName': '', 'about': '', 'aboutEmoji': '',
+                                            'mobileCoinAddress': None, 'lastUpdateTimestamp': 0},
+}
+"""The account's own contact, as listContacts returns it; Listing it means loading contacts doesn't ask signal to
+add it."""
+
+
+def make_message_dict(sender: str,
+                      recipient: str = ACCOUNT_ID,
+                      timestamp: int = TIMESTAMP,
+                      is_read: bool = False,
+                      message_type: MessageTypes = MessageTypes.RECEIVED,
+                      expires: Optional[int] = None,
+                      mentioned: Optional[str] = None,
+                      ) -> dict[str, Any]:
+    """
+    Make the __to_dict__() of a message, as SignalMessages stores it.
+    :param sender: str: The sender's id.
+    :param recipient: str: The recipient's id, a group id makes it a group message.
+    :param timestamp: int: The timestamp in milliseconds.
+    :param is_read: bool: Has the message been read?
+    :param message_type: MessageTypes: The message type.
+    :param expires: Optional[int]: When the message expires in milliseconds, None if it doesn't.
+    :param mentioned: Optional[str]: The id of a contact mentioned in the message.
+    :return: dict[str, Any]: The message dict.
+    """
+    recipient_type: RecipientTypes = RecipientTypes.GROUP if recipient == GROUP_ID else RecipientTypes.CONTACT
+    message_dict: dict[str, Any] = {
+        'sender': sender, 'recipient': recipient, 'recipientType': recipient_type.value, 'device': 1,
+        'timestamp': {'timestamp': timestamp}, 'messageType': message_type.value, 'isRead': is_read,
+        'expirationTimestamp': {'timestamp': expires} if expires is not None else None,
+    }
+    if mentioned is not None:
+        message_dict['mentions'] = {'mentions': [{'contactId': mentioned, 'start': 0, 'length': 1}]}
+    return message_dict
+
+
+class MessageStorageTestCase(unittest.TestCase):
+    """
+    Runs each test in a temporary account directory, with a contact whose number can be learned part way through.
+    """
+
+    def setUp(self) -> None:
+        """
+        Create the temporary directory.
+        :return: None
+        """
+        self._directory = tempfile.TemporaryDirectory()
+        self._numbers: dict[str, str] = {}
+        """The uuid of each contact whose number is known, keyed by number."""
+        return
+
+    def tearDown(self) -> None:
+        """
+        Remove the temporary directory.
+        :return: None
+        """
+        self._directory.cleanup()
+        return
+
+    def __get_path__(self, filename: str) -> str:
+        """
+        Get the path to a file in the temporary directory.
+        :param filename: str: The file name.
+        :return: str: The full path.
+        """
+        return os.path.join(self._directory.name, filename)
+
+    def __resolve_id__(self, contact_id: str) -> str:
+        """
+        Map a contact id to the contact's uuid, as SignalMessages does.
+        :param contact_id: str: The id.
+        :return: str: The uuid, or the id if the number isn't known.
+        """
+        return self._numbers.get(contact_id, contact_id)
+
+    def __make_messages__(self, storage: StorageTypes, compact_size: int = 1000) -> SignalMessages:
+        """
+        Create a SignalMessages for the temporary directory, restoring the storage settings after the test.
+        :param storage: StorageTypes: How to store the messages.
+        :param compact_size: int: The number of journal records that triggers a compaction.
+        :return: SignalMessages: The messages, closed after the test.
+        """
+        old_settings: tuple[StorageTypes, int] = (signalCommon.MESSAGES_STORAGE,
+                                                  signalCommon.MESSAGES_JOURNAL_COMPACT_SIZE)
+        signalCommon.MESSAGES_STORAGE = storage
+        signalCommon.MESSAGES_JOURNAL_COMPACT_SIZE = compact_size
+        self.addCleanup(self.__restore_settings__, *old_settings)
+        sock, other_sock = socket.socketpair()
+        self.addCleanup(sock.close)
+        self.addCleanup(other_sock.close)
+        context: SignalAccountContext = SignalAccountContext(
+            command_socket=sock, sync_socket=sock, account_id=ACCOUNT_ID, config_path=self._directory.name,
+            account_path=self._directory.name, sticker_packs=SignalStickerPacks(config_path=self._directory.name))
+        context.contacts = SignalContacts(command_socket=sock, sync_socket=sock, config_path=self._directory.name,
+                                          account_id=ACCOUNT_ID, account_path=self._directory.name,
+                                          raw_contacts=[SELF_RAW_CONTACT])
+        messages: SignalMessages = SignalMessages(context=context, do_load=True)
+        self.addCleanup(messages.close)
+        return messages
+
+    @staticmethod
+    def __restore_settings__(storage: StorageTypes, compact_size: int) -> None:
+        """
+        Put the storage settings back.
+        :param storage: StorageTypes: The storage type.
+        :param compact_size: int: The compaction size.
+        :return: None
+        """
+        signalCommon.MESSAGES_STORAGE = storage
+        signalCommon.MESSAGES_JOURNAL_COMPACT_SIZE = compact_size
+        return
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+File: test_message_journal.py
+Test replaying the message journal.
+Run from the repository root: python -m pytest tests
+"""
+import os
+import unittest
+from typing import Any
+
+from message_fixtures import NUMBER, OTHER_NUMBER, TIMESTAMP, UUID, MessageStorageTestCase, make_message_dict
+from SignalCliApi.signalCommon import StorageTypes
+from SignalCliApi.signalMessageJournal import SignalMessageJournal
+from SignalCliApi.signalMessages import SignalMessages
+
+
+class JournalTestCase(MessageStorageTestCase):
+    """
+    Opens a journal in the temporary directory.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set the snapshot and journal paths.
+        :return: None
+        """
+        super().setUp()
+        self._snapshot_path: str = self.__get_path__('messages.json')
+        """The full path to the snapshot file."""
+        self._journal_path: str = self.__get_path__('messages.journal')
+        """The full path to the journal file."""
+        return
+
+    def __make_journal__(self) -> SignalMessageJournal:
+        """
+        Open the journal.
+        :return: SignalMessageJournal: The journal, closed after the test.
+        """
+        journal: SignalMessageJournal = SignalMessageJournal(self._snapshot_path, self._journal_path,
+                                                             self.__resolve_id__)
+        self.addCleanup(journal.close)
+        return journal
+
+
+class TestJournalReplay(JournalTestCase):
+    """
+    Replay a journal written while the sender's id changed from its uuid to its number.
+    """
+
+    def test_put_after_id_change(self) -> None:
+        """
+        A message put again after its sender's number is learned replays as one message, the latest version.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.put('messages', make_message_dict(UUID))
+        self._numbers[NUMBER] = UUID
+        journal.put('messages', make_message_dict(NUMBER, is_read=True))
+        journal.close()
+
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual(len(messages_dict['messages']), 1)
+        self.assertEqual(messages_dict['messages'][0]['sender'], NUMBER)
+        self.assertTrue(messages_dict['messages'][0]['isRead'])
+
+    def test_remove_after_id_change(self) -> None:
+        """
+        A message removed after its sender's number is learned doesn't replay.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.put('messages', make_message_dict(UUID))
+        self._numbers[NUMBER] = UUID
+        journal.remove('messages', [make_message_dict(NUMBER)])
+        journal.close()
+
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual(len(messages_dict['messages']), 0)
+
+    def test_put_after_id_change_over_snapshot(self) -> None:
+        """
+        A message in the snapshot, put again after its sender's number is learned, replays as one message.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.compact({'messages': [make_message_dict(UUID)]})
+        self._numbers[NUMBER] = UUID
+        journal.put('messages', make_message_dict(NUMBER, is_read=True))
+        journal.close()
+
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual(len(messages_dict['messages']), 1)
+        self.assertTrue(messages_dict['messages'][0]['isRead'])
+
+
+class TestJournalRecords(JournalTestCase):
+    """
+    Replay each kind of record, over a snapshot.
+    """
+
+    def test_remove_over_snapshot(self) -> None:
+        """
+        A remove record drops the message from the snapshot, and leaves the others.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.compact({'messages': [make_message_dict(NUMBER, timestamp=TIMESTAMP),
+                                      make_message_dict(NUMBER, timestamp=TIMESTAMP + 1)]})
+        journal.remove('messages', [make_message_dict(NUMBER, timestamp=TIMESTAMP)])
+        journal.close()
+
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual([message_dict['timestamp']['timestamp'] for message_dict in messages_dict['messages']],
+                         [TIMESTAMP + 1])
+
+    def test_set(self) -> None:
+        """
+        The last set record replaces the whole list, and the other lists are left alone.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.compact({'messages': [make_message_dict(NUMBER)], 'unparsedReceipts': [{'timestamp': 1}]})
+        journal.set('unparsedReceipts', [{'timestamp': 2}, {'timestamp': 3}])
+        journal.set('unparsedReceipts', [{'timestamp': 4}])
+        journal.close()
+
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual(messages_dict['unparsedReceipts'], [{'timestamp': 4}])
+        self.assertEqual(len(messages_dict['messages']), 1)
+        self.assertEqual(messages_dict['syncMessages'], [])
+
+    def test_torn_last_record(self) -> None:
+        """
+        A record cut short by a crash is ignored, and cut off, so records written afterwards replay.
+        """
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.put('messages', make_message_dict(NUMBER, timestamp=TIMESTAMP))
+        journal.close()
+        valid_size: int = os.path.getsize(self._journal_path)
+        with open(self._journal_path, 'a') as file_handle:
+            file_handle.write('{"op": "put", "list": "messa')
+
+        journal = self.__make_journal__()
+        messages_dict: dict[str, Any] = journal.load()
+        self.assertEqual(len(messages_dict['messages']), 1)
+        self.assertEqual(journal.num_records, 1)
+        self.assertEqual(os.path.getsize(self._journal_path), valid_size)
+        journal.put('messages', make_message_dict(OTHER_NUMBER, timestamp=TIMESTAMP + 1))
+        journal.close()
+
+        messages_dict = self.__make_journal__().load()
+        self.assertEqual([message_dict['sender'] for message_dict in messages_dict['messages']],
+                         [NUMBER, OTHER_NUMBER])
+
+
+class TestJournalCompaction(JournalTestCase):
+    """
+    Compact the journal as SignalMessages records changes.
+    """
+
+    def test_compact_at_size(self) -> None:
+        """
+        The journal is folded into the snapshot once it holds MESSAGES_JOURNAL_COMPACT_SIZE records, and what's
+        journaled afterwards replays over the new snapshot.
+        """
+        messages: SignalMessages = self.__make_messages__(StorageTypes.JOURNAL, compact_size=3)
+        messages.__receipts_changed__()
+        messages.__receipts_changed__()
+        self.assertTrue(os.path.exists(self._journal_path))
+        self.assertEqual(messages._journal.num_records, 2)
+
+        messages.__receipts_changed__()
+        self.assertFalse(os.path.exists(self._journal_path))
+        self.assertEqual(messages._journal.num_records, 0)
+        self.assertTrue(os.path.exists(self._snapshot_path))
+        messages.close()
+
+        journal: SignalMessageJournal = self.__make_journal__()
+        journal.put('messages', make_message_dict(NUMBER))
+        journal.close()
+        messages_dict: dict[str, Any] = self.__make_journal__().load()
+        self.assertEqual(len(messages_dict['messages']), 1)
+        self.assertEqual(messages_dict['unparsedReceipts'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+File: test_message_store.py
+Test the SQLite message store.
+Run from the repository root: python -m pytest tests
+"""
+import json
+import sqlite3
+import unittest
+from typing import Any
+
+from message_fixtures import (ACCOUNT_ID, GROUP_ID, NUMBER, OTHER_NUMBER, TIMESTAMP, UUID, MessageStorageTestCase,
+                              make_message_dict)
+from SignalCliApi.signalCommon import MessageTypes, StorageTypes
+from SignalCliApi.signalMessageJournal import SignalMessageJournal
+from SignalCliApi.signalMessageStore import SignalMessageStore
+
+
+class StoreTestCase(MessageStorageTestCase):
+    """
+    Opens a store in the temporary directory.
+    """
+
+    def setUp(self) -> None:
+        """
+        Set the database path.
+        :return: None
+        """
+        super().setUp()
+        self._db_path: str = self.__get_path__('messages.db')
+        """The full path to the database file."""
+        return
+
+    def __make_store__(self) -> SignalMessageStore:
+        """
+        Open the store.
+        :return: SignalMessageStore: The store, closed after the test.
+        """
+        store: SignalMessageStore = SignalMessageStore(self._db_path, ACCOUNT_ID, self.__resolve_id__)
+        self.addCleanup(store.close)
+        return store
+
+
+class TestStoreKeys(StoreTestCase):
+    """
+    Store a message while the sender's id changes from its uuid to its number.
+    """
+
+    def test_put_after_id_change(self) -> None:
+        """
+        A message put again after its sender's number is learned updates the one row, found by either id.
+        """
+        store: SignalMessageStore = self.__make_store__()
+        store.put('messages', make_message_dict(UUID))
+        self._numbers[NUMBER] = UUID
+        store.put('messages', make_message_dict(NUMBER, is_read=True))
+
+        self.assertEqual(store.count(), 1)
+        for contact_id in (UUID, NUMBER):
+            results: list[tuple[str, dict[str, Any]]] = store.query(sender=contact_id)
+            self.assertEqual(len(results), 1)
+            self.assertTrue(results[0][1]['isRead'])
+            self.assertEqual(len(store.query(conversation=contact_id)), 1)
+
+    def test_remove_after_id_change(self) -> None:
+        """
+        A message removed after its sender's number is learned is removed.
+        """
+        store: SignalMessageStore = self.__make_store__()
+        store.put('messages', make_message_dict(UUID))
+        self._numbers[NUMBER] = UUID
+        store.remove('messages', [make_message_dict(NUMBER)])
+
+        self.assertEqual(store.count(), 0)
+
+    def test_rekey_old_database(self) -> None:
+        """
+        Opening a database keyed by the old ids keeps the latest version of each message, under the new key.
+        """
+        self._numbers[NUMBER] = UUID
+        self.__make_store__().close()
+        # Write the two versions as the old store did, keyed and indexed by the ids as they were:
+        connection: sqlite3.Connection = sqlite3.connect(self._db_path)
+        for sender, is_read in ((UUID, False), (NUMBER, True)):
+            message_dict: dict[str, Any] = make_message_dict(sender, is_read=is_read)
+            key: str = SignalMessageJournal.__get_key__(message_dict)
+            connection.execute("INSERT INTO messages (key, list, message_type, sender, recipient, conversation, "
+                               "timestamp, is_read, body) VALUES (?, 'messages', ?, ?, ?, ?, ?, ?, ?)",
+                               (key, message_dict['messageType'], sender, ACCOUNT_ID, sender, TIMESTAMP, is_read,
+                                json.dumps(message_dict)))
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+        connection.close()
+
+        store: SignalMessageStore = self.__make_store__()
+        self.assertEqual(store.count(), 1)
+        results: list[tuple[str, dict[str, Any]]] = store.query(sender=NUMBER)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0][1]['isRead'])
+
+
+class TestStoreQuery(StoreTestCase):
+    """
+    Find messages by the criteria query() takes.
+    """
+
+    def setUp(self) -> None:
+        """
+        Store messages from two contacts, one of them to a group, and one sent by us.
+        :return: None
+        """
+        super().setUp()
+        self._store: SignalMessageStore = self.__make_store__()
+        """The store holding the messages."""
+        self._store.put_many('messages', [
+            make_message_dict(NUMBER, timestamp=TIMESTAMP),
+            make_message_dict(NUMBER, timestamp=TIMESTAMP + 1, is_read=True),
+            make_message_dict(OTHER_NUMBER, timestamp=TIMESTAMP + 2, mentioned=ACCOUNT_ID),
+            make_message_dict(OTHER_NUMBER, recipient=GROUP_ID, timestamp=TIMESTAMP + 3),
+            make_message_dict(ACCOUNT_ID, recipient=NUMBER, timestamp=TIMESTAMP + 4, message_type=MessageTypes.SENT),
+        ])
+        self._store.put('syncMessages', make_message_dict(ACCOUNT_ID, recipient=NUMBER, timestamp=TIMESTAMP + 5))
+        return
+
+    def __get_timestamps__(self, **criteria: Any) -> list[int]:
+        """
+        Query the store, and get the timestamps of the messages found.
+        :param criteria: Any: The query() arguments.
+        :return: list[int]: The timestamps, in the order returned.
+        """
+        return [message_dict['timestamp']['timestamp'] for _, message_dict in self._store.query(**criteria)]
+
+    def test_list(self) -> None:
+        """
+        Only the list asked for is searched.
+        """
+        self.assertEqual(len(self.__get_timestamps__()), 5)
+        self.assertEqual(self.__get_timestamps__(list_name='syncMessages'), [TIMESTAMP + 5])
+
+    def test_conversation(self) -> None:
+        """
+        A contact's conversation holds the messages from them, and the ones we sent them, but not their group messages.
+        """
+        self.assertEqual(self.__get_timestamps__(conversation=NUMBER), [TIMESTAMP, TIMESTAMP + 1, TIMESTAMP + 4])
+        self.assertEqual(self.__get_timestamps__(conversation=OTHER_NUMBER), [TIMESTAMP + 2])
+        self.assertEqual(self.__get_timestamps__(conversation=GROUP_ID), [TIMESTAMP + 3])
+
+    def test_sender_and_recipient(self) -> None:
+        """
+        Messages are found by who sent them, and who they were sent to.
+        """
+        self.assertEqual(self.__get_timestamps__(sender=OTHER_NUMBER), [TIMESTAMP + 2, TIMESTAMP + 3])
+        self.assertEqual(self.__get_timestamps__(recipient=GROUP_ID), [TIMESTAMP + 3])
+        self.assertEqual(self.__get_timestamps__(timestamp=TIMESTAMP + 1), [TIMESTAMP + 1])
+
+    def test_flags_and_type(self) -> None:
+        """
+        Messages are found by their flags and type, together.
+        """
+        self.assertEqual(self.__get_timestamps__(message_type=MessageTypes.SENT), [TIMESTAMP + 4])
+        self.assertEqual(self.__get_timestamps__(message_type=MessageTypes.RECEIVED, is_read=False),
+                         [TIMESTAMP, TIMESTAMP + 2, TIMESTAMP + 3])
+        self.assertEqual(self.__get_timestamps__(sender=NUMBER, is_read=True), [TIMESTAMP + 1])
+
+    def test_mentioned(self) -> None:
+        """
+        Messages are found by who they mention.
+        """
+        self.assertEqual(self.__get_timestamps__(mentioned=ACCOUNT_ID), [TIMESTAMP + 2])
+        self.assertEqual(self.__get_timestamps__(mentioned=NUMBER), [])
+
+    def test_limit(self) -> None:
+        """
+        The limit keeps the first messages stored.
+        """
+        self.assertEqual(self.__get_timestamps__(limit=2), [TIMESTAMP, TIMESTAMP + 1])
+
+    def test_indexes_used(self) -> None:
+        """
+        The common lookups are answered from an index, not by scanning the table.
+        """
+        for sql, params, index in (
+                ("SELECT key FROM messages WHERE list = ? AND conversation = ?", ('messages', NUMBER),
+                 'messages_conversation'),
+                ("SELECT key FROM messages WHERE sender = ?", (NUMBER,), 'messages_sender'),
+                ("SELECT key FROM messages WHERE list = ? AND message_type = ? AND is_read = ?",
+                 ('messages', MessageTypes.RECEIVED.value, 0), 'messages_read'),
+                ("SELECT key FROM messages WHERE expires IS NOT NULL AND expires <= ?", (TIMESTAMP,),
+                 'messages_expires'),
+                ("SELECT message_key FROM mentions WHERE contact_id = ?", (ACCOUNT_ID,), 'mentions_contact'),
+        ):
+            plan: str = ' '.join(row[-1] for row in self._store._connection.execute("EXPLAIN QUERY PLAN " + sql,
+                                                                                    params))
+            self.assertIn(index, plan, sql)
+
+
+class TestStoreExpiry(StoreTestCase):
+    """
+    Remove messages once they expire.
+    """
+
+    def test_remove_expired(self) -> None:
+        """
+        Only the messages due are removed, and the next expiry moves on to the one left.
+        """
+        store: SignalMessageStore = self.__make_store__()
+        store.put_many('messages', [
+            make_message_dict(NUMBER, timestamp=TIMESTAMP, expires=TIMESTAMP + 1000),
+            make_message_dict(NUMBER, timestamp=TIMESTAMP + 1, expires=TIMESTAMP + 2000),
+            make_message_dict(NUMBER, timestamp=TIMESTAMP + 2),
+        ])
+        self.assertEqual(store.next_expiry(), TIMESTAMP + 1000)
+
+        self.assertEqual(store.remove_expired(TIMESTAMP + 999), [])
+        removed_keys: list[str] = store.remove_expired(TIMESTAMP + 1000)
+        self.assertEqual(removed_keys, [SignalMessageJournal.__get_key__(
+            make_message_dict(NUMBER, timestamp=TIMESTAMP), self.__resolve_id__)])
+        self.assertEqual(store.count(), 2)
+        self.assertEqual(store.next_expiry(), TIMESTAMP + 2000)
+
+        store.remove_expired(TIMESTAMP + 5000)
+        self.assertEqual(store.count(), 1)
+        self.assertIsNone(store.next_expiry())
+
+
+class TestStoreImport(StoreTestCase):
+    """
+    Import the messages of an account stored before SQLite was used.
+    """
+
+    def test_import_messages_json(self) -> None:
+        """
+        The first load imports messages.json, and the journal on top of it, once.
+        """
+        journal: SignalMessageJournal = SignalMessageJournal(
+            self.__get_path__('messages.json'), self.__get_path__('messages.journal'), self.__resolve_id__)
+        journal.compact({'messages': [make_message_dict(NUMBER, timestamp=TIMESTAMP)], 'syncMessages': [],
+                         'typingMessages': [], 'storyMessages': [], 'unparsedReceipts': []})
+        journal.put('messages', make_message_dict(OTHER_NUMBER, timestamp=TIMESTAMP + 2))
+        journal.close()
+
+        self.__make_messages__(StorageTypes.SQLITE).close()
+        # Loading again doesn't import a second time:
+        self.__make_messages__(StorageTypes.SQLITE).close()
+
+        store: SignalMessageStore = self.__make_store__()
+        self.assertEqual(store.count('messages'), 2)
+        self.assertEqual(len(store.query(sender=OTHER_NUMBER)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()